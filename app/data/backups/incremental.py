@@ -0,0 +1,335 @@
+"""
+Backups incrementais com deduplicação por blocos de registros.
+
+Layout dentro do diretório de backups do usuário:
+
+    objetos/ab/abcdef....zst        blocos de registros, endereçados pelo SHA-256 do conteúdo
+    snapshots/<AAAAMMDD_HHMMSS_ffffff>.json.zst  manifesto de cada backup
+
+(a extensão segue o algoritmo de `app.data.compressao`; arquivos gravados
+com outro algoritmo continuam sendo encontrados e lidos)
+
+Cada registro é serializado de forma canônica e as listas são divididas em
+blocos definidos pelo conteúdo: um bloco termina após um registro cujo hash
+satisfaz uma condição (em média a cada MEDIA_BLOCO registros). Como a
+divisão não depende da posição, alterar, incluir ou excluir um gasto muda
+apenas o bloco em que ele está; os demais blocos já existem no armazém e não
+são gravados de novo. O manifesto referencia apenas os hashes dos blocos.
+
+A política de retenção mantém os últimos backups, um por dia e um por semana
+recentes; os objetos que deixam de ser referenciados são removidos.
+"""
+import os
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+from app.data import storage, compressao
+from app.utils.instrumentation import get_logger, span
+
+logger = get_logger("backups")
+
+# Tamanho médio e máximo (em registros) dos blocos de uma lista
+MEDIA_BLOCO = 64
+MAXIMO_BLOCO = 256
+
+# Retenção: últimos backups, um por dia nos últimos N dias e um por semana nas últimas N semanas
+MANTER_ULTIMOS = int(os.environ.get("BRAUNA_BACKUP_MANTER_ULTIMOS", "10"))
+MANTER_DIARIOS = int(os.environ.get("BRAUNA_BACKUP_MANTER_DIARIOS", "7"))
+MANTER_SEMANAIS = int(os.environ.get("BRAUNA_BACKUP_MANTER_SEMANAIS", "4"))
+
+# Formato do nome dos manifestos (ordenável como texto)
+FORMATO_NOME = "%Y%m%d_%H%M%S_%f"
+
+# Extensões possíveis dos objetos (a do algoritmo configurado primeiro)
+EXTENSOES = [compressao.extensao()] + [
+    ext for ext in compressao.EXTENSOES.values() if ext != compressao.extensao()
+]
+
+
+class BackupCorrompidoError(Exception):
+    """Lançada quando um objeto do backup está ausente ou não corresponde ao seu hash."""
+
+
+def serializar(dados):
+    """Serialização canônica (chaves ordenadas, sem espaços) usada para o hash."""
+    return json.dumps(dados, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def calcular_hash(conteudo):
+    """SHA-256 (hexadecimal) do conteúdo."""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+class ArmazemBackups:
+    """
+    Armazém de backups incrementais de um usuário.
+
+    Exemplo:
+        armazem = ArmazemBackups(diretorio_usuario() / "backups")
+        nome, manifesto, estatisticas = armazem.criar_snapshot({"gastos": gastos})
+        gastos = armazem.restaurar(nome, "gastos")
+    """
+
+    def __init__(self, raiz):
+        self.raiz = Path(raiz)
+        self.dir_objetos = self.raiz / "objetos"
+        self.dir_snapshots = self.raiz / "snapshots"
+
+    # Objetos
+
+    def _caminho_objeto(self, chave, extensao=None):
+        """Caminho do objeto de um hash (com a extensão do algoritmo configurado)."""
+        return self.dir_objetos / chave[:2] / f"{chave}{compressao.extensao() if extensao is None else extensao}"
+
+    def _localizar_objeto(self, chave):
+        """Caminho do objeto existente de um hash, em qualquer formato, ou None."""
+        for extensao in EXTENSOES:
+            caminho = self._caminho_objeto(chave, extensao)
+            if caminho.exists():
+                return caminho
+        return None
+
+    def _gravar_objeto(self, conteudo, estatisticas):
+        """
+        Grava um objeto se ele ainda não existir.
+
+        Returns:
+            str: Hash do conteúdo.
+        """
+        chave = calcular_hash(conteudo)
+        if self._localizar_objeto(chave):
+            estatisticas["objetos_reaproveitados"] += 1
+            return chave
+        comprimido = compressao.comprimir(conteudo)
+        storage.gravar_imutavel(self._caminho_objeto(chave), comprimido)
+        estatisticas["objetos_novos"] += 1
+        estatisticas["bytes_gravados"] += len(comprimido)
+        return chave
+
+    def _ler_objeto(self, chave):
+        """
+        Lê e verifica um objeto.
+
+        Raises:
+            BackupCorrompidoError: Se o objeto não existir ou o conteúdo não corresponder ao hash.
+        """
+        caminho = self._localizar_objeto(chave)
+        if caminho is None:
+            raise BackupCorrompidoError(f"Objeto {chave} ausente")
+        try:
+            conteudo = compressao.ler_bytes(caminho)
+        except (OSError, EOFError, RuntimeError) as e:
+            raise BackupCorrompidoError(f"Objeto {chave} ilegível: {e}") from e
+        if calcular_hash(conteudo) != chave:
+            raise BackupCorrompidoError(f"Objeto {chave} não corresponde ao seu hash")
+        return json.loads(conteudo)
+
+    # Entidades
+
+    def _gravar_lista(self, registros, estatisticas):
+        """Grava os blocos de uma lista e retorna sua descrição no manifesto."""
+        blocos = []
+        atual = []
+        for registro in registros:
+            conteudo = serializar(registro)
+            atual.append(conteudo)
+            # Fronteira definida pelo conteúdo do registro (independente da posição na lista)
+            fronteira = int(calcular_hash(conteudo)[:8], 16) % MEDIA_BLOCO == 0
+            if fronteira or len(atual) >= MAXIMO_BLOCO:
+                blocos.append(self._gravar_objeto(b"[" + b",".join(atual) + b"]", estatisticas))
+                atual = []
+        if atual:
+            blocos.append(self._gravar_objeto(b"[" + b",".join(atual) + b"]", estatisticas))
+        return {
+            "tipo": "lista",
+            "linhas": len(registros),
+            "blocos": blocos,
+            "raiz": calcular_hash(serializar(blocos)),
+        }
+
+    def _gravar_documento(self, dados, estatisticas):
+        """Grava um documento (ex: perfil do usuário) como um único objeto."""
+        chave = self._gravar_objeto(serializar(dados), estatisticas)
+        return {"tipo": "documento", "linhas": 0, "objeto": chave, "raiz": chave}
+
+    # Snapshots
+
+    def caminho_manifesto(self, nome):
+        """Caminho do manifesto de um snapshot (o existente, em qualquer formato, ou o do algoritmo atual)."""
+        for extensao in EXTENSOES:
+            caminho = self.dir_snapshots / f"{nome}.json{extensao}"
+            if caminho.exists():
+                return caminho
+        return self.dir_snapshots / f"{nome}.json{compressao.extensao()}"
+
+    @staticmethod
+    def nome_manifesto(caminho):
+        """Nome do snapshot a partir do caminho do manifesto."""
+        return Path(caminho).name.split(".")[0]
+
+    def criar_snapshot(self, entidades, criado_em=None):
+        """
+        Cria um snapshot das entidades informadas.
+
+        Args:
+            entidades (dict): {nome: dados}, onde dados é uma lista de registros ou um documento.
+            criado_em (datetime, optional): Data do snapshot. Padrão: agora.
+
+        Returns:
+            tuple: (nome, manifesto, estatisticas), onde estatisticas tem
+                "objetos_novos", "objetos_reaproveitados" e "bytes_gravados".
+        """
+        criado_em = criado_em or datetime.now()
+        nome = criado_em.strftime(FORMATO_NOME)
+        estatisticas = {"objetos_novos": 0, "objetos_reaproveitados": 0, "bytes_gravados": 0}
+
+        with span("backup.snapshot") as s, storage.bloquear(self.raiz / "armazem", exclusivo=True):
+            manifesto = {"criado_em": criado_em.isoformat(timespec="seconds"), "entidades": {}}
+            for entidade, dados in entidades.items():
+                if isinstance(dados, list):
+                    manifesto["entidades"][entidade] = self._gravar_lista(dados, estatisticas)
+                else:
+                    manifesto["entidades"][entidade] = self._gravar_documento(dados, estatisticas)
+
+            comprimido = compressao.comprimir(serializar(manifesto))
+            storage.gravar_imutavel(self.caminho_manifesto(nome), comprimido)
+            estatisticas["bytes_gravados"] += len(comprimido)
+            s.registrar(linhas=sum(d["linhas"] for d in manifesto["entidades"].values()),
+                        bytes=estatisticas["bytes_gravados"])
+
+        logger.info(f"Backup {nome}: {estatisticas['objetos_novos']} objetos novos, "
+                    f"{estatisticas['objetos_reaproveitados']} reaproveitados, {estatisticas['bytes_gravados']} bytes")
+        return nome, manifesto, estatisticas
+
+    def listar(self):
+        """Nomes dos snapshots, do mais recente para o mais antigo."""
+        if not self.dir_snapshots.exists():
+            return []
+        nomes = {
+            self.nome_manifesto(arquivo)
+            for arquivo in os.listdir(self.dir_snapshots)
+            if ".json" in arquivo and not arquivo.startswith(".")
+        }
+        return sorted(nomes, reverse=True)
+
+    def ler_manifesto(self, nome):
+        """
+        Lê o manifesto de um snapshot.
+
+        Raises:
+            BackupCorrompidoError: Se o manifesto não existir ou estiver ilegível.
+        """
+        try:
+            return compressao.carregar_json(self.caminho_manifesto(nome))
+        except (OSError, EOFError, ValueError, RuntimeError) as e:
+            raise BackupCorrompidoError(f"Manifesto {nome} ilegível: {e}") from e
+
+    def restaurar(self, nome, entidade, raiz_esperada=None):
+        """
+        Reconstrói os dados de uma entidade a partir de um snapshot, verificando cada objeto.
+
+        Args:
+            nome (str): Nome do snapshot.
+            entidade (str): Entidade a restaurar.
+            raiz_esperada (str, optional): Hash registrado no catálogo para conferência.
+
+        Returns:
+            list ou dict: Dados da entidade, ou None se ela não estiver no snapshot.
+
+        Raises:
+            BackupCorrompidoError: Se algum objeto estiver ausente ou corrompido.
+        """
+        descricao = self.ler_manifesto(nome)["entidades"].get(entidade)
+        if descricao is None:
+            return None
+        if raiz_esperada and descricao.get("raiz") != raiz_esperada:
+            raise BackupCorrompidoError(f"Snapshot {nome} de '{entidade}' não corresponde ao catálogo")
+
+        with span("backup.restaurar", entidade) as s:
+            if descricao["tipo"] == "documento":
+                return self._ler_objeto(descricao["objeto"])
+
+            if calcular_hash(serializar(descricao["blocos"])) != descricao["raiz"]:
+                raise BackupCorrompidoError(f"Lista de blocos de '{entidade}' corrompida em {nome}")
+            registros = []
+            for bloco in descricao["blocos"]:
+                registros.extend(self._ler_objeto(bloco))
+            s.registrar(dados=registros)
+            return registros
+
+    # Retenção
+
+    def selecionar_retidos(self, nomes):
+        """
+        Aplica a política de retenção a uma lista de snapshots (mais recentes primeiro).
+
+        Returns:
+            set: Nomes dos snapshots mantidos.
+        """
+        retidos = set(nomes[:MANTER_ULTIMOS])
+        dias, semanas = [], []
+        for nome in nomes:
+            data = datetime.strptime(nome, FORMATO_NOME)
+            dia = data.date()
+            semana = data.isocalendar()[:2]
+            # O primeiro (mais recente) snapshot de cada dia e de cada semana
+            if dia not in dias and len(dias) < MANTER_DIARIOS:
+                dias.append(dia)
+                retidos.add(nome)
+            if semana not in semanas and len(semanas) < MANTER_SEMANAIS:
+                semanas.append(semana)
+                retidos.add(nome)
+        return retidos
+
+    def aplicar_retencao(self):
+        """
+        Remove os snapshots fora da política de retenção e os objetos não referenciados.
+
+        Returns:
+            list: Caminhos dos manifestos removidos.
+        """
+        with storage.bloquear(self.raiz / "armazem", exclusivo=True):
+            nomes = self.listar()
+            retidos = self.selecionar_retidos(nomes)
+            removidos = []
+            for nome in nomes:
+                if nome not in retidos:
+                    caminho = self.caminho_manifesto(nome)
+                    try:
+                        os.remove(caminho)
+                        removidos.append(caminho)
+                    except OSError as e:
+                        logger.warning(f"Não foi possível remover o backup {nome}: {e}")
+            if removidos:
+                self._coletar_lixo()
+        return removidos
+
+    def _coletar_lixo(self):
+        """Remove os objetos que nenhum snapshot restante referencia (chamada com o armazém bloqueado)."""
+        referenciados = set()
+        for nome in self.listar():
+            try:
+                manifesto = self.ler_manifesto(nome)
+            except BackupCorrompidoError as e:
+                # Na dúvida, não apagar nada: um manifesto ilegível pode referenciar qualquer objeto
+                logger.warning(f"Coleta de objetos cancelada: {e}")
+                return 0
+            for descricao in manifesto["entidades"].values():
+                if descricao["tipo"] == "documento":
+                    referenciados.add(descricao["objeto"])
+                    continue
+                referenciados.update(descricao["blocos"])
+
+        removidos = 0
+        for raiz, _, arquivos in os.walk(self.dir_objetos):
+            for arquivo in arquivos:
+                if not arquivo.startswith(".") and arquivo.split(".")[0] not in referenciados:
+                    try:
+                        os.remove(os.path.join(raiz, arquivo))
+                        removidos += 1
+                    except OSError:
+                        pass
+        logger.info(f"{removidos} objetos de backup não referenciados removidos")
+        return removidos
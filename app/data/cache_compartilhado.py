@@ -0,0 +1,153 @@
+"""
+Cache de processo dos arquivos locais lidos com frequência.
+
+Os arquivos JSON/YAML lidos pelas sessões (listas das entidades, configuração)
+ficam em memória uma única vez por processo, identificados pelo caminho e pela
+versão do arquivo (inode, data de modificação e tamanho). Todas as sessões que
+leem a mesma versão recebem os mesmos registros; uma gravação gera uma versão
+nova e a próxima leitura substitui o snapshot.
+
+Cópia na escrita: cada chamada recebe uma lista própria (inclusões e remoções
+não afetam as outras sessões), mas os registros são compartilhados. Para
+alterar um registro, substitua-o na lista por uma cópia
+(`lista[i] = dict(registro, campo=valor)`) em vez de alterá-lo no lugar.
+
+Os snapshots são montados uma vez por versão: a lista vira uma tupla e as
+strings curtas dos registros são internadas (`registro_compacto`), então as
+sessões compartilham também os valores repetidos (categorias, datas, status).
+
+Desativado com BRAUNA_CACHE_COMPARTILHADO=0 (cada leitura volta a analisar o arquivo).
+
+O módulo também conta as gravações de cada entidade feitas pelo processo
+(`registrar_geracao`), usadas na versão dos dados dos caches derivados, como
+o das figuras. Os contadores ficam aqui, e não no `data_handler`, porque ele é
+importado com dois nomes (`app.data.data_handler` e `data.data_handler`) e
+cada nome tem as suas variáveis de módulo.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from app.data import storage
+
+# Cache ativo
+ATIVO = os.environ.get("BRAUNA_CACHE_COMPARTILHADO", "1") != "0"
+
+# Máximo de arquivos mantidos em memória (os menos usados saem primeiro)
+MAX_ARQUIVOS = int(os.environ.get("BRAUNA_CACHE_COMPARTILHADO_MAX", "256"))
+
+# Strings até este tamanho são internadas (valores categóricos, datas, IDs)
+MAX_TAMANHO_INTERNAR = 40
+
+_snapshots = OrderedDict()
+_lock = threading.Lock()
+_estatisticas = {"acertos": 0, "leituras": 0}
+
+_geracoes = {}
+_geracoes_lock = threading.Lock()
+
+
+def registro_compacto(registro):
+    """
+    Versão do registro com as strings curtas internadas com `sys.intern`.
+
+    Não altera o registro recebido: se alguma string for trocada, retorna um
+    dicionário novo; caso contrário, o próprio registro.
+    """
+    trocas = None
+    for campo, valor in registro.items():
+        if type(valor) is str and len(valor) <= MAX_TAMANHO_INTERNAR:
+            internado = sys.intern(valor)
+            if internado is not valor:
+                if trocas is None:
+                    trocas = {}
+                trocas[campo] = internado
+    if trocas is None:
+        return registro
+    return {**registro, **trocas}
+
+
+def ler(caminho, carregar):
+    """
+    Retorna o snapshot compartilhado de um arquivo, lendo-o apenas se a versão mudou.
+
+    Args:
+        caminho (str ou Path): Arquivo.
+        carregar (callable): Lê o arquivo e retorna (dados, versao), como `storage.ler_json`.
+
+    Returns:
+        tuple: (dados, versao). Os dados são compartilhados entre as sessões e não devem ser alterados.
+    """
+    if not ATIVO:
+        return carregar()
+
+    chave = str(caminho)
+    versao_atual = storage.versao_arquivo(caminho)
+    with _lock:
+        guardado = _snapshots.get(chave)
+        if guardado is not None and versao_atual is not None and guardado[1] == versao_atual:
+            _snapshots.move_to_end(chave)
+            _estatisticas["acertos"] += 1
+            return guardado
+
+    dados, versao = carregar()
+    if isinstance(dados, list):
+        # Tupla: a lista compartilhada não pode receber inclusões por engano
+        dados = tuple(registro_compacto(r) if isinstance(r, dict) else r for r in dados)
+    with _lock:
+        _estatisticas["leituras"] += 1
+        if versao is not None:
+            _snapshots[chave] = (dados, versao)
+            _snapshots.move_to_end(chave)
+            while len(_snapshots) > MAX_ARQUIVOS:
+                _snapshots.popitem(last=False)
+        else:
+            _snapshots.pop(chave, None)
+    return dados, versao
+
+
+def ler_lista(caminho, padrao=None):
+    """
+    Lê uma lista JSON pelo cache.
+
+    Returns:
+        tuple: (lista própria do chamador com os registros compartilhados, versao).
+    """
+    dados, versao = ler(caminho, lambda: storage.ler_json(caminho, padrao))
+    if isinstance(dados, tuple):
+        dados = list(dados)
+    return dados, versao
+
+
+def invalidar(caminho=None):
+    """Remove um arquivo do cache (ou todos, sem argumento)."""
+    with _lock:
+        if caminho is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(str(caminho), None)
+
+
+def estatisticas():
+    """
+    Returns:
+        dict: Arquivos em cache, acertos e leituras do disco desde o início do processo.
+    """
+    with _lock:
+        return {"arquivos": len(_snapshots), **_estatisticas}
+
+
+def registrar_geracao(chave):
+    """Conta uma nova gravação dos dados identificados pela chave (ex: (usuário, "gastos"))."""
+    with _geracoes_lock:
+        _geracoes[chave] = _geracoes.get(chave, 0) + 1
+
+
+def geracao(chave):
+    """
+    Returns:
+        int: Gravações registradas para a chave desde o início do processo.
+    """
+    with _geracoes_lock:
+        return _geracoes.get(chave, 0)
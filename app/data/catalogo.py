@@ -0,0 +1,253 @@
+"""
+Catálogo de snapshots (cópias de segurança) dos dados locais de um usuário.
+
+Cada diretório de usuário tem um `catalogo.json` pequeno que lista, por
+entidade, os snapshots gravados (arquivo, data, quantidade de registros,
+tamanho e checksum SHA-256). A recuperação consulta o catálogo em vez de
+varrer o sistema de arquivos, e o catálogo também guarda o maior volume já
+registrado, o que permite distinguir "vazio porque o usuário é novo" de
+"vazio porque os dados se perderam".
+"""
+import os
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+from app.data import storage
+from app.data import compressao
+from app.data.backups.incremental import ArmazemBackups, BackupCorrompidoError
+from app.utils.instrumentation import get_logger
+
+logger = get_logger("catalogo")
+
+# Nome do arquivo do catálogo dentro do diretório do usuário
+ARQUIVO_CATALOGO = "catalogo.json"
+
+# Snapshots mantidos no catálogo por entidade (os mais antigos saem da lista)
+MAX_SNAPSHOTS = 50
+
+# Tentativas de regravar o catálogo quando outra sessão o alterou
+TENTATIVAS_CONFLITO = 3
+
+
+def calcular_checksum(conteudo):
+    """
+    Retorna o SHA-256 (hexadecimal) do conteúdo.
+
+    Args:
+        conteudo (str ou bytes): Conteúdo do arquivo.
+    """
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def caminho_catalogo(diretorio):
+    """Caminho do catálogo de um diretório de usuário."""
+    return Path(diretorio) / ARQUIVO_CATALOGO
+
+
+def existe(diretorio):
+    """Indica se o diretório já tem catálogo."""
+    return os.path.exists(caminho_catalogo(diretorio))
+
+
+def ler_catalogo(diretorio):
+    """
+    Lê o catálogo de um diretório de usuário.
+
+    Returns:
+        tuple: (catalogo, versao). Um catálogo ausente ou corrompido é tratado como vazio.
+    """
+    try:
+        catalogo, versao = storage.ler_json(caminho_catalogo(diretorio))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Catálogo de snapshots ilegível em {diretorio}: {e}")
+        return {"entidades": {}}, storage.versao_arquivo(caminho_catalogo(diretorio))
+    if not isinstance(catalogo, dict) or not isinstance(catalogo.get("entidades"), dict):
+        catalogo = {"entidades": {}}
+    return catalogo, versao
+
+
+def _atualizar(diretorio, alterar):
+    """
+    Aplica `alterar(catalogo)` e grava o catálogo, repetindo se outra sessão o alterou antes.
+    """
+    for _ in range(TENTATIVAS_CONFLITO):
+        catalogo, versao = ler_catalogo(diretorio)
+        alterar(catalogo)
+        try:
+            storage.gravar_json(caminho_catalogo(diretorio), catalogo, versao_esperada=versao)
+            return catalogo
+        except storage.ConflitoVersaoError:
+            continue
+    # Catálogo em disputa contínua: gravar a última versão sem nova verificação
+    storage.gravar_json(caminho_catalogo(diretorio), catalogo)
+    return catalogo
+
+
+def _entidade(catalogo, entidade):
+    """Retorna (criando se necessário) o registro de uma entidade no catálogo."""
+    return catalogo["entidades"].setdefault(entidade, {"max_linhas": 0, "snapshots": []})
+
+
+def _caminho_relativo(diretorio, caminho):
+    """Guarda caminhos dentro do diretório do usuário como relativos (o diretório pode mudar de lugar)."""
+    try:
+        return str(Path(caminho).resolve().relative_to(Path(diretorio).resolve()))
+    except ValueError:
+        return str(Path(caminho).resolve())
+
+
+def caminho_snapshot(diretorio, entrada):
+    """Caminho absoluto do arquivo de uma entrada do catálogo."""
+    caminho = Path(entrada["arquivo"])
+    return caminho if caminho.is_absolute() else Path(diretorio) / caminho
+
+
+def registrar_snapshot(diretorio, entidade, caminho, linhas, checksum, tamanho, criado_em=None, formato="json"):
+    """
+    Registra um snapshot gravado no catálogo.
+
+    Args:
+        diretorio (Path): Diretório do usuário.
+        entidade (str): Entidade do snapshot (ex: "gastos").
+        caminho (str ou Path): Arquivo do snapshot.
+        linhas (int): Quantidade de registros.
+        checksum (str): SHA-256 do conteúdo.
+        tamanho (int): Tamanho do arquivo em bytes.
+        criado_em (str, optional): Data ISO do snapshot. Padrão: agora.
+        formato (str): "json" (arquivo com a lista completa) ou "incremental"
+            (manifesto do armazém de backups; o checksum é a raiz da entidade).
+
+    Returns:
+        dict: A entrada registrada.
+    """
+    entrada = {
+        "entidade": entidade,
+        "formato": formato,
+        "arquivo": _caminho_relativo(diretorio, caminho),
+        "criado_em": criado_em or datetime.now().isoformat(timespec="seconds"),
+        "linhas": linhas,
+        "bytes": tamanho,
+        "checksum": checksum,
+    }
+
+    def alterar(catalogo):
+        dados = _entidade(catalogo, entidade)
+        # Um arquivo regravado (ex: gastos_backup.json) substitui a entrada anterior
+        snapshots = [s for s in dados["snapshots"] if s.get("arquivo") != entrada["arquivo"]]
+        snapshots.append(entrada)
+        snapshots.sort(key=lambda s: s.get("criado_em") or "")
+        dados["snapshots"] = snapshots[-MAX_SNAPSHOTS:]
+        dados["max_linhas"] = max(dados.get("max_linhas", 0), linhas)
+
+    _atualizar(diretorio, alterar)
+    return entrada
+
+
+def gravar_snapshot(diretorio, entidade, caminho, conteudo, linhas):
+    """
+    Grava o conteúdo de um snapshot de forma atômica e o registra no catálogo.
+
+    Args:
+        conteudo (str ou bytes): Conteúdo do arquivo.
+        linhas (int): Quantidade de registros no conteúdo.
+
+    Returns:
+        dict: A entrada registrada.
+    """
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+    storage.gravar_atomico(caminho, conteudo)
+    return registrar_snapshot(diretorio, entidade, caminho, linhas, calcular_checksum(conteudo), len(conteudo))
+
+
+def copiar_snapshot(diretorio, entidade, origem, destino):
+    """
+    Copia um arquivo JSON (lista de registros) como snapshot e o registra no catálogo.
+
+    Returns:
+        dict ou None: A entrada registrada, ou None se a origem não existir.
+    """
+    conteudo, _ = storage.ler_texto(origem)
+    if conteudo is None:
+        return None
+    registros = json.loads(conteudo)
+    linhas = len(registros) if isinstance(registros, list) else 0
+    return gravar_snapshot(diretorio, entidade, destino, conteudo, linhas)
+
+
+def remover_snapshots(diretorio, caminhos):
+    """
+    Remove do catálogo as entradas dos arquivos informados (ex: backups descartados pela retenção).
+    """
+    arquivos = {_caminho_relativo(diretorio, caminho) for caminho in caminhos}
+    if not arquivos:
+        return
+
+    def alterar(catalogo):
+        for dados in catalogo["entidades"].values():
+            dados["snapshots"] = [s for s in dados["snapshots"] if s.get("arquivo") not in arquivos]
+
+    _atualizar(diretorio, alterar)
+
+
+def snapshots(diretorio, entidade, com_dados=False):
+    """
+    Lista os snapshots de uma entidade, do mais recente para o mais antigo.
+
+    Args:
+        com_dados (bool): Se True, ignora os snapshots sem registros.
+    """
+    catalogo, _ = ler_catalogo(diretorio)
+    entradas = catalogo["entidades"].get(entidade, {}).get("snapshots", [])
+    if com_dados:
+        entradas = [e for e in entradas if e.get("linhas")]
+    return list(reversed(entradas))
+
+
+def ja_teve_dados(diretorio, entidade):
+    """
+    Indica se algum snapshot da entidade já teve registros.
+
+    Um catálogo sem registros indica um usuário novo; com registros e sem
+    nenhum snapshot íntegro, houve perda de dados.
+    """
+    catalogo, _ = ler_catalogo(diretorio)
+    return catalogo["entidades"].get(entidade, {}).get("max_linhas", 0) > 0
+
+
+def ler_snapshot(diretorio, entrada):
+    """
+    Lê o arquivo de um snapshot verificando o checksum.
+
+    Returns:
+        list ou None: Registros do snapshot, ou None se o arquivo (ou algum objeto
+            do backup incremental) não existir ou não corresponder ao checksum registrado.
+    """
+    caminho = caminho_snapshot(diretorio, entrada)
+    if entrada.get("formato") == "incremental":
+        # Manifesto do armazém: backups/snapshots/<nome>.json.zst
+        armazem = ArmazemBackups(caminho.parent.parent)
+        try:
+            return armazem.restaurar(ArmazemBackups.nome_manifesto(caminho), entrada["entidade"],
+                                     raiz_esperada=entrada.get("checksum"))
+        except BackupCorrompidoError as e:
+            logger.warning(f"Snapshot incremental inválido ({caminho}): {e}")
+            return None
+
+    # Arquivos JSON completos, comprimidos ou não (ex: arquivos de resgate)
+    try:
+        conteudo = compressao.ler_bytes(caminho)
+    except FileNotFoundError:
+        logger.warning(f"Snapshot ausente: {caminho}")
+        return None
+    except (OSError, EOFError, RuntimeError) as e:
+        logger.warning(f"Snapshot ilegível ({caminho}): {e}")
+        return None
+    if calcular_checksum(conteudo) != entrada.get("checksum"):
+        logger.warning(f"Snapshot corrompido (checksum diferente): {caminho}")
+        return None
+    return json.loads(conteudo)
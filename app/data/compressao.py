@@ -0,0 +1,147 @@
+"""
+Compressão dos backups, exportações e arquivos de resgate.
+
+O algoritmo é escolhido por BRAUNA_COMPRESSAO ("zstd", "gzip" ou "nenhuma").
+O padrão é zstd quando o pacote `zstandard` está instalado e gzip caso
+contrário. O nível vem de BRAUNA_COMPRESSAO_NIVEL (padrão: 3 no zstd, 6 no gzip).
+
+A leitura detecta o formato pelo cabeçalho do arquivo, então arquivos gravados
+com outro algoritmo (ou sem compressão) continuam legíveis quando a
+configuração muda. A descompressão é feita em fluxo (`abrir_leitura`), sem
+carregar o arquivo comprimido inteiro na memória.
+"""
+import os
+import io
+import gzip
+import json
+
+# zstandard é opcional (melhor razão e velocidade que o gzip)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Cabeçalhos (magic numbers) de cada formato
+MAGIC_GZIP = b"\x1f\x8b"
+MAGIC_ZSTD = b"\x28\xb5\x2f\xfd"
+
+# Extensão dos arquivos de cada algoritmo
+EXTENSOES = {"zstd": ".zst", "gzip": ".gz", "nenhuma": ""}
+
+# Nível padrão de cada algoritmo
+NIVEIS_PADRAO = {"zstd": 3, "gzip": 6, "nenhuma": 0}
+
+# Tamanho dos blocos lidos na descompressão em fluxo
+TAMANHO_LEITURA = 1024 * 1024
+
+
+def _algoritmo_configurado():
+    """Algoritmo definido no ambiente (zstd sem o pacote instalado cai para gzip)."""
+    algoritmo = os.environ.get("BRAUNA_COMPRESSAO", "zstd" if ZSTD_AVAILABLE else "gzip").lower()
+    if algoritmo not in EXTENSOES:
+        algoritmo = "gzip"
+    if algoritmo == "zstd" and not ZSTD_AVAILABLE:
+        algoritmo = "gzip"
+    return algoritmo
+
+
+ALGORITMO = _algoritmo_configurado()
+NIVEL = int(os.environ.get("BRAUNA_COMPRESSAO_NIVEL", NIVEIS_PADRAO[ALGORITMO]))
+
+
+def extensao(algoritmo=None):
+    """Extensão dos arquivos do algoritmo (ex: ".zst"); vazia sem compressão."""
+    return EXTENSOES[algoritmo or ALGORITMO]
+
+
+def comprimir(dados, algoritmo=None, nivel=None):
+    """
+    Comprime os dados.
+
+    Args:
+        dados (bytes ou str): Conteúdo a comprimir.
+        algoritmo (str, optional): "zstd", "gzip" ou "nenhuma". Padrão: o configurado.
+        nivel (int, optional): Nível de compressão. Padrão: o configurado (ou o padrão do algoritmo).
+
+    Returns:
+        bytes: Conteúdo comprimido.
+    """
+    if isinstance(dados, str):
+        dados = dados.encode("utf-8")
+    algoritmo = algoritmo or ALGORITMO
+    if nivel is None:
+        nivel = NIVEL if algoritmo == ALGORITMO else NIVEIS_PADRAO[algoritmo]
+
+    if algoritmo == "zstd":
+        return zstandard.ZstdCompressor(level=nivel).compress(dados)
+    if algoritmo == "gzip":
+        # mtime fixo: o mesmo conteúdo gera sempre os mesmos bytes
+        return gzip.compress(dados, compresslevel=nivel, mtime=0)
+    return dados
+
+
+def _formato(cabecalho):
+    """Identifica o formato pelo cabeçalho."""
+    if cabecalho.startswith(MAGIC_ZSTD):
+        return "zstd"
+    if cabecalho.startswith(MAGIC_GZIP):
+        return "gzip"
+    return "nenhuma"
+
+
+def descomprimir(dados):
+    """
+    Descomprime dados em qualquer um dos formatos suportados (detectado pelo cabeçalho).
+
+    Returns:
+        bytes: Conteúdo original (os dados sem compressão são devolvidos como estão).
+    """
+    formato = _formato(dados[:4])
+    if formato == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Arquivo comprimido com zstd, mas o pacote zstandard não está instalado")
+        # stream_reader não depende do tamanho original gravado no cabeçalho
+        with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(dados)) as leitor:
+            return leitor.read()
+    if formato == "gzip":
+        return gzip.decompress(dados)
+    return dados
+
+
+def abrir_leitura(caminho):
+    """
+    Abre um arquivo para leitura binária com descompressão em fluxo.
+
+    Returns:
+        Arquivo binário com o conteúdo original (usar com `with`).
+    """
+    with open(caminho, "rb") as arquivo:
+        formato = _formato(arquivo.read(4))
+    if formato == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"{caminho} foi comprimido com zstd, mas o pacote zstandard não está instalado")
+        return zstandard.ZstdDecompressor().stream_reader(open(caminho, "rb"), closefd=True)
+    if formato == "gzip":
+        return gzip.open(caminho, "rb")
+    return open(caminho, "rb")
+
+
+def ler_bytes(caminho):
+    """Lê o conteúdo original (descomprimido) de um arquivo."""
+    with abrir_leitura(caminho) as leitor:
+        partes = []
+        while True:
+            parte = leitor.read(TAMANHO_LEITURA)
+            if not parte:
+                break
+            partes.append(parte)
+    return b"".join(partes)
+
+
+def carregar_json(caminho):
+    """
+    Lê um arquivo JSON, comprimido ou não, decodificando em fluxo.
+    """
+    with abrir_leitura(caminho) as leitor:
+        return json.load(io.TextIOWrapper(leitor, encoding="utf-8"))
@@ -3,24 +3,35 @@ Módulo para gerenciar a persistência e carregamento de dados do aplicativo.
 Inclui funções para salvar e carregar dados do usuário, gastos, investimentos, dívidas e seguros.
 """
 import os
+import copy
 import json
-import yaml
+import time
+import calendar
 from datetime import datetime
 from pathlib import Path
 import uuid
+import hashlib
+import threading
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-import shutil
+
+from app.utils.instrumentation import get_logger, span, medir_tempo
+from app.data import storage, catalogo, compressao, memoria_sessao, cache_compartilhado
+from app.data.backups.incremental import ArmazemBackups
+
+logger = get_logger("data_handler")
 
 # Tente importar as funções do Supabase
 try:
     from app.database.supabase_client import (
-        get_current_user,
+        get_current_user as supabase_get_current_user,
         get_supabase_client,
         load_gastos as supabase_load_gastos,
         save_gastos as supabase_save_gastos,
         add_gasto as supabase_add_gasto,
         delete_gasto as supabase_delete_gasto,
-        load_investimentos as supabase_load_investimentos,
         save_investimentos as supabase_save_investimentos,
         add_investimento as supabase_add_investimento,
         delete_investimento as supabase_delete_investimento,
@@ -28,13 +39,21 @@ try:
         save_dividas as supabase_save_dividas,
         add_divida as supabase_add_divida,
         delete_divida as supabase_delete_divida,
-        load_objetivos as supabase_load_objetivos,
         save_objetivos as supabase_save_objetivos,
         add_objetivo as supabase_add_objetivo,
         delete_objetivo as supabase_delete_objetivo,
         load_user_data as supabase_load_user_data,
+        count_user_data as supabase_count_user_data,
         save_user_data as supabase_save_user_data,
+        sync_collection as supabase_sync_collection,
+        replace_user_collection as supabase_replace_user_collection,
+        upsert_user_records as supabase_upsert_user_records,
+        delete_user_record as supabase_delete_user_record,
+        load_vinculos_objetivos as supabase_load_vinculos_objetivos,
+        PROGRESSO_NO_SERVIDOR as SUPABASE_PROGRESSO_NO_SERVIDOR,
     )
+    from app.database.write_queue import obter_fila
+    from app.database.resilience import circuito_aberto as supabase_circuito_aberto
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
@@ -54,11 +73,18 @@ try:
 except ImportError:
     DATA_MAPPER_AVAILABLE = False
 
+# Contexto do script do Streamlit nas threads de carga (API interna, pode não existir em outras versões)
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    SCRIPT_RUN_CTX_AVAILABLE = True
+except ImportError:
+    SCRIPT_RUN_CTX_AVAILABLE = False
+
 # Definir diretório de dados - adaptado para funcionar no Streamlit Cloud
 # No Streamlit Cloud, os dados serão armazenados na sessão
 DATA_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
 
-# Arquivos locais
+# Arquivos globais da versão anterior (migrados para o diretório do usuário padrão)
 USER_FILE = DATA_DIR / "user.json"
 GASTOS_FILE = DATA_DIR / "gastos.json"
 INVESTIMENTOS_FILE = DATA_DIR / "investimentos.json"
@@ -67,6 +93,24 @@ SEGUROS_FILE = DATA_DIR / "seguros.json"
 CONFIG_FILE = DATA_DIR / "config.yaml"
 OBJETIVOS_FILE = DATA_DIR / "objetivos.json"
 
+# Diretórios de dados de cada usuário: usuarios/<2 primeiros caracteres do hash>/<hash>/
+USUARIOS_DIR = DATA_DIR / "usuarios"
+
+# Usuário das sessões sem login (herda os arquivos globais antigos)
+USUARIO_PADRAO = "default"
+
+# Gravações pendentes para o Supabase (outbox da fila write-behind)
+OUTBOX_DIR = DATA_DIR / "outbox"
+
+# Intervalo mínimo entre backups incrementais automáticos (segundos); create_backup ignora o intervalo
+INTERVALO_BACKUP = int(os.environ.get("BRAUNA_BACKUP_INTERVALO", "300"))
+
+# Envio ao Supabase em segundo plano (defina BRAUNA_WRITE_BEHIND=0 para gravar de forma síncrona)
+WRITE_BEHIND_ATIVO = os.environ.get("BRAUNA_WRITE_BEHIND", "1") != "0"
+
+# Threads do processo para as cargas em paralelo de load_all (1 carrega em sequência)
+MAX_CARGAS_PARALELAS = int(os.environ.get("BRAUNA_CARGAS_PARALELAS", "8"))
+
 # Verificar se estamos em ambiente de produção (Streamlit Cloud)
 def is_prod():
     """
@@ -87,7 +131,7 @@ def is_prod():
         # Registro detalhado do ambiente para diagnóstico
         ambiente_descricao = "Streamlit Cloud" if is_streamlit_env else "Ambiente Local"
         acesso_descricao = "com acesso de escrita" if has_write_access else "sem acesso de escrita"
-        print(f"INFO: Ambiente detectado: {ambiente_descricao} {acesso_descricao}")
+        logger.info(f"Ambiente detectado: {ambiente_descricao} {acesso_descricao}")
         
         # Se temos acesso a arquivos, mesmo no Streamlit Cloud, preferimos usar arquivos para persistência
         if has_write_access:
@@ -97,25 +141,42 @@ def is_prod():
                 with open(test_file, 'w') as f:
                     f.write('test')
                 os.remove(test_file)
-                print(f"INFO: Confirmado acesso de escrita real ao diretório de dados")
+                logger.info(f"Confirmado acesso de escrita real ao diretório de dados")
                 
                 # Se estamos no Streamlit Cloud mas com acesso garantido a arquivos, 
                 # podemos utilizar persistência em arquivo
                 if is_streamlit_env:
-                    print(f"INFO: Detectado Streamlit Cloud com acesso confiável a arquivos!")
+                    logger.info(f"Detectado Streamlit Cloud com acesso confiável a arquivos!")
                     # Ainda consideramos como ambiente de produção, mas usaremos armazenamento híbrido
                     return True
             except Exception as e:
-                print(f"AVISO: Falha no teste real de escrita: {e}")
+                logger.warning(f"Falha no teste real de escrita: {e}")
                 # Não temos acesso real de escrita, mesmo que os metadados indiquem o contrário
                 has_write_access = False
     except Exception as e:
-        print(f"ERRO ao verificar ambiente: {e}")
+        logger.error(f"Erro ao verificar ambiente: {e}")
         has_write_access = False
     
     # Em caso de dúvida, assumimos que estamos em produção se estivermos no Streamlit Cloud
     return is_streamlit_env
 
+# Usuário já consultado por load_all, reaproveitado pelas cargas de cada coleção
+_usuario_resolvido = contextvars.ContextVar("usuario_resolvido", default=None)
+
+def get_current_user():
+    """
+    Obtém o usuário autenticado no Supabase (None sem Supabase ou sem login).
+
+    Dentro de `load_all` o usuário é consultado uma única vez e reaproveitado
+    pelas cargas de todas as coleções.
+    """
+    resolvido = _usuario_resolvido.get()
+    if resolvido is not None:
+        return resolvido[0]
+    if not SUPABASE_AVAILABLE:
+        return None
+    return supabase_get_current_user()
+
 # Verificar se o usuário está autenticado no Supabase
 def is_authenticated():
     """
@@ -127,6 +188,417 @@ def is_authenticated():
     user = get_current_user()
     return user is not None
 
+# Diretório local de cada usuário
+
+# Usuários cujos arquivos antigos já foram verificados neste processo
+_usuarios_migrados = set()
+_migracao_lock = threading.Lock()
+
+def usuario_local():
+    """
+    Retorna o ID do usuário dono dos arquivos locais da sessão.
+
+    Usa o usuário guardado na sessão no login (sem consultar o Supabase) e,
+    sem login, o usuário padrão.
+    """
+    user = st.session_state.get("user")
+    if isinstance(user, dict) and user.get("id"):
+        return str(user["id"])
+    return str(st.session_state.get("user_id") or USUARIO_PADRAO)
+
+def _arquivos_legados(user_id):
+    """
+    Arquivos da organização antiga que pertencem a um usuário.
+
+    Returns:
+        dict: {entidade: [caminhos candidatos, em ordem de preferência]}
+    """
+    legados = {
+        "dividas": [Path("data") / f"dividas_{user_id}.json"],
+        "seguros": [Path("data") / f"seguros_{user_id}.json"],
+    }
+    if user_id == USUARIO_PADRAO:
+        # Os arquivos globais eram usados pelas sessões sem login
+        legados["user"] = [USER_FILE]
+        legados["gastos"] = [GASTOS_FILE]
+        legados["gastos_backup"] = [DATA_DIR / "gastos_backup.json"]
+        legados["investimentos"] = [INVESTIMENTOS_FILE]
+        legados["dividas"].append(DIVIDAS_FILE)
+        legados["seguros"].append(SEGUROS_FILE)
+        legados["objetivos"] = [OBJETIVOS_FILE]
+    return legados
+
+def _migrar_arquivos_legados(user_id, diretorio):
+    """
+    Copia os arquivos antigos do usuário para o seu diretório (apenas uma vez por processo).
+
+    Os originais são mantidos; um arquivo já existente no diretório do usuário
+    nunca é sobrescrito.
+    """
+    with _migracao_lock:
+        if user_id in _usuarios_migrados:
+            return
+        _usuarios_migrados.add(user_id)
+
+    for entidade, candidatos in _arquivos_legados(user_id).items():
+        destino = diretorio / f"{entidade}.json"
+        if os.path.exists(destino):
+            continue
+        for origem in candidatos:
+            try:
+                if storage.copiar_atomico(origem, destino):
+                    logger.info(f"Arquivo antigo {origem} migrado para {destino}")
+                    break
+            except Exception as e:
+                logger.warning(f"Não foi possível migrar {origem}: {e}")
+
+def diretorio_usuario(user_id=None):
+    """
+    Retorna o diretório local de dados de um usuário.
+
+    O nome do diretório é um hash do ID, então IDs arbitrários (e-mails,
+    UUIDs) viram nomes seguros e os usuários se distribuem em subdiretórios.
+
+    Args:
+        user_id (str, optional): ID do usuário. Padrão: usuário da sessão.
+
+    Returns:
+        Path: Diretório do usuário.
+    """
+    user_id = str(user_id or usuario_local())
+    chave = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:24]
+    diretorio = USUARIOS_DIR / chave[:2] / chave
+    if user_id not in _usuarios_migrados:
+        _migrar_arquivos_legados(user_id, diretorio)
+    return diretorio
+
+def arquivo_usuario(entidade, user_id=None):
+    """
+    Retorna o arquivo JSON local de uma entidade do usuário (ex: "gastos").
+    """
+    return diretorio_usuario(user_id) / f"{entidade}.json"
+
+# Armazenamento local (gravação atômica com bloqueio e verificação de versão)
+
+# Tentativas de mesclar e regravar quando outra sessão alterou o arquivo
+TENTATIVAS_CONFLITO = 3
+
+def _versoes_lidas():
+    """
+    Versões (e IDs) dos arquivos locais lidos ou gravados nesta sessão.
+    """
+    return st.session_state.setdefault("versoes_arquivos", {})
+
+def _registrar_versao(caminho, versao, registros):
+    """Guarda a versão e os IDs da lista conhecida pela sessão."""
+    ids = {item.get("id") for item in registros if isinstance(item, dict)} if isinstance(registros, list) else set()
+    _versoes_lidas()[str(caminho)] = {"versao": versao, "ids": ids}
+
+def ler_lista_local(caminho):
+    """
+    Lê uma lista JSON local e registra a versão lida para a próxima gravação.
+
+    A leitura passa pelo cache do processo: sessões que leem a mesma versão do
+    arquivo compartilham os registros (veja `cache_compartilhado`).
+
+    Args:
+        caminho (str ou Path): Arquivo JSON.
+
+    Returns:
+        list: Registros do arquivo ou lista vazia se ele não existir.
+    """
+    with span("arquivo.ler", Path(caminho).stem) as s:
+        dados, versao = cache_compartilhado.ler_lista(caminho, [])
+        s.registrar(dados=dados, bytes=versao[2] if versao else None)
+    _registrar_versao(caminho, versao, dados)
+    return dados
+
+def gravar_lista_local(caminho, registros, indent=2):
+    """
+    Grava uma lista JSON local de forma atômica, sem sobrescrever alterações de outras sessões.
+
+    Se o arquivo mudou desde a última leitura desta sessão, os registros que a
+    outra sessão adicionou são mesclados aos nossos (por ID) antes de gravar.
+
+    Args:
+        caminho (str ou Path): Arquivo JSON.
+        registros (list): Lista completa a gravar.
+
+    Returns:
+        list: A lista efetivamente gravada (com os registros mesclados, se houver).
+    """
+    conhecida = _versoes_lidas().get(str(caminho))
+    versao_esperada = conhecida["versao"] if conhecida else storage.SEM_VERIFICACAO
+
+    with span("arquivo.gravar", Path(caminho).stem) as s:
+        for _ in range(TENTATIVAS_CONFLITO):
+            try:
+                versao = storage.gravar_json(caminho, registros, versao_esperada=versao_esperada, indent=indent)
+                break
+            except storage.ConflitoVersaoError:
+                deles, versao_esperada = storage.ler_json(caminho, [])
+                registros = storage.mesclar_por_id(conhecida["ids"], registros, deles)
+                logger.warning(f"{Path(caminho).name} foi alterado por outra sessão, mesclando {len(deles)} registros")
+        else:
+            # Arquivo em disputa contínua: gravar a última mescla sem nova verificação
+            versao = storage.gravar_json(caminho, registros, indent=indent)
+        s.registrar(dados=registros, bytes=versao[2] if versao else None)
+
+    _registrar_versao(caminho, versao, registros)
+    return registros
+
+# Backups incrementais
+
+# Momento do último backup incremental por diretório de usuário (neste processo)
+_ultimos_backups = {}
+
+def armazem_backups(diretorio=None):
+    """
+    Retorna o armazém de backups incrementais do usuário.
+    """
+    return ArmazemBackups((diretorio or diretorio_usuario()) / "backups")
+
+def backup_incremental(entidades, forcar=False):
+    """
+    Cria um backup incremental das entidades e o registra no catálogo de snapshots.
+    
+    Apenas os registros que mudaram desde o backup anterior ocupam espaço novo.
+    Backups automáticos respeitam INTERVALO_BACKUP; depois de cada backup a
+    política de retenção é aplicada.
+    
+    Args:
+        entidades (dict): {entidade: dados} (ex: {"gastos": gastos}).
+        forcar (bool): Se True, ignora o intervalo mínimo entre backups.
+    
+    Returns:
+        Path ou None: Manifesto do backup, ou None se ele não foi necessário.
+    """
+    diretorio = diretorio_usuario()
+    agora = time.time()
+    if not entidades or (not forcar and agora - _ultimos_backups.get(str(diretorio), 0) < INTERVALO_BACKUP):
+        return None
+    
+    armazem = armazem_backups(diretorio)
+    nome, manifesto, estatisticas = armazem.criar_snapshot(entidades)
+    _ultimos_backups[str(diretorio)] = agora
+    
+    caminho = armazem.caminho_manifesto(nome)
+    for entidade, descricao in manifesto["entidades"].items():
+        catalogo.registrar_snapshot(
+            diretorio, entidade, caminho, descricao["linhas"], descricao["raiz"],
+            estatisticas["bytes_gravados"], criado_em=manifesto["criado_em"], formato="incremental"
+        )
+    
+    removidos = armazem.aplicar_retencao()
+    if removidos:
+        catalogo.remover_snapshots(diretorio, removidos)
+        logger.info(f"{len(removidos)} backups antigos removidos pela política de retenção")
+    return caminho
+
+# Memória da sessão
+
+def _chave_duravel(chave):
+    """
+    Indica se o conteúdo de uma chave da sessão pode ser recarregado depois de descartado.
+
+    As cópias sincronizadas são duráveis quando o arquivo da cópia existe. As
+    listas das entidades só são duráveis se o arquivo local ainda está na versão
+    que a sessão leu ou gravou e tem os mesmos registros; em produção, onde a
+    sessão pode ser o único armazenamento, essa condição não é atendida.
+    """
+    if chave.startswith("sync_cache_"):
+        return os.path.exists(_arquivo_sync(chave[len("sync_cache_"):], usuario_local()))
+
+    caminho = arquivo_usuario(chave)
+    conhecida = _versoes_lidas().get(str(caminho))
+    if not conhecida or not conhecida["versao"] or conhecida["versao"] != storage.versao_arquivo(caminho):
+        return False
+    registros = st.session_state.get(chave)
+    if not isinstance(registros, list):
+        return False
+    return {item.get("id") for item in registros if isinstance(item, dict)} == conhecida["ids"]
+
+def manter_memoria_sessao():
+    """
+    Compacta as listas da sessão e descarta as entidades frias (ao fim de cada rerun).
+    """
+    try:
+        with span("sessao.memoria"):
+            return memoria_sessao.manter(_chave_duravel)
+    except Exception as e:
+        logger.warning(f"Erro ao manter a memória da sessão: {e}")
+        return []
+
+# Gravação em segundo plano no Supabase
+
+def obter_fila_escrita():
+    """
+    Retorna a fila write-behind compartilhada pelo processo.
+    """
+    return obter_fila(OUTBOX_DIR, supabase_replace_user_collection)
+
+def enviar_para_supabase(collection, registros, salvar_sincrono):
+    """
+    Envia a lista completa de uma coleção ao Supabase.
+
+    Com a fila write-behind ativa, a lista é enfileirada e a função retorna
+    imediatamente; o envio acontece em segundo plano. Caso contrário, usa a
+    função de salvamento síncrona informada.
+
+    Args:
+        collection (str): Nome da coleção (tabela).
+        registros (list): Lista completa de registros.
+        salvar_sincrono (callable): Função de salvamento síncrono (ex: supabase_save_gastos).
+
+    Returns:
+        bool: True se a lista foi enfileirada ou salva com sucesso.
+    """
+    if WRITE_BEHIND_ATIVO:
+        user = get_current_user()
+        if user:
+            obter_fila_escrita().enqueue(user["id"], collection, registros, client=get_supabase_client())
+            logger.info(f"{len(registros)} registros de '{collection}' enfileirados para o Supabase")
+            return True
+    if supabase_circuito_aberto():
+        # Supabase instável: não esperar novas falhas, o chamador grava localmente
+        logger.warning(f"Supabase indisponível, '{collection}' não foi enviado")
+        return False
+    return salvar_sincrono(registros)
+
+def contar_escritas_pendentes():
+    """
+    Retorna quantas coleções do usuário atual aguardam envio ao Supabase.
+    """
+    if not (SUPABASE_AVAILABLE and WRITE_BEHIND_ATIVO):
+        return 0
+    user = get_current_user()
+    if not user:
+        return 0
+    return obter_fila_escrita().pending_count(user["id"])
+
+def retomar_escritas_pendentes(incluir_falhas=False):
+    """
+    Volta a enviar as gravações do usuário atual paradas na fila.
+
+    As gravações recuperadas da outbox depois de um reinício esperam o cliente
+    autenticado de uma sessão do usuário; com `incluir_falhas`, também são
+    reenviadas as que esgotaram as tentativas.
+
+    Returns:
+        int: Quantidade de coleções retomadas.
+    """
+    if not (SUPABASE_AVAILABLE and WRITE_BEHIND_ATIVO):
+        return 0
+    user = get_current_user()
+    if not user:
+        return 0
+    client = get_supabase_client()
+    if not client:
+        return 0
+    return obter_fila_escrita().retomar(user["id"], client, incluir_esgotados=incluir_falhas)
+
+def escritas_nao_enviadas():
+    """
+    Retorna as coleções do usuário atual cujas gravações estão paradas na fila.
+
+    Returns:
+        list: Dicionários {"collection", "motivo", "tentativas"}.
+    """
+    if not (SUPABASE_AVAILABLE and WRITE_BEHIND_ATIVO):
+        return []
+    user = get_current_user()
+    if not user:
+        return []
+    return obter_fila_escrita().stalled(user["id"])
+
+# Sincronização incremental com o Supabase
+
+def _arquivo_sync(collection, user_id):
+    """Retorna o caminho da cópia local sincronizada de uma coleção."""
+    return diretorio_usuario(user_id) / "sync" / f"{collection}.json"
+
+def _ler_estado_sync(collection, user_id):
+    """
+    Lê a cópia local sincronizada de uma coleção.
+
+    Returns:
+        dict: {"marca": str ou None, "registros": list ou None}
+    """
+    arquivo = _arquivo_sync(collection, user_id)
+    if os.path.exists(arquivo):
+        try:
+            with span("arquivo.ler", collection) as s:
+                estado, versao = storage.ler_json(arquivo)
+                s.registrar(bytes=versao[2] if versao else None)
+                if isinstance(estado, dict):
+                    s.registrar(dados=estado.get("registros"))
+                    return estado
+        except Exception as e:
+            logger.warning(f"Erro ao ler cópia sincronizada de '{collection}': {e}")
+    return {"marca": None, "registros": None}
+
+def _gravar_estado_sync(collection, user_id, estado):
+    """Grava a cópia local sincronizada de uma coleção."""
+    try:
+        arquivo = _arquivo_sync(collection, user_id)
+        with span("arquivo.gravar", collection) as s:
+            versao = storage.gravar_json(arquivo, estado, indent=None)
+            s.registrar(linhas=len(estado.get("registros") or []), bytes=versao[2] if versao else None)
+    except Exception as e:
+        logger.warning(f"Não foi possível gravar cópia sincronizada de '{collection}': {e}")
+
+def carregar_sincronizado(collection):
+    """
+    Carrega uma coleção do Supabase buscando apenas o que mudou desde a última vez.
+
+    A cópia local e a marca d'água de `updated_at` ficam na sessão e em arquivo,
+    então uma sessão nova do mesmo usuário reconcilia a coleção com uma consulta
+    pequena em vez de baixar todo o histórico.
+
+    Args:
+        collection (str): Nome da coleção (tabela).
+
+    Returns:
+        list: Registros atuais da coleção.
+    """
+    user = get_current_user()
+    if not user:
+        return []
+
+    # Gravações ainda na fila são a versão mais recente da coleção
+    if WRITE_BEHIND_ATIVO:
+        pendente = obter_fila_escrita().pending(user["id"], collection)
+        if pendente is not None:
+            return pendente
+
+    chave_sessao = f"sync_cache_{collection}"
+    memoria_sessao.registrar_acesso(chave_sessao)
+    estado = st.session_state.get(chave_sessao)
+    if estado is None:
+        estado = _ler_estado_sync(collection, user["id"])
+
+    if supabase_circuito_aberto():
+        # Supabase instável: usar a cópia local sem esperar novas falhas
+        logger.warning(f"Supabase indisponível, usando cópia local de '{collection}'")
+        return list(estado.get("registros") or [])
+
+    with span("supabase.sync", collection) as s:
+        registros, marca = supabase_sync_collection(
+            collection,
+            cache=estado.get("registros"),
+            watermark=estado.get("marca"),
+            user_id=user["id"]
+        )
+        s.registrar(dados=registros)
+
+    novo_estado = {"marca": marca, "registros": registros}
+    st.session_state[chave_sessao] = novo_estado
+    if marca != estado.get("marca") or estado.get("registros") is None:
+        _gravar_estado_sync(collection, user["id"], novo_estado)
+
+    # Devolver uma cópia da lista para que alterações do chamador não afetem o cache
+    return list(registros)
+
 # Funções para carregar dados
 
 def load_user_data():
@@ -151,61 +623,51 @@ def load_user_data():
         st.error(f"Erro ao carregar dados do usuário: {e}")
         return None
 
+@medir_tempo("data_handler.load", "gastos")
 def load_gastos():
     """
     Carrega os gastos de forma extremamente robusta, verificando múltiplas fontes 
     para garantir que os dados nunca sejam perdidos.
     """
     gastos = []
+    memoria_sessao.registrar_acesso("gastos")
     ambiente = "produção" if is_prod() else "local"
-    print(f"INFO: Carregando gastos no ambiente {ambiente}")
+    logger.info(f"Carregando gastos no ambiente {ambiente}")
     
     # Várias fontes possíveis para os dados
     fontes_dados = {
         "session_state": None,
         "arquivo_principal": None,
-        "arquivo_backup": None,
         "supabase": None
     }
     
     # 1. Verificar session_state (memória atual)
     if "gastos" in st.session_state and st.session_state.get("gastos", []):
         gastos_session = st.session_state.get("gastos", [])
-        print(f"INFO: Encontrados {len(gastos_session)} gastos no session_state")
+        logger.info(f"Encontrados {len(gastos_session)} gastos no session_state")
         fontes_dados["session_state"] = gastos_session
     
-    # 2. Verificar arquivo principal
-    try:
-        if os.path.exists(GASTOS_FILE):
-            with open(GASTOS_FILE, 'r', encoding='utf-8') as file:
-                gastos_arquivo = json.load(file)
-                if gastos_arquivo:
-                    print(f"INFO: Encontrados {len(gastos_arquivo)} gastos no arquivo principal")
-                    fontes_dados["arquivo_principal"] = gastos_arquivo
-    except Exception as e:
-        print(f"AVISO: Erro ao carregar gastos do arquivo principal: {e}")
+    arquivo_gastos = arquivo_usuario("gastos")
     
-    # 3. Verificar backup
+    # 2. Verificar arquivo principal
     try:
-        backup_file = DATA_DIR / "gastos_backup.json"
-        if os.path.exists(backup_file):
-            with open(backup_file, 'r', encoding='utf-8') as file:
-                gastos_backup = json.load(file)
-                if gastos_backup:
-                    print(f"INFO: Encontrados {len(gastos_backup)} gastos no arquivo de backup")
-                    fontes_dados["arquivo_backup"] = gastos_backup
+        if os.path.exists(arquivo_gastos):
+            gastos_arquivo = ler_lista_local(arquivo_gastos)
+            if gastos_arquivo:
+                logger.info(f"Encontrados {len(gastos_arquivo)} gastos no arquivo principal")
+                fontes_dados["arquivo_principal"] = gastos_arquivo
     except Exception as e:
-        print(f"AVISO: Erro ao carregar gastos do backup: {e}")
+        logger.warning(f"Erro ao carregar gastos do arquivo principal: {e}")
     
-    # 4. Verificar Supabase (se disponível)
+    # 3. Verificar Supabase (se disponível)
     if SUPABASE_AVAILABLE and is_authenticated():
         try:
-            gastos_supabase = supabase_load_gastos()
+            gastos_supabase = carregar_sincronizado("gastos")
             if gastos_supabase:
-                print(f"INFO: Encontrados {len(gastos_supabase)} gastos no Supabase")
+                logger.info(f"Encontrados {len(gastos_supabase)} gastos no Supabase")
                 fontes_dados["supabase"] = gastos_supabase
         except Exception as e:
-            print(f"AVISO: Erro ao carregar gastos do Supabase: {e}")
+            logger.warning(f"Erro ao carregar gastos do Supabase: {e}")
     
     # Determinar a fonte mais completa de dados
     # Preferimos a fonte com mais registros, assumindo que contém dados mais completos
@@ -219,7 +681,7 @@ def load_gastos():
             gastos = dados
     
     if fonte_escolhida:
-        print(f"INFO: Usando dados da fonte '{fonte_escolhida}' com {max_registros} registros")
+        logger.info(f"Usando dados da fonte '{fonte_escolhida}' com {max_registros} registros")
         
         # Garantir que os dados estejam armazenados em todas as fontes disponíveis
         try:
@@ -227,51 +689,145 @@ def load_gastos():
             st.session_state["gastos"] = gastos
             
             # Se temos acesso a arquivos, salvar uma cópia
-            if os.access(os.path.dirname(GASTOS_FILE), os.W_OK):
-                # Criar backup do arquivo atual se existir
-                if os.path.exists(GASTOS_FILE):
-                    backup_file = DATA_DIR / "gastos_backup.json"
-                    shutil.copy2(GASTOS_FILE, backup_file)
+            if os.access(DATA_DIR, os.W_OK):
+                # Backup incremental do conteúdo atual do arquivo antes de substituí-lo
+                if fontes_dados["arquivo_principal"] and fonte_escolhida != "arquivo_principal":
+                    backup_incremental({"gastos": fontes_dados["arquivo_principal"]})
                 
-                # Salvar arquivo principal
-                os.makedirs(os.path.dirname(GASTOS_FILE), exist_ok=True)
-                with open(GASTOS_FILE, 'w', encoding='utf-8') as file:
-                    json.dump(gastos, file, ensure_ascii=False, indent=2)
-                print(f"INFO: Gastos sincronizados com arquivo local")
+                # Salvar arquivo principal (só se mudou: regravar invalidaria o snapshot compartilhado)
+                if gastos != fontes_dados["arquivo_principal"]:
+                    gastos = gravar_lista_local(arquivo_gastos, gastos)
+                    st.session_state["gastos"] = gastos
+                    logger.info(f"Gastos sincronizados com arquivo local")
             
             # Sincronizar com Supabase se disponível
             if SUPABASE_AVAILABLE and is_authenticated() and fonte_escolhida != "supabase":
-                supabase_save_gastos(gastos)
-                print(f"INFO: Gastos sincronizados com Supabase")
+                if enviar_para_supabase("gastos", gastos, supabase_save_gastos):
+                    logger.info(f"Gastos sincronizados com Supabase")
                 
         except Exception as e:
-            print(f"AVISO: Erro ao sincronizar dados entre fontes: {e}")
+            logger.warning(f"Erro ao sincronizar dados entre fontes: {e}")
     else:
-        print(f"INFO: Nenhum gasto encontrado em nenhuma fonte")
+        logger.info(f"Nenhum gasto encontrado em nenhuma fonte")
     
     return gastos
 
+def contar_registros(entidade):
+    """
+    Conta os registros de uma entidade sem carregar a lista completa.
+
+    Para usuários autenticados é uma consulta de contagem ao Supabase (ou o
+    tamanho da lista que aguarda envio na fila write-behind); sem login, ou
+    com o Supabase indisponível, é o tamanho da lista local.
+
+    Args:
+        entidade (str): Nome da entidade (ex: "gastos").
+
+    Returns:
+        int: Quantidade de registros.
+    """
+    if SUPABASE_AVAILABLE and is_authenticated():
+        user = get_current_user()
+        if WRITE_BEHIND_ATIVO and user:
+            pendente = obter_fila_escrita().pending(user["id"], entidade)
+            if pendente is not None:
+                return len(pendente)
+        if user and not supabase_circuito_aberto():
+            try:
+                return supabase_count_user_data(entidade, user["id"])
+            except Exception as e:
+                logger.warning(f"Erro ao contar '{entidade}' no Supabase: {e}")
+    return len(_carregadores()[entidade]())
+
+def limites_do_mes(mes):
+    """
+    Retorna o primeiro e o último dia de um mês.
+
+    Args:
+        mes (str): Mês no formato "YYYY-MM".
+
+    Returns:
+        tuple: (primeiro_dia, ultimo_dia) no formato "YYYY-MM-DD".
+    """
+    ano, numero_mes = (int(parte) for parte in mes.split("-")[:2])
+    ultimo_dia = calendar.monthrange(ano, numero_mes)[1]
+    return f"{ano:04d}-{numero_mes:02d}-01", f"{ano:04d}-{numero_mes:02d}-{ultimo_dia:02d}"
+
+def _gastos_do_periodo(gastos, data_inicio, data_fim, colunas=None):
+    """Filtra uma lista de gastos pelo período (datas "YYYY-MM-DD", inclusive), ordenada por data."""
+    selecionados = sorted(
+        (g for g in gastos if data_inicio <= str(g.get("data", ""))[:10] <= data_fim),
+        key=lambda g: (str(g.get("data", "")), str(g.get("id", "")))
+    )
+    if colunas:
+        selecionados = [{k: g.get(k) for k in colunas} for g in selecionados]
+    return selecionados
+
+@medir_tempo("data_handler.load_mes", "gastos")
+def load_gastos_mes(mes, colunas=None):
+    """
+    Carrega apenas os gastos de um mês.
+
+    Para usuários autenticados, a consulta ao Supabase já vem filtrada pelo
+    período (usando o índice da coluna `data`) e projetada nas colunas pedidas,
+    de forma que o volume transferido depende do mês exibido e não de todo o
+    histórico do usuário. Se os gastos ainda aguardam envio na fila
+    write-behind, o mês é filtrado da lista enfileirada (mais recente que o
+    Supabase).
+
+    Args:
+        mes (str): Mês no formato "YYYY-MM".
+        colunas (list, optional): Colunas a carregar. Se None, carrega todas.
+
+    Returns:
+        list: Lista de gastos do mês ordenada por data.
+    """
+    data_inicio, data_fim = limites_do_mes(mes)
+    if SUPABASE_AVAILABLE and is_authenticated():
+        if WRITE_BEHIND_ATIVO:
+            user = get_current_user()
+            pendente = obter_fila_escrita().pending(user["id"], "gastos") if user else None
+            if pendente is not None:
+                return _gastos_do_periodo(pendente, data_inicio, data_fim, colunas)
+
+        if not supabase_circuito_aberto():
+            try:
+                return supabase_load_gastos(
+                    columns=colunas,
+                    date_from=data_inicio,
+                    date_to=data_fim,
+                    order_by=("data", "id")
+                )
+            except Exception as e:
+                logger.warning(f"Erro ao carregar gastos do mês {mes} do Supabase: {e}")
+
+    # Fonte local: filtrar a lista já carregada
+    return _gastos_do_periodo(load_gastos(), data_inicio, data_fim, colunas)
+
+@medir_tempo("data_handler.load", "investimentos")
 def load_investimentos():
     """
     Carrega os investimentos. Se o arquivo não existir, retorna uma lista vazia.
     """
+    memoria_sessao.registrar_acesso("investimentos")
     # Se o Supabase estiver disponível e o usuário estiver autenticado, carregar do Supabase
     if SUPABASE_AVAILABLE and is_authenticated():
-        return supabase_load_investimentos()
+        return carregar_sincronizado("investimentos")
     
     if is_prod():
         return st.session_state.get("investimentos", [])
     
-    if not os.path.exists(INVESTIMENTOS_FILE):
+    arquivo = arquivo_usuario("investimentos")
+    if not os.path.exists(arquivo):
         return []
     
     try:
-        with open(INVESTIMENTOS_FILE, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        return ler_lista_local(arquivo)
     except Exception as e:
-        print(f"Erro ao carregar investimentos: {e}")
+        logger.error(f"Erro ao carregar investimentos: {e}")
         return []
 
+@medir_tempo("data_handler.load", "dividas")
 def load_dividas():
     """
     Carrega a lista de dívidas do usuário.
@@ -279,6 +835,7 @@ def load_dividas():
     Returns:
         list: Lista de dívidas do usuário atual.
     """
+    memoria_sessao.registrar_acesso("dividas")
     try:
         # Tentar carregar do session state primeiro
         if "dividas" in st.session_state:
@@ -287,44 +844,42 @@ def load_dividas():
         # Tentar carregar do Supabase
         user = get_current_user()
         if user:
-            cliente = get_supabase_client()
-            if cliente:
-                response = cliente.table('dividas').select('*').eq('user_id', user['id']).execute()
-                if response.data:
-                    st.session_state.dividas = response.data
-                    return response.data
+            dividas_supabase = carregar_sincronizado("dividas")
+            if dividas_supabase:
+                st.session_state.dividas = dividas_supabase
+                return dividas_supabase
         
         # Carregar do arquivo local como fallback
-        user_id = st.session_state.get("user_id", "default")
-        arquivo = f"data/dividas_{user_id}.json"
+        arquivo = arquivo_usuario("dividas")
         
         if os.path.exists(arquivo):
-            with open(arquivo, "r", encoding="utf-8") as f:
-                dividas = json.load(f)
-                st.session_state.dividas = dividas
-                return dividas
+            dividas = ler_lista_local(arquivo)
+            st.session_state.dividas = dividas
+            return dividas
     except Exception as e:
-        print(f"Erro ao carregar dívidas: {e}")
+        logger.error(f"Erro ao carregar dívidas: {e}")
     
     # Caso não tenha dados, inicializa lista vazia
     st.session_state.dividas = []
     return []
 
+@medir_tempo("data_handler.load", "seguros")
 def load_seguros():
     """
     Carrega os seguros. Se o arquivo não existir, retorna uma lista vazia.
     """
+    memoria_sessao.registrar_acesso("seguros")
     if is_prod():
         return st.session_state.get("seguros", [])
     
-    if not os.path.exists(SEGUROS_FILE):
+    arquivo = arquivo_usuario("seguros")
+    if not os.path.exists(arquivo):
         return []
     
     try:
-        with open(SEGUROS_FILE, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        return ler_lista_local(arquivo)
     except Exception as e:
-        print(f"Erro ao carregar seguros: {e}")
+        logger.error(f"Erro ao carregar seguros: {e}")
         return []
 
 def load_config():
@@ -344,33 +899,176 @@ def load_config():
         return default_config
     
     try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as file:
-            return yaml.safe_load(file)
+        config, _ = cache_compartilhado.ler(CONFIG_FILE, lambda: storage.ler_yaml(CONFIG_FILE, default_config))
+        # Cópia: quem altera a configuração não afeta o snapshot das outras sessões
+        return copy.deepcopy(config)
     except Exception as e:
-        print(f"Erro ao carregar configuração: {e}")
+        logger.error(f"Erro ao carregar configuração: {e}")
         return default_config
 
+@medir_tempo("data_handler.load", "objetivos")
 def load_objetivos():
     """
     Carrega os objetivos financeiros. Se o arquivo não existir, retorna uma lista vazia.
     """
+    memoria_sessao.registrar_acesso("objetivos")
     # Se o Supabase estiver disponível e o usuário estiver autenticado, carregar do Supabase
     if SUPABASE_AVAILABLE and is_authenticated():
-        return supabase_load_objetivos()
+        return carregar_sincronizado("objetivos")
     
     if is_prod():
         return st.session_state.get("objetivos", [])
     
-    if not os.path.exists(OBJETIVOS_FILE):
+    arquivo = arquivo_usuario("objetivos")
+    if not os.path.exists(arquivo):
         return []
     
     try:
-        with open(OBJETIVOS_FILE, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        return ler_lista_local(arquivo)
     except Exception as e:
-        print(f"Erro ao carregar objetivos: {e}")
+        logger.error(f"Erro ao carregar objetivos: {e}")
         return []
 
+# Carga de várias coleções em paralelo
+
+@st.cache_resource
+def obter_executor_cargas():
+    """
+    Retorna o pool de threads das cargas em paralelo, compartilhado pelo processo.
+    """
+    return ThreadPoolExecutor(max_workers=MAX_CARGAS_PARALELAS, thread_name_prefix="brauna-carga")
+
+def _carregadores():
+    """Função de carga de cada coleção aceita por load_all."""
+    return {
+        "gastos": load_gastos,
+        "investimentos": load_investimentos,
+        "dividas": load_dividas,
+        "seguros": load_seguros,
+        "objetivos": load_objetivos,
+    }
+
+def load_all(entidades=None):
+    """
+    Carrega várias coleções ao mesmo tempo.
+
+    Cada coleção usa a sua função de carga (que já atualiza o cache da sessão
+    e a cópia sincronizada), executada no pool de threads do processo; o tempo
+    total fica próximo ao da coleção mais lenta em vez da soma de todas. O
+    usuário autenticado é consultado uma vez, e não uma vez por coleção. O
+    tempo de cada coleção aparece nos trechos `data_handler.load` do painel de
+    depuração, com a thread que a carregou.
+
+    Args:
+        entidades (list, optional): Coleções a carregar (ex: ["gastos", "dividas"]). Padrão: todas.
+
+    Returns:
+        dict: {entidade: lista de registros}. Uma coleção com erro volta como lista vazia.
+    """
+    carregadores = _carregadores()
+    entidades = list(entidades or carregadores)
+    desconhecidas = [e for e in entidades if e not in carregadores]
+    if desconhecidas:
+        raise ValueError(f"Coleções desconhecidas: {', '.join(desconhecidas)}")
+
+    # Criar antes das threads as estruturas da sessão que as cargas preenchem com setdefault
+    _versoes_lidas()
+    st.session_state.setdefault("sync_watermarks", {})
+    for entidade in entidades:
+        memoria_sessao.registrar_acesso(entidade)
+
+    usuario = (get_current_user(),)
+    ctx = get_script_run_ctx() if SCRIPT_RUN_CTX_AVAILABLE else None
+
+    def carregar(entidade):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        token = _usuario_resolvido.set(usuario)
+        try:
+            return carregadores[entidade]()
+        finally:
+            _usuario_resolvido.reset(token)
+
+    resultados = {}
+    with span("data_handler.load_all", ",".join(entidades)) as s:
+        if MAX_CARGAS_PARALELAS <= 1 or len(entidades) <= 1:
+            futuros = None
+        else:
+            executor = obter_executor_cargas()
+            futuros = {entidade: executor.submit(carregar, entidade) for entidade in entidades}
+        for entidade in entidades:
+            try:
+                resultados[entidade] = futuros[entidade].result() if futuros else carregar(entidade)
+            except Exception as e:
+                logger.error(f"Erro ao carregar '{entidade}': {e}")
+                resultados[entidade] = []
+        s.registrar(linhas=sum(len(r) for r in resultados.values() if isinstance(r, list)))
+    return resultados
+
+# Versão dos dados de cada entidade (para caches derivados, como o das figuras)
+
+def dono_dados():
+    """
+    Identifica de quem são os dados da sessão nos caches compartilhados pelo processo.
+
+    É o usuário, exceto em produção sem login, quando os dados existem só na
+    sessão e cada sessão é dona dos seus.
+    """
+    if is_prod() and not is_authenticated():
+        ctx = get_script_run_ctx() if SCRIPT_RUN_CTX_AVAILABLE else None
+        return f"sessao:{ctx.session_id if ctx is not None else 'local'}"
+    return usuario_local()
+
+def registrar_alteracao(entidade):
+    """Marca uma nova versão dos dados de uma entidade do dono da sessão."""
+    cache_compartilhado.registrar_geracao((dono_dados(), entidade))
+
+def altera_entidade(entidade):
+    """
+    Decorador das funções de gravação: registra a alteração da entidade ao fim de cada chamada.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar_alteracao(entidade)
+        return envolvida
+    return decorador
+
+def recalcula_objetivos(salvar):
+    """
+    Decorador da gravação da lista de investimentos: depois de gravar, atualiza
+    o progresso dos objetivos vinculados.
+    """
+    @functools.wraps(salvar)
+    def envolvida(investimentos, *args, **kwargs):
+        resultado = salvar(investimentos, *args, **kwargs)
+        if resultado:
+            _atualizar_objetivos_vinculados(investimentos=investimentos)
+        return resultado
+    return envolvida
+
+def versao_dados(entidade):
+    """
+    Versão atual dos dados de uma entidade, sem ler os registros.
+
+    Muda quando qualquer sessão do processo grava a entidade, quando o arquivo
+    local muda (inclusive por outro processo) e quando a sincronização traz
+    alterações do Supabase.
+
+    Returns:
+        tuple: Valor comparável; igual enquanto os dados não mudam.
+    """
+    gravacoes = cache_compartilhado.geracao((dono_dados(), entidade))
+    sincronizado = st.session_state.get(f"sync_cache_{entidade}")
+    return (
+        gravacoes,
+        storage.versao_arquivo(arquivo_usuario(entidade)),
+        sincronizado.get("marca") if isinstance(sincronizado, dict) else None,
+    )
+
 # Funções para salvar dados
 
 def save_user_data(user_data):
@@ -386,16 +1084,14 @@ def save_user_data(user_data):
         return True
     
     try:
-        # Criar diretório se não existir
-        os.makedirs(os.path.dirname(USER_FILE), exist_ok=True)
-        
-        with open(USER_FILE, 'w', encoding='utf-8') as file:
-            json.dump(user_data, file, ensure_ascii=False, indent=2)
+        storage.gravar_json(arquivo_usuario("user"), user_data)
         return True
     except Exception as e:
-        print(f"Erro ao salvar dados do usuário: {e}")
+        logger.error(f"Erro ao salvar dados do usuário: {e}")
         return False
 
+@medir_tempo("data_handler.save", "gastos")
+@altera_entidade("gastos")
 def save_gastos(gastos):
     """
     Salva a lista de gastos com um sistema robusto de persistência que utiliza
@@ -407,7 +1103,7 @@ def save_gastos(gastos):
     Returns:
         bool: True se o salvamento foi bem-sucedido em pelo menos uma fonte, False caso contrário.
     """
-    print(f"INFO: Salvando {len(gastos)} gastos")
+    logger.info(f"Salvando {len(gastos)} gastos")
     
     # Garantir que cada gasto tenha um ID único
     for gasto in gastos:
@@ -416,7 +1112,7 @@ def save_gastos(gastos):
     
     # 1. Sempre salvar na sessão como primeira camada de persistência
     st.session_state["gastos"] = gastos
-    print("INFO: Gastos salvos na sessão")
+    logger.info("Gastos salvos na sessão")
     
     # Variáveis para rastreamento do status de salvamento
     status = {
@@ -430,68 +1126,47 @@ def save_gastos(gastos):
     try:
         # Verificar se temos acesso de escrita ao sistema de arquivos
         if os.access(DATA_DIR, os.W_OK):
-            # Criar diretório de dados se não existir
-            os.makedirs(os.path.dirname(GASTOS_FILE), exist_ok=True)
+            arquivo_gastos = arquivo_usuario("gastos")
             
-            # Criar backup do arquivo atual primeiro (se existir)
-            if os.path.exists(GASTOS_FILE):
-                try:
-                    backup_file = DATA_DIR / "gastos_backup.json"
-                    shutil.copy2(GASTOS_FILE, backup_file)
-                    print(f"INFO: Backup do arquivo de gastos criado: {backup_file}")
-                    status["arquivo_backup"] = True
-                except Exception as e:
-                    print(f"AVISO: Não foi possível criar backup do arquivo: {e}")
+            # Salvar no arquivo principal de forma atômica (temporário + os.replace),
+            # mesclando gastos adicionados por outra sessão desde a nossa leitura
+            try:
+                gastos = gravar_lista_local(arquivo_gastos, gastos)
+                st.session_state["gastos"] = gastos
+                logger.info(f"Gastos salvos no arquivo: {arquivo_gastos}")
+                status["arquivo_principal"] = True
+            except Exception as e:
+                logger.error(f"Erro ao salvar no arquivo principal: {e}")
             
-            # Salvar no arquivo principal com estratégia segura
-            # Primeiro salvar em um arquivo temporário, depois renomear
-            temp_file = DATA_DIR / "gastos_temp.json"
+            # Backup incremental (apenas os gastos alterados desde o último backup são gravados)
             try:
-                with open(temp_file, 'w', encoding='utf-8') as file:
-                    json.dump(gastos, file, ensure_ascii=False, indent=2)
-                
-                # Se o arquivo temporário foi criado com sucesso, renomear para o arquivo final
-                if os.path.exists(temp_file):
-                    # Em sistemas Windows, pode ser necessário excluir o arquivo existente primeiro
-                    if os.path.exists(GASTOS_FILE) and os.name == 'nt':
-                        os.remove(GASTOS_FILE)
-                    
-                    os.replace(temp_file, GASTOS_FILE)
-                    print(f"INFO: Gastos salvos no arquivo: {GASTOS_FILE}")
-                    status["arquivo_principal"] = True
+                if backup_incremental({"gastos": gastos}):
+                    status["arquivo_backup"] = True
             except Exception as e:
-                print(f"AVISO: Erro ao salvar no arquivo principal: {e}")
-                # Tentar abordagem direta se a estratégia de arquivo temporário falhar
-                try:
-                    with open(GASTOS_FILE, 'w', encoding='utf-8') as file:
-                        json.dump(gastos, file, ensure_ascii=False, indent=2)
-                    print(f"INFO: Gastos salvos diretamente no arquivo principal")
-                    status["arquivo_principal"] = True
-                except Exception as direct_e:
-                    print(f"ERRO: Falha também ao salvar diretamente no arquivo principal: {direct_e}")
+                logger.warning(f"Não foi possível criar backup dos gastos: {e}")
     except Exception as e:
-        print(f"AVISO: Não foi possível salvar gastos em arquivo: {e}")
+        logger.warning(f"Não foi possível salvar gastos em arquivo: {e}")
     
     # 3. Salvar no Supabase se disponível
     if SUPABASE_AVAILABLE and is_authenticated():
         try:
-            success = supabase_save_gastos(gastos)
+            success = enviar_para_supabase("gastos", gastos, supabase_save_gastos)
             if success:
-                print("INFO: Gastos salvos no Supabase")
+                logger.info("Gastos salvos no Supabase")
                 status["supabase"] = True
             else:
-                print("AVISO: Falha ao salvar gastos no Supabase")
+                logger.warning("Falha ao salvar gastos no Supabase")
         except Exception as e:
-            print(f"AVISO: Erro ao salvar gastos no Supabase: {e}")
+            logger.warning(f"Erro ao salvar gastos no Supabase: {e}")
     
     # Verificar se conseguimos salvar em pelo menos uma fonte persistente além da sessão
     saved_persistent = status["arquivo_principal"] or status["supabase"]
     
     if saved_persistent:
-        print("INFO: Gastos salvos com sucesso em pelo menos uma fonte persistente")
+        logger.info("Gastos salvos com sucesso em pelo menos uma fonte persistente")
     else:
         # Registrar aviso, mas não falhar completamente se pelo menos a sessão foi salva
-        print("AVISO: Gastos salvos apenas na sessão, sem persistência garantida!")
+        logger.warning("Gastos salvos apenas na sessão, sem persistência garantida!")
         
         # Tentativa de emergência: criar arquivo de resgate em local alternativo
         try:
@@ -505,42 +1180,58 @@ def save_gastos(gastos):
             for rescue_dir in rescue_paths:
                 try:
                     os.makedirs(rescue_dir, exist_ok=True)
-                    rescue_file = os.path.join(rescue_dir, f"gastos_rescue_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-                    with open(rescue_file, 'w', encoding='utf-8') as file:
-                        json.dump(gastos, file, ensure_ascii=False, indent=2)
-                    print(f"INFO: Arquivo de resgate criado: {rescue_file}")
+                    rescue_file = os.path.join(
+                        rescue_dir,
+                        f"gastos_rescue_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json{compressao.extensao()}"
+                    )
+                    conteudo = json.dumps(gastos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                    comprimido = compressao.comprimir(conteudo)
+                    with open(rescue_file, 'wb') as file:
+                        file.write(comprimido)
+                    logger.info(f"Arquivo de resgate criado: {rescue_file}")
+                    try:
+                        # Registrar o resgate no catálogo para que a recuperação o encontre
+                        catalogo.registrar_snapshot(
+                            diretorio_usuario(), "gastos", rescue_file, len(gastos),
+                            catalogo.calcular_checksum(conteudo), len(comprimido)
+                        )
+                    except Exception as e:
+                        logger.warning(f"Arquivo de resgate não registrado no catálogo: {e}")
                     break  # Sair do loop se conseguir salvar
                 except Exception:
                     continue  # Tentar próximo caminho
         except Exception as e:
-            print(f"ERRO: Todas as tentativas de resgate falharam: {e}")
+            logger.error(f"Todas as tentativas de resgate falharam: {e}")
     
     # Se conseguimos salvar em pelo menos uma fonte (mesmo que seja só session_state), consideramos sucesso
     return True
 
+@recalcula_objetivos
+@medir_tempo("data_handler.save", "investimentos")
+@altera_entidade("investimentos")
 def save_investimentos(investimentos):
     """
     Salva a lista de investimentos.
     """
     # Se o Supabase estiver disponível e o usuário estiver autenticado, salvar no Supabase
     if SUPABASE_AVAILABLE and is_authenticated():
-        return supabase_save_investimentos(investimentos)
+        if enviar_para_supabase("investimentos", investimentos, supabase_save_investimentos):
+            return True
+        logger.warning("Salvando investimentos localmente")
     
     if is_prod():
         st.session_state["investimentos"] = investimentos
         return True
     
     try:
-        # Criar diretório se não existir
-        os.makedirs(os.path.dirname(INVESTIMENTOS_FILE), exist_ok=True)
-        
-        with open(INVESTIMENTOS_FILE, 'w', encoding='utf-8') as file:
-            json.dump(investimentos, file, ensure_ascii=False, indent=2)
+        gravar_lista_local(arquivo_usuario("investimentos"), investimentos)
         return True
     except Exception as e:
-        print(f"Erro ao salvar investimentos: {e}")
+        logger.error(f"Erro ao salvar investimentos: {e}")
         return False
 
+@medir_tempo("data_handler.save", "dividas")
+@altera_entidade("dividas")
 def save_dividas(dividas):
     """
     Salva a lista de dívidas do usuário.
@@ -552,78 +1243,68 @@ def save_dividas(dividas):
         bool: True se salvou com sucesso, False caso contrário.
     """
     try:
-        print(f"Tentando salvar {len(dividas)} dívidas")
+        logger.info(f"Tentando salvar {len(dividas)} dívidas")
         
         # Verificar se estamos em ambiente de produção (Streamlit Cloud)
         if is_prod():
             # Salvar no session state do Streamlit
             st.session_state.dividas = dividas
-            print("Dívidas salvas no session_state")
+            logger.info("Dívidas salvas no session_state")
             return True
         
         # Verificar se há dados de autenticação
         user = get_current_user() if SUPABASE_AVAILABLE else None
         
-        if user and SUPABASE_AVAILABLE:
+        if user and SUPABASE_AVAILABLE and WRITE_BEHIND_ATIVO:
+            # Atualizar a sessão e enviar ao Supabase em segundo plano
+            st.session_state.dividas = dividas
+            return enviar_para_supabase("dividas", dividas, None)
+        elif user and SUPABASE_AVAILABLE and not supabase_circuito_aberto():
             # Salvar no Supabase
             try:
                 cliente = get_supabase_client()
                 if not cliente:
-                    print("Cliente Supabase não disponível")
+                    logger.info("Cliente Supabase não disponível")
                     return False
                 
-                # Adicionar user_id a cada dívida
-                for divida in dividas:
-                    divida["user_id"] = user["id"]
-                
-                # Primeiro excluir todas as dívidas existentes do usuário
-                response = cliente.table('dividas').delete().eq('user_id', user['id']).execute()
-                
-                # Depois inserir as novas
-                if dividas:  # Verificar se a lista não está vazia
-                    response = cliente.table('dividas').insert(dividas).execute()
-                    if hasattr(response, 'error') and response.error:
-                        print(f"Erro ao salvar dívidas no Supabase: {response.error}")
-                        return False
+                # Substituir as dívidas do usuário (com novas tentativas e upsert por id)
+                supabase_replace_user_collection("dividas", dividas, user["id"], cliente)
                 
                 # Atualizar cache local
                 st.session_state.dividas = dividas
-                print("Dívidas salvas no Supabase")
+                logger.info("Dívidas salvas no Supabase")
                 return True
             except Exception as e:
-                print(f"Erro ao salvar dívidas no Supabase: {e}")
+                logger.error(f"Erro ao salvar dívidas no Supabase: {e}")
                 import traceback
-                print(traceback.format_exc())
+                logger.debug(traceback.format_exc())
                 return False
         else:
             # Salvar em arquivo local
             try:
-                # Definir o caminho do arquivo baseado no ID do usuário
-                user_id = st.session_state.get("user_id", "default")
-                arquivo = f"data/dividas_{user_id}.json"
-                
-                # Garantir que o diretório exista
-                os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+                # Arquivo do usuário atual
+                arquivo = arquivo_usuario("dividas")
                 
                 # Salvar o arquivo
-                with open(arquivo, "w", encoding="utf-8") as f:
-                    json.dump(dividas, f, ensure_ascii=False, indent=2)
+                dividas = gravar_lista_local(arquivo, dividas)
                 
                 # Atualizar cache local
                 st.session_state.dividas = dividas
-                print(f"Dívidas salvas no arquivo: {arquivo}")
+                logger.info(f"Dívidas salvas no arquivo: {arquivo}")
                 return True
             except Exception as e:
-                print(f"Erro ao salvar dívidas em arquivo: {e}")
+                logger.error(f"Erro ao salvar dívidas em arquivo: {e}")
                 import traceback
-                print(traceback.format_exc())
+                logger.debug(traceback.format_exc())
                 return False
     except Exception as e:
-        print(f"Erro geral ao salvar dívidas: {e}")
+        logger.error(f"Erro geral ao salvar dívidas: {e}")
         import traceback
-        print(traceback.format_exc())
+        logger.debug(traceback.format_exc())
         return False
 
+@medir_tempo("data_handler.save", "seguros")
+@altera_entidade("seguros")
 def save_seguros(seguros):
     """
     Salva a lista de seguros.
@@ -634,34 +1315,24 @@ def save_seguros(seguros):
         
         # Tentar salvar no Supabase
         user = get_current_user()
-        if user:
+        if user and WRITE_BEHIND_ATIVO:
+            # Enviar ao Supabase em segundo plano
+            return enviar_para_supabase("seguros", seguros, None)
+        if user and not supabase_circuito_aberto():
             cliente = get_supabase_client()
             if cliente:
-                # Remover dados existentes
-                cliente.table('seguros').delete().eq('user_id', user['id']).execute()
-                
-                # Inserir novos dados
-                if seguros:
-                    for seguro in seguros:
-                        seguro_supabase = seguro.copy()
-                        seguro_supabase['user_id'] = user['id']
-                        cliente.table('seguros').insert(seguro_supabase).execute()
-                
+                # Substituir os seguros do usuário (com novas tentativas e upsert por id)
+                supabase_replace_user_collection("seguros", seguros, user["id"], cliente)
                 return True
         
         # Salvar no arquivo local como fallback
-        user_id = st.session_state.get("user_id", "default")
-        arquivo = f"data/seguros_{user_id}.json"
-        
-        # Criar diretório se não existir
-        os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+        arquivo = arquivo_usuario("seguros")
         
-        with open(arquivo, "w", encoding="utf-8") as f:
-            json.dump(seguros, f, ensure_ascii=False, indent=4)
+        gravar_lista_local(arquivo, seguros, indent=4)
         
         return True
     except Exception as e:
-        print(f"Erro ao salvar seguros: {e}")
+        logger.error(f"Erro ao salvar seguros: {e}")
         return False
 
 def save_config(config):
@@ -673,37 +1344,233 @@ def save_config(config):
         return True
     
     try:
-        # Criar diretório se não existir
-        os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-        
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as file:
-            yaml.dump(config, file, default_flow_style=False, allow_unicode=True)
+        storage.gravar_yaml(CONFIG_FILE, config)
         return True
     except Exception as e:
-        print(f"Erro ao salvar configuração: {e}")
+        logger.error(f"Erro ao salvar configuração: {e}")
         return False
 
+@medir_tempo("data_handler.save", "objetivos")
+@altera_entidade("objetivos")
 def save_objetivos(objetivos):
     """
     Salva a lista de objetivos financeiros.
     """
     # Se o Supabase estiver disponível e o usuário estiver autenticado, salvar no Supabase
     if SUPABASE_AVAILABLE and is_authenticated():
-        return supabase_save_objetivos(objetivos)
+        if enviar_para_supabase("objetivos", objetivos, supabase_save_objetivos):
+            return True
+        logger.warning("Salvando objetivos localmente")
     
     if is_prod():
         st.session_state["objetivos"] = objetivos
         return True
     
     try:
-        # Criar diretório se não existir
-        os.makedirs(os.path.dirname(OBJETIVOS_FILE), exist_ok=True)
-        
-        with open(OBJETIVOS_FILE, 'w', encoding='utf-8') as file:
-            json.dump(objetivos, file, ensure_ascii=False, indent=2)
+        gravar_lista_local(arquivo_usuario("objetivos"), objetivos)
         return True
     except Exception as e:
-        print(f"Erro ao salvar objetivos: {e}")
+        logger.error(f"Erro ao salvar objetivos: {e}")
+        return False
+
+# Alterações por ID
+
+# Entidades guardadas na sessão pelas funções save_* (a sessão acompanha cada alteração)
+ENTIDADES_NA_SESSAO = ("gastos", "dividas", "seguros")
+
+# Entidades lidas do arquivo local mesmo com o Supabase (o arquivo acompanha cada alteração)
+ENTIDADES_NO_ARQUIVO = ("gastos", "seguros")
+
+def _salvadores():
+    """Função de gravação da lista completa de cada coleção."""
+    return {
+        "gastos": save_gastos,
+        "investimentos": save_investimentos,
+        "dividas": save_dividas,
+        "seguros": save_seguros,
+        "objetivos": save_objetivos,
+    }
+
+def indice_por_id(entidade, registros):
+    """
+    Retorna o índice {id: posição} de uma lista de registros.
+
+    O índice fica na sessão e é reaproveitado enquanto as posições continuam
+    corretas: as listas carregadas de novo do mesmo arquivo (ou da mesma cópia
+    sincronizada) mantêm a ordem, então o índice vale para elas também.
+    """
+    indices = st.session_state.setdefault("indices_id", {})
+    guardado = indices.get(entidade)
+    if guardado is None or guardado["tamanho"] != len(registros):
+        guardado = {
+            "tamanho": len(registros),
+            "posicoes": {
+                item.get("id"): i for i, item in enumerate(registros)
+                if isinstance(item, dict) and item.get("id") is not None
+            },
+        }
+        indices[entidade] = guardado
+    return guardado["posicoes"]
+
+def posicao_por_id(entidade, registros, registro_id):
+    """
+    Posição de um registro na lista, pelo ID, sem comparar os demais campos.
+
+    A posição do índice é conferida no registro; se a lista mudou de ordem, o
+    índice é refeito uma vez.
+
+    Returns:
+        int ou None: Posição do registro, ou None se o ID não estiver na lista.
+    """
+    if registro_id is None:
+        return None
+    posicao = indice_por_id(entidade, registros).get(registro_id)
+    if posicao is not None and registros[posicao].get("id") == registro_id:
+        return posicao
+    st.session_state.get("indices_id", {}).pop(entidade, None)
+    return indice_por_id(entidade, registros).get(registro_id)
+
+def _gravar_registros_remoto(entidade, registros, alterados):
+    """
+    Envia ao Supabase apenas os registros alterados (ou a exclusão deles).
+
+    `alterados` é {id: registro novo, ou None se o registro foi excluído}; os
+    registros novos vão em uma única requisição.
+
+    Só é usado com o usuário autenticado, o Supabase estável e nenhuma
+    gravação da coleção na fila write-behind (a lista enfileirada substituiria
+    a coleção inteira depois). A sessão, a cópia sincronizada e, nas
+    entidades lidas do arquivo, o arquivo local recebem a lista atualizada.
+
+    Returns:
+        bool: True se os registros foram gravados; False para usar a gravação da lista completa.
+    """
+    if not SUPABASE_AVAILABLE or supabase_circuito_aberto():
+        return False
+    user = get_current_user()
+    if not user:
+        return False
+    if WRITE_BEHIND_ATIVO and obter_fila_escrita().pending(user["id"], entidade) is not None:
+        return False
+
+    novos = [registro for registro in alterados.values() if registro is not None]
+    try:
+        for registro_id, registro in alterados.items():
+            if registro is None:
+                supabase_delete_user_record(entidade, registro_id, user["id"])
+        supabase_upsert_user_records(entidade, novos, user["id"])
+    except Exception as e:
+        logger.warning(f"Não foi possível gravar {len(alterados)} registro(s) de '{entidade}' no Supabase: {e}")
+        return False
+
+    chave_sync = f"sync_cache_{entidade}"
+    estado = st.session_state.get(chave_sync)
+    if estado and estado.get("registros") is not None:
+        sincronizados = [r for r in estado["registros"] if r.get("id") not in alterados]
+        sincronizados.extend(novos)
+        st.session_state[chave_sync] = dict(estado, registros=sincronizados)
+
+    if entidade in ENTIDADES_NO_ARQUIVO and os.access(DATA_DIR, os.W_OK):
+        try:
+            registros = gravar_lista_local(arquivo_usuario(entidade), registros, indent=4 if entidade == "seguros" else 2)
+            if entidade == "gastos":
+                backup_incremental({"gastos": registros})
+        except Exception as e:
+            logger.warning(f"Não foi possível atualizar o arquivo local de '{entidade}': {e}")
+    if entidade in ENTIDADES_NA_SESSAO:
+        st.session_state[entidade] = registros
+    return True
+
+def _alterar_por_id(entidade, registro_id, alterar):
+    """
+    Aplica `alterar(registros, posicao)` ao registro de um ID e grava o resultado.
+
+    `alterar` retorna o registro novo (ou None para excluir).
+    """
+    registros = list(_carregadores()[entidade]())
+    posicao = posicao_por_id(entidade, registros, registro_id)
+    if posicao is None:
+        logger.warning(f"Registro {registro_id} não encontrado em '{entidade}'")
+        return False
+
+    registro = alterar(registros, posicao)
+    if registro is None:
+        registros.pop(posicao)
+        # As posições seguintes mudaram: o índice é refeito na próxima consulta
+        st.session_state.get("indices_id", {}).pop(entidade, None)
+    else:
+        registros[posicao] = registro
+        indice_por_id(entidade, registros)
+
+    if not _gravar_alteracoes(entidade, registros, {registro_id: registro}):
+        return False
+    if entidade == "investimentos":
+        # O valor do investimento (ou a exclusão dele) muda o progresso dos objetivos vinculados
+        _atualizar_objetivos_vinculados(investimento_ids=[registro_id])
+    return True
+
+def _gravar_alteracoes(entidade, registros, alterados):
+    """
+    Grava a lista `registros`, em que só os registros de `alterados` mudaram.
+
+    Com o Supabase, apenas as linhas alteradas são enviadas; sem ele (ou com a
+    coleção na fila), o armazenamento local grava a lista inteira.
+    """
+    with span("data_handler.alterar_por_id", entidade):
+        if _gravar_registros_remoto(entidade, registros, alterados):
+            registrar_alteracao(entidade)
+            return True
+        return _salvadores()[entidade](registros)
+
+def delete_by_id(entidade, registro_id):
+    """
+    Remove um registro pelo ID.
+
+    Com o Supabase, apenas a linha do registro é excluída; localmente, o
+    arquivo JSON é regravado sem ele.
+
+    Args:
+        entidade (str): Coleção (ex: "gastos").
+        registro_id (str): ID do registro.
+
+    Returns:
+        bool: True se o registro foi removido, False se não foi encontrado ou a gravação falhou.
+    """
+    if entidade not in _salvadores():
+        raise ValueError(f"Coleção desconhecida: {entidade}")
+    try:
+        return _alterar_por_id(entidade, registro_id, lambda registros, posicao: None)
+    except Exception as e:
+        logger.error(f"Erro ao remover registro {registro_id} de '{entidade}': {e}")
+        return False
+
+def update_by_id(entidade, registro_id, alteracoes):
+    """
+    Altera campos de um registro pelo ID.
+
+    O registro é substituído por uma cópia com as alterações (os registros
+    podem ser compartilhados com outras sessões pelo cache de arquivos).
+
+    Args:
+        entidade (str): Coleção (ex: "seguros").
+        registro_id (str): ID do registro.
+        alteracoes (dict ou callable): Campos novos, ou função que recebe o
+            registro atual e retorna os campos novos.
+
+    Returns:
+        bool: True se o registro foi alterado, False se não foi encontrado ou a gravação falhou.
+    """
+    def alterar(registros, posicao):
+        atual = registros[posicao]
+        campos = alteracoes(atual) if callable(alteracoes) else alteracoes
+        return {**atual, **campos, "id": registro_id}
+
+    if entidade not in _salvadores():
+        raise ValueError(f"Coleção desconhecida: {entidade}")
+    try:
+        return _alterar_por_id(entidade, registro_id, alterar)
+    except Exception as e:
+        logger.error(f"Erro ao alterar registro {registro_id} de '{entidade}': {e}")
         return False
 
 # Funções para adicionar itens
@@ -721,7 +1588,7 @@ def add_gasto(gasto):
     try:
         # Validar campos obrigatórios
         if DATA_MAPPER_AVAILABLE and not validar_campos_obrigatorios(gasto, 'gastos'):
-            print("Erro: campos obrigatórios ausentes no gasto")
+            logger.error("campos obrigatórios ausentes no gasto")
             return False
             
         # Normalizar dados para garantir compatibilidade
@@ -757,7 +1624,7 @@ def add_gasto(gasto):
         # Salvar lista atualizada
         return save_gastos(gastos)
     except Exception as e:
-        print(f"Erro ao adicionar gasto: {e}")
+        logger.error(f"Erro ao adicionar gasto: {e}")
         return False
 
 def add_investimento(investimento):
@@ -776,7 +1643,7 @@ def add_investimento(investimento):
         campos_faltantes = [campo for campo in campos_obrigatorios if campo not in investimento]
         
         if campos_faltantes:
-            print(f"Erro: campos obrigatórios ausentes no investimento: {campos_faltantes}")
+            logger.error(f"campos obrigatórios ausentes no investimento: {campos_faltantes}")
             return False
             
         # Normalizar dados para garantir compatibilidade
@@ -784,7 +1651,7 @@ def add_investimento(investimento):
             try:
                 investimento = normalizar_investimento(investimento)
             except Exception as e:
-                print(f"Erro ao normalizar investimento: {e}")
+                logger.error(f"Erro ao normalizar investimento: {e}")
                 return False
         else:
             # Adicionar ID único se não foi fornecido
@@ -805,12 +1672,12 @@ def add_investimento(investimento):
         if save_investimentos(investimentos):
             return True
         else:
-            print("Erro ao salvar lista de investimentos")
+            logger.error("Erro ao salvar lista de investimentos")
             return False
             
     except Exception as e:
-        print(f"Erro ao adicionar investimento: {e}")
-        print(f"Dados do investimento: {investimento}")
+        logger.error(f"Erro ao adicionar investimento: {e}")
+        logger.info(f"Dados do investimento: {investimento}")
         return False
 
 def add_divida(divida):
@@ -824,14 +1691,14 @@ def add_divida(divida):
         bool: True se adicionou com sucesso, False caso contrário.
     """
     try:
-        print(f"DEBUG: Iniciando adição de dívida: {divida}")
+        logger.debug(f"Iniciando adição de dívida: {divida}")
         
         # Validar campos obrigatórios
         campos_obrigatorios = ['descricao', 'valor_atual', 'tipo']
         campos_faltantes = [campo for campo in campos_obrigatorios if campo not in divida]
         
         if campos_faltantes:
-            print(f"ERRO: campos obrigatórios ausentes na dívida: {campos_faltantes}")
+            logger.error(f"campos obrigatórios ausentes na dívida: {campos_faltantes}")
             st.error(f"Campos obrigatórios ausentes: {', '.join(campos_faltantes)}")
             return False
             
@@ -860,32 +1727,27 @@ def add_divida(divida):
         st.session_state.dividas = dividas
         
         # Salvar no armazenamento persistente
-        print(f"DEBUG: Tentando salvar lista de {len(dividas)} dívidas")
+        logger.debug(f"Tentando salvar lista de {len(dividas)} dívidas")
         
         # Método simplificado de persistência - evitar problemas com Supabase
         try:
             # Utilizar método mais simples para produção
             if is_prod():
-                print("DEBUG: Salvando em ambiente de produção (session_state)")
+                logger.debug("Salvando em ambiente de produção (session_state)")
                 return True  # Já salvamos no session_state anteriormente
                 
             # Salvamento local
-            user_id = st.session_state.get("user_id", "default")
-            arquivo = f"data/dividas_{user_id}.json"
-            
-            # Garantir que o diretório exista
-            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+            arquivo = arquivo_usuario("dividas")
             
             # Salvar o arquivo
-            with open(arquivo, "w", encoding="utf-8") as f:
-                json.dump(dividas, f, ensure_ascii=False, indent=2)
+            gravar_lista_local(arquivo, dividas)
                 
-            print(f"DEBUG: Dívidas salvas com sucesso no arquivo: {arquivo}")
+            logger.debug(f"Dívidas salvas com sucesso no arquivo: {arquivo}")
             return True
         except Exception as e:
-            print(f"ERRO: Falha ao persistir dívidas: {e}")
+            logger.error(f"Falha ao persistir dívidas: {e}")
             import traceback
-            print(traceback.format_exc())
+            logger.debug(traceback.format_exc())
             
             # Retornar verdadeiro mesmo assim, já que os dados estão no session_state
             # Pelo menos o usuário não perderá seus dados durante a sessão atual
@@ -893,8 +1755,8 @@ def add_divida(divida):
             
     except Exception as e:
         import traceback
-        print(f"ERRO: Erro ao adicionar dívida: {e}")
-        print(traceback.format_exc())
+        logger.error(f"Erro ao adicionar dívida: {e}")
+        logger.debug(traceback.format_exc())
         return False
 
 def add_objetivo(objetivo):
@@ -910,7 +1772,7 @@ def add_objetivo(objetivo):
     try:
         # Validar campos obrigatórios
         if DATA_MAPPER_AVAILABLE and not validar_campos_obrigatorios(objetivo, 'objetivos'):
-            print("Erro: campos obrigatórios ausentes no objetivo")
+            logger.error("campos obrigatórios ausentes no objetivo")
             return False
             
         # Normalizar dados para garantir compatibilidade
@@ -937,28 +1799,33 @@ def add_objetivo(objetivo):
         # Salvar lista atualizada
         return save_objetivos(objetivos)
     except Exception as e:
-        print(f"Erro ao adicionar objetivo: {e}")
+        logger.error(f"Erro ao adicionar objetivo: {e}")
         return False
 
 def create_backup():
     """
-    Cria um backup dos dados atuais.
+    Cria um backup (incremental) de todos os dados atuais do usuário.
+    
+    Returns:
+        Path: Manifesto do backup criado.
     """
-    backup_dir = DATA_DIR / "backups" / datetime.now().strftime("%Y%m%d_%H%M%S")
-    os.makedirs(backup_dir, exist_ok=True)
+    entidades = {}
     
-    # Copiar arquivos existentes
-    for file_path in [USER_FILE, GASTOS_FILE, INVESTIMENTOS_FILE, DIVIDAS_FILE, SEGUROS_FILE, CONFIG_FILE, OBJETIVOS_FILE]:
+    # Ler os arquivos existentes do usuário e a configuração
+    arquivos = {entidade: arquivo_usuario(entidade)
+                for entidade in ["user", "gastos", "investimentos", "dividas", "seguros", "objetivos"]}
+    arquivos["config"] = CONFIG_FILE
+    for entidade, file_path in arquivos.items():
         if os.path.exists(file_path):
-            backup_file = backup_dir / file_path.name
             try:
-                with open(file_path, 'r', encoding='utf-8') as src:
-                    with open(backup_file, 'w', encoding='utf-8') as dst:
-                        dst.write(src.read())
+                if entidade == "config":
+                    entidades[entidade], _ = storage.ler_yaml(file_path)
+                else:
+                    entidades[entidade], _ = storage.ler_json(file_path)
             except Exception as e:
-                print(f"Erro ao fazer backup de {file_path.name}: {e}")
+                logger.error(f"Erro ao fazer backup de {file_path.name}: {e}")
     
-    return backup_dir
+    return backup_incremental(entidades, forcar=True)
 
 def initialize_data():
     """
@@ -982,7 +1849,7 @@ def initialize_data():
         # ... existing code ...
         
         # Adicionar objetivos de exemplo se não existirem
-        if not os.path.exists(OBJETIVOS_FILE):
+        if not os.path.exists(arquivo_usuario("objetivos")):
             exemplo_objetivos = [
                 {
                     "id": str(uuid.uuid4()),
@@ -1032,19 +1899,14 @@ def initialize_data():
         
         return True
     except Exception as e:
-        print(f"Erro ao inicializar dados: {e}")
+        logger.error(f"Erro ao inicializar dados: {e}")
         return False
 
 # Funções de utilidade
 def ensure_data_dirs():
     """Garante que os diretórios de dados existam."""
-    os.makedirs(os.path.dirname(USER_FILE), exist_ok=True)
-    os.makedirs(os.path.dirname(GASTOS_FILE), exist_ok=True)
-    os.makedirs(os.path.dirname(INVESTIMENTOS_FILE), exist_ok=True)
-    os.makedirs(os.path.dirname(DIVIDAS_FILE), exist_ok=True)
-    os.makedirs(os.path.dirname(SEGUROS_FILE), exist_ok=True)
     os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-    os.makedirs(os.path.dirname(OBJETIVOS_FILE), exist_ok=True)
+    os.makedirs(diretorio_usuario(), exist_ok=True)
 
 def atualizar_progresso_objetivo(objetivo_id, novo_valor):
     """
@@ -1057,14 +1919,7 @@ def atualizar_progresso_objetivo(objetivo_id, novo_valor):
     Returns:
         bool: True se atualizado com sucesso, False caso contrário
     """
-    objetivos = load_objetivos()
-    
-    for objetivo in objetivos:
-        if objetivo.get("id") == objetivo_id:
-            objetivo["valor_atual"] = novo_valor
-            return save_objetivos(objetivos)
-    
-    return False
+    return update_by_id("objetivos", objetivo_id, {"valor_atual": novo_valor})
 
 def vincular_investimento_objetivo(objetivo_id, investimento_id):
     """
@@ -1078,19 +1933,16 @@ def vincular_investimento_objetivo(objetivo_id, investimento_id):
         bool: True se vinculado com sucesso, False caso contrário
     """
     objetivos = load_objetivos()
+    posicao = posicao_por_id("objetivos", objetivos, objetivo_id)
+    if posicao is None:
+        return False
     
-    for objetivo in objetivos:
-        if objetivo.get("id") == objetivo_id:
-            if "investimentos_vinculados" not in objetivo:
-                objetivo["investimentos_vinculados"] = []
-            
-            # Verificar se o investimento já está vinculado
-            if investimento_id not in objetivo["investimentos_vinculados"]:
-                objetivo["investimentos_vinculados"].append(investimento_id)
-                return save_objetivos(objetivos)
-            return True  # Já está vinculado
+    vinculados = objetivos[posicao].get("investimentos_vinculados") or []
+    if investimento_id in vinculados:
+        return True  # Já está vinculado
     
-    return False
+    # Lista nova: o registro pode ser compartilhado com outras sessões
+    return update_by_id("objetivos", objetivo_id, {"investimentos_vinculados": vinculados + [investimento_id]})
 
 def desvincular_investimento_objetivo(objetivo_id, investimento_id):
     """
@@ -1104,43 +1956,177 @@ def desvincular_investimento_objetivo(objetivo_id, investimento_id):
         bool: True se desvinculado com sucesso, False caso contrário
     """
     objetivos = load_objetivos()
+    posicao = posicao_por_id("objetivos", objetivos, objetivo_id)
+    if posicao is None:
+        return False
     
-    for objetivo in objetivos:
-        if objetivo.get("id") == objetivo_id and "investimentos_vinculados" in objetivo:
-            if investimento_id in objetivo["investimentos_vinculados"]:
-                objetivo["investimentos_vinculados"].remove(investimento_id)
-                return save_objetivos(objetivos)
+    vinculados = objetivos[posicao].get("investimentos_vinculados") or []
+    if investimento_id not in vinculados:
+        return False
     
-    return False
+    return update_by_id("objetivos", objetivo_id, {
+        "investimentos_vinculados": [v for v in vinculados if v != investimento_id]
+    })
+
+def progresso_no_servidor():
+    """
+    Indica se o progresso dos objetivos é mantido pelo banco.
+
+    Vale com o usuário no Supabase e SUPABASE_PROGRESSO_OBJETIVOS=1 (depois de
+    executar scripts/8_add_progresso_objetivos.sql).
+    """
+    return SUPABASE_AVAILABLE and SUPABASE_PROGRESSO_NO_SERVIDOR and is_authenticated()
+
+def indice_objetivos_por_investimento(objetivos):
+    """
+    Retorna o índice reverso dos vínculos: {investimento_id: [objetivo_id, ...]}.
+
+    O índice fica na sessão e só é refeito quando os objetivos mudam (versão
+    dos dados ou tamanho da lista).
+    """
+    marca = (versao_dados("objetivos"), len(objetivos))
+    guardado = st.session_state.get("indice_objetivos_por_investimento")
+    if guardado is None or guardado["marca"] != marca:
+        reverso = {}
+        for objetivo in objetivos:
+            if objetivo.get("id") is None:
+                continue
+            for investimento_id in objetivo.get("investimentos_vinculados") or ():
+                reverso.setdefault(investimento_id, []).append(objetivo["id"])
+        guardado = {"marca": marca, "reverso": reverso}
+        st.session_state["indice_objetivos_por_investimento"] = guardado
+    return guardado["reverso"]
 
-def calcular_progresso_objetivos():
+def calcular_progresso_objetivos(investimento_ids=None, objetivo_ids=None, investimentos=None):
     """
-    Recalcula o progresso de todos os objetivos com base nos investimentos vinculados.
-    Usado quando um investimento é atualizado ou removido.
+    Recalcula o progresso dos objetivos com base nos investimentos vinculados.
+    
+    Apenas os objetivos afetados são recalculados: os vinculados a
+    `investimento_ids` (pelo índice reverso) e os de `objetivo_ids`. Sem
+    nenhum dos dois, todos os objetivos com investimentos vinculados. Só os
+    objetivos cujo valor mudou são gravados (no Supabase, apenas essas linhas).
     
+    Args:
+        investimento_ids (iterable, optional): Investimentos alterados ou removidos
+        objetivo_ids (iterable, optional): Objetivos cujos vínculos mudaram
+        investimentos (list, optional): Investimentos já carregados
+        
     Returns:
-        bool: True se atualizado com sucesso, False caso contrário
+        bool: True se atualizado com sucesso (ou se nada mudou), False caso contrário
     """
-    objetivos = load_objetivos()
-    investimentos = load_investimentos()
-    
-    # Criar um dicionário de investimentos para acesso rápido
-    investimentos_dict = {inv.get("id", ""): inv for inv in investimentos if "id" in inv}
-    
-    for objetivo in objetivos:
-        if "investimentos_vinculados" in objetivo and objetivo["investimentos_vinculados"]:
-            # Calcular a soma dos valores atuais dos investimentos vinculados
-            valor_atual = 0
-            for inv_id in objetivo["investimentos_vinculados"]:
-                if inv_id in investimentos_dict:
-                    investimento = investimentos_dict[inv_id]
-                    valor_atual += investimento.get("valor_atual", 0)
-            
-            # Atualizar o valor atual do objetivo
-            objetivo["valor_atual"] = valor_atual
+    if progresso_no_servidor():
+        # Os triggers do banco já atualizaram os objetivos; a sincronização traz os valores
+        return True
+    
+    objetivos = list(load_objetivos())
+    
+    if investimento_ids is None and objetivo_ids is None:
+        posicoes = range(len(objetivos))
+    else:
+        reverso = indice_objetivos_por_investimento(objetivos)
+        afetados = dict.fromkeys(objetivo_ids or ())
+        for investimento_id in investimento_ids or ():
+            afetados.update(dict.fromkeys(reverso.get(investimento_id, ())))
+        posicoes = [posicao_por_id("objetivos", objetivos, objetivo_id) for objetivo_id in afetados]
+    
+    # Objetivos sem investimentos vinculados têm o valor informado manualmente
+    posicoes = [p for p in posicoes if p is not None and objetivos[p].get("investimentos_vinculados")]
+    if not posicoes:
+        return True
     
-    # Salvar os objetivos atualizados
-    return save_objetivos(objetivos)
+    # Valores atuais apenas dos investimentos vinculados aos objetivos afetados
+    if investimentos is None:
+        investimentos = load_investimentos()
+    necessarios = {inv_id for p in posicoes for inv_id in objetivos[p]["investimentos_vinculados"]}
+    valores = {
+        inv.get("id"): inv.get("valor_atual", 0)
+        for inv in investimentos if inv.get("id") in necessarios
+    }
+    
+    alterados = {}
+    sem_id = False
+    for posicao in posicoes:
+        objetivo = objetivos[posicao]
+        valor_atual = sum(valores.get(inv_id, 0) for inv_id in objetivo["investimentos_vinculados"])
+        if objetivo.get("valor_atual") == valor_atual:
+            continue
+        
+        # Cópia: o registro pode ser compartilhado com outras sessões
+        objetivos[posicao] = dict(objetivo, valor_atual=valor_atual)
+        if objetivo.get("id") is None:
+            sem_id = True
+        else:
+            alterados[objetivo["id"]] = objetivos[posicao]
+    
+    if sem_id:
+        # Objetivos antigos sem ID só podem ser gravados com a lista inteira
+        return save_objetivos(objetivos)
+    if not alterados:
+        return True
+    return _gravar_alteracoes("objetivos", objetivos, alterados)
+
+def vinculos_objetivos():
+    """
+    Investimentos vinculados a cada objetivo.
+    
+    Com o progresso mantido pelo banco, os vínculos vêm resolvidos da visão do
+    Supabase; senão, dos objetivos e investimentos carregados. O resultado
+    fica na sessão enquanto objetivos e investimentos não mudam.
+    
+    Returns:
+        dict: {objetivo_id: [{"id", "nome", "valor_atual"}, ...]}
+    """
+    marca = (versao_dados("objetivos"), versao_dados("investimentos"))
+    guardado = st.session_state.get("vinculos_objetivos")
+    if guardado is not None and guardado["marca"] == marca:
+        return guardado["vinculos"]
+    
+    linhas = None
+    if progresso_no_servidor():
+        try:
+            linhas = supabase_load_vinculos_objetivos()
+        except Exception as e:
+            logger.warning(f"Não foi possível ler os vínculos dos objetivos no Supabase: {e}")
+    
+    if linhas is None:
+        objetivos = load_objetivos()
+        necessarios = {
+            inv_id for objetivo in objetivos for inv_id in objetivo.get("investimentos_vinculados") or ()
+        }
+        por_id = {inv.get("id"): inv for inv in load_investimentos() if inv.get("id") in necessarios}
+        linhas = [
+            {
+                "objetivo_id": objetivo.get("id"),
+                "investimento_id": inv_id,
+                "nome": por_id[inv_id].get("nome") or por_id[inv_id].get("descricao"),
+                "valor_atual": por_id[inv_id].get("valor_atual", 0),
+            }
+            for objetivo in objetivos
+            for inv_id in objetivo.get("investimentos_vinculados") or ()
+            if inv_id in por_id
+        ]
+    
+    vinculos = {}
+    for linha in linhas:
+        vinculos.setdefault(linha["objetivo_id"], []).append({
+            "id": linha["investimento_id"],
+            "nome": linha.get("nome") or "Investimento",
+            "valor_atual": float(linha.get("valor_atual") or 0),
+        })
+    st.session_state["vinculos_objetivos"] = {"marca": marca, "vinculos": vinculos}
+    return vinculos
+
+def _atualizar_objetivos_vinculados(**kwargs):
+    """
+    Recalcula o progresso dos objetivos depois de uma gravação de investimentos.
+
+    Uma falha aqui não desfaz a gravação dos investimentos: é apenas registrada.
+    """
+    try:
+        if not calcular_progresso_objetivos(**kwargs):
+            logger.warning("Não foi possível gravar o progresso dos objetivos")
+    except Exception as e:
+        logger.warning(f"Erro ao recalcular o progresso dos objetivos: {e}")
 
 # Funções para seguros
 
@@ -1157,7 +2143,7 @@ def add_seguro(seguro):
     try:
         # Validar campos obrigatórios
         if DATA_MAPPER_AVAILABLE and not validar_campos_obrigatorios(seguro, 'seguros'):
-            print("Erro: campos obrigatórios ausentes no seguro")
+            logger.error("campos obrigatórios ausentes no seguro")
             return False
             
         # Normalizar dados para garantir compatibilidade
@@ -1177,7 +2163,7 @@ def add_seguro(seguro):
         # Salvar lista atualizada
         return save_seguros(seguros)
     except Exception as e:
-        print(f"Erro ao adicionar seguro: {e}")
+        logger.error(f"Erro ao adicionar seguro: {e}")
         return False
 
 def delete_seguro(seguro_id):
@@ -1190,15 +2176,7 @@ def delete_seguro(seguro_id):
     Returns:
         bool: True se o seguro foi removido com sucesso, False caso contrário.
     """
-    seguros = load_seguros()
-    
-    # Encontrar o seguro pelo ID
-    for i, seguro in enumerate(seguros):
-        if seguro.get("id") == seguro_id:
-            seguros.pop(i)
-            return save_seguros(seguros)
-    
-    return False
+    return delete_by_id("seguros", seguro_id)
 
 def delete_divida(divida_id):
     """
@@ -1210,24 +2188,7 @@ def delete_divida(divida_id):
     Returns:
         bool: True se removeu com sucesso, False caso contrário.
     """
-    try:
-        # Carregar dívidas existentes
-        dividas = load_dividas()
-        
-        # Encontrar e remover a dívida com o ID especificado
-        for i, divida in enumerate(dividas):
-            if divida.get("id") == divida_id:
-                dividas.pop(i)
-                break
-        else:
-            # Dívida não encontrada
-            return False
-        
-        # Salvar lista atualizada
-        return save_dividas(dividas)
-    except Exception as e:
-        print(f"Erro ao remover dívida: {e}")
-        return False
+    return delete_by_id("dividas", divida_id)
 
 def load_data(data_type):
     """
@@ -1239,18 +2200,18 @@ def load_data(data_type):
     Returns:
         list: Lista de dados carregados ou lista vazia se não houver dados
     """
+    memoria_sessao.registrar_acesso(data_type)
     if is_prod():
         return st.session_state.get(data_type, [])
     
-    file_path = DATA_DIR / f"{data_type}.json"
+    file_path = arquivo_usuario(data_type)
     if not os.path.exists(file_path):
         return []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        return ler_lista_local(file_path)
     except Exception as e:
-        print(f"Erro ao carregar {data_type}: {e}")
+        logger.error(f"Erro ao carregar {data_type}: {e}")
         return []
 
 def save_data(data_type, data):
@@ -1263,26 +2224,27 @@ def save_data(data_type, data):
     """
     # Normalizar os tipos dos gastos se for tipo 'gastos'
     if data_type == 'gastos':
-        # Garantir que os tipos estejam em minúsculas
-        for item in data:
+        # Garantir que os tipos estejam em minúsculas (em cópias dos registros alterados)
+        for indice, item in enumerate(data):
             if 'tipo' in item:
-                item['tipo'] = item['tipo'].lower()
+                tipo = item['tipo'].lower()
                 # Padronizar valores
-                if item['tipo'] in ['fixo', 'fíxo', 'fixado']:
-                    item['tipo'] = 'fixo'
-                elif item['tipo'] in ['variável', 'variavel', 'variable']:
-                    item['tipo'] = 'variavel'
+                if tipo in ['fixo', 'fíxo', 'fixado']:
+                    tipo = 'fixo'
+                elif tipo in ['variável', 'variavel', 'variable']:
+                    tipo = 'variavel'
+                if tipo != item['tipo']:
+                    data[indice] = dict(item, tipo=tipo)
     
     if is_prod():
         st.session_state[data_type] = data
         return
     
-    file_path = DATA_DIR / f"{data_type}.json"
+    file_path = arquivo_usuario(data_type)
     try:
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=2)
+        gravar_lista_local(file_path, data)
     except Exception as e:
-        print(f"Erro ao salvar {data_type}: {e}")
+        logger.error(f"Erro ao salvar {data_type}: {e}")
 
 # Função para normalizar os gastos existentes
 def normalizar_gastos_existentes():
@@ -1301,9 +2263,10 @@ def normalizar_gastos_existentes():
         if not gastos:
             return True
             
-        # Normalizar os tipos dos gastos
+        # Normalizar os tipos dos gastos (substituindo por cópias os gastos alterados,
+        # já que os registros carregados são compartilhados entre as sessões)
         modificados = False
-        for gasto in gastos:
+        for indice, gasto in enumerate(gastos):
             if 'tipo' in gasto:
                 tipo_original = gasto['tipo']
                 
@@ -1312,13 +2275,14 @@ def normalizar_gastos_existentes():
                 
                 # Normalizar os valores
                 if tipo_minusculo in ['fixo', 'fíxo', 'fixado']:
-                    gasto['tipo'] = 'fixo'
-                    if tipo_original != 'fixo':
-                        modificados = True
+                    tipo_normalizado = 'fixo'
                 elif tipo_minusculo in ['variável', 'variavel', 'variable', 'variável']:
-                    gasto['tipo'] = 'variavel'
-                    if tipo_original != 'variavel':
-                        modificados = True
+                    tipo_normalizado = 'variavel'
+                else:
+                    continue
+                if tipo_original != tipo_normalizado:
+                    gastos[indice] = dict(gasto, tipo=tipo_normalizado)
+                    modificados = True
                         
         # Se houve modificações, salvar os gastos atualizados
         if modificados:
@@ -1326,87 +2290,113 @@ def normalizar_gastos_existentes():
             
         return True
     except Exception as e:
-        print(f"Erro ao normalizar gastos existentes: {e}")
+        logger.error(f"Erro ao normalizar gastos existentes: {e}")
         return False
 
+def _indexar_snapshots_antigos(diretorio):
+    """
+    Cria o catálogo de um usuário a partir dos arquivos de backup anteriores ao catálogo.
+
+    Executado uma única vez por usuário (o catálogo é gravado mesmo se vazio);
+    para um usuário novo não há diretório de backups e nada é varrido.
+    """
+    candidatos = [diretorio / "gastos_backup.json"]
+    backup_dirs = [diretorio / "backups"]
+    if diretorio == diretorio_usuario(USUARIO_PADRAO):
+        # Backups da organização antiga (globais) pertencem ao usuário padrão
+        backup_dirs.append(DATA_DIR / "backups")
+    for backup_dir in backup_dirs:
+        for root, dirs, files in os.walk(backup_dir):
+            for file in files:
+                if file.endswith('.json') and 'gasto' in file.lower():
+                    candidatos.append(Path(root) / file)
+    
+    for caminho in candidatos:
+        try:
+            conteudo, versao = storage.ler_texto(caminho)
+            if conteudo is None:
+                continue
+            dados = json.loads(conteudo)
+            if not isinstance(dados, list):
+                continue
+            catalogo.registrar_snapshot(
+                diretorio, "gastos", caminho, len(dados), catalogo.calcular_checksum(conteudo),
+                versao[2], criado_em=datetime.fromtimestamp(versao[1] / 1e9).isoformat(timespec="seconds")
+            )
+        except Exception as e:
+            logger.warning(f"Backup antigo ignorado ({caminho}): {e}")
+    
+    if not catalogo.existe(diretorio):
+        storage.gravar_json(catalogo.caminho_catalogo(diretorio), {"entidades": {}})
+    logger.info(f"Catálogo de snapshots criado com {len(candidatos)} arquivos antigos verificados")
+
 def recuperar_gastos():
     """
-    Tenta recuperar gastos de qualquer fonte disponível.
+    Tenta recuperar os gastos do usuário a partir do catálogo de snapshots.
     Função específica para casos em que a carga normal falhou.
     
+    O catálogo lista os snapshots com data, quantidade de registros e checksum,
+    então a recuperação lê apenas o snapshot mais recente com dados (ou o
+    seguinte, se ele estiver corrompido) em vez de varrer os diretórios.
+    
     Returns:
         list: Lista de gastos recuperados ou lista vazia se não encontrou dados
     """
     gastos = []
     
+    # Apenas os arquivos do usuário atual são considerados
+    diretorio = diretorio_usuario()
+    arquivo_gastos = arquivo_usuario("gastos")
+    
     # 1. Tentar arquivo principal
-    if os.path.exists(GASTOS_FILE):
+    if os.path.exists(arquivo_gastos):
         try:
-            with open(GASTOS_FILE, 'r', encoding='utf-8') as file:
-                gastos = json.load(file)
-                if gastos:
-                    # Salvar na sessão
-                    st.session_state["gastos"] = gastos
-                    print(f"INFO: Recuperados {len(gastos)} gastos do arquivo principal")
-                    return gastos
+            gastos = ler_lista_local(arquivo_gastos)
+            if gastos:
+                # Salvar na sessão
+                st.session_state["gastos"] = gastos
+                logger.info(f"Recuperados {len(gastos)} gastos do arquivo principal")
+                return gastos
         except Exception as e:
-            print(f"ERRO ao recuperar gastos do arquivo principal: {e}")
-    
-    # 2. Buscar em qualquer arquivo com 'gasto' no nome
-    try:
-        data_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.json') and 'gasto' in f.lower()]
-        for file in data_files:
-            try:
-                file_path = os.path.join(DATA_DIR, file)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list) and data:
-                        # Salvar na sessão e no arquivo principal para futura referência
-                        st.session_state["gastos"] = data
-                        try:
-                            with open(GASTOS_FILE, 'w', encoding='utf-8') as main_file:
-                                json.dump(data, main_file, ensure_ascii=False, indent=2)
-                        except Exception:
-                            pass
-                        print(f"INFO: Recuperados {len(data)} gastos do arquivo alternativo {file}")
-                        return data
-            except Exception:
-                continue
-    except Exception as e:
-        print(f"ERRO ao procurar arquivos alternativos: {e}")
+            logger.error(f"Erro ao recuperar gastos do arquivo principal: {e}")
     
-    # 3. Verificar backups
+    # 2. Consultar o catálogo de snapshots (criado a partir dos backups antigos na primeira vez)
     try:
-        backup_dir = DATA_DIR / "backups"
-        if os.path.exists(backup_dir):
-            all_backup_files = []
-            # Coletar todos os possíveis arquivos de backup
-            for root, dirs, files in os.walk(backup_dir):
-                for file in files:
-                    if file.endswith('.json') and ('gasto' in file.lower() or file == 'gastos.json'):
-                        all_backup_files.append(os.path.join(root, file))
-            
-            # Ordenar do mais recente para o mais antigo (assumindo timestamp no nome)
-            all_backup_files.sort(reverse=True)
-            
-            # Tentar cada arquivo de backup
-            for backup_file in all_backup_files:
+        if not catalogo.existe(diretorio):
+            _indexar_snapshots_antigos(diretorio)
+        
+        for entrada in catalogo.snapshots(diretorio, "gastos", com_dados=True):
+            data = catalogo.ler_snapshot(diretorio, entrada)
+            if isinstance(data, list) and data:
                 try:
-                    with open(backup_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if isinstance(data, list) and data:
-                            st.session_state["gastos"] = data
-                            try:
-                                with open(GASTOS_FILE, 'w', encoding='utf-8') as main_file:
-                                    json.dump(data, main_file, ensure_ascii=False, indent=2)
-                            except Exception:
-                                pass
-                            print(f"INFO: Recuperados {len(data)} gastos do backup {backup_file}")
-                            return data
-                except Exception:
-                    continue
+                    data = gravar_lista_local(arquivo_gastos, data)
+                    registrar_alteracao("gastos")
+                except Exception as e:
+                    logger.error(f"Erro ao gravar os gastos recuperados no arquivo principal: {e}")
+                st.session_state["gastos"] = data
+                logger.info(f"Recuperados {len(data)} gastos do snapshot {entrada['arquivo']} ({entrada['criado_em']})")
+                return data
     except Exception as e:
-        print(f"ERRO ao verificar backups: {e}")
+        logger.error(f"Erro ao consultar o catálogo de snapshots: {e}")
     
-    print("AVISO: Não foi possível recuperar nenhum gasto de nenhuma fonte")
-    return [] 
\ No newline at end of file
+    if dados_perdidos("gastos"):
+        logger.error("O catálogo registra gastos anteriores, mas nenhum snapshot íntegro foi encontrado")
+    else:
+        logger.info("Nenhum gasto registrado para este usuário (usuário novo)")
+    return []
+
+def dados_perdidos(entidade="gastos"):
+    """
+    Indica se a entidade está vazia por perda de dados, e não por ser um usuário novo.
+    
+    Returns:
+        bool: True se o catálogo registra snapshots com dados, mas o arquivo atual está vazio.
+    """
+    try:
+        diretorio = diretorio_usuario()
+        if not catalogo.ja_teve_dados(diretorio, entidade):
+            return False
+        dados, _ = storage.ler_json(arquivo_usuario(entidade), [])
+        return not dados
+    except Exception:
+        return False
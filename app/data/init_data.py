@@ -43,9 +43,10 @@ def reset_and_initialize_data():
     # Verificar os gastos nas possíveis fontes
     try:
         # Verificar no arquivo
-        if os.path.exists(data_handler.GASTOS_FILE):
+        arquivo_gastos = data_handler.arquivo_usuario("gastos")
+        if os.path.exists(arquivo_gastos):
             try:
-                with open(data_handler.GASTOS_FILE, 'r', encoding='utf-8') as file:
+                with open(arquivo_gastos, 'r', encoding='utf-8') as file:
                     gastos = json.load(file)
                     if gastos and len(gastos) > 0:
                         print(f"INFO: Detectados {len(gastos)} gastos existentes no arquivo, pulando inicialização")
@@ -141,9 +142,13 @@ def reset_and_initialize_data():
     else:
         print("INFO: Dados de exemplo inicializados com sucesso em arquivos locais")
 
-def gerar_dados_gastos():
+def gerar_dados_gastos(meses=3, gastos_por_mes=15):
     """
-    Gera dados de exemplo de gastos para os últimos 3 meses.
+    Gera dados de exemplo de gastos para os últimos meses.
+    
+    Args:
+        meses (int): Quantidade de meses gerados (contando o atual).
+        gastos_por_mes (int): Quantidade de gastos variáveis por mês, além dos 5 fixos.
     """
     gastos = []
     categorias = [
@@ -185,9 +190,9 @@ def gerar_dados_gastos():
         }
     ]
     
-    # Gerar dados para os últimos 3 meses
+    # Gerar dados para os últimos meses
     hoje = datetime.now()
-    for i in range(3):
+    for i in range(meses):
         # Calcular o mês
         mes_atual = hoje - timedelta(days=30*i)
         
@@ -199,7 +204,7 @@ def gerar_dados_gastos():
             gastos.append(gasto)
         
         # Adicionar alguns gastos variáveis
-        for _ in range(15):
+        for _ in range(gastos_por_mes):
             dia = random.randint(1, 28)
             categoria = random.choice(categorias)
             
@@ -229,9 +234,32 @@ def gerar_dados_gastos():
     
     return gastos
 
-def gerar_dados_investimentos():
+def _replicar(modelos, quantidade):
+    """
+    Repete os registros de exemplo até a quantidade pedida, com novos IDs.
+    
+    Args:
+        modelos (list): Registros de exemplo.
+        quantidade (int, optional): Quantidade desejada. Se None, retorna os modelos.
+    """
+    if quantidade is None:
+        return modelos
+    
+    registros = []
+    for i in range(quantidade):
+        registro = modelos[i % len(modelos)].copy()
+        if i >= len(modelos):
+            registro["id"] = str(uuid.uuid4())
+            registro["descricao"] = f"{registro['descricao']} {i // len(modelos) + 1}"
+        registros.append(registro)
+    return registros
+
+def gerar_dados_investimentos(quantidade=None):
     """
     Gera dados de exemplo de investimentos.
+    
+    Args:
+        quantidade (int, optional): Quantidade de investimentos. Se None, gera os 4 de exemplo.
     """
     investimentos = [
         {
@@ -279,11 +307,14 @@ def gerar_dados_investimentos():
             "instituicao": "BTG Pactual"
         }
     ]
-    return investimentos
+    return _replicar(investimentos, quantidade)
 
-def gerar_dados_dividas():
+def gerar_dados_dividas(quantidade=None):
     """
     Gera dados de exemplo de dívidas.
+    
+    Args:
+        quantidade (int, optional): Quantidade de registros. Se None, gera os 2 de exemplo.
     """
     dividas = [
         {
@@ -313,11 +344,14 @@ def gerar_dados_dividas():
             "instituicao": "Nubank"
         }
     ]
-    return dividas
+    return _replicar(dividas, quantidade)
 
-def gerar_dados_seguros():
+def gerar_dados_seguros(quantidade=None):
     """
     Gera dados de exemplo de seguros.
+    
+    Args:
+        quantidade (int, optional): Quantidade de registros. Se None, gera os 2 de exemplo.
     """
     seguros = [
         {
@@ -343,11 +377,14 @@ def gerar_dados_seguros():
             "seguradora": "Bradesco Seguros"
         }
     ]
-    return seguros
+    return _replicar(seguros, quantidade)
 
-def gerar_dados_objetivos():
+def gerar_dados_objetivos(quantidade=None):
     """
     Gera dados de exemplo de objetivos financeiros.
+    
+    Args:
+        quantidade (int, optional): Quantidade de registros. Se None, gera os 3 de exemplo.
     """
     objetivos = [
         {
@@ -384,7 +421,7 @@ def gerar_dados_objetivos():
             "categoria": "Segurança"
         }
     ]
-    return objetivos
+    return _replicar(objetivos, quantidade)
 
 if __name__ == "__main__":
     # Se executado diretamente, reinicializar os dados
@@ -0,0 +1,269 @@
+"""
+Orçamento de memória do `st.session_state`.
+
+Cada sessão guarda as listas completas das entidades (gastos, dívidas,
+investimentos, objetivos, seguros) e as cópias sincronizadas do Supabase
+(`sync_cache_<coleção>`). Com centenas de sessões no mesmo processo, isso
+domina o uso de memória. Este módulo:
+
+- compacta as listas: strings curtas e repetidas (categoria, tipo, data,
+  status...) são internadas com `sys.intern`, então todas as sessões do
+  processo passam a compartilhar o mesmo objeto para cada valor. Os
+  registros lidos pelo `cache_compartilhado` já chegam compactados; os
+  demais (cópias sincronizadas do Supabase, registros novos) são trocados
+  na lista da sessão por cópias compactadas, sem alterar os originais;
+- descarta da sessão as entidades frias (sem acesso há TEMPO_FRIO segundos)
+  quando elas podem ser recarregadas de um armazenamento durável;
+- informa o uso de memória por chave da sessão e o total de cada sessão ativa.
+
+O descarte acontece no rerun da própria sessão (uma sessão parada não é
+percorrida por outras), mas já libera as entidades das páginas que o usuário
+não visita mais.
+"""
+import os
+import sys
+import time
+import threading
+
+import streamlit as st
+
+from app.data.cache_compartilhado import registro_compacto
+from app.utils.instrumentation import get_logger
+
+logger = get_logger("memoria_sessao")
+
+# ID da sessão do Streamlit (API interna, pode não existir em outras versões)
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    SCRIPT_RUN_CTX_AVAILABLE = True
+except ImportError:
+    SCRIPT_RUN_CTX_AVAILABLE = False
+
+# Entidades guardadas na sessão
+ENTIDADES = ("gastos", "dividas", "investimentos", "objetivos", "seguros")
+
+# Segundos sem acesso para uma entidade ser considerada fria
+TEMPO_FRIO = int(os.environ.get("BRAUNA_SESSAO_TEMPO_FRIO", "600"))
+
+# Chave da sessão com os acessos e as listas já compactadas
+CHAVE_CONTROLE = "_memoria_sessao"
+
+# Sessões sem relatório há mais tempo que isso saem do resumo do processo
+EXPIRACAO_RELATORIO = 3600
+
+_uso_sessoes = {}
+_uso_lock = threading.Lock()
+
+
+def chaves_entidades():
+    """Chaves da sessão controladas: as listas das entidades e as cópias sincronizadas."""
+    return list(ENTIDADES) + [f"sync_cache_{entidade}" for entidade in ENTIDADES]
+
+
+def _controle(estado):
+    return estado.setdefault(CHAVE_CONTROLE, {"acessos": {}, "compactadas": {}, "tamanhos": {}})
+
+
+def _registros(valor):
+    """Lista de registros de um valor da sessão (listas ou o estado de sincronização)."""
+    if isinstance(valor, dict):
+        valor = valor.get("registros")
+    return valor if isinstance(valor, list) else None
+
+
+def _assinatura(registros):
+    """Identifica uma lista sem percorrê-la (trocas da lista ou inclusões mudam a assinatura)."""
+    return (id(registros), len(registros))
+
+
+def registrar_acesso(chave, estado=None):
+    """
+    Marca uma chave da sessão (ex: "gastos") como usada agora.
+    """
+    estado = st.session_state if estado is None else estado
+    _controle(estado)["acessos"][chave] = time.time()
+
+
+def compactar_registros(registros):
+    """
+    Troca na lista os registros com strings curtas não internadas por cópias compactadas.
+
+    Os dicionários não são alterados no lugar: podem ser os snapshots
+    compartilhados pelo `cache_compartilhado`.
+
+    Returns:
+        int: Quantidade de registros substituídos.
+    """
+    substituidos = 0
+    for i, registro in enumerate(registros):
+        if not isinstance(registro, dict):
+            continue
+        compacto = registro_compacto(registro)
+        if compacto is not registro:
+            registros[i] = compacto
+            substituidos += 1
+    return substituidos
+
+
+def compactar(estado=None):
+    """
+    Compacta as listas da sessão que mudaram desde a última compactação.
+
+    Returns:
+        int: Quantidade de registros substituídos.
+    """
+    estado = st.session_state if estado is None else estado
+    compactadas = _controle(estado)["compactadas"]
+    substituidos = 0
+    for chave in chaves_entidades():
+        registros = _registros(estado.get(chave))
+        if not registros:
+            continue
+        assinatura = _assinatura(registros)
+        if compactadas.get(chave) == assinatura:
+            continue
+        substituidos += compactar_registros(registros)
+        compactadas[chave] = assinatura
+    return substituidos
+
+
+def descartar_frias(duravel, estado=None, agora=None):
+    """
+    Remove da sessão as entidades frias que podem ser recarregadas.
+
+    Args:
+        duravel (callable): Recebe a chave e indica se o conteúdo da sessão
+            está salvo em outro lugar (arquivo local ou cópia sincronizada).
+            Entidades que só existem na sessão nunca são descartadas.
+
+    Returns:
+        list: Chaves descartadas.
+    """
+    estado = st.session_state if estado is None else estado
+    agora = agora or time.time()
+    controle = _controle(estado)
+    descartadas = []
+    for chave in chaves_entidades():
+        if chave not in estado:
+            continue
+        # Uma chave vista pela primeira vez começa a contar a partir de agora
+        ultimo_acesso = controle["acessos"].setdefault(chave, agora)
+        if agora - ultimo_acesso < TEMPO_FRIO:
+            continue
+        try:
+            if not duravel(chave):
+                continue
+        except Exception as e:
+            logger.warning(f"Não foi possível verificar se '{chave}' pode ser descartada: {e}")
+            continue
+        del estado[chave]
+        for registro in ("acessos", "compactadas", "tamanhos"):
+            controle[registro].pop(chave, None)
+        descartadas.append(chave)
+    if descartadas:
+        logger.info(f"Entidades frias descartadas da sessão: {', '.join(descartadas)}")
+    return descartadas
+
+
+def manter(duravel, estado=None):
+    """
+    Compacta a sessão e descarta as entidades frias (chamado ao fim de cada rerun).
+
+    Returns:
+        list: Chaves descartadas.
+    """
+    estado = st.session_state if estado is None else estado
+    compactar(estado)
+    return descartar_frias(duravel, estado)
+
+
+def tamanho_profundo(objeto, vistos=None):
+    """
+    Estima os bytes de um objeto e do que ele contém.
+
+    Percorre apenas dicionários, listas, tuplas e conjuntos; outros objetos
+    (ex: o cliente do Supabase) contam só o próprio tamanho. Objetos
+    compartilhados (strings internadas, por exemplo) são contados uma vez.
+    """
+    vistos = set() if vistos is None else vistos
+    total = 0
+    pendentes = [objeto]
+    while pendentes:
+        atual = pendentes.pop()
+        if id(atual) in vistos:
+            continue
+        vistos.add(id(atual))
+        total += sys.getsizeof(atual)
+        if isinstance(atual, dict):
+            pendentes.extend(atual.keys())
+            pendentes.extend(atual.values())
+        elif isinstance(atual, (list, tuple, set, frozenset)):
+            pendentes.extend(atual)
+    return total
+
+
+def _id_sessao():
+    if SCRIPT_RUN_CTX_AVAILABLE:
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    return "local"
+
+
+def relatorio(estado=None):
+    """
+    Uso de memória estimado de cada chave da sessão.
+
+    Os tamanhos das listas são guardados pela assinatura, então só as listas
+    que mudaram são medidas de novo.
+
+    Returns:
+        list: Dicionários com chave, tipo, itens, bytes e segundos desde o último acesso,
+            do maior para o menor.
+    """
+    estado = st.session_state if estado is None else estado
+    controle = _controle(estado)
+    agora = time.time()
+    linhas = []
+    for chave in list(estado.keys()):
+        if chave == CHAVE_CONTROLE:
+            continue
+        valor = estado[chave]
+        registros = _registros(valor)
+        if registros is not None:
+            assinatura = _assinatura(registros)
+            guardado = controle["tamanhos"].get(chave)
+            if guardado and guardado[0] == assinatura:
+                tamanho = guardado[1]
+            else:
+                tamanho = tamanho_profundo(valor)
+                controle["tamanhos"][chave] = (assinatura, tamanho)
+        else:
+            tamanho = tamanho_profundo(valor)
+        acesso = controle["acessos"].get(chave)
+        linhas.append({
+            "chave": chave,
+            "tipo": type(valor).__name__,
+            "itens": len(registros) if registros is not None else (len(valor) if hasattr(valor, "__len__") else None),
+            "bytes": tamanho,
+            "ocioso_s": round(agora - acesso) if acesso else None,
+        })
+    linhas.sort(key=lambda linha: linha["bytes"], reverse=True)
+
+    with _uso_lock:
+        _uso_sessoes[_id_sessao()] = {"bytes": sum(l["bytes"] for l in linhas), "atualizado_em": agora}
+    return linhas
+
+
+def uso_por_sessao():
+    """
+    Total estimado de cada sessão do processo (das sessões que geraram relatório recentemente).
+
+    Returns:
+        dict: {id_sessao: {"bytes", "atualizado_em"}}
+    """
+    limite = time.time() - EXPIRACAO_RELATORIO
+    with _uso_lock:
+        for id_sessao in [s for s, uso in _uso_sessoes.items() if uso["atualizado_em"] < limite]:
+            del _uso_sessoes[id_sessao]
+        return {s: dict(uso) for s, uso in _uso_sessoes.items()}
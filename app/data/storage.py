@@ -0,0 +1,275 @@
+"""
+Primitiva de armazenamento para os arquivos locais (JSON/YAML) do aplicativo.
+
+Várias sessões (ou workers) do Streamlit compartilham o mesmo diretório de
+dados. Para que gravações simultâneas não corrompam os arquivos:
+
+- Gravações atômicas: o conteúdo vai para um arquivo temporário no mesmo
+  diretório, que é sincronizado em disco e renomeado com `os.replace`. Um
+  leitor vê sempre a versão anterior completa ou a nova completa.
+- Bloqueio consultivo entre processos (`fcntl.flock` em um arquivo `.lock`
+  ao lado do arquivo de dados). Em sistemas sem `fcntl` (Windows) o bloqueio
+  é ignorado e apenas a atomicidade é garantida.
+- Verificação otimista de versão: quem leu o arquivo informa a versão lida
+  ao gravar; se outra sessão gravou nesse meio tempo, `ConflitoVersaoError`
+  é lançada em vez de sobrescrever as alterações alheias.
+"""
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+# fcntl só existe em sistemas POSIX
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Valor padrão de `versao_esperada`: grava sem verificar a versão
+SEM_VERIFICACAO = object()
+
+# Bloqueios entre threads do mesmo processo (flock é por descritor, não por thread)
+_locks_processo = {}
+_locks_processo_lock = threading.Lock()
+
+
+class ConflitoVersaoError(Exception):
+    """Lançada quando o arquivo foi alterado por outra sessão desde a leitura."""
+
+    def __init__(self, caminho, esperada, atual):
+        super().__init__(f"Arquivo alterado por outra sessão: {caminho}")
+        self.caminho = caminho
+        self.esperada = esperada
+        self.atual = atual
+
+
+def versao_arquivo(caminho):
+    """
+    Retorna a versão atual de um arquivo.
+
+    A versão combina inode, data de modificação (ns) e tamanho; como toda
+    gravação substitui o arquivo via `os.replace`, o inode muda a cada gravação.
+
+    Returns:
+        tuple ou None: (inode, mtime_ns, tamanho), ou None se o arquivo não existir.
+    """
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+
+def _lock_do_processo(caminho):
+    """Retorna o lock de threads associado a um arquivo."""
+    chave = os.path.abspath(caminho)
+    with _locks_processo_lock:
+        if chave not in _locks_processo:
+            _locks_processo[chave] = threading.RLock()
+        return _locks_processo[chave]
+
+
+@contextmanager
+def bloquear(caminho, exclusivo=True):
+    """
+    Bloqueia um arquivo de dados para leitura (compartilhado) ou gravação (exclusivo).
+
+    Args:
+        caminho (str ou Path): Arquivo de dados (o bloqueio usa `<arquivo>.lock`).
+        exclusivo (bool): True para gravação, False para leitura.
+    """
+    caminho = Path(caminho)
+    with _lock_do_processo(caminho):
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+
+        os.makedirs(caminho.parent, exist_ok=True)
+        descritor = os.open(f"{caminho}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(descritor, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            yield
+        finally:
+            fcntl.flock(descritor, fcntl.LOCK_UN)
+            os.close(descritor)
+
+
+def _gravar_bytes(caminho, conteudo):
+    """Grava o conteúdo em um temporário no mesmo diretório e o renomeia sobre o destino."""
+    caminho = Path(caminho)
+    os.makedirs(caminho.parent, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix=f".{caminho.name}.", suffix=".tmp", dir=caminho.parent)
+    try:
+        with os.fdopen(descritor, "wb") as file:
+            file.write(conteudo)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
+
+
+def gravar_imutavel(caminho, conteudo):
+    """
+    Grava de forma atômica, sem bloqueio, um arquivo que nunca é alterado depois de criado.
+
+    Usado para arquivos endereçados pelo conteúdo (ex: objetos de backup): duas
+    gravações simultâneas do mesmo caminho têm o mesmo conteúdo, então o
+    bloqueio (e o arquivo `.lock` ao lado de cada objeto) é desnecessário.
+
+    Args:
+        caminho (str ou Path): Arquivo de destino.
+        conteudo (bytes): Conteúdo completo do arquivo.
+    """
+    _gravar_bytes(caminho, conteudo)
+
+
+def gravar_atomico(caminho, conteudo, versao_esperada=SEM_VERIFICACAO):
+    """
+    Grava um arquivo de forma atômica, com bloqueio e verificação de versão.
+
+    Args:
+        caminho (str ou Path): Arquivo de destino.
+        conteudo (str ou bytes): Conteúdo completo do arquivo.
+        versao_esperada (tuple, optional): Versão lida anteriormente (None se o
+            arquivo não existia). Se informada e o arquivo tiver mudado, nada é gravado.
+
+    Returns:
+        tuple: Nova versão do arquivo.
+
+    Raises:
+        ConflitoVersaoError: Se o arquivo foi alterado desde `versao_esperada`.
+    """
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+
+    with bloquear(caminho, exclusivo=True):
+        if versao_esperada is not SEM_VERIFICACAO:
+            atual = versao_arquivo(caminho)
+            if atual != versao_esperada:
+                raise ConflitoVersaoError(str(caminho), versao_esperada, atual)
+        _gravar_bytes(caminho, conteudo)
+        return versao_arquivo(caminho)
+
+
+def ler_texto(caminho):
+    """
+    Lê um arquivo inteiro com bloqueio compartilhado.
+
+    Returns:
+        tuple: (conteudo, versao), ou (None, None) se o arquivo não existir.
+    """
+    with bloquear(caminho, exclusivo=False):
+        versao = versao_arquivo(caminho)
+        if versao is None:
+            return None, None
+        with open(caminho, "r", encoding="utf-8") as file:
+            return file.read(), versao
+
+
+def ler_json(caminho, padrao=None):
+    """
+    Lê um arquivo JSON e retorna os dados e a versão lida.
+
+    Args:
+        caminho (str ou Path): Arquivo JSON.
+        padrao: Valor retornado se o arquivo não existir.
+
+    Returns:
+        tuple: (dados, versao)
+
+    Raises:
+        json.JSONDecodeError: Se o arquivo existir mas estiver corrompido.
+    """
+    conteudo, versao = ler_texto(caminho)
+    if conteudo is None:
+        return padrao, None
+    return json.loads(conteudo), versao
+
+
+def gravar_json(caminho, dados, versao_esperada=SEM_VERIFICACAO, indent=2):
+    """
+    Grava dados em JSON de forma atômica (ver `gravar_atomico`).
+
+    Returns:
+        tuple: Nova versão do arquivo.
+    """
+    conteudo = json.dumps(dados, ensure_ascii=False, indent=indent)
+    return gravar_atomico(caminho, conteudo, versao_esperada)
+
+
+def ler_yaml(caminho, padrao=None):
+    """
+    Lê um arquivo YAML e retorna os dados e a versão lida.
+
+    Returns:
+        tuple: (dados, versao)
+    """
+    conteudo, versao = ler_texto(caminho)
+    if conteudo is None:
+        return padrao, None
+    return yaml.safe_load(conteudo), versao
+
+
+def gravar_yaml(caminho, dados, versao_esperada=SEM_VERIFICACAO):
+    """
+    Grava dados em YAML de forma atômica (ver `gravar_atomico`).
+
+    Returns:
+        tuple: Nova versão do arquivo.
+    """
+    conteudo = yaml.dump(dados, default_flow_style=False, allow_unicode=True)
+    return gravar_atomico(caminho, conteudo, versao_esperada)
+
+
+def copiar_atomico(origem, destino):
+    """
+    Copia um arquivo de forma atômica (ex: para manter um backup consistente).
+
+    Returns:
+        bool: True se a origem existia e foi copiada.
+    """
+    with bloquear(origem, exclusivo=False):
+        if not os.path.exists(origem):
+            return False
+        with open(origem, "rb") as file:
+            conteudo = file.read()
+    gravar_atomico(destino, conteudo)
+    return True
+
+
+def mesclar_por_id(ids_base, nossos, deles):
+    """
+    Mescla duas versões de uma lista de registros a partir da versão lida em comum.
+
+    Usada quando uma gravação encontra o arquivo alterado por outra sessão:
+    os registros da nossa lista prevalecem, os que a outra sessão adicionou
+    (ausentes na base e na nossa lista) são mantidos, e os que removemos
+    (presentes na base) continuam removidos.
+
+    Args:
+        ids_base (set): IDs presentes quando o arquivo foi lido.
+        nossos (list): Lista que estamos gravando.
+        deles (list): Lista gravada pela outra sessão.
+
+    Returns:
+        list: Lista mesclada.
+    """
+    nossos_ids = {item.get("id") for item in nossos if isinstance(item, dict)}
+    adicionados_por_eles = [
+        item for item in (deles or [])
+        if isinstance(item, dict)
+        and item.get("id") is not None
+        and item.get("id") not in nossos_ids
+        and item.get("id") not in ids_base
+    ]
+    return list(nossos) + adicionados_por_eles
@@ -0,0 +1,161 @@
+"""
+Índice de vencimentos das dívidas e dos seguros.
+
+O dashboard ("Vencimentos Próximos") e as páginas de dívidas e de seguros
+precisam dos dias até o vencimento de cada registro, várias vezes por rerun
+(ordenação, cards, tabela de vencimentos, opções de renovação). Em vez de
+converter `data_vencimento` com `strptime` a cada uso, cada entidade tem um
+índice com as datas já convertidas (em ordinais) e ordenadas:
+
+- o índice fica na sessão e só é refeito quando a versão dos dados muda
+  (`data_handler.versao_dados`) ou a lista recebida tem outro tamanho;
+- "o que vence nos próximos N dias" é respondido por busca binária;
+- os dias até o vencimento são sempre calculados para a data de hoje, então
+  o mesmo índice continua valendo na virada do dia.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+import streamlit as st
+
+from app.data.data_handler import versao_dados
+
+# Campos com a data de vencimento de cada entidade, em ordem de preferência
+CAMPOS_VENCIMENTO = {
+    "dividas": ("data_vencimento",),
+    "seguros": ("data_vencimento", "data_renovacao"),
+}
+
+
+def converter_data(valor):
+    """
+    Converte uma data de vencimento para date.
+
+    Args:
+        valor: date/datetime ou texto ISO (AAAA-MM-DD, com ou sem horário).
+
+    Returns:
+        date ou None se o valor não for uma data válida.
+    """
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if not isinstance(valor, str) or not valor:
+        return None
+    try:
+        return datetime.strptime(valor[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def data_vencimento(registro, campos=("data_vencimento",)):
+    """Data de vencimento de um registro: o primeiro campo preenchido entre `campos`."""
+    for campo in campos:
+        if registro.get(campo):
+            return converter_data(registro[campo])
+    return None
+
+
+class IndiceVencimentos:
+    """
+    Registros de uma entidade ordenados pela data de vencimento.
+
+    `ordinais` e `registros` são listas paralelas, ordenadas pela data (os
+    registros com a mesma data mantêm a ordem da lista original). Os
+    registros sem data válida ficam em `sem_data`.
+    """
+
+    def __init__(self, registros, campos=("data_vencimento",)):
+        pares = []
+        self.sem_data = []
+        for registro in registros:
+            if not isinstance(registro, dict):
+                continue
+            data = data_vencimento(registro, campos)
+            if data is None:
+                self.sem_data.append(registro)
+            else:
+                pares.append((data.toordinal(), registro))
+        pares.sort(key=lambda par: par[0])
+        self.ordinais = [ordinal for ordinal, _ in pares]
+        self.registros = [registro for _, registro in pares]
+        # Ordinal de cada registro, pelo objeto (as listas recarregadas reaproveitam os registros)
+        self._por_registro = {id(registro): ordinal for ordinal, registro in pares}
+        self._campos = campos
+
+    def __len__(self):
+        return len(self.ordinais)
+
+    def dias_para_vencimento(self, registro, hoje=None):
+        """
+        Dias até o vencimento de um registro.
+
+        Returns:
+            int ou None: Negativo se já venceu, None se o registro não tiver data.
+        """
+        hoje = (hoje or date.today()).toordinal()
+        ordinal = self._por_registro.get(id(registro))
+        if ordinal is None:
+            data = data_vencimento(registro, self._campos)
+            if data is None:
+                return None
+            ordinal = data.toordinal()
+        return ordinal - hoje
+
+    def vencendo_em(self, dias, hoje=None, incluir_vencidos=False):
+        """
+        Registros que vencem entre hoje e daqui a `dias` dias (inclusive).
+
+        Args:
+            dias (int): Tamanho da janela, em dias.
+            hoje (date, optional): Data de referência. Padrão: hoje.
+            incluir_vencidos (bool): Inclui também os registros já vencidos.
+
+        Returns:
+            list: Pares (registro, dias até o vencimento), do vencimento mais próximo ao mais distante.
+        """
+        hoje = (hoje or date.today()).toordinal()
+        inicio = 0 if incluir_vencidos else bisect_left(self.ordinais, hoje)
+        fim = bisect_right(self.ordinais, hoje + dias)
+        return [(self.registros[i], self.ordinais[i] - hoje) for i in range(inicio, fim)]
+
+    def ordenados(self, hoje=None, incluir_sem_data=False):
+        """
+        Todos os registros em ordem de vencimento.
+
+        Returns:
+            list: Pares (registro, dias até o vencimento); os registros sem data
+            vêm no fim, com None, quando `incluir_sem_data` é True.
+        """
+        hoje = (hoje or date.today()).toordinal()
+        pares = [(registro, ordinal - hoje) for ordinal, registro in zip(self.ordinais, self.registros)]
+        if incluir_sem_data:
+            pares.extend((registro, None) for registro in self.sem_data)
+        return pares
+
+
+def indice_vencimentos(entidade, registros):
+    """
+    Retorna o índice de vencimentos de uma entidade ("dividas" ou "seguros").
+
+    O índice fica na sessão e é reaproveitado enquanto a versão dos dados da
+    entidade e o tamanho da lista não mudam.
+
+    Args:
+        entidade (str): Nome da entidade.
+        registros (list): Registros carregados da entidade.
+
+    Returns:
+        IndiceVencimentos
+    """
+    if entidade not in CAMPOS_VENCIMENTO:
+        raise ValueError(f"Entidade sem data de vencimento: {entidade}")
+
+    marca = (versao_dados(entidade), len(registros))
+    indices = st.session_state.setdefault("indices_vencimento", {})
+    guardado = indices.get(entidade)
+    if guardado is None or guardado["marca"] != marca:
+        guardado = {"marca": marca, "indice": IndiceVencimentos(registros, CAMPOS_VENCIMENTO[entidade])}
+        indices[entidade] = guardado
+    return guardado["indice"]
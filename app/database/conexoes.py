@@ -0,0 +1,161 @@
+"""
+Pool de conexões HTTP compartilhado pelas sessões do processo.
+
+Cada sessão tem o seu cliente Supabase, com os cabeçalhos de autenticação
+do seu usuário, mas as requisições do PostgREST e da autenticação de todos
+os clientes passam pelo mesmo transporte httpx. Assim as conexões TLS são
+abertas uma vez e reaproveitadas (keep-alive) por todas as sessões, em vez de
+um handshake novo a cada cliente recriado.
+
+- Tamanho do pool: SUPABASE_POOL_MAX_CONEXOES (padrão: 20) e
+  SUPABASE_POOL_KEEPALIVE (conexões ociosas mantidas, padrão: 10).
+- SUPABASE_POOL_EXPIRACAO: segundos que uma conexão ociosa fica aberta (padrão: 60).
+- HTTP/2 é usado quando o pacote `h2` está instalado (várias requisições
+  simultâneas na mesma conexão).
+- As métricas contam as requisições, as conexões novas (handshakes) e as
+  requisições que reaproveitaram uma conexão aberta.
+"""
+import os
+import threading
+import weakref
+
+import streamlit as st
+
+from app.utils.instrumentation import get_logger
+
+logger = get_logger("conexoes")
+
+# httpx é dependência do cliente Supabase
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# HTTP/2 no httpx depende do pacote h2
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Limites do pool compartilhado
+MAX_CONEXOES = int(os.environ.get("SUPABASE_POOL_MAX_CONEXOES", "20"))
+MAX_KEEPALIVE = int(os.environ.get("SUPABASE_POOL_KEEPALIVE", "10"))
+EXPIRACAO_KEEPALIVE = float(os.environ.get("SUPABASE_POOL_EXPIRACAO", "60"))
+
+
+if HTTPX_AVAILABLE:
+
+    class TransporteMonitorado(httpx.BaseTransport):
+        """
+        Transporte httpx com pool de conexões e contagem de handshakes.
+
+        Uma conexão que aparece no pool depois de uma requisição e não
+        existia antes conta como handshake; as demais requisições
+        reaproveitaram uma conexão aberta.
+        """
+
+        def __init__(self, http2=HTTP2_AVAILABLE, max_conexoes=MAX_CONEXOES,
+                     max_keepalive=MAX_KEEPALIVE, expiracao=EXPIRACAO_KEEPALIVE):
+            self.http2 = http2
+            self._transporte = httpx.HTTPTransport(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=max_conexoes,
+                    max_keepalive_connections=max_keepalive,
+                    keepalive_expiry=expiracao,
+                ),
+            )
+            self._lock = threading.Lock()
+            self._conhecidas = weakref.WeakSet()
+            self._metricas = {"requisicoes": 0, "handshakes": 0, "erros": 0}
+
+        def _conexoes(self):
+            # Atributos internos do httpx/httpcore: sem eles, os handshakes não são contados
+            pool = getattr(self._transporte, "_pool", None)
+            return list(getattr(pool, "connections", None) or [])
+
+        def handle_request(self, request):
+            try:
+                resposta = self._transporte.handle_request(request)
+            except Exception:
+                with self._lock:
+                    self._metricas["requisicoes"] += 1
+                    self._metricas["erros"] += 1
+                raise
+            with self._lock:
+                self._metricas["requisicoes"] += 1
+                for conexao in self._conexoes():
+                    if conexao not in self._conhecidas:
+                        self._conhecidas.add(conexao)
+                        self._metricas["handshakes"] += 1
+            return resposta
+
+        def close(self):
+            # O transporte é do processo: fechar um cliente de sessão não encerra o pool
+            pass
+
+        def metricas(self):
+            """Requisições, handshakes, reaproveitamentos e conexões abertas."""
+            with self._lock:
+                metricas = dict(self._metricas)
+            metricas["reaproveitadas"] = max(0, metricas["requisicoes"] - metricas["erros"] - metricas["handshakes"])
+            metricas["conexoes_abertas"] = len(self._conexoes())
+            metricas["http2"] = self.http2
+            return metricas
+
+
+@st.cache_resource
+def obter_transporte():
+    """
+    Retorna o transporte HTTP compartilhado pelo processo (None sem httpx).
+    """
+    if not HTTPX_AVAILABLE:
+        return None
+    logger.info(f"Pool HTTP do Supabase: até {MAX_CONEXOES} conexões, HTTP/2 {'ativo' if HTTP2_AVAILABLE else 'inativo'}")
+    return TransporteMonitorado()
+
+
+def _clientes_http(cliente):
+    """Clientes httpx internos do cliente Supabase (PostgREST e autenticação)."""
+    candidatos = [
+        getattr(getattr(cliente, "postgrest", None), "session", None),
+        getattr(getattr(cliente, "auth", None), "_http_client", None),
+    ]
+    return [http for http in candidatos if isinstance(http, httpx.Client)]
+
+
+def aplicar_pool(cliente):
+    """
+    Faz o cliente Supabase usar o transporte compartilhado.
+
+    O PostgREST é recriado pelo cliente a cada login ou renovação do token,
+    então a verificação é feita sempre que o cliente da sessão é obtido
+    (custa apenas algumas comparações).
+
+    Returns:
+        bool: True se o pool compartilhado está em uso.
+    """
+    transporte = obter_transporte()
+    if transporte is None or cliente is None:
+        return False
+    try:
+        for http in _clientes_http(cliente):
+            if getattr(http, "_transport", None) is not transporte:
+                http._transport = transporte
+        return True
+    except Exception as e:
+        logger.warning(f"Não foi possível usar o pool HTTP compartilhado: {e}")
+        return False
+
+
+def metricas_pool():
+    """
+    Métricas do pool compartilhado.
+
+    Returns:
+        dict ou None: Requisições, handshakes, reaproveitadas, conexões abertas e HTTP/2.
+    """
+    transporte = obter_transporte()
+    return transporte.metricas() if transporte is not None else None
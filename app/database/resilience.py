@@ -0,0 +1,319 @@
+"""
+Política de resiliência compartilhada pelas chamadas ao Supabase.
+
+Todas as requisições passam por `executar_com_resiliencia`, que aplica:
+
+- Novas tentativas com espera exponencial e jitter ("full jitter"), para que
+  várias sessões não repitam a requisição ao mesmo tempo.
+- Disjuntor (circuit breaker): após várias chamadas seguidas com falha, as
+  próximas falham imediatamente por um período, e o aplicativo usa os dados
+  locais em vez de esperar timeouts do Supabase.
+- Métricas por operação (chamadas, falhas, novas tentativas e latências).
+
+As inserções usam chaves de idempotência (o `id` de cada registro é gerado no
+cliente), então repetir uma inserção que chegou ao servidor não duplica dados.
+"""
+import os
+import time
+import uuid
+import random
+import threading
+from collections import deque
+
+from app.utils.instrumentation import get_logger
+
+logger = get_logger("resilience")
+
+# Número máximo de tentativas por chamada (incluindo a primeira)
+MAX_TENTATIVAS = int(os.environ.get("SUPABASE_MAX_TENTATIVAS", "3"))
+
+# Espera base e máxima entre tentativas (segundos)
+ESPERA_BASE = float(os.environ.get("SUPABASE_ESPERA_BASE", "0.2"))
+ESPERA_MAXIMA = float(os.environ.get("SUPABASE_ESPERA_MAXIMA", "5.0"))
+
+# Falhas seguidas que abrem o circuito e tempo até testar o Supabase novamente (segundos)
+LIMITE_FALHAS = int(os.environ.get("SUPABASE_LIMITE_FALHAS", "5"))
+TEMPO_RECUPERACAO = float(os.environ.get("SUPABASE_TEMPO_RECUPERACAO", "30"))
+
+# Quantidade de latências guardadas por operação para os percentis
+AMOSTRAS_LATENCIA = 200
+
+# Códigos do PostgREST/PostgreSQL que indicam falha temporária do servidor
+CODIGOS_TRANSITORIOS = {
+    "PGRST000",  # Falha de conexão com o banco
+    "PGRST001",  # Erro interno de conexão
+    "PGRST002",  # Cache de esquema indisponível
+    "PGRST003",  # Tempo esgotado aguardando conexão do pool
+    "40001",     # Falha de serialização
+    "40P01",     # Deadlock detectado
+    "53300",     # Conexões demais
+    "57014",     # Consulta cancelada por timeout
+    "57P01",     # Servidor encerrando
+}
+
+
+class CircuitoAbertoError(Exception):
+    """Lançada quando o circuito está aberto e a chamada não é feita."""
+
+
+class CircuitBreaker:
+    """
+    Disjuntor com os estados fechado, aberto e meio-aberto.
+
+    Fechado: as chamadas seguem normalmente. Aberto: as chamadas falham
+    imediatamente até passar `tempo_recuperacao`. Meio-aberto: uma chamada de
+    teste é liberada; se der certo o circuito fecha, senão abre novamente.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, limite_falhas=LIMITE_FALHAS, tempo_recuperacao=TEMPO_RECUPERACAO):
+        self.limite_falhas = limite_falhas
+        self.tempo_recuperacao = tempo_recuperacao
+        self._estado = self.FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self):
+        """Estado atual do circuito (considerando o tempo de recuperação)."""
+        with self._lock:
+            if self._estado == self.ABERTO and time.time() - self._aberto_em >= self.tempo_recuperacao:
+                return self.MEIO_ABERTO
+            return self._estado
+
+    def permitir(self):
+        """
+        Indica se uma chamada pode ser feita agora.
+
+        Returns:
+            bool: False se o circuito estiver aberto (ou já houver um teste em andamento).
+        """
+        with self._lock:
+            if self._estado == self.FECHADO:
+                return True
+            if self._estado == self.ABERTO:
+                if time.time() - self._aberto_em < self.tempo_recuperacao:
+                    return False
+                self._estado = self.MEIO_ABERTO
+                self._teste_em_andamento = False
+            # Meio-aberto: liberar apenas uma chamada de teste por vez
+            if self._teste_em_andamento:
+                return False
+            self._teste_em_andamento = True
+            return True
+
+    def registrar_sucesso(self):
+        """Fecha o circuito e zera o contador de falhas."""
+        with self._lock:
+            if self._estado != self.FECHADO:
+                logger.info("Supabase respondeu novamente, circuito fechado")
+            self._estado = self.FECHADO
+            self._falhas = 0
+            self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        """Conta uma falha e abre o circuito ao atingir o limite (ou se o teste falhar)."""
+        with self._lock:
+            self._falhas += 1
+            self._teste_em_andamento = False
+            if self._estado == self.MEIO_ABERTO or self._falhas >= self.limite_falhas:
+                if self._estado != self.ABERTO:
+                    logger.warning(f"Supabase indisponível após {self._falhas} falhas, "
+                                   f"circuito aberto por {self.tempo_recuperacao:.0f}s")
+                self._estado = self.ABERTO
+                self._aberto_em = time.time()
+
+
+class ResilienceMetrics:
+    """
+    Métricas das chamadas ao Supabase, agrupadas por operação.
+    """
+
+    def __init__(self, amostras=AMOSTRAS_LATENCIA):
+        self.amostras = amostras
+        self._operacoes = {}
+        self._lock = threading.Lock()
+
+    def _operacao(self, operacao):
+        """Retorna (criando se necessário) o registro de uma operação."""
+        if operacao not in self._operacoes:
+            self._operacoes[operacao] = {
+                "chamadas": 0,
+                "sucessos": 0,
+                "falhas": 0,
+                "novas_tentativas": 0,
+                "rejeitadas": 0,
+                "latencias": deque(maxlen=self.amostras),
+            }
+        return self._operacoes[operacao]
+
+    def registrar_chamada(self, operacao, sucesso, latencia, novas_tentativas):
+        """Registra o resultado final de uma chamada (após as novas tentativas)."""
+        with self._lock:
+            dados = self._operacao(operacao)
+            dados["chamadas"] += 1
+            dados["sucessos" if sucesso else "falhas"] += 1
+            dados["novas_tentativas"] += novas_tentativas
+            dados["latencias"].append(latencia)
+
+    def registrar_rejeicao(self, operacao):
+        """Registra uma chamada não feita porque o circuito estava aberto."""
+        with self._lock:
+            self._operacao(operacao)["rejeitadas"] += 1
+
+    def snapshot(self):
+        """
+        Retorna uma cópia das métricas, com latências resumidas em milissegundos.
+
+        Returns:
+            dict: {operacao: {"chamadas", "sucessos", "falhas", "novas_tentativas",
+                "rejeitadas", "latencia_media_ms", "latencia_p50_ms", "latencia_p95_ms"}}
+        """
+        with self._lock:
+            resultado = {}
+            for operacao, dados in self._operacoes.items():
+                latencias = sorted(dados["latencias"])
+                resumo = {k: v for k, v in dados.items() if k != "latencias"}
+                if latencias:
+                    resumo["latencia_media_ms"] = round(1000 * sum(latencias) / len(latencias), 1)
+                    resumo["latencia_p50_ms"] = round(1000 * latencias[len(latencias) // 2], 1)
+                    resumo["latencia_p95_ms"] = round(1000 * latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))], 1)
+                else:
+                    resumo["latencia_media_ms"] = resumo["latencia_p50_ms"] = resumo["latencia_p95_ms"] = None
+                resultado[operacao] = resumo
+            return resultado
+
+    def reset(self):
+        """Limpa todas as métricas."""
+        with self._lock:
+            self._operacoes.clear()
+
+
+# Instâncias compartilhadas pelo processo (todas as sessões usam o mesmo Supabase)
+circuito = CircuitBreaker()
+metricas = ResilienceMetrics()
+
+
+def erro_transitorio(erro):
+    """
+    Indica se vale a pena repetir a chamada que gerou o erro.
+
+    Erros de programação e de validação (parâmetros inválidos, violação de
+    restrições, permissão negada) não se resolvem com nova tentativa.
+    """
+    if isinstance(erro, (ValueError, TypeError, KeyError, CircuitoAbertoError)):
+        return False
+
+    codigo = getattr(erro, "code", None)
+    if isinstance(codigo, str) and codigo:
+        return codigo in CODIGOS_TRANSITORIOS
+
+    # Erros de rede/timeout (httpx, requests) e erros sem código: repetir
+    return True
+
+
+def calcular_espera(tentativa, base=ESPERA_BASE, maxima=ESPERA_MAXIMA):
+    """
+    Espera antes da próxima tentativa, com jitter completo.
+
+    Args:
+        tentativa (int): Número da tentativa que falhou (começando em 1).
+
+    Returns:
+        float: Segundos de espera, sorteados entre 0 e base * 2^(tentativa-1).
+    """
+    return random.uniform(0, min(maxima, base * (2 ** (tentativa - 1))))
+
+
+def executar_com_resiliencia(operacao, funcao, tentativas=None, ao_falhar=None):
+    """
+    Executa uma chamada ao Supabase com novas tentativas e disjuntor.
+
+    Args:
+        operacao (str): Nome da operação nas métricas (ex: "select:gastos").
+        funcao (callable): Função sem argumentos que faz a requisição.
+        tentativas (int, optional): Máximo de tentativas. Padrão: MAX_TENTATIVAS.
+        ao_falhar (callable, optional): Chamada com o erro antes de cada nova
+            tentativa (ex: para reconectar o cliente).
+
+    Returns:
+        O resultado de `funcao()`.
+
+    Raises:
+        CircuitoAbertoError: Se o circuito estiver aberto.
+        Exception: O último erro, se todas as tentativas falharem.
+    """
+    if not circuito.permitir():
+        metricas.registrar_rejeicao(operacao)
+        raise CircuitoAbertoError(f"Supabase temporariamente indisponível ({operacao})")
+
+    tentativas = tentativas or MAX_TENTATIVAS
+    inicio = time.perf_counter()
+
+    for tentativa in range(1, tentativas + 1):
+        try:
+            resultado = funcao()
+        except Exception as e:
+            transitorio = erro_transitorio(e)
+            if not transitorio or tentativa == tentativas:
+                if transitorio:
+                    circuito.registrar_falha()
+                else:
+                    # O Supabase respondeu; o erro é da requisição, não do serviço
+                    circuito.registrar_sucesso()
+                metricas.registrar_chamada(operacao, False, time.perf_counter() - inicio, tentativa - 1)
+                raise
+
+            espera = calcular_espera(tentativa)
+            logger.warning(f"Falha em '{operacao}' (tentativa {tentativa}/{tentativas}), "
+                           f"nova tentativa em {espera:.2f}s: {e}")
+            if ao_falhar:
+                try:
+                    ao_falhar(e)
+                except Exception as callback_e:
+                    logger.warning(f"Erro ao preparar nova tentativa de '{operacao}': {callback_e}")
+            time.sleep(espera)
+            continue
+
+        circuito.registrar_sucesso()
+        metricas.registrar_chamada(operacao, True, time.perf_counter() - inicio, tentativa - 1)
+        return resultado
+
+
+def garantir_ids(registros):
+    """
+    Garante que todos os registros tenham `id` (chave de idempotência).
+
+    Com o ID gerado no cliente, a inserção pode ser repetida como upsert sem
+    duplicar registros caso a primeira tentativa tenha chegado ao servidor.
+
+    Args:
+        registros (list): Registros a inserir (alterados no lugar).
+
+    Returns:
+        list: A mesma lista de registros.
+    """
+    for registro in registros:
+        if isinstance(registro, dict) and not registro.get("id"):
+            registro["id"] = str(uuid.uuid4())
+    return registros
+
+
+def circuito_aberto():
+    """Indica se o Supabase está sendo evitado pelo disjuntor."""
+    return circuito.estado == CircuitBreaker.ABERTO
+
+
+def obter_metricas():
+    """
+    Retorna as métricas das chamadas ao Supabase e o estado do circuito.
+
+    Returns:
+        dict: {"circuito": str, "operacoes": dict}
+    """
+    return {"circuito": circuito.estado, "operacoes": metricas.snapshot()}
@@ -9,9 +9,72 @@ import streamlit as st
 from supabase import create_client, Client
 from datetime import datetime
 
+from app.database.resilience import executar_com_resiliencia, garantir_ids
+from app.database import conexoes
+from app.utils.instrumentation import get_logger, span
+
+logger = get_logger("supabase_client")
+
 # Carrega variáveis de ambiente do arquivo .env
 load_dotenv()
 
+# Quantidade de registros lidos por requisição ao paginar coleções.
+# O PostgREST limita o número de linhas por resposta, então coleções maiores
+# precisam ser lidas em páginas para não serem truncadas silenciosamente.
+TAMANHO_PAGINA_PADRAO = int(os.environ.get("SUPABASE_PAGE_SIZE", "1000"))
+
+# Colunas usadas na paginação por chave de cada coleção (padrão: id)
+CHAVES_PAGINACAO = {
+    "gastos": ("data", "id"),
+}
+
+# === Execução resiliente das requisições ===
+
+def _executar(operacao, montar, client=None):
+    """
+    Executa uma requisição ao Supabase com novas tentativas e disjuntor.
+    
+    Args:
+        operacao (str): Nome da operação nas métricas (ex: "select:gastos").
+        montar (callable): Recebe o cliente e retorna a consulta pronta para `execute()`.
+        client (Client, optional): Cliente fixo (ex: em threads de segundo plano).
+            Se None, usa o cliente da sessão e o reconecta entre as tentativas.
+            
+    Returns:
+        A resposta de `execute()`.
+    """
+    tipo, _, entidade = operacao.partition(":")
+    with span(f"supabase.{tipo}", entidade) as s:
+        if client is not None:
+            resposta = executar_com_resiliencia(operacao, lambda: montar(client).execute())
+        else:
+            resposta = executar_com_resiliencia(
+                operacao,
+                lambda: montar(get_supabase_client()).execute(),
+                ao_falhar=lambda e: refresh_supabase_client()
+            )
+        s.registrar(dados=getattr(resposta, "data", None))
+        return resposta
+
+def _inserir(collection, registros, client=None):
+    """
+    Insere registros de forma idempotente.
+    
+    Os IDs são gerados no cliente e a gravação é um upsert por `id`, então uma
+    nova tentativa após uma resposta perdida não duplica os registros.
+    
+    Args:
+        collection (str): Nome da coleção (tabela).
+        registros (dict ou list): Registro ou lista de registros (recebem `id` se não tiverem).
+        client (Client, optional): Cliente fixo. Se None, usa o cliente da sessão.
+    """
+    garantir_ids(registros if isinstance(registros, list) else [registros])
+    return _executar(
+        f"insert:{collection}",
+        lambda c: c.table(collection).upsert(registros, on_conflict="id"),
+        client=client
+    )
+
 # Obter a URL e chave do Supabase das variáveis de ambiente ou do Streamlit secrets
 def get_supabase_credentials():
     """
@@ -31,10 +94,12 @@ def get_supabase_credentials():
     return supabase_url, supabase_key, supabase_service_key
 
 # Inicializar cliente Supabase
-@st.cache_resource
 def init_supabase_client():
     """
-    Inicializa e retorna o cliente Supabase.
+    Cria um cliente Supabase usando o pool de conexões do processo.
+
+    O cliente guarda o login do usuário, então cada sessão tem o seu (criar
+    o cliente não abre conexões); as conexões HTTP são as do pool compartilhado.
     """
     supabase_url, supabase_key, _ = get_supabase_credentials()
     
@@ -46,6 +111,7 @@ def init_supabase_client():
         # Usando forma compatível com supabase 1.0.3
         # Esta versão da biblioteca não tem o problema do proxy
         client = create_client(supabase_url, supabase_key)
+        conexoes.aplicar_pool(client)
         return client
     except Exception as e:
         st.error(f"🚨 Erro ao conectar ao Supabase: {e}")
@@ -54,12 +120,14 @@ def init_supabase_client():
 # Função para obter o cliente Supabase
 def get_supabase_client() -> Client:
     """
-    Retorna o cliente Supabase inicializado.
+    Retorna o cliente Supabase da sessão, ligado ao pool de conexões compartilhado.
     """
-    if "supabase" not in st.session_state:
+    if st.session_state.get("supabase") is None:
         st.session_state.supabase = init_supabase_client()
     
-    return st.session_state.supabase
+    client = st.session_state.supabase
+    conexoes.aplicar_pool(client)
+    return client
 
 # === Funções de Autenticação ===
 
@@ -239,85 +307,486 @@ def get_current_user():
 
 # === Funções de Gerenciamento de Dados ===
 
-def load_user_data(collection, user_id=None):
+def _normalizar_colunas(columns):
     """
-    Carrega dados do usuário a partir do Supabase com verificações rigorosas de segurança.
+    Converte a projeção de colunas para o formato aceito pelo PostgREST.
     
     Args:
-        collection (str): Nome da coleção (tabela) a ser carregada.
-        user_id (str, optional): ID do usuário. Se None, usa o usuário atual.
+        columns (str, list ou None): Colunas desejadas. None carrega todas.
         
     Returns:
-        list: Lista de dados carregados ou lista vazia em caso de erro.
+        str: Lista de colunas separadas por vírgula ou "*".
+    """
+    if not columns:
+        return "*"
+    if isinstance(columns, str):
+        return columns
+    return ",".join(columns)
+
+def _normalizar_ordenacao(order_by):
+    """
+    Converte a ordenação informada em uma tupla de colunas.
+    """
+    if not order_by:
+        return ()
+    if isinstance(order_by, str):
+        return (order_by,)
+    return tuple(order_by)
+
+def _filtro_keyset(colunas, valores, descending=False):
+    """
+    Monta o filtro de paginação por chave (keyset) no formato do PostgREST.
+    
+    Para colunas (data, id) e cursor (d, i), gera o equivalente a
+    `data > d OR (data = d AND id > i)`, que aproveita o índice da ordenação
+    em vez de usar OFFSET.
+    
+    Args:
+        colunas (tuple): Colunas da ordenação.
+        valores (tuple): Valores do último registro da página anterior.
+        descending (bool): Se a ordenação é decrescente.
+        
+    Returns:
+        str: Expressão para ser usada em `or_()`.
+    """
+    operador = "lt" if descending else "gt"
+    clausulas = []
+    for i, coluna in enumerate(colunas):
+        termos = [f'{colunas[j]}.eq."{valores[j]}"' for j in range(i)]
+        termos.append(f'{coluna}.{operador}."{valores[i]}"')
+        if len(termos) == 1:
+            clausulas.append(termos[0])
+        else:
+            clausulas.append(f"and({','.join(termos)})")
+    return ",".join(clausulas)
+
+def _montar_consulta(supabase, collection, user_id, columns=None, date_from=None, date_to=None,
+                     date_column="data", order_by=None, descending=False, limit=None, after=None):
+    """
+    Monta a consulta de leitura de uma coleção sempre filtrada pelo usuário.
+    
+    Returns:
+        Objeto de consulta do Supabase pronto para `execute()`.
+    """
+    query = supabase.table(collection).select(_normalizar_colunas(columns)).eq("user_id", user_id)
+    
+    # Filtros de período (aproveitam o índice da coluna de data)
+    if date_from:
+        query = query.gte(date_column, str(date_from))
+    if date_to:
+        query = query.lte(date_column, str(date_to))
+    
+    colunas_ordem = _normalizar_ordenacao(order_by)
+    
+    # Paginação por chave: continuar a partir do último registro já lido
+    if after is not None:
+        if not colunas_ordem:
+            raise ValueError("Paginação com 'after' exige 'order_by'")
+        valores = tuple(after) if isinstance(after, (list, tuple)) else (after,)
+        if len(valores) != len(colunas_ordem):
+            raise ValueError("O cursor 'after' deve ter um valor para cada coluna de 'order_by'")
+        query = query.or_(_filtro_keyset(colunas_ordem, valores, descending))
+    
+    for coluna in colunas_ordem:
+        query = query.order(coluna, desc=descending)
+    
+    if limit:
+        query = query.limit(limit)
+    
+    return query
+
+def _incluir_colunas(columns, obrigatorias):
+    """
+    Garante que as colunas obrigatórias (ex: chaves do cursor) estejam na projeção.
+    """
+    if not columns or columns == "*":
+        return columns
+    lista = columns.split(",") if isinstance(columns, str) else list(columns)
+    lista = [coluna.strip() for coluna in lista]
+    for coluna in obrigatorias:
+        if coluna not in lista:
+            lista.append(coluna)
+    return lista
+
+def _resolver_user_id(user_id, collection):
+    """
+    Obtém e valida o ID do usuário usado nas leituras.
+    
+    Returns:
+        str ou None: ID válido do usuário ou None se não houver usuário válido.
     """
-    # Verificação de segurança: garantir que temos o ID do usuário
     if not user_id:
         user = get_current_user()
         if not user:
-            print(f"AVISO: Tentativa de carregar dados '{collection}' sem usuário autenticado")
-            return []
+            logger.warning(f"Tentativa de carregar dados '{collection}' sem usuário autenticado")
+            return None
         
         user_id = user.get("id")
         if not user_id:
-            print(f"AVISO: Usuário autenticado sem ID válido ao carregar '{collection}'")
-            return []
+            logger.warning(f"Usuário autenticado sem ID válido ao carregar '{collection}'")
+            return None
     
     # Validar o formato do user_id para evitar injeções SQL
     if not isinstance(user_id, str) or len(user_id) < 10:
-        print(f"ERRO: ID de usuário inválido ao carregar '{collection}': {user_id}")
+        logger.error(f"ID de usuário inválido ao carregar '{collection}': {user_id}")
+        return None
+    
+    return user_id
+
+def iter_user_data(collection, user_id=None, chunk_size=None, columns=None, date_from=None,
+                   date_to=None, date_column="data", order_by=None, descending=False):
+    """
+    Percorre os dados do usuário em páginas, usando paginação por chave.
+    
+    Cada página é uma requisição com `limit=chunk_size` que continua a partir
+    do último registro lido (por padrão `(data, id)` para gastos e `id` para as
+    demais coleções). Os registros são entregues conforme chegam, então a
+    memória usada fica limitada ao tamanho da página e coleções com mais linhas
+    do que o limite do PostgREST são lidas por completo.
+    
+    Args:
+        collection (str): Nome da coleção (tabela) a ser carregada.
+        user_id (str, optional): ID do usuário. Se None, usa o usuário atual.
+        chunk_size (int, optional): Registros por página. Padrão: TAMANHO_PAGINA_PADRAO.
+        columns, date_from, date_to, date_column, order_by, descending:
+            Mesmo significado que em `load_user_data`.
+        
+    Yields:
+        dict: Cada registro da coleção.
+        
+    Raises:
+        Exception: Se uma página não puder ser lida mesmo após as novas
+            tentativas, para que o chamador não trate um resultado parcial como completo.
+    """
+    user_id = _resolver_user_id(user_id, collection)
+    if not user_id:
+        return
+    
+    supabase = get_supabase_client()
+    if not supabase:
+        logger.error(f"Cliente Supabase não disponível ao carregar '{collection}'")
+        return
+    
+    chunk_size = chunk_size or TAMANHO_PAGINA_PADRAO
+    colunas_ordem = _normalizar_ordenacao(order_by) or CHAVES_PAGINACAO.get(collection, ("id",))
+    columns = _incluir_colunas(columns, colunas_ordem)
+    
+    cursor = None
+    paginas = 0
+    while True:
+        filtros = {
+            "columns": columns,
+            "date_from": date_from,
+            "date_to": date_to,
+            "date_column": date_column,
+            "order_by": colunas_ordem,
+            "descending": descending,
+            "limit": chunk_size,
+            "after": cursor,
+        }
+        try:
+            pagina = _executar(
+                f"select:{collection}",
+                lambda c: _montar_consulta(c, collection, user_id, **filtros)
+            ).data or []
+        except Exception as e:
+            logger.error(f"Erro ao carregar página {paginas + 1} de '{collection}': {e}")
+            raise
+        
+        paginas += 1
+        yield from pagina
+        
+        if len(pagina) < chunk_size:
+            break
+        
+        ultimo = pagina[-1]
+        cursor = tuple(ultimo.get(coluna) for coluna in colunas_ordem)
+
+def load_user_data(collection, user_id=None, columns=None, date_from=None, date_to=None,
+                   date_column="data", order_by=None, descending=False, limit=None, after=None):
+    """
+    Carrega dados do usuário a partir do Supabase com verificações rigorosas de segurança.
+    
+    Args:
+        collection (str): Nome da coleção (tabela) a ser carregada.
+        user_id (str, optional): ID do usuário. Se None, usa o usuário atual.
+        columns (str ou list, optional): Colunas a carregar. Se None, carrega todas.
+        date_from (str ou date, optional): Data inicial (inclusive) em `date_column`.
+        date_to (str ou date, optional): Data final (inclusive) em `date_column`.
+        date_column (str): Coluna usada nos filtros de período. Padrão: "data".
+        order_by (str ou list, optional): Coluna(s) de ordenação.
+        descending (bool): Se a ordenação é decrescente.
+        limit (int, optional): Número máximo de registros retornados.
+        after (tuple, optional): Cursor de paginação com os valores de `order_by`
+            do último registro da página anterior.
+        
+    Sem `limit` e sem `after`, a coleção é lida por completo em páginas via
+    `iter_user_data`. Com `limit` ou `after`, uma única página é retornada.
+        
+    Returns:
+        list: Lista de dados carregados ou lista vazia em caso de erro.
+    """
+    # Verificação de segurança: garantir que temos o ID do usuário
+    user_id = _resolver_user_id(user_id, collection)
+    if not user_id:
         return []
     
     # Verificar conexão com Supabase
     supabase = get_supabase_client()
     if not supabase:
-        print(f"ERRO: Cliente Supabase não disponível ao carregar '{collection}'")
+        logger.error(f"Cliente Supabase não disponível ao carregar '{collection}'")
         return []
     
+    # Sem limite explícito, ler a coleção inteira em páginas para não depender
+    # do limite de linhas por resposta do PostgREST
+    if limit is None and after is None:
+        try:
+            logger.info(f"Carregando '{collection}' para usuário {user_id[:8]}...")
+            dados = list(iter_user_data(
+                collection,
+                user_id,
+                columns=columns,
+                date_from=date_from,
+                date_to=date_to,
+                date_column=date_column,
+                order_by=order_by,
+                descending=descending
+            ))
+            logger.info(f"Carregados {len(dados)} registros de '{collection}'")
+            return dados
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao carregar dados de '{collection}': {e}")
+            return []
+    
+    filtros = {
+        "columns": columns,
+        "date_from": date_from,
+        "date_to": date_to,
+        "date_column": date_column,
+        "order_by": order_by,
+        "descending": descending,
+        "limit": limit,
+        "after": after,
+    }
+    
     try:
         # Registrar operação para facilitar a depuração
-        print(f"INFO: Carregando '{collection}' para usuário {user_id[:8]}...")
+        logger.info(f"Carregando '{collection}' para usuário {user_id[:8]}...")
         
         # Sempre adicionar filtro por user_id para garantir segurança
-        response = supabase.table(collection).select("*").eq("user_id", user_id).execute()
+        response = _executar(
+            f"select:{collection}",
+            lambda c: _montar_consulta(c, collection, user_id, **filtros)
+        )
         
         # Verificar se os dados pertencem realmente ao usuário solicitado
         if response.data:
-            # Verificar cada registro para garantir que pertence ao usuário correto
+            # Verificar cada registro para garantir que pertence ao usuário correto.
+            # Projeções sem a coluna user_id já vêm filtradas pela consulta.
             validated_data = []
             for item in response.data:
-                if item.get("user_id") == user_id:
+                if item.get("user_id", user_id) == user_id:
                     validated_data.append(item)
                 else:
-                    print(f"AVISO: Encontrado registro em '{collection}' com user_id diferente do solicitado")
+                    logger.warning(f"Encontrado registro em '{collection}' com user_id diferente do solicitado")
             
             if validated_data:
-                print(f"INFO: Carregados {len(validated_data)} registros de '{collection}'")
+                logger.info(f"Carregados {len(validated_data)} registros de '{collection}'")
                 return validated_data
             else:
-                print(f"INFO: Nenhum registro válido encontrado em '{collection}'")
+                logger.info(f"Nenhum registro válido encontrado em '{collection}'")
                 return []
         
-        print(f"INFO: Nenhum dado encontrado em '{collection}' para o usuário")
+        logger.info(f"Nenhum dado encontrado em '{collection}' para o usuário")
         return []
+    except ValueError:
+        # Parâmetros de consulta inválidos não se resolvem com nova tentativa
+        raise
     except Exception as e:
-        print(f"ERRO ao carregar dados de '{collection}': {e}")
+        # As novas tentativas (com reconexão) já foram feitas por _executar
+        logger.error(f"Erro ao carregar dados de '{collection}': {e}")
+        return []
+
+def count_user_data(collection, user_id=None):
+    """
+    Conta os registros de uma coleção do usuário sem transferi-los.
+    
+    Usa a contagem do PostgREST (`count="exact"`) com uma página de uma linha,
+    então o custo não depende do tamanho do histórico.
+    
+    Args:
+        collection (str): Nome da coleção (tabela).
+        user_id (str, optional): ID do usuário. Se None, usa o usuário atual.
         
-        # Em caso de erro, tentar novamente com uma nova sessão do Supabase
-        try:
-            # Reinicializar o cliente
-            refresh_supabase_client()
-            
-            # Tentar novamente com o novo cliente
-            supabase = get_supabase_client()
-            if supabase:
-                response = supabase.table(collection).select("*").eq("user_id", user_id).execute()
-                if response.data:
-                    print(f"INFO: Recuperados {len(response.data)} registros de '{collection}' após reconexão")
-                    return response.data
-        except Exception as retry_e:
-            print(f"ERRO na segunda tentativa de carregar '{collection}': {retry_e}")
+    Returns:
+        int: Quantidade de registros do usuário.
         
-        return []
+    Raises:
+        Exception: Se a consulta falhar.
+    """
+    user_id = _resolver_user_id(user_id, collection)
+    if not user_id:
+        return 0
+    
+    response = _executar(f"count:{collection}", lambda c: (
+        c.table(collection)
+        .select("id", count="exact")
+        .eq("user_id", user_id)
+        .limit(1)
+    ))
+    return response.count or 0
+
+def _preparar_registro(collection, item, user_id, indice=0):
+    """
+    Prepara uma cópia de um registro para gravação em lote no Supabase.
+    
+    Args:
+        collection (str): Nome da coleção (tabela).
+        item (dict): Registro a ser gravado.
+        user_id (str): ID do usuário dono do registro.
+        indice (int): Posição do registro na lista (usada em títulos padrão).
+        
+    Returns:
+        dict: Cópia do registro com user_id e campos ajustados à tabela.
+    """
+    # Fazer uma cópia para não modificar o original
+    item_copy = item.copy()
+    
+    # Garantir que o user_id esteja definido corretamente
+    item_copy["user_id"] = user_id
+    
+    # updated_at é mantido pelo banco: um registro reinserido com a marca antiga
+    # ficaria fora da sincronização incremental (ver merge_changes)
+    item_copy.pop("updated_at", None)
+    
+    # Remover campos que causam erros específicos
+    if collection == "investimentos":
+        if "data_inicial" in item_copy:
+            # Renomear para data_inicio se necessário
+            if "data_inicio" not in item_copy:
+                item_copy["data_inicio"] = item_copy.pop("data_inicial")
+            else:
+                item_copy.pop("data_inicial")
+    
+    # Remover campos problemáticos da tabela objetivos
+    if collection == "objetivos":
+        if "aporte_mensal" in item_copy:
+            item_copy.pop("aporte_mensal")
+        
+        # Garantir que o título está presente (campo obrigatório)
+        if "titulo" not in item_copy and "nome" in item_copy:
+            item_copy["titulo"] = item_copy["nome"]
+        elif "nome" not in item_copy and "titulo" in item_copy:
+            item_copy["nome"] = item_copy["titulo"]
+        elif "titulo" not in item_copy and "nome" not in item_copy:
+            # Usar um título padrão
+            item_copy["titulo"] = f"Item {indice+1}"
+            item_copy["nome"] = f"Item {indice+1}"
+    
+    return item_copy
+
+def replace_user_collection(collection, rows, user_id, client):
+    """
+    Substitui todos os registros de uma coleção do usuário pela lista informada.
+    
+    Diferente das funções `save_*`, não depende da sessão do Streamlit (o
+    usuário e o cliente são informados explicitamente) e propaga os erros,
+    o que permite usá-la a partir de threads de segundo plano com novas
+    tentativas controladas pelo chamador.
+    
+    Args:
+        collection (str): Nome da coleção (tabela).
+        rows (list): Lista completa de registros do usuário.
+        user_id (str): ID do usuário.
+        client (Client): Cliente Supabase autenticado como o usuário (obrigatório:
+            fora da sessão não há cliente com login, e um cliente novo seria
+            anônimo e recusado pelas políticas RLS).
+        
+    Raises:
+        Exception: Se a exclusão ou a inserção falharem.
+    """
+    if not isinstance(user_id, str) or len(user_id) < 10:
+        raise ValueError(f"ID de usuário inválido: {user_id}")
+    
+    if client is None:
+        raise RuntimeError(f"Cliente Supabase do usuário não informado ao gravar '{collection}'")
+    
+    registros = [
+        _preparar_registro(collection, item, user_id, i)
+        for i, item in enumerate(rows)
+        if isinstance(item, dict)
+    ]
+    
+    _executar(f"delete:{collection}", lambda c: c.table(collection).delete().eq("user_id", user_id), client=client)
+    if registros:
+        _inserir(collection, registros, client=client)
+
+def upsert_user_record(collection, record, user_id, client=None):
+    """
+    Grava (insere ou atualiza) um único registro do usuário, pelo `id`.
+
+    Como `replace_user_collection`, recebe o usuário explicitamente e propaga os erros.
+
+    Args:
+        collection (str): Nome da coleção (tabela).
+        record (dict): Registro com `id`.
+        user_id (str): ID do usuário.
+        client (Client, optional): Cliente fixo. Se None, usa o cliente da sessão.
+
+    Raises:
+        Exception: Se a gravação falhar.
+    """
+    upsert_user_records(collection, [record], user_id, client=client)
+
+def upsert_user_records(collection, records, user_id, client=None):
+    """
+    Grava (insere ou atualiza) alguns registros do usuário em uma única requisição, pelo `id`.
+
+    Os demais registros da coleção não são tocados.
+
+    Args:
+        collection (str): Nome da coleção (tabela).
+        records (list): Registros com `id`.
+        user_id (str): ID do usuário.
+        client (Client, optional): Cliente fixo. Se None, usa o cliente da sessão.
+
+    Raises:
+        Exception: Se a gravação falhar.
+    """
+    if not isinstance(user_id, str) or len(user_id) < 10:
+        raise ValueError(f"ID de usuário inválido: {user_id}")
+    if any(not record.get("id") for record in records):
+        raise ValueError(f"Registro de '{collection}' sem ID")
+    if not records:
+        return
+
+    _inserir(collection, [
+        _preparar_registro(collection, record, user_id, i) for i, record in enumerate(records)
+    ], client=client)
+
+def delete_user_record(collection, record_id, user_id, client=None):
+    """
+    Remove um único registro do usuário, pelo `id`.
+
+    Args:
+        collection (str): Nome da coleção (tabela).
+        record_id (str): ID do registro.
+        user_id (str): ID do usuário (a exclusão nunca alcança registros de outro usuário).
+        client (Client, optional): Cliente fixo. Se None, usa o cliente da sessão.
+
+    Raises:
+        Exception: Se a exclusão falhar.
+    """
+    if not isinstance(user_id, str) or len(user_id) < 10:
+        raise ValueError(f"ID de usuário inválido: {user_id}")
+
+    _executar(
+        f"delete:{collection}",
+        lambda c: c.table(collection).delete().eq("id", record_id).eq("user_id", user_id),
+        client=client
+    )
 
 def save_user_data(collection, data, user_id=None):
     """
@@ -335,31 +804,31 @@ def save_user_data(collection, data, user_id=None):
     if not user_id:
         user = get_current_user()
         if not user:
-            print(f"AVISO: Tentativa de salvar dados em '{collection}' sem usuário autenticado")
+            logger.warning(f"Tentativa de salvar dados em '{collection}' sem usuário autenticado")
             return False
         
         user_id = user.get("id")
         if not user_id:
-            print(f"AVISO: Usuário autenticado sem ID válido ao salvar em '{collection}'")
+            logger.warning(f"Usuário autenticado sem ID válido ao salvar em '{collection}'")
             return False
     
     # Validar o formato do user_id para evitar injeções SQL
     if not isinstance(user_id, str) or len(user_id) < 10:
-        print(f"ERRO: ID de usuário inválido ao salvar em '{collection}': {user_id}")
+        logger.error(f"ID de usuário inválido ao salvar em '{collection}': {user_id}")
         return False
     
     # Verificar conexão com Supabase
     supabase = get_supabase_client()
     if not supabase:
-        print(f"ERRO: Cliente Supabase não disponível ao salvar em '{collection}'")
+        logger.error(f"Cliente Supabase não disponível ao salvar em '{collection}'")
         return False
     
     try:
         # Registrar operação para facilitar a depuração
         if isinstance(data, list):
-            print(f"INFO: Salvando {len(data)} registros em '{collection}' para usuário {user_id[:8]}...")
+            logger.info(f"Salvando {len(data)} registros em '{collection}' para usuário {user_id[:8]}...")
         else:
-            print(f"INFO: Salvando dados em '{collection}' para usuário {user_id[:8]}...")
+            logger.info(f"Salvando dados em '{collection}' para usuário {user_id[:8]}...")
         
         # Adicionar user_id aos dados se não estiver presente
         if isinstance(data, dict):
@@ -408,7 +877,7 @@ def save_user_data(collection, data, user_id=None):
             
             # Verificar se o registro já existe
             try:
-                response = supabase.table(collection).select("*").eq("user_id", user_id).execute()
+                response = _executar(f"select:{collection}", lambda c: c.table(collection).select("*").eq("user_id", user_id))
                 
                 if response.data and len(response.data) > 0:
                     # Registros existentes - verificar se pertencem ao usuário correto
@@ -421,140 +890,301 @@ def save_user_data(collection, data, user_id=None):
                     
                     if record_exists:
                         # Se o registro já existe, atualizar
-                        print(f"INFO: Atualizando registro existente em '{collection}'")
-                        supabase.table(collection).update(data_copy).eq("id", record_id).eq("user_id", user_id).execute()
+                        logger.info(f"Atualizando registro existente em '{collection}'")
+                        _executar(f"update:{collection}", lambda c: c.table(collection).update(data_copy).eq("id", record_id).eq("user_id", user_id))
                     else:
                         # Se não existe registro para este usuário, inserir novo
-                        print(f"INFO: Inserindo novo registro em '{collection}'")
-                        supabase.table(collection).insert(data_copy).execute()
+                        logger.info(f"Inserindo novo registro em '{collection}'")
+                        _inserir(collection, data_copy)
                 else:
                     # Se não existe, inserir novo
-                    print(f"INFO: Inserindo primeiro registro em '{collection}' para este usuário")
-                    supabase.table(collection).insert(data_copy).execute()
+                    logger.info(f"Inserindo primeiro registro em '{collection}' para este usuário")
+                    _inserir(collection, data_copy)
             except Exception as lookup_e:
-                print(f"AVISO: Erro ao verificar existência de registros: {lookup_e}")
+                logger.warning(f"Erro ao verificar existência de registros: {lookup_e}")
                 # Tentativa direta de inserção
-                supabase.table(collection).insert(data_copy).execute()
+                _inserir(collection, data_copy)
             
-            print(f"INFO: Dados salvos com sucesso em '{collection}'")
+            logger.info(f"Dados salvos com sucesso em '{collection}'")
             return True
         elif isinstance(data, list):
             # Validar a integridade dos dados antes de salvar
             data_validos = []
             for i, item in enumerate(data):
                 if not isinstance(item, dict):
-                    print(f"AVISO: Item {i} não é um dicionário válido, ignorando")
+                    logger.warning(f"Item {i} não é um dicionário válido, ignorando")
                     continue
                 
-                # Fazer uma cópia para não modificar o original
-                item_copy = item.copy()
-                
-                # Garantir que o user_id esteja definido corretamente
-                item_copy["user_id"] = user_id
-                
-                # Remover campos que causam erros específicos
-                if collection == "investimentos":
-                    if "data_inicial" in item_copy:
-                        # Renomear para data_inicio se necessário
-                        if "data_inicio" not in item_copy:
-                            item_copy["data_inicio"] = item_copy.pop("data_inicial")
-                        else:
-                            item_copy.pop("data_inicial")
-                
-                # Remover campos problemáticos da tabela objetivos
-                if collection == "objetivos":
-                    if "aporte_mensal" in item_copy:
-                        item_copy.pop("aporte_mensal")
-                    
-                    # Garantir que o título está presente (campo obrigatório)
-                    if "titulo" not in item_copy and "nome" in item_copy:
-                        item_copy["titulo"] = item_copy["nome"]
-                    elif "nome" not in item_copy and "titulo" in item_copy:
-                        item_copy["nome"] = item_copy["titulo"]
-                    elif "titulo" not in item_copy and "nome" not in item_copy:
-                        # Usar um título padrão
-                        item_copy["titulo"] = f"Item {i+1}"
-                        item_copy["nome"] = f"Item {i+1}"
-                
-                data_validos.append(item_copy)
+                data_validos.append(_preparar_registro(collection, item, user_id, i))
             
             if not data_validos:
-                print(f"AVISO: Nenhum dado válido para salvar em '{collection}'")
+                logger.warning(f"Nenhum dado válido para salvar em '{collection}'")
                 return False
             
             # Estratégia de salvamento segura:
             # 1. Primeiro, fazer backup dos dados existentes
             existing_data = []
             try:
-                response = supabase.table(collection).select("*").eq("user_id", user_id).execute()
+                response = _executar(f"select:{collection}", lambda c: c.table(collection).select("*").eq("user_id", user_id))
                 if response.data:
                     existing_data = response.data
-                    print(f"INFO: Backup de {len(existing_data)} registros existentes em '{collection}'")
+                    logger.info(f"Backup de {len(existing_data)} registros existentes em '{collection}'")
             except Exception as backup_e:
-                print(f"AVISO: Não foi possível fazer backup dos dados existentes: {backup_e}")
+                logger.warning(f"Não foi possível fazer backup dos dados existentes: {backup_e}")
             
             # 2. Excluir registros existentes
             try:
                 if existing_data:
-                    print(f"INFO: Removendo {len(existing_data)} registros existentes em '{collection}'")
-                supabase.table(collection).delete().eq("user_id", user_id).execute()
+                    logger.info(f"Removendo {len(existing_data)} registros existentes em '{collection}'")
+                _executar(f"delete:{collection}", lambda c: c.table(collection).delete().eq("user_id", user_id))
             except Exception as delete_e:
-                print(f"AVISO: Erro ao excluir registros existentes: {delete_e}")
+                logger.warning(f"Erro ao excluir registros existentes: {delete_e}")
                 # Se não conseguir excluir, tentar continuar com a inserção
             
             # 3. Inserir novos registros
             try:
                 if data_validos:
-                    print(f"INFO: Inserindo {len(data_validos)} novos registros em '{collection}'")
-                    supabase.table(collection).insert(data_validos).execute()
-                    print(f"INFO: Dados salvos com sucesso em '{collection}'")
+                    logger.info(f"Inserindo {len(data_validos)} novos registros em '{collection}'")
+                    _inserir(collection, data_validos)
+                    logger.info(f"Dados salvos com sucesso em '{collection}'")
                 return True
             except Exception as insert_e:
-                print(f"ERRO ao inserir novos registros: {insert_e}")
+                logger.error(f"Erro ao inserir novos registros: {insert_e}")
                 
                 # 4. Em caso de falha, tentar restaurar o backup
                 if existing_data:
                     try:
-                        print(f"INFO: Tentando restaurar {len(existing_data)} registros do backup")
+                        logger.info(f"Tentando restaurar {len(existing_data)} registros do backup")
                         # Limpar novamente a tabela
-                        supabase.table(collection).delete().eq("user_id", user_id).execute()
+                        _executar(f"delete:{collection}", lambda c: c.table(collection).delete().eq("user_id", user_id))
                         # Restaurar os dados originais
-                        supabase.table(collection).insert(existing_data).execute()
-                        print(f"INFO: Backup restaurado com sucesso em '{collection}'")
+                        _inserir(collection, existing_data)
+                        logger.info(f"Backup restaurado com sucesso em '{collection}'")
                     except Exception as restore_e:
-                        print(f"ERRO ao restaurar backup: {restore_e}")
+                        logger.error(f"Erro ao restaurar backup: {restore_e}")
                 
                 return False
         
-        print(f"ERRO: Tipo de dados inválido para '{collection}': {type(data)}")
+        logger.error(f"Tipo de dados inválido para '{collection}': {type(data)}")
         return False
     except Exception as e:
-        print(f"ERRO ao salvar dados em '{collection}': {e}")
+        # As novas tentativas (com reconexão) já foram feitas por _executar
+        logger.error(f"Erro ao salvar dados em '{collection}': {e}")
+        return False
+
+# === Progresso dos Objetivos ===
+
+# Progresso dos objetivos mantido pelo banco (requer scripts/8_add_progresso_objetivos.sql)
+PROGRESSO_NO_SERVIDOR = os.environ.get("SUPABASE_PROGRESSO_OBJETIVOS", "0") == "1"
+
+# Visão com os investimentos vinculados a cada objetivo, já resolvidos
+VISAO_VINCULOS_OBJETIVOS = "objetivos_investimentos_detalhe"
+
+def load_vinculos_objetivos(user_id=None):
+    """
+    Carrega os investimentos vinculados a cada objetivo, resolvidos pelo banco.
+    
+    Apenas os investimentos vinculados são lidos (sem baixar a coleção inteira).
+    
+    Args:
+        user_id (str, optional): ID do usuário. Se None, usa o usuário atual.
         
-        # Em caso de erro, tentar novamente com uma nova sessão do Supabase
-        try:
-            # Reinicializar o cliente
-            if refresh_supabase_client():
-                # Chamar recursivamente com o novo cliente, mas apenas uma vez para evitar loop
-                print(f"INFO: Tentando salvar novamente em '{collection}' após reconexão")
-                # Criar nova instância para evitar modificação acidental
-                data_copy = data.copy() if isinstance(data, dict) else [item.copy() for item in data if isinstance(item, dict)]
-                return save_user_data(collection, data_copy, user_id)
-        except Exception as retry_e:
-            print(f"ERRO na segunda tentativa de salvar em '{collection}': {retry_e}")
+    Returns:
+        list: Linhas {"objetivo_id", "investimento_id", "nome", "valor_atual"}.
         
-        return False
+    Raises:
+        Exception: Se a consulta falhar (ex: script 8 não executado).
+    """
+    user_id = _resolver_user_id(user_id, VISAO_VINCULOS_OBJETIVOS)
+    if not user_id:
+        return []
+    
+    response = _executar(f"select:{VISAO_VINCULOS_OBJETIVOS}", lambda c: (
+        c.table(VISAO_VINCULOS_OBJETIVOS)
+        .select("objetivo_id,investimento_id,nome,valor_atual")
+        .eq("user_id", user_id)
+    ))
+    return response.data or []
+
+# === Sincronização Incremental ===
+
+# Tabela com os registros excluídos (preenchida por trigger, ver scripts/7_add_delta_sync.sql)
+TABELA_EXCLUSOES = "registros_excluidos"
+
+def pull_changes(collection, since, user_id=None):
+    """
+    Busca apenas o que mudou em uma coleção desde a marca informada.
+    
+    Os registros alterados vêm da coluna `updated_at` (mantida pelos triggers
+    das tabelas) e as exclusões vêm da tabela de exclusões. A comparação é
+    inclusiva (>=) para não perder registros gravados no mesmo instante da
+    marca; reaplicar um registro já conhecido não altera o resultado.
+    
+    Args:
+        collection (str): Nome da coleção (tabela).
+        since (str): Marca d'água (timestamp ISO de `updated_at`) da última sincronização.
+        user_id (str, optional): ID do usuário. Se None, usa o usuário atual.
+        
+    Returns:
+        tuple: (alterados, excluidos) onde `alterados` é a lista de registros
+            alterados ou inseridos e `excluidos` é a lista de dicionários
+            {"registro_id", "deleted_at"}.
+            
+    Raises:
+        Exception: Se a consulta falhar, para que o chamador faça uma carga completa.
+    """
+    user_id = _resolver_user_id(user_id, collection)
+    if not user_id:
+        return [], []
+    
+    alterados = list(iter_user_data(
+        collection,
+        user_id,
+        date_from=since,
+        date_column="updated_at",
+        order_by=("updated_at", "id")
+    ))
+    
+    supabase = get_supabase_client()
+    if not supabase:
+        raise RuntimeError("Cliente Supabase não disponível")
+    
+    response = _executar(f"select:{TABELA_EXCLUSOES}", lambda c: (
+        c.table(TABELA_EXCLUSOES)
+        .select("registro_id,deleted_at")
+        .eq("user_id", user_id)
+        .eq("tabela", collection)
+        .gte("deleted_at", since)
+    ))
+    excluidos = response.data or []
+    
+    return alterados, excluidos
+
+def _maior_marca(*marcas):
+    """
+    Retorna a maior marca d'água entre as informadas (ignora valores vazios).
+    """
+    validas = [str(m) for m in marcas if m]
+    if not validas:
+        return None
+    # Os timestamps vêm do servidor sempre em UTC e no formato ISO, então a
+    # comparação textual preserva a ordem cronológica
+    return max(validas)
+
+def merge_changes(cache, alterados, excluidos):
+    """
+    Aplica um lote de alterações sobre a cópia local de uma coleção.
+    
+    Uma exclusão só remove o registro se for posterior ao `updated_at` dele:
+    as funções de salvamento excluem e reinserem a lista inteira, mantendo os
+    mesmos IDs, e o registro reinserido (com `updated_at` dado pelo banco na
+    inserção) continua valendo.
+    
+    Args:
+        cache (list): Registros conhecidos localmente.
+        alterados (list): Registros alterados ou inseridos no servidor.
+        excluidos (list): Exclusões no formato {"registro_id", "deleted_at"}.
+        
+    Returns:
+        list: Nova lista de registros, preservando a ordem dos já conhecidos.
+    """
+    por_id = {item.get("id"): item for item in cache if isinstance(item, dict)}
+    
+    for item in alterados:
+        por_id[item.get("id")] = item
+    
+    for exclusao in excluidos:
+        registro = por_id.get(exclusao.get("registro_id"))
+        if registro is None:
+            continue
+        # Mesma comparação textual de _maior_marca (timestamps ISO em UTC)
+        atualizado = registro.get("updated_at")
+        if not atualizado or str(exclusao.get("deleted_at") or "") > str(atualizado):
+            por_id.pop(exclusao.get("registro_id"), None)
+    
+    return list(por_id.values())
+
+def sync_collection(collection, cache=None, watermark=None, user_id=None):
+    """
+    Reconcilia a cópia local de uma coleção com o Supabase usando marcas d'água.
+    
+    Sem marca (primeira sincronização) a coleção é carregada por completo; nas
+    seguintes, apenas os registros alterados e as exclusões desde a marca são
+    buscados e mesclados na cópia local. As marcas ficam em
+    `st.session_state["sync_watermarks"]` quando não são informadas.
+    
+    Args:
+        collection (str): Nome da coleção (tabela).
+        cache (list, optional): Registros conhecidos localmente.
+        watermark (str, optional): Marca da última sincronização. Se None, usa a da sessão.
+        user_id (str, optional): ID do usuário. Se None, usa o usuário atual.
+        
+    Returns:
+        tuple: (registros, nova_marca)
+    """
+    user_id = _resolver_user_id(user_id, collection)
+    if not user_id:
+        return list(cache or []), watermark
+    
+    marcas_sessao = st.session_state.setdefault("sync_watermarks", {})
+    if watermark is None:
+        watermark = marcas_sessao.get(collection)
+    
+    registros = None
+    if watermark and cache is not None:
+        try:
+            alterados, excluidos = pull_changes(collection, watermark, user_id)
+            registros = merge_changes(cache, alterados, excluidos)
+            nova_marca = _maior_marca(
+                watermark,
+                *(item.get("updated_at") for item in alterados),
+                *(item.get("deleted_at") for item in excluidos)
+            )
+            logger.info(f"Sincronização incremental de '{collection}': "
+                        f"{len(alterados)} alterados, {len(excluidos)} excluídos")
+        except Exception as e:
+            logger.warning(f"Falha na sincronização incremental de '{collection}', recarregando tudo: {e}")
+            registros = None
+    
+    if registros is None:
+        # Primeira sincronização (ou falha na incremental): carga completa
+        try:
+            registros = list(iter_user_data(collection, user_id))
+        except Exception as e:
+            logger.error(f"Erro ao carregar '{collection}' para sincronização: {e}")
+            return list(cache or []), watermark
+        nova_marca = _maior_marca(*(item.get("updated_at") for item in registros))
+    
+    marcas_sessao[collection] = nova_marca
+    return registros, nova_marca
 
 # === Funções Específicas para Gastos ===
 
-def load_gastos():
+def load_gastos(**filtros):
     """
     Carrega os gastos do usuário atual.
     
+    Args:
+        **filtros: Filtros opcionais repassados para `load_user_data`
+            (columns, date_from, date_to, order_by, descending, limit, after).
+    
     Returns:
         list: Lista de gastos ou lista vazia em caso de erro.
     """
-    return load_user_data("gastos")
+    return load_user_data("gastos", **filtros)
+
+def iter_gastos(**filtros):
+    """
+    Percorre os gastos do usuário atual em páginas, sem carregar tudo na memória.
+    
+    Args:
+        **filtros: Parâmetros repassados para `iter_user_data`
+            (chunk_size, columns, date_from, date_to, order_by, descending).
+    
+    Yields:
+        dict: Cada gasto do usuário, em ordem de (data, id).
+    """
+    return iter_user_data("gastos", **filtros)
 
 def save_gastos(gastos):
     """
@@ -576,14 +1206,11 @@ def save_gastos(gastos):
     
     try:
         # Exclui gastos existentes do usuário
-        supabase.table("gastos").delete().eq("user_id", user["id"]).execute()
+        _executar("delete:gastos", lambda c: c.table("gastos").delete().eq("user_id", user["id"]))
         
         # Insere os novos gastos
         if gastos:
-            for gasto in gastos:
-                gasto["user_id"] = user["id"]
-            
-            supabase.table("gastos").insert(gastos).execute()
+            _inserir("gastos", [dict(gasto, user_id=user["id"]) for gasto in gastos])
         
         return True
     except Exception as e:
@@ -621,7 +1248,7 @@ def delete_gasto(gasto_id):
         return False
     
     try:
-        supabase.table("gastos").delete().eq("id", gasto_id).eq("user_id", user["id"]).execute()
+        _executar("delete:gastos", lambda c: c.table("gastos").delete().eq("id", gasto_id).eq("user_id", user["id"]))
         return True
     except Exception as e:
         st.error(f"Erro ao excluir gasto: {e}")
@@ -658,7 +1285,7 @@ def save_investimentos(investimentos):
     
     try:
         # Exclui investimentos existentes do usuário
-        supabase.table("investimentos").delete().eq("user_id", user["id"]).execute()
+        _executar("delete:investimentos", lambda c: c.table("investimentos").delete().eq("user_id", user["id"]))
         
         # Insere os novos investimentos
         if investimentos:
@@ -673,7 +1300,7 @@ def save_investimentos(investimentos):
                     else:
                         investimento.pop("data_inicial")
             
-            supabase.table("investimentos").insert(investimentos).execute()
+            _inserir("investimentos", investimentos)
         
         return True
     except Exception as e:
@@ -711,7 +1338,7 @@ def delete_investimento(investimento_id):
         return False
     
     try:
-        supabase.table("investimentos").delete().eq("id", investimento_id).eq("user_id", user["id"]).execute()
+        _executar("delete:investimentos", lambda c: c.table("investimentos").delete().eq("id", investimento_id).eq("user_id", user["id"]))
         return True
     except Exception as e:
         st.error(f"Erro ao excluir investimento: {e}")
@@ -748,14 +1375,14 @@ def save_dividas(dividas):
     
     try:
         # Exclui dívidas existentes do usuário
-        supabase.table("dividas").delete().eq("user_id", user["id"]).execute()
+        _executar("delete:dividas", lambda c: c.table("dividas").delete().eq("user_id", user["id"]))
         
         # Insere as novas dívidas
         if dividas:
             for divida in dividas:
                 divida["user_id"] = user["id"]
             
-            supabase.table("dividas").insert(dividas).execute()
+            _inserir("dividas", dividas)
         
         return True
     except Exception as e:
@@ -793,7 +1420,7 @@ def delete_divida(divida_id):
         return False
     
     try:
-        supabase.table("dividas").delete().eq("id", divida_id).eq("user_id", user["id"]).execute()
+        _executar("delete:dividas", lambda c: c.table("dividas").delete().eq("id", divida_id).eq("user_id", user["id"]))
         return True
     except Exception as e:
         st.error(f"Erro ao excluir dívida: {e}")
@@ -834,7 +1461,7 @@ def save_objetivos(objetivos):
         # Verifica se há dados para salvar
         if not objetivos or len(objetivos) == 0:
             # Se a lista estiver vazia, apenas excluir todos
-            supabase.table("objetivos").delete().eq("user_id", user["id"]).execute()
+            _executar("delete:objetivos", lambda c: c.table("objetivos").delete().eq("user_id", user["id"]))
             return True
             
         # Lista de objetivos válidos para inserir
@@ -858,7 +1485,7 @@ def save_objetivos(objetivos):
                 # Usar um título padrão em vez de retornar erro
                 objetivo_valido["titulo"] = "Objetivo sem título"
                 objetivo_valido["nome"] = "Objetivo sem título"
-                print("Aviso: Objetivo sem título ou nome - usando título padrão")
+                logger.warning("Objetivo sem título ou nome - usando título padrão")
             
             # Adicionar user_id em cada objetivo
             objetivo_valido["user_id"] = user["id"]
@@ -869,15 +1496,15 @@ def save_objetivos(objetivos):
         # Primeiro, fazer um backup dos objetivos existentes
         objetivos_existentes = []
         try:
-            result = supabase.table("objetivos").select("*").eq("user_id", user["id"]).execute()
+            result = _executar("select:objetivos", lambda c: c.table("objetivos").select("*").eq("user_id", user["id"]))
             if result.data:
                 objetivos_existentes = result.data
         except Exception as e:
-            print(f"Aviso: não foi possível fazer backup dos objetivos existentes: {e}")
+            logger.warning(f"não foi possível fazer backup dos objetivos existentes: {e}")
         
         # Agora tenta excluir os objetivos existentes
         try:
-            supabase.table("objetivos").delete().eq("user_id", user["id"]).execute()
+            _executar("delete:objetivos", lambda c: c.table("objetivos").delete().eq("user_id", user["id"]))
         except Exception as e:
             st.error(f"Erro ao excluir objetivos existentes: {e}")
             return False
@@ -885,7 +1512,7 @@ def save_objetivos(objetivos):
         # Finalmente, insere os novos objetivos (apenas os válidos)
         try:
             if objetivos_validos:
-                supabase.table("objetivos").insert(objetivos_validos).execute()
+                _inserir("objetivos", objetivos_validos)
             return True
         except Exception as e:
             # Se falhar ao inserir, tentar restaurar o backup
@@ -894,7 +1521,7 @@ def save_objetivos(objetivos):
             # Tenta restaurar os objetivos anteriores se houver backup
             if objetivos_existentes:
                 try:
-                    supabase.table("objetivos").insert(objetivos_existentes).execute()
+                    _inserir("objetivos", objetivos_existentes)
                     st.warning("Os objetivos anteriores foram restaurados devido a um erro.")
                 except Exception as restore_error:
                     st.error(f"Erro ao restaurar objetivos: {restore_error}")
@@ -935,7 +1562,7 @@ def delete_objetivo(objetivo_id):
         return False
     
     try:
-        supabase.table("objetivos").delete().eq("id", objetivo_id).eq("user_id", user["id"]).execute()
+        _executar("delete:objetivos", lambda c: c.table("objetivos").delete().eq("id", objetivo_id).eq("user_id", user["id"]))
         return True
     except Exception as e:
         st.error(f"Erro ao excluir objetivo: {e}")
@@ -944,16 +1571,19 @@ def delete_objetivo(objetivo_id):
 # Função para reinicializar o cliente Supabase em caso de problemas
 def refresh_supabase_client():
     """
-    Reinicializa o cliente Supabase para resolver problemas de conexão.
+    Prepara o cliente Supabase para uma nova tentativa após um erro.
+
+    O cliente da sessão (e o login do usuário) é mantido: conexões com falha
+    já são descartadas pelo pool, então recriar o cliente só custaria novos
+    handshakes. Um cliente que não pôde ser criado é criado de novo.
     """
     try:
-        if "supabase" in st.session_state:
-            del st.session_state["supabase"]
-        
-        # Reinicializar cliente
-        st.session_state.supabase = init_supabase_client()
-        print("INFO: Cliente Supabase reinicializado")
+        if st.session_state.get("supabase") is None:
+            st.session_state.supabase = init_supabase_client()
+            logger.info("Cliente Supabase reinicializado")
+        else:
+            conexoes.aplicar_pool(st.session_state.supabase)
         return True
     except Exception as e:
-        print(f"ERRO ao reinicializar cliente Supabase: {e}")
+        logger.error(f"Erro ao reinicializar cliente Supabase: {e}")
         return False 
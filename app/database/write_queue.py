@@ -0,0 +1,344 @@
+"""
+Fila de gravação em segundo plano (write-behind) para o Supabase.
+
+As funções de salvamento gravam primeiro na sessão/arquivo local e colocam a
+lista completa da coleção nesta fila. Uma thread de segundo plano envia as
+alterações ao Supabase, de forma que o rerun do Streamlit não espera as
+requisições de rede.
+
+- Coalescência: cada salvamento substitui a coleção inteira, então várias
+  edições seguidas da mesma coleção viram um único envio (vale a última).
+- Novas tentativas: falhas são repetidas com espera exponencial, até
+  WRITE_BEHIND_MAX_TENTATIVAS; depois disso o item fica parado (e visível ao
+  usuário) até ser reenviado.
+- Durabilidade: cada item pendente fica gravado em um arquivo da "outbox" até
+  ser enviado. Depois de um reinício, os itens recuperados esperam uma sessão
+  do mesmo usuário fornecer o cliente autenticado (`retomar`): o login não é
+  gravado em disco e um cliente anônimo seria recusado pelas políticas RLS.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+from app.utils.instrumentation import get_logger, span
+
+logger = get_logger("write_queue")
+
+# Espera antes de enviar, para agrupar várias edições em um único envio (segundos)
+INTERVALO_COALESCENCIA = float(os.environ.get("WRITE_BEHIND_DELAY", "1.0"))
+
+# Espera inicial e máxima entre novas tentativas (segundos)
+ESPERA_INICIAL = 1.0
+ESPERA_MAXIMA = 60.0
+
+# Tentativas de envio de um item antes de ele ficar parado
+MAX_TENTATIVAS = int(os.environ.get("WRITE_BEHIND_MAX_TENTATIVAS", "10"))
+
+# Motivos de um item parado na fila
+SEM_CLIENTE = "sem_cliente"
+TENTATIVAS_ESGOTADAS = "tentativas_esgotadas"
+
+
+class WriteBehindQueue:
+    """
+    Fila de gravações pendentes por (usuário, coleção), com outbox em disco.
+    """
+
+    def __init__(self, outbox_dir, enviar, intervalo=INTERVALO_COALESCENCIA):
+        """
+        Args:
+            outbox_dir (Path): Diretório onde os itens pendentes são gravados.
+            enviar (callable): Função `enviar(collection, rows, user_id, client)`
+                que grava a coleção no Supabase e lança exceção em caso de falha.
+            intervalo (float): Espera para agrupar edições antes de enviar.
+        """
+        self.outbox_dir = Path(outbox_dir)
+        self.enviar = enviar
+        self.intervalo = intervalo
+        self._pendentes = {}
+        self._clientes = {}
+        self._condicao = threading.Condition()
+        self._thread = None
+
+        self._carregar_outbox()
+
+    # === API pública ===
+
+    def enqueue(self, user_id, collection, rows, client=None):
+        """
+        Coloca a lista completa de uma coleção na fila de envio.
+
+        Args:
+            user_id (str): ID do usuário dono dos dados.
+            collection (str): Nome da coleção (tabela).
+            rows (list): Lista completa de registros da coleção.
+            client (Client, optional): Cliente Supabase da sessão que fez a alteração.
+        """
+        # Cópia independente (e serializável) da lista, para que alterações
+        # posteriores do chamador não afetem o que será enviado
+        rows = json.loads(json.dumps(rows, ensure_ascii=False, default=str))
+        chave = (user_id, collection)
+
+        with self._condicao:
+            anterior = self._pendentes.get(chave)
+            if client is not None:
+                self._clientes[chave] = client
+            item = {
+                "user_id": user_id,
+                "collection": collection,
+                "rows": rows,
+                "versao": (anterior["versao"] + 1) if anterior else 1,
+                "tentativas": 0,
+                "proxima_tentativa": time.time() + self.intervalo,
+                "parado": None if chave in self._clientes else SEM_CLIENTE,
+            }
+            self._pendentes[chave] = item
+            self._gravar_outbox(item)
+            self._garantir_thread()
+            self._condicao.notify()
+
+    def pending(self, user_id, collection):
+        """
+        Retorna a lista pendente de uma coleção (ou None se não houver).
+
+        Permite que as leituras enxerguem as próprias gravações ainda não enviadas.
+        """
+        with self._condicao:
+            item = self._pendentes.get((user_id, collection))
+            return list(item["rows"]) if item else None
+
+    def pending_count(self, user_id=None):
+        """
+        Retorna o número de coleções com gravações pendentes (sem contar as paradas).
+
+        Args:
+            user_id (str, optional): Se informado, conta apenas as do usuário.
+        """
+        with self._condicao:
+            return sum(
+                1 for (uid, _), item in self._pendentes.items()
+                if item["parado"] is None and (user_id is None or uid == user_id)
+            )
+
+    def stalled(self, user_id):
+        """
+        Retorna as gravações do usuário paradas na fila.
+
+        Returns:
+            list: Dicionários {"collection", "motivo", "tentativas"}, onde
+                `motivo` é SEM_CLIENTE ou TENTATIVAS_ESGOTADAS.
+        """
+        with self._condicao:
+            return [
+                {"collection": item["collection"], "motivo": item["parado"], "tentativas": item["tentativas"]}
+                for (uid, _), item in self._pendentes.items()
+                if uid == user_id and item["parado"] is not None
+            ]
+
+    def retomar(self, user_id, client, incluir_esgotados=False):
+        """
+        Volta a enviar as gravações paradas de um usuário, com o cliente da sessão dele.
+
+        Args:
+            user_id (str): ID do usuário.
+            client (Client): Cliente Supabase autenticado como esse usuário.
+            incluir_esgotados (bool): Retoma também os itens que esgotaram as tentativas.
+
+        Returns:
+            int: Quantidade de itens retomados.
+        """
+        motivos = {SEM_CLIENTE, TENTATIVAS_ESGOTADAS} if incluir_esgotados else {SEM_CLIENTE}
+        retomados = 0
+        with self._condicao:
+            for (uid, collection), item in self._pendentes.items():
+                if uid != user_id or item["parado"] not in motivos:
+                    continue
+                self._clientes[(uid, collection)] = client
+                item.update(parado=None, tentativas=0, proxima_tentativa=time.time())
+                retomados += 1
+            if retomados:
+                self._garantir_thread()
+                self._condicao.notify()
+        return retomados
+
+    def flush(self, timeout=None):
+        """
+        Aguarda o envio de todas as gravações pendentes que não estão paradas.
+
+        Args:
+            timeout (float, optional): Tempo máximo de espera em segundos.
+
+        Returns:
+            bool: True se a fila ficou vazia, False se o tempo acabou ou
+                restaram itens parados.
+        """
+        limite = time.time() + timeout if timeout is not None else None
+        with self._condicao:
+            for item in self._pendentes.values():
+                item["proxima_tentativa"] = 0
+            self._condicao.notify()
+            while any(item["parado"] is None for item in self._pendentes.values()):
+                restante = None if limite is None else limite - time.time()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicao.wait(restante)
+            return not self._pendentes
+
+    # === Thread de envio ===
+
+    def _garantir_thread(self):
+        """Inicia a thread de envio se ainda não estiver rodando."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._executar, name="brauna-write-behind", daemon=True)
+            self._thread.start()
+
+    def _executar(self):
+        """Laço principal da thread: envia os itens cujo horário de envio chegou."""
+        while True:
+            with self._condicao:
+                ativos = [item for item in self._pendentes.values() if item["parado"] is None]
+                if not ativos:
+                    self._condicao.wait()
+                    continue
+
+                agora = time.time()
+                prontos = [dict(item) for item in ativos if item["proxima_tentativa"] <= agora]
+                if not prontos:
+                    proxima = min(item["proxima_tentativa"] for item in ativos)
+                    self._condicao.wait(max(0.0, proxima - agora))
+                    continue
+
+            for item in prontos:
+                self._enviar_item(item)
+
+    def _enviar_item(self, item):
+        """Envia um item e o remove da fila se nenhuma versão mais nova chegou nesse meio tempo."""
+        chave = (item["user_id"], item["collection"])
+        with self._condicao:
+            client = self._clientes.get(chave)
+            if client is None:
+                # Sem o cliente autenticado do usuário o envio seria recusado: aguardar `retomar`
+                atual = self._pendentes.get(chave)
+                if atual and atual["versao"] == item["versao"]:
+                    atual["parado"] = SEM_CLIENTE
+                return
+        try:
+            with span("write_behind.enviar", item["collection"]) as s:
+                s.registrar(dados=item["rows"])
+                self.enviar(item["collection"], item["rows"], item["user_id"], client)
+        except Exception as e:
+            with self._condicao:
+                atual = self._pendentes.get(chave)
+                if atual and atual["versao"] == item["versao"]:
+                    atual["tentativas"] += 1
+                    if atual["tentativas"] >= MAX_TENTATIVAS:
+                        atual["parado"] = TENTATIVAS_ESGOTADAS
+                        logger.error(f"Envio de '{item['collection']}' ao Supabase falhou {atual['tentativas']} "
+                                     f"vezes; o item fica na outbox até ser reenviado: {e}")
+                        self._condicao.notify_all()
+                        return
+                    espera = min(ESPERA_MAXIMA, ESPERA_INICIAL * (2 ** (atual["tentativas"] - 1)))
+                    atual["proxima_tentativa"] = time.time() + espera
+                    logger.warning(f"Falha ao enviar '{item['collection']}' ao Supabase "
+                                   f"(tentativa {atual['tentativas']}), nova tentativa em {espera:.0f}s: {e}")
+            return
+
+        with self._condicao:
+            atual = self._pendentes.get(chave)
+            if atual and atual["versao"] == item["versao"]:
+                del self._pendentes[chave]
+                self._clientes.pop(chave, None)
+                self._remover_outbox(item)
+            logger.info(f"{len(item['rows'])} registros de '{item['collection']}' enviados ao Supabase")
+            self._condicao.notify_all()
+
+    # === Outbox em disco ===
+
+    def _arquivo_outbox(self, user_id, collection):
+        """Retorna o arquivo da outbox de uma coleção do usuário."""
+        usuario = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:16]
+        return self.outbox_dir / f"{collection}_{usuario}.json"
+
+    def _gravar_outbox(self, item):
+        """Grava o item pendente em disco (arquivo temporário + os.replace)."""
+        try:
+            os.makedirs(self.outbox_dir, exist_ok=True)
+            arquivo = self._arquivo_outbox(item["user_id"], item["collection"])
+            temporario = arquivo.with_suffix(".tmp")
+            with open(temporario, 'w', encoding='utf-8') as file:
+                json.dump(
+                    {k: item[k] for k in ("user_id", "collection", "rows", "versao")},
+                    file,
+                    ensure_ascii=False
+                )
+            os.replace(temporario, arquivo)
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar a outbox de '{item['collection']}': {e}")
+
+    def _remover_outbox(self, item):
+        """Remove o arquivo da outbox após o envio."""
+        try:
+            os.remove(self._arquivo_outbox(item["user_id"], item["collection"]))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Não foi possível remover a outbox de '{item['collection']}': {e}")
+
+    def _carregar_outbox(self):
+        """
+        Recarrega os itens pendentes deixados por uma execução anterior.
+
+        Os itens ficam parados até uma sessão do usuário chamar `retomar`.
+        """
+        if not self.outbox_dir.exists():
+            return
+
+        for arquivo in self.outbox_dir.glob("*.json"):
+            try:
+                with open(arquivo, 'r', encoding='utf-8') as file:
+                    dados = json.load(file)
+                item = {
+                    "user_id": dados["user_id"],
+                    "collection": dados["collection"],
+                    "rows": dados["rows"],
+                    "versao": dados.get("versao", 1),
+                    "tentativas": 0,
+                    "proxima_tentativa": time.time(),
+                    "parado": SEM_CLIENTE,
+                }
+                self._pendentes[(item["user_id"], item["collection"])] = item
+            except Exception as e:
+                logger.warning(f"Item inválido na outbox ({arquivo.name}): {e}")
+
+        if self._pendentes:
+            logger.info(f"{len(self._pendentes)} gravações pendentes recuperadas da outbox, "
+                        f"aguardando a sessão dos usuários")
+
+
+# Filas do processo, uma por diretório de outbox
+_filas = {}
+_lock_filas = threading.Lock()
+
+
+def obter_fila(outbox_dir, enviar):
+    """
+    Retorna a fila do processo para uma outbox, criando-a na primeira chamada.
+
+    Deve haver uma única fila por diretório: duas filas sobre a mesma outbox
+    reenviariam os mesmos itens e não veriam as gravações pendentes uma da
+    outra. Por isso a fila fica neste módulo e não em um cache do módulo que
+    a usa (que pode ser importado com mais de um nome).
+
+    Args:
+        outbox_dir (Path): Diretório da outbox.
+        enviar (callable): Veja `WriteBehindQueue`.
+    """
+    chave = str(Path(outbox_dir).resolve())
+    with _lock_filas:
+        fila = _filas.get(chave)
+        if fila is None:
+            fila = _filas[chave] = WriteBehindQueue(outbox_dir, enviar)
+        return fila
@@ -26,12 +26,20 @@ from app.ui.auth_page import render_auth_page, logout
 # Importar manipulação de dados
 from app.data.data_handler import (
     load_config, save_config, initialize_data, ensure_data_dirs, 
-    load_gastos, save_gastos, normalizar_gastos_existentes
+    load_gastos, save_gastos, normalizar_gastos_existentes,
+    contar_escritas_pendentes, retomar_escritas_pendentes, escritas_nao_enviadas,
+    manter_memoria_sessao, dono_dados
 )
 from app.data import init_data
 
 # Importar cliente Supabase
 from app.database.supabase_client import get_supabase_client, get_current_user
+from app.database.resilience import circuito_aberto
+
+# Instrumentação (tempos por rerun)
+from app.utils.instrumentation import span, iniciar_rerun, finalizar_rerun
+from app.ui.debug_panel import debug_ativo, render_debug_panel, render_profile_panel
+from app.utils.profiling import perfil_ativo, perfilar
 
 # Carregar estilos personalizados
 def load_custom_styles():
@@ -691,6 +699,22 @@ def render_sidebar():
         # Separador antes das configurações
         st.markdown('<div style="height: 1px; background: var(--border-color); margin: 8px 0;"></div>', unsafe_allow_html=True)
         
+        # Alterações ainda não enviadas ao Supabase (as deixadas por uma execução
+        # anterior esperam a sessão do usuário para serem enviadas)
+        retomar_escritas_pendentes()
+        pendentes = contar_escritas_pendentes()
+        if pendentes:
+            st.caption(f"⏳ Sincronizando {pendentes} {'coleção' if pendentes == 1 else 'coleções'} com a nuvem...")
+        nao_enviadas = escritas_nao_enviadas()
+        if nao_enviadas:
+            colecoes = ", ".join(item["collection"] for item in nao_enviadas)
+            st.caption(f"⚠️ Alterações não enviadas à nuvem: {colecoes}")
+            if st.button("🔁 Reenviar", key="reenviar_escritas", use_container_width=True):
+                retomar_escritas_pendentes(incluir_falhas=True)
+                st.rerun()
+        if circuito_aberto():
+            st.caption("⚠️ Nuvem indisponível no momento, usando os dados locais")
+        
         # Botões para operações especiais
         col1, col2 = st.columns(2)
         with col1:
@@ -716,6 +740,9 @@ def main():
     """
     Função principal que inicializa a aplicação
     """
+    # Começar a medição deste rerun
+    iniciar_rerun()
+    
     # Carregar estilos e fontes primeiro, antes de qualquer outro elemento da UI
     load_google_fonts()
     load_custom_styles()
@@ -737,8 +764,12 @@ def main():
         print(f"Erro ao inicializar dados: {e}")
         dados_inicializados = False
     
-    # Normalizar gastos para garantir consistência de tipos
-    normalizar_gastos_existentes()
+    # Normalizar gastos para garantir consistência de tipos. A normalização lê a
+    # lista completa, então roda uma vez por usuário na sessão (os gastos novos
+    # já são gravados normalizados por add_gasto)
+    if st.session_state.get("gastos_normalizados") != dono_dados():
+        if normalizar_gastos_existentes():
+            st.session_state["gastos_normalizados"] = dono_dados()
     
     # Configurar tema
     if "tema" not in st.session_state:
@@ -792,25 +823,37 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
-    if pagina_atual == "dashboard":
-        render_dashboard_page()
-    elif pagina_atual == "gastos":
-        render_gastos_page()
-    elif pagina_atual == "investimentos":
-        render_investimentos_page()
-    elif pagina_atual == "objetivos":
-        render_objetivos_page()
-    elif pagina_atual == "dividas":
-        render_dividas_page()
-    elif pagina_atual == "seguros":
-        render_seguros_page()
-    elif pagina_atual == "planejamento":
-        render_planejamento_page()
-    elif pagina_atual == "settings":
-        render_settings_page()
-    else:
-        # Página padrão (dashboard) se algum erro ocorrer
-        render_dashboard_page()
+    profiling = perfil_ativo()
+    with span("pagina.render", pagina_atual), perfilar(pagina_atual, ativo=profiling) as perfil:
+        if pagina_atual == "dashboard":
+            render_dashboard_page()
+        elif pagina_atual == "gastos":
+            render_gastos_page()
+        elif pagina_atual == "investimentos":
+            render_investimentos_page()
+        elif pagina_atual == "objetivos":
+            render_objetivos_page()
+        elif pagina_atual == "dividas":
+            render_dividas_page()
+        elif pagina_atual == "seguros":
+            render_seguros_page()
+        elif pagina_atual == "planejamento":
+            render_planejamento_page()
+        elif pagina_atual == "settings":
+            render_settings_page()
+        else:
+            # Página padrão (dashboard) se algum erro ocorrer
+            render_dashboard_page()
+    
+    # Compactar a sessão e descartar as entidades que não são usadas há algum tempo
+    manter_memoria_sessao()
+    
+    # Painel de depuração, perfil e exportação das métricas do rerun
+    if profiling:
+        render_profile_panel(perfil)
+    if debug_ativo():
+        render_debug_panel()
+    finalizar_rerun()
 
 # Função para definir a página atual
 def set_pagina(pagina, rerun=True):
@@ -931,9 +974,10 @@ def init_app_data():
     
     # 1. Verificar se há gastos no arquivo
     try:
-        if os.path.exists(data_handler.GASTOS_FILE):
-            print(f"INFO: Encontrado arquivo de gastos: {data_handler.GASTOS_FILE}")
-            with open(data_handler.GASTOS_FILE, 'r', encoding='utf-8') as file:
+        arquivo_gastos = data_handler.arquivo_usuario("gastos")
+        if os.path.exists(arquivo_gastos):
+            print(f"INFO: Encontrado arquivo de gastos: {arquivo_gastos}")
+            with open(arquivo_gastos, 'r', encoding='utf-8') as file:
                 gastos = json.load(file)
                 if gastos:
                     st.session_state["gastos"] = gastos
@@ -3,18 +3,9 @@ from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 
 
-class Goal(BaseModel):
-    """Modelo para objetivos financeiros."""
-    id: Optional[int] = None
-    name: str
-    description: Optional[str] = None
-    target_amount: float
-    current_amount: float = 0.0
-    start_date: datetime = Field(default_factory=datetime.now)
-    deadline: datetime
-    priority: int = 2  # 1 (alta), 2 (média), 3 (baixa)
-    expected_return_rate: float = 0.05  # Taxa anual esperada (padrão: 5%)
-    category: str = "outros"  # reserva, aposentadoria, imóvel, educação, etc.
+class GoalCalculations:
+    """Cálculos dos objetivos, comuns a Goal e GoalRecord."""
+    __slots__ = ()
     
     @property
     def months_remaining(self) -> int:
@@ -93,4 +84,48 @@ class Goal(BaseModel):
         else:
             future_value_of_contributions = monthly_contribution * ((1 + monthly_rate) ** months - 1) / monthly_rate
         
-        return future_value_of_present + future_value_of_contributions 
\ No newline at end of file
+        return future_value_of_present + future_value_of_contributions
+
+
+class Goal(GoalCalculations, BaseModel):
+    """Modelo para objetivos financeiros."""
+    id: Optional[int] = None
+    name: str
+    description: Optional[str] = None
+    target_amount: float
+    current_amount: float = 0.0
+    start_date: datetime = Field(default_factory=datetime.now)
+    deadline: datetime
+    priority: int = 2  # 1 (alta), 2 (média), 3 (baixa)
+    expected_return_rate: float = 0.05  # Taxa anual esperada (padrão: 5%)
+    category: str = "outros"  # reserva, aposentadoria, imóvel, educação, etc.
+
+
+class GoalRecord(GoalCalculations):
+    """
+    Objetivo sem validação, para exibir objetivos já gravados.
+    
+    Os dados são validados com Goal na entrada (formulários); ao serem lidos
+    de volta (com as datas já convertidas por load_goals), são exibidos com
+    este registro, que só atribui os campos. Tem os mesmos campos e padrões
+    de Goal; campos desconhecidos são ignorados.
+    """
+    __slots__ = (
+        "id", "name", "description", "target_amount", "current_amount",
+        "start_date", "deadline", "priority", "expected_return_rate", "category"
+    )
+    
+    def __init__(self, name: str, target_amount: float, deadline: datetime, id: Optional[int] = None,
+                 description: Optional[str] = None, current_amount: float = 0.0,
+                 start_date: Optional[datetime] = None, priority: int = 2,
+                 expected_return_rate: float = 0.05, category: str = "outros", **_outros):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.target_amount = target_amount
+        self.current_amount = current_amount
+        self.start_date = start_date if start_date is not None else datetime.now()
+        self.deadline = deadline
+        self.priority = priority
+        self.expected_return_rate = expected_return_rate
+        self.category = category
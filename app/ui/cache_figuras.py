@@ -0,0 +1,114 @@
+"""
+Cache de processo das figuras Plotly.
+
+Os gráficos das páginas são refeitos a cada rerun, mesmo quando só um widget
+sem relação com eles mudou. Este cache guarda o JSON de cada figura,
+identificado por:
+
+- dono dos dados (usuário, ou a sessão quando os dados só existem nela);
+- versão dos dados das entidades usadas (`data_handler.versao_dados`);
+- identificador do gráfico e parâmetros (ex: mês selecionado);
+- tema da interface.
+
+Enquanto a chave não muda, a agregação e a construção da figura são puladas:
+a figura é recriada a partir do JSON guardado. Os gráficos saem do cache pelo
+uso menos recente quando o total passa de BRAUNA_CACHE_FIGURAS_MB (padrão: 32).
+
+Desativado com BRAUNA_CACHE_FIGURAS=0.
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+import plotly.io as pio
+
+from app.data.data_handler import dono_dados, versao_dados
+from app.utils.instrumentation import span
+
+# Cache ativo
+ATIVO = os.environ.get("BRAUNA_CACHE_FIGURAS", "1") != "0"
+
+# Tamanho máximo do JSON das figuras guardadas (em bytes)
+MAX_BYTES = int(os.environ.get("BRAUNA_CACHE_FIGURAS_MB", "32")) * 1024 * 1024
+
+_figuras = OrderedDict()
+_lock = threading.Lock()
+_estatisticas = {"acertos": 0, "construcoes": 0, "bytes": 0}
+
+
+def chave_figura(grafico_id, entidades=(), parametros=None, tema=None):
+    """
+    Monta a chave de uma figura.
+
+    Args:
+        grafico_id (str): Identificador do gráfico (ex: "gastos.categorias").
+        entidades (iterable): Entidades cujos dados o gráfico usa (ex: ["gastos"]).
+        parametros (dict, optional): Demais valores que mudam o gráfico (serializáveis em JSON).
+        tema (str, optional): Tema da interface. Padrão: o tema da sessão.
+    """
+    versoes = tuple((entidade, versao_dados(entidade)) for entidade in entidades)
+    parametros = json.dumps(parametros, sort_keys=True, default=str)
+    tema = tema if tema is not None else st.session_state.get("tema", "claro")
+    return (dono_dados(), versoes, grafico_id, parametros, tema)
+
+
+def figura(grafico_id, construir, entidades=(), parametros=None, tema=None):
+    """
+    Retorna a figura de um gráfico, construindo-a apenas se a chave mudou.
+
+    Args:
+        grafico_id (str): Identificador do gráfico.
+        construir (callable): Agrega os dados e retorna a figura (ou None, que não é guardado).
+        entidades, parametros, tema: Veja `chave_figura`.
+
+    Returns:
+        plotly.graph_objects.Figure ou None
+    """
+    if not ATIVO:
+        return construir()
+
+    chave = chave_figura(grafico_id, entidades, parametros, tema)
+    with _lock:
+        texto = _figuras.get(chave)
+        if texto is not None:
+            _figuras.move_to_end(chave)
+            _estatisticas["acertos"] += 1
+    if texto is not None:
+        with span("figura.cache", grafico_id):
+            return pio.from_json(texto)
+
+    with span("figura.construir", grafico_id):
+        fig = construir()
+        if fig is None:
+            return None
+        texto = fig.to_json()
+
+    with _lock:
+        _estatisticas["construcoes"] += 1
+        anterior = _figuras.pop(chave, None)
+        if anterior is not None:
+            _estatisticas["bytes"] -= len(anterior)
+        _figuras[chave] = texto
+        _estatisticas["bytes"] += len(texto)
+        while _estatisticas["bytes"] > MAX_BYTES and len(_figuras) > 1:
+            _, removido = _figuras.popitem(last=False)
+            _estatisticas["bytes"] -= len(removido)
+    return fig
+
+
+def limpar():
+    """Remove todas as figuras do cache."""
+    with _lock:
+        _figuras.clear()
+        _estatisticas["bytes"] = 0
+
+
+def estatisticas():
+    """
+    Returns:
+        dict: Figuras guardadas, bytes, acertos e construções desde o início do processo.
+    """
+    with _lock:
+        return {"figuras": len(_figuras), **_estatisticas}
@@ -26,12 +26,6 @@ from app.data.data_handler import (
     salvar_seguros
 )
 
-def formatar_moeda(valor):
-    """Formata um valor para o formato de moeda brasileira."""
-    if valor is None:
-        return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
-
 def exportar_dados():
     """Exporta todos os dados do usuário para um arquivo JSON."""
     dados_export = {
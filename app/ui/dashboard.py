@@ -18,6 +18,7 @@ from models.user import User
 from models.goals import Goal
 from models.investments import Portfolio, Investment
 from utils.data_processor import load_user_data, load_goals, load_investments
+from utils.formatting import formatar_moeda
 from utils.calculations import compound_interest, inflation_adjust
 
 # Importar funções de manipulação de dados
@@ -258,12 +259,6 @@ def criar_grafico_area_fluxo():
     
     return fig
 
-def formatar_moeda(valor):
-    """
-    Formata um valor numérico como moeda brasileira (R$).
-    """
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
 def get_variacao_badge(variacao):
     """
     Retorna HTML para exibir um badge de variação (positiva/negativa).
@@ -10,20 +10,15 @@ from datetime import datetime, timedelta
 import calendar
 
 # Importar funções de manipulação de dados
-from data.data_handler import (
+from app.data.data_handler import (
     load_user_data,
-    load_gastos,
     load_investimentos,
     load_dividas,
-    load_seguros,
-    load_objetivos
+    load_all
 )
-
-def formatar_moeda(valor):
-    """
-    Formata um valor numérico como moeda brasileira (R$).
-    """
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+from app.data.vencimentos import indice_vencimentos
+from app.utils.formatting import formatar_moeda
+from app.ui.cache_figuras import figura
 
 def calcular_gastos_periodo(gastos, mes_ano):
     """
@@ -172,12 +167,13 @@ def render_dashboard_page():
     """
     st.title("Dashboard")
     
-    # Buscar dados para o dashboard
-    objetivos = load_objetivos()
-    investimentos = load_investimentos()
-    dividas = load_dividas()
-    gastos = load_gastos()
-    seguros = load_seguros()
+    # Buscar dados para o dashboard (coleções carregadas em paralelo)
+    dados = load_all(["objetivos", "investimentos", "dividas", "gastos", "seguros"])
+    objetivos = dados["objetivos"]
+    investimentos = dados["investimentos"]
+    dividas = dados["dividas"]
+    gastos = dados["gastos"]
+    seguros = dados["seguros"]
     
     # Adicionar estilos CSS diretos para a página
     st.markdown("""
@@ -329,67 +325,72 @@ def render_dashboard_page():
         
         # Preparar dados para o gráfico de pizza de investimentos
         if investimentos:
-            categorias_inv = {}
-            for inv in investimentos:
-                categoria = inv.get("categoria", "Outros")
-                valor = float(inv.get("valor_atual", 0) or inv.get("valor_inicial", 0) or 0)
-                if categoria in categorias_inv:
-                    categorias_inv[categoria] += valor
-                else:
-                    categorias_inv[categoria] = valor
+            def construir_grafico_investimentos():
+                categorias_inv = {}
+                for inv in investimentos:
+                    categoria = inv.get("categoria", "Outros")
+                    valor = float(inv.get("valor_atual", 0) or inv.get("valor_inicial", 0) or 0)
+                    if categoria in categorias_inv:
+                        categorias_inv[categoria] += valor
+                    else:
+                        categorias_inv[categoria] = valor
             
-            # Criar DataFrame para o gráfico
-            df_inv = pd.DataFrame({
-                'Categoria': list(categorias_inv.keys()),
-                'Valor': list(categorias_inv.values())
-            })
+                # Criar DataFrame para o gráfico
+                df_inv = pd.DataFrame({
+                    'Categoria': list(categorias_inv.keys()),
+                    'Valor': list(categorias_inv.values())
+                })
+            
+                # Gráfico de pizza para investimentos
+                fig = px.pie(
+                    df_inv, 
+                    values='Valor', 
+                    names='Categoria',
+                    color_discrete_sequence=px.colors.qualitative.Pastel1,
+                    hole=0.6,
+                    template="plotly_white"
+                )
+            
+                fig.update_layout(
+                    margin=dict(t=0, b=0, l=0, r=0),
+                    height=280,
+                    legend=dict(
+                        orientation="h", 
+                        yanchor="bottom", 
+                        y=-0.2, 
+                        xanchor="center", 
+                        x=0.5,
+                        font=dict(size=11, family="Arial, sans-serif")
+                    ),
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    uniformtext_minsize=12,
+                    uniformtext_mode='hide'
+                )
             
-            # Gráfico de pizza para investimentos
-            fig = px.pie(
-                df_inv, 
-                values='Valor', 
-                names='Categoria',
-                color_discrete_sequence=px.colors.qualitative.Pastel1,
-                hole=0.6,
-                template="plotly_white"
-            )
+                fig.update_traces(
+                    textposition='inside',
+                    textinfo='percent+label',
+                    insidetextfont=dict(color='white', size=12, family="Arial, sans-serif"),
+                    hovertemplate='<b>%{label}</b><br>Valor: %{value:,.2f}<br>Percentual: %{percent}',
+                    marker=dict(
+                        line=dict(color='white', width=2),
+                        pattern=dict(shape="")
+                    ),
+                    rotation=45
+                )
             
-            fig.update_layout(
-                margin=dict(t=0, b=0, l=0, r=0),
-                height=280,
-                legend=dict(
-                    orientation="h", 
-                    yanchor="bottom", 
-                    y=-0.2, 
-                    xanchor="center", 
-                    x=0.5,
-                    font=dict(size=11, family="Arial, sans-serif")
-                ),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                uniformtext_minsize=12,
-                uniformtext_mode='hide'
-            )
+                # Adicionar título central no donut
+                fig.add_annotation(
+                    text=f"R$ {sum(df_inv['Valor']):,.0f}",
+                    x=0.5, y=0.5,
+                    font=dict(size=14, color='#333', family="Arial, sans-serif"),
+                    showarrow=False
+                )
             
-            fig.update_traces(
-                textposition='inside',
-                textinfo='percent+label',
-                insidetextfont=dict(color='white', size=12, family="Arial, sans-serif"),
-                hovertemplate='<b>%{label}</b><br>Valor: %{value:,.2f}<br>Percentual: %{percent}',
-                marker=dict(
-                    line=dict(color='white', width=2),
-                    pattern=dict(shape="")
-                ),
-                rotation=45
-            )
+                return fig
             
-            # Adicionar título central no donut
-            fig.add_annotation(
-                text=f"R$ {sum(df_inv['Valor']):,.0f}",
-                x=0.5, y=0.5,
-                font=dict(size=14, color='#333', family="Arial, sans-serif"),
-                showarrow=False
-            )
+            fig = figura("dashboard.investimentos", construir_grafico_investimentos, entidades=["investimentos"])
             
             # Configurações adicionais para garantir a aparência correta
             config = {
@@ -512,72 +513,78 @@ def render_dashboard_page():
         """, unsafe_allow_html=True)
         
         if gastos_mes:
-            # Preparar dados para o gráfico de gastos por categoria
-            categorias_gastos = {}
-            for gasto in gastos_mes:
-                categoria = gasto.get("categoria", "Outros")
-                valor = float(gasto.get("valor", 0) or 0)
-                if categoria in categorias_gastos:
-                    categorias_gastos[categoria] += valor
-                else:
-                    categorias_gastos[categoria] = valor
+            def construir_grafico_gastos():
+                # Preparar dados para o gráfico de gastos por categoria
+                categorias_gastos = {}
+                for gasto in gastos_mes:
+                    categoria = gasto.get("categoria", "Outros")
+                    valor = float(gasto.get("valor", 0) or 0)
+                    if categoria in categorias_gastos:
+                        categorias_gastos[categoria] += valor
+                    else:
+                        categorias_gastos[categoria] = valor
             
-            # Criar DataFrame para o gráfico
-            df_gastos = pd.DataFrame({
-                'Categoria': list(categorias_gastos.keys()),
-                'Valor': list(categorias_gastos.values())
-            })
+                # Criar DataFrame para o gráfico
+                df_gastos = pd.DataFrame({
+                    'Categoria': list(categorias_gastos.keys()),
+                    'Valor': list(categorias_gastos.values())
+                })
             
-            # Ordenar por valor (do maior para o menor)
-            df_gastos = df_gastos.sort_values('Valor', ascending=False)
+                # Ordenar por valor (do maior para o menor)
+                df_gastos = df_gastos.sort_values('Valor', ascending=False)
             
-            # Gráfico de barras para gastos com estilo moderno
-            fig = px.bar(
-                df_gastos, 
-                x='Categoria', 
-                y='Valor',
-                color='Valor',
-                color_continuous_scale=["#FFCDD2", "#E53935"],
-                text='Valor',
-                template="plotly_white"
-            )
+                # Gráfico de barras para gastos com estilo moderno
+                fig = px.bar(
+                    df_gastos, 
+                    x='Categoria', 
+                    y='Valor',
+                    color='Valor',
+                    color_continuous_scale=["#FFCDD2", "#E53935"],
+                    text='Valor',
+                    template="plotly_white"
+                )
             
-            fig.update_traces(
-                texttemplate='R$ %{text:,.0f}',
-                textposition='auto',
-                textfont=dict(color="white", size=11, family="Arial, sans-serif"),
-                marker=dict(
-                    line=dict(width=1, color='#fff'),
-                    pattern=dict(shape="")
-                ),
-                hovertemplate='<b>%{x}</b><br>Valor: R$ %{y:,.2f}'
-            )
+                fig.update_traces(
+                    texttemplate='R$ %{text:,.0f}',
+                    textposition='auto',
+                    textfont=dict(color="white", size=11, family="Arial, sans-serif"),
+                    marker=dict(
+                        line=dict(width=1, color='#fff'),
+                        pattern=dict(shape="")
+                    ),
+                    hovertemplate='<b>%{x}</b><br>Valor: R$ %{y:,.2f}'
+                )
             
-            fig.update_layout(
-                yaxis_title="Valor (R$)",
-                xaxis_title="",
-                coloraxis_showscale=False,
-                height=280,
-                margin=dict(t=0, b=0, l=0, r=0),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(
-                    showgrid=False,
-                    tickangle=-45,
-                    tickfont=dict(size=10, family="Arial, sans-serif")
-                ),
-                yaxis=dict(
-                    showgrid=True,
-                    gridcolor='rgba(0,0,0,0.05)',
-                    zeroline=False,
-                    tickformat='R$ %{y:,.0f}'
-                ),
-                hoverlabel=dict(
-                    bgcolor="white",
-                    font_size=12,
-                    font_family="Arial, sans-serif"
+                fig.update_layout(
+                    yaxis_title="Valor (R$)",
+                    xaxis_title="",
+                    coloraxis_showscale=False,
+                    height=280,
+                    margin=dict(t=0, b=0, l=0, r=0),
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    xaxis=dict(
+                        showgrid=False,
+                        tickangle=-45,
+                        tickfont=dict(size=10, family="Arial, sans-serif")
+                    ),
+                    yaxis=dict(
+                        showgrid=True,
+                        gridcolor='rgba(0,0,0,0.05)',
+                        zeroline=False,
+                        tickformat='R$ %{y:,.0f}'
+                    ),
+                    hoverlabel=dict(
+                        bgcolor="white",
+                        font_size=12,
+                        font_family="Arial, sans-serif"
+                    )
                 )
-            )
+            
+                return fig
+            
+            fig = figura("dashboard.gastos_categoria", construir_grafico_gastos, entidades=["gastos"],
+                         parametros={"mes": mes_atual, "ano": ano_atual})
             
             # Configurações adicionais para garantir a aparência correta
             config = {
@@ -602,43 +609,24 @@ def render_dashboard_page():
             <div class="conteudo-grafico">
         """, unsafe_allow_html=True)
         
-        # Combinar dívidas e seguros para mostrar próximos vencimentos
+        # Combinar dívidas e seguros para mostrar próximos vencimentos (próximos 30 dias),
+        # consultando o índice de vencimentos de cada entidade
         vencimentos = []
         hoje = datetime.now().date()
         
-        # Adicionar vencimentos de dívidas
-        for divida in dividas:
-            if "data_vencimento" in divida and divida["data_vencimento"]:
-                try:
-                    data_venc = datetime.strptime(divida["data_vencimento"], "%Y-%m-%d").date()
-                    dias_restantes = (data_venc - hoje).days
-                    if 0 <= dias_restantes <= 30:  # Mostrar vencimentos nos próximos 30 dias
-                        vencimentos.append({
-                            "tipo": "Dívida",
-                            "descricao": divida.get("descricao", "Sem descrição"),
-                            "data": data_venc,
-                            "dias_restantes": dias_restantes,
-                            "valor": float(divida.get("valor_restante", 0) or divida.get("valor_atual", 0) or 0)
-                        })
-                except (ValueError, TypeError):
-                    continue
-        
-        # Adicionar vencimentos de seguros
-        for seguro in seguros:
-            if "data_vencimento" in seguro and seguro["data_vencimento"]:
-                try:
-                    data_venc = datetime.strptime(seguro["data_vencimento"], "%Y-%m-%d").date()
-                    dias_restantes = (data_venc - hoje).days
-                    if 0 <= dias_restantes <= 30:  # Mostrar vencimentos nos próximos 30 dias
-                        vencimentos.append({
-                            "tipo": "Seguro",
-                            "descricao": seguro.get("descricao", "Sem descrição"),
-                            "data": data_venc,
-                            "dias_restantes": dias_restantes,
-                            "valor": float(seguro.get("valor_premio", 0) or 0)
-                        })
-                except (ValueError, TypeError):
-                    continue
+        for tipo, entidade, registros in (("Dívida", "dividas", dividas), ("Seguro", "seguros", seguros)):
+            for registro, dias_restantes in indice_vencimentos(entidade, registros).vencendo_em(30, hoje=hoje):
+                if tipo == "Dívida":
+                    valor = registro.get("valor_restante", 0) or registro.get("valor_atual", 0) or 0
+                else:
+                    valor = registro.get("valor_premio", 0) or 0
+                vencimentos.append({
+                    "tipo": tipo,
+                    "descricao": registro.get("descricao", "Sem descrição"),
+                    "data": hoje + timedelta(days=dias_restantes),
+                    "dias_restantes": dias_restantes,
+                    "valor": float(valor)
+                })
         
         # Ordenar por proximidade da data
         vencimentos.sort(key=lambda x: x["dias_restantes"])
@@ -0,0 +1,140 @@
+"""
+Painel de depuração com a divisão de tempo de cada rerun.
+
+Ativado apenas com a variável de ambiente BRAUNA_DEBUG=1: o painel mostra
+métricas de todo o processo (inclusive o uso de memória das outras sessões),
+então não pode ser ligado por qualquer visitante pela URL.
+Mostra os trechos medidos pela instrumentação no rerun da sessão (cargas,
+gravações, requisições ao Supabase e arquivos), os totais acumulados e as
+métricas de resiliência.
+Com o profiling ativo (BRAUNA_PROFILE=1), mostra também o tempo por fase e
+as funções mais custosas do rerun. A seção de memória mostra o uso estimado
+de cada chave da sessão e o total das sessões do processo.
+"""
+import os
+import json
+
+import pandas as pd
+import streamlit as st
+
+from app.utils.instrumentation import registro, exportar_prometheus
+from app.database.resilience import obter_metricas
+from app.database.conexoes import metricas_pool
+from app.data import memoria_sessao, cache_compartilhado
+from app.ui import cache_figuras
+
+
+def debug_ativo():
+    """
+    Indica se o painel de depuração deve ser exibido (BRAUNA_DEBUG=1).
+    """
+    return os.environ.get("BRAUNA_DEBUG", "0") == "1"
+
+
+def render_debug_panel():
+    """
+    Renderiza o painel de depuração na barra lateral.
+    """
+    spans = registro.spans_rerun()
+
+    with st.sidebar.expander("🛠️ Depuração", expanded=False):
+        st.caption(f"Rerun atual: {registro.duracao_rerun() * 1000:.0f} ms, {len(spans)} trechos medidos")
+
+        if spans:
+            df = pd.DataFrame(spans)
+
+            # Tempo por operação neste rerun
+            resumo = (
+                df.groupby(["operacao", "entidade"], dropna=False)
+                .agg(chamadas=("duracao_ms", "size"), total_ms=("duracao_ms", "sum"), linhas=("linhas", "sum"))
+                .sort_values("total_ms", ascending=False)
+                .reset_index()
+            )
+            st.markdown("**Tempo por operação**")
+            st.dataframe(resumo, use_container_width=True, hide_index=True)
+
+            st.markdown("**Trechos (em ordem de término)**")
+            st.dataframe(df, use_container_width=True, hide_index=True)
+
+        metricas = obter_metricas()
+        pool = metricas_pool()
+        st.markdown(f"**Supabase** (circuito {metricas['circuito']})")
+        if pool:
+            st.caption(
+                f"Pool HTTP: {pool['requisicoes']} requisições, {pool['handshakes']} handshakes, "
+                f"{pool['reaproveitadas']} conexões reaproveitadas, {pool['conexoes_abertas']} abertas"
+                f"{' (HTTP/2)' if pool['http2'] else ''}"
+            )
+        if metricas["operacoes"]:
+            st.dataframe(
+                pd.DataFrame.from_dict(metricas["operacoes"], orient="index"),
+                use_container_width=True
+            )
+
+        uso_sessao = memoria_sessao.relatorio()
+        uso_processo = memoria_sessao.uso_por_sessao()
+        total_sessao = sum(linha["bytes"] for linha in uso_sessao)
+        total_processo = sum(uso["bytes"] for uso in uso_processo.values())
+        st.markdown(
+            f"**Memória da sessão**: {total_sessao / 1024 ** 2:.1f} MB "
+            f"({len(uso_processo)} sessões recentes, {total_processo / 1024 ** 2:.1f} MB no total)"
+        )
+        if uso_sessao:
+            st.dataframe(pd.DataFrame(uso_sessao), use_container_width=True, hide_index=True)
+        cache = cache_compartilhado.estatisticas()
+        st.caption(
+            f"Cache compartilhado: {cache['arquivos']} arquivos, "
+            f"{cache['acertos']} acertos, {cache['leituras']} leituras do disco"
+        )
+        figuras = cache_figuras.estatisticas()
+        st.caption(
+            f"Cache de figuras: {figuras['figuras']} figuras ({figuras['bytes'] / 1024:.0f} KB), "
+            f"{figuras['acertos']} acertos, {figuras['construcoes']} construções"
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "JSON",
+                data=json.dumps(
+                    {"rerun": spans, "totais": registro.totais(), "supabase": metricas, "pool_http": pool,
+                     "memoria_sessao": uso_sessao},
+                    ensure_ascii=False, indent=2
+                ),
+                file_name="brauna_metricas.json",
+                mime="application/json",
+                use_container_width=True
+            )
+        with col2:
+            st.download_button(
+                "Prometheus",
+                data=exportar_prometheus(),
+                file_name="brauna_metricas.prom",
+                mime="text/plain",
+                use_container_width=True
+            )
+
+
+def render_profile_panel(resultado):
+    """
+    Renderiza na barra lateral o perfil do rerun (tempo por fase e funções mais custosas).
+
+    Args:
+        resultado (dict): Resultado preenchido por `profiling.perfilar`.
+    """
+    if not resultado.get("fases"):
+        return
+
+    with st.sidebar.expander(f"⏱️ Perfil: {resultado['pagina']} ({resultado['total_ms']:.0f} ms)", expanded=True):
+        fases = pd.DataFrame(
+            [{"fase": fase, "ms": ms} for fase, ms in resultado["fases"].items()]
+        )
+        st.bar_chart(fases, x="fase", y="ms", height=180)
+
+        st.markdown("**Funções mais custosas (tempo acumulado)**")
+        st.dataframe(pd.DataFrame(resultado["top"]), use_container_width=True, hide_index=True)
+
+        if resultado.get("arquivo"):
+            st.caption(f"Perfil gravado em `{resultado['arquivo']}` (abra com snakeviz ou `python -m pstats`)")
+        if resultado.get("arquivo_html"):
+            st.caption(f"Árvore de chamadas: `{resultado['arquivo_html']}`")
@@ -18,34 +18,9 @@ from app.data.data_handler import (
     delete_divida,
     add_gasto
 )
-
-def formatar_moeda(valor):
-    """
-    Formata um valor numérico como moeda brasileira (R$).
-    """
-    if valor is None:
-        return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-def calcular_dias_para_vencimento(data_vencimento):
-    """
-    Calcula quantos dias faltam para o vencimento da dívida.
-    
-    Args:
-        data_vencimento (str): Data de vencimento no formato "YYYY-MM-DD"
-        
-    Returns:
-        int: Número de dias até o vencimento, negativo se já venceu
-    """
-    if not data_vencimento:
-        return None
-    
-    try:
-        data_venc = datetime.strptime(data_vencimento, "%Y-%m-%d")
-        hoje = datetime.now()
-        return (data_venc - hoje).days
-    except (ValueError, TypeError):
-        return None
+from app.data.vencimentos import indice_vencimentos
+from app.utils.formatting import formatar_moeda, formatar_moeda_serie, formatar_data
+from app.ui.cache_figuras import figura
 
 def render_dividas_page():
     """
@@ -392,6 +367,9 @@ def mostrar_resumo_dividas(dividas):
     st.progress(progresso)
 
 def mostrar_lista_dividas(dividas):
+    # Datas de vencimento convertidas e ordenadas uma vez, usadas pelas abas
+    vencimentos = indice_vencimentos("dividas", dividas)
+    
     # Criar abas para diferentes visualizações
     tab1, tab2, tab3 = st.tabs(["Todas as Dívidas", "Próximos Vencimentos", "Análise"])
     
@@ -411,9 +389,8 @@ def mostrar_lista_dividas(dividas):
                 # Calcular progresso de pagamento e data de vencimento
                 progresso_pagamento = ((valor_inicial - valor_atual) / valor_inicial) * 100 if valor_inicial > 0 else 0
                 
-                # Verificar se tem data de vencimento
-                data_vencimento = divida.get("data_vencimento", "")
-                dias_para_vencimento = calcular_dias_para_vencimento(data_vencimento) if data_vencimento else None
+                # Dias para o vencimento (None se não houver data)
+                dias_para_vencimento = vencimentos.dias_para_vencimento(divida)
                 
                 # Definir classe de status com base no vencimento
                 status_class = ""
@@ -467,16 +444,10 @@ def mostrar_lista_dividas(dividas):
         st.subheader("Próximos Vencimentos")
         
         if dividas:
-            # Filtrar dívidas com data de vencimento
-            dividas_com_vencimento = [d for d in dividas if d.get("data_vencimento", "")]
+            # Dívidas com data de vencimento, já ordenadas pelo índice (mais próxima primeiro)
+            dividas_ordenadas = vencimentos.ordenados()
             
-            if dividas_com_vencimento:
-                # Calcular dias para vencimento e adicionar à dívida
-                for divida in dividas_com_vencimento:
-                    divida["dias_para_vencimento"] = calcular_dias_para_vencimento(divida.get("data_vencimento", ""))
-                
-                # Ordenar por data de vencimento (mais próxima primeiro)
-                dividas_ordenadas = sorted(dividas_com_vencimento, key=lambda x: x.get("dias_para_vencimento", 999999))
+            if dividas_ordenadas:
                 
                 # Criar tabela de próximos vencimentos
                 st.markdown("""
@@ -535,13 +506,11 @@ def mostrar_lista_dividas(dividas):
                     <tbody>
                 """, unsafe_allow_html=True)
                 
-                for divida in dividas_ordenadas:
+                for divida, dias in dividas_ordenadas:
                     valor_atual = divida.get("valor_atual", divida.get("valor_restante", 0))
-                    dias = divida.get("dias_para_vencimento", 0)
                     
                     # Formatar data de vencimento
-                    data_vencimento = datetime.strptime(divida.get("data_vencimento", "2023-01-01"), "%Y-%m-%d")
-                    data_formatada = data_vencimento.strftime("%d/%m/%Y")
+                    data_formatada = formatar_data(divida.get("data_vencimento"))
                     
                     # Definir status com base nos dias para vencimento
                     status_class = ""
@@ -601,35 +570,40 @@ def mostrar_lista_dividas(dividas):
             # Ordenar por valor (maior para menor)
             df_tipos = df_tipos.sort_values(by="Valor", ascending=False)
             
-            # Definir cores para o gráfico
-            cores = ['#DC3912', '#FF9900', '#990099', '#3366CC', '#109618', '#0099C6']
+            def construir_grafico_tipos():
+                # Definir cores para o gráfico
+                cores = ['#DC3912', '#FF9900', '#990099', '#3366CC', '#109618', '#0099C6']
             
-            # Criar gráfico de pizza
-            fig = px.pie(
-                df_tipos,
-                values="Valor",
-                names="Tipo",
-                color_discrete_sequence=cores,
-                hole=0.4
-            )
+                # Criar gráfico de pizza
+                fig = px.pie(
+                    df_tipos,
+                    values="Valor",
+                    names="Tipo",
+                    color_discrete_sequence=cores,
+                    hole=0.4
+                )
             
-            # Personalizar layout
-            fig.update_layout(
-                margin=dict(t=0, b=0, l=0, r=0),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=-0.2,
-                    xanchor="center",
-                    x=0.5
-                ),
-                annotations=[dict(
-                    text=f"Total<br>{formatar_moeda(sum(tipos_divida.values()))}",
-                    x=0.5, y=0.5,
-                    font_size=14,
-                    showarrow=False
-                )]
-            )
+                # Personalizar layout
+                fig.update_layout(
+                    margin=dict(t=0, b=0, l=0, r=0),
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=-0.2,
+                        xanchor="center",
+                        x=0.5
+                    ),
+                    annotations=[dict(
+                        text=f"Total<br>{formatar_moeda(sum(tipos_divida.values()))}",
+                        x=0.5, y=0.5,
+                        font_size=14,
+                        showarrow=False
+                    )]
+                )
+            
+                return fig
+            
+            fig = figura("dividas.tipos", construir_grafico_tipos, entidades=["dividas"])
             
             st.plotly_chart(fig, use_container_width=True)
             
@@ -637,7 +611,7 @@ def mostrar_lista_dividas(dividas):
             st.markdown("### Detalhamento por Tipo")
             
             # Formatar valores para exibição
-            df_tipos["Valor Formatado"] = df_tipos["Valor"].apply(lambda x: formatar_moeda(x))
+            df_tipos["Valor Formatado"] = formatar_moeda_serie(df_tipos["Valor"])
             df_tipos["Porcentagem Formatada"] = df_tipos["Porcentagem"].apply(lambda x: f"{x:.1f}%")
             
             # Criar tabela estilizada
@@ -705,17 +679,8 @@ def mostrar_lista_dividas(dividas):
             indice = opcoes_dict[divida_selecionada]
             divida_para_excluir = dividas[indice]
             
-            # Usar função delete_divida se existir, senão fazer manualmente
-            try:
-                if delete_divida(divida_para_excluir["id"]):
-                    st.success(f"Dívida '{divida_para_excluir.get('descricao', 'Dívida sem nome')}' excluída com sucesso!")
-                    st.rerun()
-            except:
-                # Fallback manual
-                for i, divida in enumerate(dividas):
-                    if all(divida.get(k) == divida_para_excluir.get(k) for k in divida_para_excluir.keys()):
-                        dividas.pop(i)
-                        save_dividas(dividas)
-                        st.success(f"Dívida '{divida_para_excluir.get('descricao', 'Dívida sem nome')}' excluída com sucesso!")
-                        st.rerun()
-                        break 
\ No newline at end of file
+            if delete_divida(divida_para_excluir.get("id")):
+                st.success(f"Dívida '{divida_para_excluir.get('descricao', 'Dívida sem nome')}' excluída com sucesso!")
+                st.rerun()
+            else:
+                st.error("Não foi possível excluir a dívida.") 
\ No newline at end of file
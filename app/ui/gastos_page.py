@@ -1,6 +1,8 @@
 """
 Módulo para a página de Controle de Gastos do aplicativo de Controle Financeiro Pessoal.
 """
+import html
+import math
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -21,12 +23,73 @@ if str(root_dir) not in sys.path:
 from app.data.data_handler import (
     load_user_data,
     load_gastos,
-    save_gastos,
+    load_gastos_mes,
+    contar_registros,
     add_gasto,
+    delete_by_id,
     load_data,
     save_data,
     recuperar_gastos
 )
+from app.utils.formatting import formatar_moeda, formatar_moeda_serie, formatar_data_serie
+from app.ui.cache_figuras import figura
+
+# Categorias exibidas no formulário (rótulo com ícone -> valor armazenado)
+CATEGORIAS_COM_ICONES = {
+    "🏠 Moradia": "Moradia", # Aluguel, contas de casa
+    "🍔 Alimentação": "Alimentação", # Mercado, restaurantes
+    "🚗 Transporte": "Transporte", # Combustível, ônibus, apps
+    "💊 Saúde": "Saúde", # Remédios, consultas
+    "📚 Educação": "Educação", # Cursos, mensalidades
+    "🎬 Lazer": "Lazer", # Cinema, viagens, festas
+    "👕 Compras": "Vestuário", # Roupas, acessórios
+    "💼 Serviços": "Serviços", # Internet, celular
+    "📦 Outros": "Outros" # Outros gastos
+}
+
+# Dica exibida para cada categoria do formulário
+DICAS_CATEGORIAS = {
+    "🏠 Moradia": "Aluguel, condomínio, IPTU, luz, água, gás, etc.",
+    "🍔 Alimentação": "Mercado, restaurantes, delivery, lanches.",
+    "🚗 Transporte": "Combustível, ônibus, táxi, aplicativos, estacionamento.",
+    "💊 Saúde": "Remédios, consultas médicas, plano de saúde.",
+    "📚 Educação": "Mensalidades, material escolar, cursos, livros.",
+    "🎬 Lazer": "Cinema, streaming, viagens, festas, esportes.",
+    "👕 Compras": "Roupas, acessórios, eletrônicos, presentes.",
+    "💼 Serviços": "Internet, celular, assinaturas, serviços domésticos.",
+    "📦 Outros": "Qualquer gasto que não se encaixe nas categorias acima."
+}
+
+# Categorias consideradas gasto fixo ou variável quando o gasto não é recorrente
+CATEGORIAS_FIXAS = ["Moradia"]
+CATEGORIAS_VARIAVEIS = ["Alimentação", "Transporte", "Saúde", "Educação",
+                        "Lazer", "Vestuário", "Serviços"]
+
+# Cor de cada categoria nos gráficos e cards (mapeamento consistente)
+CORES_CATEGORIAS = {
+    'Moradia': '#3366CC',
+    'Alimentação': '#DC3912',
+    'Vestuário': '#FF9900',
+    'Serviços': '#109618',
+    'Lazer': '#990099',
+    'Saúde': '#0099C6',
+    'Transporte': '#DD4477',
+    'Educação': '#66AA00',
+    'Outros': '#B82E2E'
+}
+
+# Ícone de cada categoria na lista de gastos
+ICONES_CATEGORIAS = {
+    'Moradia': '🏠',
+    'Alimentação': '🍔',
+    'Vestuário': '👕',
+    'Serviços': '💼',
+    'Lazer': '🎮',
+    'Saúde': '💊',
+    'Transporte': '🚗',
+    'Educação': '📚',
+    'Outros': '📦'
+}
 
 def calcular_total_gastos_por_semana(gastos, mes):
     """
@@ -65,11 +128,44 @@ def calcular_total_gastos_por_semana(gastos, mes):
     
     return semanas
 
-def formatar_moeda(valor):
+# Opções de quantidade de gastos por página na lista
+OPCOES_TAMANHO_PAGINA = (25, 50, 100)
+
+def paginar(df, pagina, tamanho):
     """
-    Formata um valor numérico como moeda brasileira (R$).
+    Recorta uma página do DataFrame.
+
+    Returns:
+        tuple: (DataFrame da página, página ajustada ao intervalo válido, total de páginas)
     """
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    total_paginas = max(1, math.ceil(len(df) / tamanho))
+    pagina = min(max(1, int(pagina)), total_paginas)
+    inicio = (pagina - 1) * tamanho
+    return df.iloc[inicio:inicio + tamanho], pagina, total_paginas
+
+def html_cards_gastos(df_pagina):
+    """
+    Monta o HTML dos cards de uma página de gastos em uma única string.
+
+    A formatação é feita por coluna, apenas nas linhas da página, e o
+    resultado é enviado ao navegador em uma só chamada de `st.markdown`.
+    """
+    descricao = df_pagina["descricao"].fillna("Gasto sem descrição").astype(str).map(html.escape)
+    categoria = df_pagina["categoria"].fillna("Outros").astype(str)
+    icone = categoria.map(ICONES_CATEGORIAS).fillna("📋")
+    tipo = df_pagina["tipo"].fillna("").astype(str)
+    badge = pd.Series(np.where(tipo == "fixo", "badge-fixo", "badge-variavel"), index=df_pagina.index)
+
+    cards = (
+        '<div class="card-gasto"><div class="card-header"><div class="card-titulo">' + descricao
+        + '</div><div class="card-valor">' + formatar_moeda_serie(df_pagina["valor"])
+        + '</div></div><div class="card-content"><div class="card-info">'
+        + '<div class="info-item"><span>📅</span> ' + formatar_data_serie(df_pagina["data"]) + '</div>'
+        + '<div class="info-item"><span>' + icone + '</span> ' + categoria.map(html.escape) + '</div>'
+        + '<div class="badge ' + badge + '">' + tipo.map(html.escape) + '</div>'
+        + '</div></div></div>'
+    )
+    return '<div class="lista-gastos">' + "".join(cards.tolist()) + '</div>'
 
 def criar_grafico_barras_semanal(dados_semanas):
     """
@@ -113,21 +209,28 @@ def render_gastos_page():
     Renderiza a página de Controle de Gastos.
     """
     # Importar a função para recuperar os gastos
-    from app.data.data_handler import recuperar_gastos
+    from app.data.data_handler import recuperar_gastos, dados_perdidos
     
     # Verificar e garantir que os gastos sejam carregados automaticamente
-    # Se a lista estiver vazia, tentar recuperar sem interação do usuário
-    gastos = load_gastos()
-    if not gastos:
+    # A página só usa o mês selecionado: aqui basta saber se há gastos. A lista
+    # completa só é lida quando a contagem é zero (para juntar as fontes locais
+    # e, se ainda estiver vazia, tentar recuperar sem interação do usuário)
+    quantidade_gastos = contar_registros("gastos")
+    if not quantidade_gastos:
+        quantidade_gastos = len(load_gastos())
+    if not quantidade_gastos:
         print("ATENÇÃO: Lista de gastos vazia, tentando recuperação automática")
         gastos = recuperar_gastos()
         if gastos:
             print(f"SUCESSO: {len(gastos)} gastos recuperados automaticamente")
             # Notificação silenciosa - sem interromper fluxo, apenas para tranquilizar o usuário
             st.sidebar.success(f"✅ {len(gastos)} gastos foram carregados com sucesso!", icon="✅")
-    elif len(gastos) > 0:
+        elif dados_perdidos("gastos"):
+            # Havia gastos registrados e nenhum snapshot íntegro: não é um usuário novo
+            st.sidebar.warning("⚠️ Seus gastos anteriores não foram encontrados. Verifique os backups em Configurações.")
+    else:
         # Garantir que o usuário saiba que seus dados estão carregados
-        st.sidebar.info(f"📊 {len(gastos)} gastos carregados", icon="📊")
+        st.sidebar.info(f"📊 {quantidade_gastos} gastos carregados", icon="📊")
     
     # Cabeçalho moderno
     st.markdown("""
@@ -141,7 +244,6 @@ def render_gastos_page():
     """, unsafe_allow_html=True)
     
     # Carregar dados necessários
-    gastos = load_gastos()
     user_data = load_user_data() or {"renda_mensal": 0.0}
     renda_mensal = user_data.get("renda_mensal", 0)
     
@@ -174,43 +276,20 @@ def render_gastos_page():
                 
                 # Categorias com icones mais intuitivas
                 st.markdown("### Categoria")
-                categorias_com_icones = {
-                    "🏠 Moradia": "Moradia", # Aluguel, contas de casa
-                    "🍔 Alimentação": "Alimentação", # Mercado, restaurantes
-                    "🚗 Transporte": "Transporte", # Combustível, ônibus, apps
-                    "💊 Saúde": "Saúde", # Remédios, consultas
-                    "📚 Educação": "Educação", # Cursos, mensalidades
-                    "🎬 Lazer": "Lazer", # Cinema, viagens, festas
-                    "👕 Compras": "Vestuário", # Roupas, acessórios
-                    "💼 Serviços": "Serviços", # Internet, celular
-                    "📦 Outros": "Outros" # Outros gastos
-                }
                 
                 # Usar radio buttons em grade para selecionar categoria
                 categoria_selecionada = st.radio(
                     "Escolha uma categoria:",
-                    options=list(categorias_com_icones.keys()),
+                    options=list(CATEGORIAS_COM_ICONES.keys()),
                     index=0,
                     horizontal=True
                 )
                 
                 # Converter a categoria com ícone para o valor armazenado
-                categoria = categorias_com_icones[categoria_selecionada]
+                categoria = CATEGORIAS_COM_ICONES[categoria_selecionada]
                 
                 # Dica baseada na categoria selecionada
-                dicas_categorias = {
-                    "🏠 Moradia": "Aluguel, condomínio, IPTU, luz, água, gás, etc.",
-                    "🍔 Alimentação": "Mercado, restaurantes, delivery, lanches.",
-                    "🚗 Transporte": "Combustível, ônibus, táxi, aplicativos, estacionamento.",
-                    "💊 Saúde": "Remédios, consultas médicas, plano de saúde.",
-                    "📚 Educação": "Mensalidades, material escolar, cursos, livros.",
-                    "🎬 Lazer": "Cinema, streaming, viagens, festas, esportes.",
-                    "👕 Compras": "Roupas, acessórios, eletrônicos, presentes.",
-                    "💼 Serviços": "Internet, celular, assinaturas, serviços domésticos.",
-                    "📦 Outros": "Qualquer gasto que não se encaixe nas categorias acima."
-                }
-                
-                st.caption(dicas_categorias.get(categoria_selecionada, ""))
+                st.caption(DICAS_CATEGORIAS.get(categoria_selecionada, ""))
                 
                 # Adicionar informações sobre categorização automática
                 if categoria_selecionada == "🏠 Moradia":
@@ -240,18 +319,14 @@ def render_gastos_page():
                         st.error("Por favor, preencha todos os campos corretamente.")
                     else:
                         # Determinar se é fixo ou variável usando a lógica híbrida
-                        categorias_fixas = ["Moradia"]
-                        categorias_variaveis = ["Alimentação", "Transporte", "Saúde", "Educação", 
-                                            "Lazer", "Vestuário", "Serviços"]
-                        
                         # Se for marcado como recorrente, sempre é fixo
                         if gasto_recorrente:
                             tipo_final = "fixo"  # Usar minúsculas para consistência
                         else:
                             # Se não for recorrente, seguir a regra da categoria
-                            if categoria in categorias_fixas:
+                            if categoria in CATEGORIAS_FIXAS:
                                 tipo_final = "fixo"  # Usar minúsculas para consistência
-                            elif categoria in categorias_variaveis:
+                            elif categoria in CATEGORIAS_VARIAVEIS:
                                 tipo_final = "variavel"  # Usar minúsculas para consistência e corrigir para "variavel"
                             else:  # Para "Outros" ou categorias não listadas
                                 tipo_final = "variavel"  # Default para outros
@@ -300,8 +375,11 @@ def render_gastos_page():
             index=meses.index(mes_atual) if mes_atual in meses else 0
         )
     
-    # Filtrar gastos do mês selecionado
-    gastos_mes = [g for g in gastos if g["data"].startswith(mes_selecionado)]
+    # Carregar apenas os gastos do mês selecionado e as colunas usadas na página
+    gastos_mes = load_gastos_mes(
+        mes_selecionado,
+        colunas=["id", "descricao", "valor", "data", "categoria", "tipo"]
+    )
     
     # Calcular totais
     total_gastos = sum(g["valor"] for g in gastos_mes)
@@ -498,37 +576,43 @@ def render_gastos_page():
             # Adicionar coluna de porcentagem
             df_categorias['Porcentagem'] = df_categorias['Valor'] / df_categorias['Valor'].sum() * 100
             
-            # Criar figura com cores personalizadas baseadas no tema
-            cores = ['#3366CC', '#DC3912', '#FF9900', '#109618', '#990099', '#0099C6', '#DD4477', '#66AA00', '#B82E2E', '#316395']
+            def construir_grafico_categorias():
+                # Criar figura com cores personalizadas baseadas no tema
+                cores = ['#3366CC', '#DC3912', '#FF9900', '#109618', '#990099', '#0099C6', '#DD4477', '#66AA00', '#B82E2E', '#316395']
             
-            # Criar gráfico de pizza
-            fig = px.pie(
-                df_categorias, 
-                values='Valor', 
-                names='Categoria',
-                color_discrete_sequence=cores,
-                hole=0.4  # Doughnut chart
-            )
+                # Criar gráfico de pizza
+                fig = px.pie(
+                    df_categorias, 
+                    values='Valor', 
+                    names='Categoria',
+                    color_discrete_sequence=cores,
+                    hole=0.4  # Doughnut chart
+                )
             
-            # Personalizar layout
-            fig.update_layout(
-                margin=dict(t=0, b=0, l=0, r=0),
-                legend_title_text='',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=-0.2,
-                    xanchor="center",
-                    x=0.5
-                ),
-                annotations=[dict(
-                    text=f"Total<br>{formatar_moeda(total_gastos)}",
-                    x=0.5, y=0.5,
-                    font_size=14,
-                    showarrow=False
-                )]
-            )
+                # Personalizar layout
+                fig.update_layout(
+                    margin=dict(t=0, b=0, l=0, r=0),
+                    legend_title_text='',
+                    showlegend=True,
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=-0.2,
+                        xanchor="center",
+                        x=0.5
+                    ),
+                    annotations=[dict(
+                        text=f"Total<br>{formatar_moeda(total_gastos)}",
+                        x=0.5, y=0.5,
+                        font_size=14,
+                        showarrow=False
+                    )]
+                )
+            
+                return fig
+            
+            fig = figura("gastos.categorias", construir_grafico_categorias, entidades=["gastos"],
+                         parametros={"mes": mes_selecionado})
             
             # Mostrar o gráfico no Streamlit
             st.plotly_chart(fig, use_container_width=True)
@@ -601,19 +685,6 @@ def render_gastos_page():
             </style>
             """, unsafe_allow_html=True)
             
-            # Criar cores para cada categoria (mapeamento consistente)
-            cores_categorias = {
-                'Moradia': '#3366CC',
-                'Alimentação': '#DC3912', 
-                'Vestuário': '#FF9900',
-                'Serviços': '#109618',
-                'Lazer': '#990099',
-                'Saúde': '#0099C6',
-                'Transporte': '#DD4477',
-                'Educação': '#66AA00',
-                'Outros': '#B82E2E'
-            }
-            
             # Início do grid de cards
             st.markdown('<div class="coluna-categorias">', unsafe_allow_html=True)
             
@@ -624,7 +695,7 @@ def render_gastos_page():
                 percentual = row['Porcentagem']
                 
                 # Obter cor para a categoria (ou usar uma padrão se não existir)
-                cor = cores_categorias.get(categoria, '#3366CC')
+                cor = CORES_CATEGORIAS.get(categoria, '#3366CC')
                 
                 # Criar card para a categoria
                 st.markdown(f"""
@@ -669,10 +740,6 @@ def render_gastos_page():
         
         # Agrupar gastos por semana
         if gastos_mes:
-            # Converter string de data para datetime
-            for g in gastos_mes:
-                g["data_dt"] = datetime.strptime(g["data"], "%Y-%m-%d")
-            
             # Obter o primeiro e último dia do mês
             primeiro_dia = datetime.strptime(f"{mes_selecionado}-01", "%Y-%m-%d")
             if primeiro_dia.month == 12:
@@ -710,27 +777,33 @@ def render_gastos_page():
             # Substituir número da semana pelo nome
             gastos_semana["nome_semana"] = gastos_semana["semana"].map(nomes_semanas)
             
-            # Criar gráfico de barras com cores agradáveis
-            fig = px.bar(
-                gastos_semana,
-                x="nome_semana",
-                y="valor",
-                labels={"nome_semana": "Semana", "valor": "Valor Total"},
-                color_discrete_sequence=["#3366CC"]
-            )
+            def construir_grafico_semanas():
+                # Criar gráfico de barras com cores agradáveis
+                fig = px.bar(
+                    gastos_semana,
+                    x="nome_semana",
+                    y="valor",
+                    labels={"nome_semana": "Semana", "valor": "Valor Total"},
+                    color_discrete_sequence=["#3366CC"]
+                )
             
-            # Adicionar rótulos com valor formatado
-            fig.update_traces(
-                text=[formatar_moeda(valor) for valor in gastos_semana["valor"]],
-                textposition="outside"
-            )
+                # Adicionar rótulos com valor formatado
+                fig.update_traces(
+                    text=[formatar_moeda(valor) for valor in gastos_semana["valor"]],
+                    textposition="outside"
+                )
             
-            # Remover título do eixo y
-            fig.update_layout(
-                yaxis_title="",
-                xaxis_title="",
-                margin=dict(t=0, b=0, l=0, r=0)
-            )
+                # Remover título do eixo y
+                fig.update_layout(
+                    yaxis_title="",
+                    xaxis_title="",
+                    margin=dict(t=0, b=0, l=0, r=0)
+                )
+            
+                return fig
+            
+            fig = figura("gastos.semanas", construir_grafico_semanas, entidades=["gastos"],
+                         parametros={"mes": mes_selecionado})
             
             # Mostrar o gráfico
             st.plotly_chart(fig, use_container_width=True)
@@ -847,7 +920,7 @@ def render_gastos_page():
                         percentual = (valor_categoria / total_semana) * 100
                         
                         # Obter cor para a categoria
-                        cor = cores_categorias.get(categoria, '#3366CC')
+                        cor = CORES_CATEGORIAS.get(categoria, '#3366CC')
                         
                         # Criar linha com mini-barra de progresso
                         st.markdown(f"""
@@ -888,17 +961,9 @@ def render_gastos_page():
         
         # Filtrar e ordenar gastos do mês
         if gastos_mes:
-            # Converter para DataFrame
-            df_gastos = pd.DataFrame(gastos_mes)
-            df_gastos['data'] = pd.to_datetime(df_gastos['data'])
-            
-            # Ordenar por data (mais recente primeiro)
-            df_gastos = df_gastos.sort_values('data', ascending=False)
-            
-            # Formatar os dados para exibição
-            df_display = df_gastos.copy()
-            df_display['data_formatada'] = df_display['data'].dt.strftime('%d/%m/%Y')
-            df_display['valor_formatado'] = df_display['valor'].apply(formatar_moeda)
+            # Converter para DataFrame, do mais recente para o mais antigo
+            # (load_gastos_mes já retorna os gastos ordenados por data; a formatação é feita só na página exibida)
+            df_display = pd.DataFrame(gastos_mes).iloc[::-1]
             
             # Interface de filtro moderna
             st.markdown("""
@@ -1018,7 +1083,7 @@ def render_gastos_page():
                 tipo_filtro = st.selectbox("Filtrar por tipo:", options=tipos)
             
             # Aplicar filtros
-            df_filtrada = df_display.copy()
+            df_filtrada = df_display
             if categoria_filtro != "Todas":
                 df_filtrada = df_filtrada[df_filtrada['categoria'] == categoria_filtro]
             
@@ -1028,54 +1093,35 @@ def render_gastos_page():
             # Mostrar estatísticas dos filtros
             st.markdown(f"**{len(df_filtrada)} gastos encontrados** • Total: **{formatar_moeda(df_filtrada['valor'].sum())}**")
             
-            # Início da lista de gastos
-            st.markdown('<div class="lista-gastos">', unsafe_allow_html=True)
+            # Paginação: apenas os gastos da página atual são formatados e enviados ao navegador
+            col_pagina1, col_pagina2 = st.columns([3, 1])
+            with col_pagina2:
+                tamanho_pagina = st.selectbox("Gastos por página:", options=OPCOES_TAMANHO_PAGINA, key="gastos_lista_tamanho")
             
-            # Ícones para categorias
-            icones_categorias = {
-                'Moradia': '🏠',
-                'Alimentação': '🍔',
-                'Vestuário': '👕',
-                'Serviços': '💼',
-                'Lazer': '🎮',
-                'Saúde': '💊',
-                'Transporte': '🚗',
-                'Educação': '📚',
-                'Outros': '📦'
-            }
+            # Voltar à primeira página quando o mês, os filtros ou o tamanho mudam
+            filtros_lista = (mes_selecionado, categoria_filtro, tipo_filtro, tamanho_pagina)
+            if st.session_state.get("gastos_lista_filtros") != filtros_lista:
+                st.session_state["gastos_lista_filtros"] = filtros_lista
+                st.session_state["gastos_lista_pagina"] = 1
             
-            # Renderizar cards modernos para cada gasto
-            for _, row in df_filtrada.iterrows():
-                categoria = row.get('categoria', 'Outros')
-                icone = icones_categorias.get(categoria, '📋')
-                
-                # Determinar a classe do badge baseado no tipo
-                badge_class = "badge-fixo" if row['tipo'] == 'fixo' else "badge-variavel"
-                
-                st.markdown(f"""
-                <div class="card-gasto">
-                    <div class="card-header">
-                        <div class="card-titulo">{row.get('descricao', 'Gasto sem descrição')}</div>
-                        <div class="card-valor">{row['valor_formatado']}</div>
-                    </div>
-                    <div class="card-content">
-                        <div class="card-info">
-                            <div class="info-item">
-                                <span>📅</span> {row['data_formatada']}
-                            </div>
-                            <div class="info-item">
-                                <span>{icone}</span> {row['categoria']}
-                            </div>
-                            <div class="badge {badge_class}">
-                                {row['tipo']}
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+            df_pagina, pagina, total_paginas = paginar(
+                df_filtrada, st.session_state.get("gastos_lista_pagina", 1), tamanho_pagina
+            )
+            st.session_state["gastos_lista_pagina"] = pagina
             
-            # Fechar a lista
-            st.markdown('</div>', unsafe_allow_html=True)
+            with col_pagina1:
+                if total_paginas > 1:
+                    st.number_input(
+                        f"Página (de {total_paginas}):",
+                        min_value=1,
+                        max_value=total_paginas,
+                        step=1,
+                        key="gastos_lista_pagina"
+                    )
+            
+            # Renderizar os cards da página em uma única chamada
+            if not df_pagina.empty:
+                st.markdown(html_cards_gastos(df_pagina), unsafe_allow_html=True)
             
             # Separador antes das opções de gestão
             st.markdown("<hr style='margin: 20px 0;'>", unsafe_allow_html=True)
@@ -1087,36 +1133,31 @@ def render_gastos_page():
             col_gerenciar1, col_gerenciar2 = st.columns([3, 1])
             
             with col_gerenciar1:
-                # Criar lista de opções para excluir (mais legível)
-                opcoes_exclusao = [{
-                    "id": i,
-                    "texto": f"{g.get('descricao', 'Gasto sem descrição')} - {datetime.strptime(g.get('data', '2023-01-01'), '%Y-%m-%d').strftime('%d/%m/%Y')} - {formatar_moeda(g.get('valor', 0))}"
-                } for i, g in enumerate(gastos_mes)]
+                # Opções de exclusão: os gastos da página exibida, formatados por coluna
+                textos_exclusao = (
+                    df_pagina['descricao'].fillna('Gasto sem descrição').astype(str)
+                    + " - " + formatar_data_serie(df_pagina['data'])
+                    + " - " + formatar_moeda_serie(df_pagina['valor'])
+                )
+                opcoes_exclusao = dict(zip(df_pagina['id'].tolist(), textos_exclusao.tolist()))
+                descricoes = dict(zip(df_pagina['id'].tolist(), df_pagina['descricao'].tolist()))
                 
                 # Melhorar a apresentação das opções
                 selected = st.selectbox(
-                    "Selecione um gasto para excluir:",
-                    options=range(len(opcoes_exclusao)),
-                    format_func=lambda x: opcoes_exclusao[x]["texto"]
+                    "Selecione um gasto desta página para excluir:",
+                    options=list(opcoes_exclusao.keys()),
+                    format_func=lambda x: opcoes_exclusao[x]
                 )
             
             with col_gerenciar2:
                 # Botão de exclusão mais atraente
-                if st.button("🗑️ Excluir Gasto", type="primary", use_container_width=True):
-                    # Obter índice do gasto na lista original
-                    indice = opcoes_exclusao[selected]["id"]
-                    gasto_para_excluir = gastos_mes[indice]
-                    
-                    # Encontrar e remover o gasto da lista completa
-                    for i, gasto in enumerate(gastos):
-                        # Verificar se é o mesmo gasto comparando todos os campos
-                        if all(gasto[k] == gasto_para_excluir[k] for k in gasto_para_excluir.keys()):
-                            # Remover e salvar
-                            gastos.pop(i)
-                            save_gastos(gastos)
-                            st.success(f"Gasto '{gasto_para_excluir.get('descricao', 'Gasto sem descrição')}' excluído com sucesso!")
-                            st.rerun()
-                            break
+                if st.button("🗑️ Excluir Gasto", type="primary", use_container_width=True, disabled=selected is None):
+                    # Remover pelo ID (a lista do mês é carregada à parte)
+                    if delete_by_id("gastos", selected):
+                        st.success(f"Gasto '{descricoes.get(selected) or 'Gasto sem descrição'}' excluído com sucesso!")
+                        st.rerun()
+                    else:
+                        st.error("Não foi possível excluir o gasto.")
         else:
             # Mensagem vazia mais amigável
             st.markdown("""
@@ -5,15 +5,34 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import sys
 import os
+from pydantic import ValidationError
 
 # Adicionar diretório pai ao path para importar os módulos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.goals import Goal
+from models.goals import Goal, GoalRecord
 from utils.data_processor import load_goals, save_goals, get_next_id
 from utils.calculations import calculate_monthly_payment, calculate_time_to_goal
 
 
+def validate_goal_data(goal_data):
+    """
+    Valida os dados de um objetivo vindos de um formulário.
+    
+    É a única validação completa dos objetivos: depois de gravados, eles são
+    exibidos com GoalRecord, sem validar de novo a cada renderização.
+    
+    Returns:
+        str ou None: Mensagem de erro, ou None se os dados forem válidos.
+    """
+    try:
+        # O ID é gerado por get_next_id e não vem do usuário
+        Goal(**{field: value for field, value in goal_data.items() if field != "id"})
+    except ValidationError as e:
+        return "; ".join(error["msg"] for error in e.errors())
+    return None
+
+
 def render_goals_page():
     """Renderiza a página de gestão de objetivos financeiros."""
     st.title("Objetivos Financeiros")
@@ -45,8 +64,9 @@ def render_goals_list(goals_data):
     
     st.header("Meus Objetivos")
     
-    # Convertemos para objetos Goal para usar os métodos
-    goals = [Goal(**goal) for goal in goals_data]
+    # Convertemos para registros leves para usar os métodos (sem validar: os
+    # objetivos foram validados com Goal ao serem criados ou editados)
+    goals = [GoalRecord(**goal) for goal in goals_data]
     
     # Ordenar por prioridade e depois por prazo
     goals.sort(key=lambda x: (x.priority, x.deadline))
@@ -183,6 +203,11 @@ def render_add_goal_form(goals_data):
                 "category": category
             }
             
+            error = validate_goal_data(new_goal)
+            if error:
+                st.error(f"Dados inválidos: {error}")
+                return
+            
             # Adicionar à lista e salvar
             goals_data.append(new_goal)
             if save_goals(goals_data):
@@ -297,8 +322,7 @@ def render_edit_goal_form(goals_data, goal_id):
                 st.error("O valor alvo deve ser maior que zero!")
                 return
             
-            # Atualizar o objetivo
-            goal_to_edit.update({
+            changes = {
                 "name": name,
                 "description": description,
                 "target_amount": target_amount,
@@ -307,7 +331,15 @@ def render_edit_goal_form(goals_data, goal_id):
                 "priority": priority_options[priority],
                 "expected_return_rate": expected_return_rate,
                 "category": category
-            })
+            }
+            
+            error = validate_goal_data(changes)
+            if error:
+                st.error(f"Dados inválidos: {error}")
+                return
+            
+            # Atualizar o objetivo
+            goal_to_edit.update(changes)
             
             # Salvar a lista atualizada
             if save_goals(goals_data):
@@ -12,18 +12,11 @@ import numpy as np
 from app.data.data_handler import (
     load_user_data,
     load_investimentos,
-    save_investimentos,
     add_investimento,
-    calcular_progresso_objetivos
+    delete_by_id
 )
-
-def formatar_moeda(valor):
-    """
-    Formata um valor numérico como moeda brasileira (R$).
-    """
-    if valor is None:
-        return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+from app.utils.formatting import formatar_moeda
+from app.ui.cache_figuras import figura
 
 def render_investimentos_page():
     """
@@ -200,45 +193,50 @@ def render_investimentos_page():
     if investimentos:
         st.subheader("Distribuição por Categoria")
         
-        # Preparar dados para o gráfico
-        valores_por_categoria = {}
-        for categoria, invs in categorias.items():
-            if invs:  # Se tem investimentos na categoria
-                valores_por_categoria[categoria] = sum(inv.get("valor_atual", 0) for inv in invs)
+        def construir_grafico_resumo():
+            # Preparar dados para o gráfico
+            valores_por_categoria = {}
+            for categoria, invs in categorias.items():
+                if invs:  # Se tem investimentos na categoria
+                    valores_por_categoria[categoria] = sum(inv.get("valor_atual", 0) for inv in invs)
+        
+            # Criar Dataframe
+            df_categorias = pd.DataFrame({
+                "Categoria": valores_por_categoria.keys(),
+                "Valor": valores_por_categoria.values()
+            })
+        
+            # Criar gráfico de pizza
+            cores = ['#3366CC', '#DC3912', '#FF9900', '#109618', '#990099', '#0099C6']
         
-        # Criar Dataframe
-        df_categorias = pd.DataFrame({
-            "Categoria": valores_por_categoria.keys(),
-            "Valor": valores_por_categoria.values()
-        })
+            fig = px.pie(
+                df_categorias, 
+                values="Valor", 
+                names="Categoria",
+                color_discrete_sequence=cores,
+                hole=0.4
+            )
         
-        # Criar gráfico de pizza
-        cores = ['#3366CC', '#DC3912', '#FF9900', '#109618', '#990099', '#0099C6']
+            fig.update_layout(
+                margin=dict(t=0, b=0, l=0, r=0),
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=-0.2,
+                    xanchor="center",
+                    x=0.5
+                ),
+                annotations=[dict(
+                    text=f"Total<br>{formatar_moeda(total_atual)}",
+                    x=0.5, y=0.5,
+                    font_size=14,
+                    showarrow=False
+                )]
+            )
         
-        fig = px.pie(
-            df_categorias, 
-            values="Valor", 
-            names="Categoria",
-            color_discrete_sequence=cores,
-            hole=0.4
-        )
+            return fig
         
-        fig.update_layout(
-            margin=dict(t=0, b=0, l=0, r=0),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.2,
-                xanchor="center",
-                x=0.5
-            ),
-            annotations=[dict(
-                text=f"Total<br>{formatar_moeda(total_atual)}",
-                x=0.5, y=0.5,
-                font_size=14,
-                showarrow=False
-            )]
-        )
+        fig = figura("investimentos.resumo_categorias", construir_grafico_resumo, entidades=["investimentos"])
         
         st.plotly_chart(fig, use_container_width=True)
     
@@ -338,40 +336,45 @@ def render_investimentos_page():
             # Mostrar gráfico de distribuição por categoria
             st.subheader("Distribuição por Categoria")
             
-            # Agrupar investimentos por categoria
-            df_categorias = pd.DataFrame({
-                "Categoria": [inv.get("categoria", "Outros") for inv in investimentos],
-                "Valor": [(inv.get("valor_atual", 0) or 0) for inv in investimentos]
-            })
+            def construir_grafico_categorias():
+                # Agrupar investimentos por categoria
+                df_categorias = pd.DataFrame({
+                    "Categoria": [inv.get("categoria", "Outros") for inv in investimentos],
+                    "Valor": [(inv.get("valor_atual", 0) or 0) for inv in investimentos]
+                })
             
-            df_categorias = df_categorias.groupby("Categoria").sum().reset_index()
+                df_categorias = df_categorias.groupby("Categoria").sum().reset_index()
             
-            cores = ['#3366CC', '#DC3912', '#FF9900', '#109618', '#990099', '#0099C6']
+                cores = ['#3366CC', '#DC3912', '#FF9900', '#109618', '#990099', '#0099C6']
             
-            fig = px.pie(
-                df_categorias,
-                values="Valor",
-                names="Categoria",
-                color_discrete_sequence=cores,
-                hole=0.4
-            )
+                fig = px.pie(
+                    df_categorias,
+                    values="Valor",
+                    names="Categoria",
+                    color_discrete_sequence=cores,
+                    hole=0.4
+                )
             
-            fig.update_layout(
-                margin=dict(t=0, b=0, l=0, r=0),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=-0.2,
-                    xanchor="center",
-                    x=0.5
-                ),
-                annotations=[dict(
-                    text=f"Total<br>{formatar_moeda(total_atual)}",
-                    x=0.5, y=0.5,
-                    font_size=14,
-                    showarrow=False
-                )]
-            )
+                fig.update_layout(
+                    margin=dict(t=0, b=0, l=0, r=0),
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=-0.2,
+                        xanchor="center",
+                        x=0.5
+                    ),
+                    annotations=[dict(
+                        text=f"Total<br>{formatar_moeda(total_atual)}",
+                        x=0.5, y=0.5,
+                        font_size=14,
+                        showarrow=False
+                    )]
+                )
+            
+                return fig
+            
+            fig = figura("investimentos.categorias", construir_grafico_categorias, entidades=["investimentos"])
             
             st.plotly_chart(fig, use_container_width=True)
             
@@ -438,15 +441,12 @@ def render_investimentos_page():
                     indice = opcoes_dict[inv_selecionado]
                     inv_para_excluir = investimentos[indice]
                     
-                    for i, inv in enumerate(investimentos):
-                        if all(inv[k] == inv_para_excluir[k] for k in inv_para_excluir.keys()):
-                            investimentos.pop(i)
-                            if save_investimentos(investimentos):
-                                # Recalcular progresso dos objetivos após excluir um investimento
-                                # Comentado temporariamente: calcular_progresso_objetivos()
-                                st.success(f"Investimento '{inv_para_excluir.get('nome', 'Investimento sem nome')}' excluído com sucesso!")
-                                st.rerun()
-                            break
+                    if delete_by_id("investimentos", inv_para_excluir.get("id")):
+                        # O progresso dos objetivos vinculados é recalculado por delete_by_id
+                        st.success(f"Investimento '{inv_para_excluir.get('nome', 'Investimento sem nome')}' excluído com sucesso!")
+                        st.rerun()
+                    else:
+                        st.error("Não foi possível excluir o investimento.")
     
     # Aba de Análise
     with tab3:
@@ -487,57 +487,62 @@ def render_investimentos_page():
                         help="Projeção baseada na rentabilidade média atual"
                     )
             
-            # Criar gráfico de rentabilidade por categoria
-            categorias_rent = {}
-            categorias_valor = {}
+            def construir_grafico_rentabilidade():
+                # Criar gráfico de rentabilidade por categoria
+                categorias_rent = {}
+                categorias_valor = {}
             
-            for inv in investimentos:
-                categoria = inv.get("categoria", "Outros")
-                rent = inv.get("rentabilidade_anual", 0) or 0  # Garantir que não seja None
-                valor = inv.get("valor_atual", 0) or 0  # Garantir que não seja None
+                for inv in investimentos:
+                    categoria = inv.get("categoria", "Outros")
+                    rent = inv.get("rentabilidade_anual", 0) or 0  # Garantir que não seja None
+                    valor = inv.get("valor_atual", 0) or 0  # Garantir que não seja None
                 
-                if categoria not in categorias_rent:
-                    categorias_rent[categoria] = 0
-                    categorias_valor[categoria] = 0
+                    if categoria not in categorias_rent:
+                        categorias_rent[categoria] = 0
+                        categorias_valor[categoria] = 0
                 
-                categorias_rent[categoria] += rent * valor
-                categorias_valor[categoria] += valor
+                    categorias_rent[categoria] += rent * valor
+                    categorias_valor[categoria] += valor
+            
+                # Calcular média ponderada por categoria
+                for categoria in categorias_rent:
+                    if categorias_valor[categoria] > 0:
+                        categorias_rent[categoria] /= categorias_valor[categoria]
+            
+                # Criar DataFrame para o gráfico
+                df_rent = pd.DataFrame({
+                    'Categoria': list(categorias_rent.keys()),
+                    'Rentabilidade': list(categorias_rent.values())
+                })
             
-            # Calcular média ponderada por categoria
-            for categoria in categorias_rent:
-                if categorias_valor[categoria] > 0:
-                    categorias_rent[categoria] /= categorias_valor[categoria]
+                # Ordenar por rentabilidade
+                df_rent = df_rent.sort_values('Rentabilidade', ascending=False)
+            
+                # Criar gráfico
+                fig_rent = px.bar(
+                    df_rent,
+                    x='Categoria',
+                    y='Rentabilidade',
+                    title='Rentabilidade Anual por Categoria (%)',
+                    color='Rentabilidade',
+                    color_continuous_scale=['#F44336', '#FFEB3B', '#4CAF50'],
+                    text='Rentabilidade'
+                )
             
-            # Criar DataFrame para o gráfico
-            df_rent = pd.DataFrame({
-                'Categoria': list(categorias_rent.keys()),
-                'Rentabilidade': list(categorias_rent.values())
-            })
+                fig_rent.update_traces(
+                    texttemplate='%{text:.2f}%', 
+                    textposition='outside'
+                )
             
-            # Ordenar por rentabilidade
-            df_rent = df_rent.sort_values('Rentabilidade', ascending=False)
-            
-            # Criar gráfico
-            fig_rent = px.bar(
-                df_rent,
-                x='Categoria',
-                y='Rentabilidade',
-                title='Rentabilidade Anual por Categoria (%)',
-                color='Rentabilidade',
-                color_continuous_scale=['#F44336', '#FFEB3B', '#4CAF50'],
-                text='Rentabilidade'
-            )
+                fig_rent.update_layout(
+                    xaxis_title="",
+                    yaxis_title="Rentabilidade Anual (%)",
+                    coloraxis_showscale=False
+                )
             
-            fig_rent.update_traces(
-                texttemplate='%{text:.2f}%', 
-                textposition='outside'
-            )
+                return fig_rent
             
-            fig_rent.update_layout(
-                xaxis_title="",
-                yaxis_title="Rentabilidade Anual (%)",
-                coloraxis_showscale=False
-            )
+            fig_rent = figura("investimentos.rentabilidade", construir_grafico_rentabilidade, entidades=["investimentos"])
             
             st.plotly_chart(fig_rent, use_container_width=True)
             
@@ -598,30 +603,40 @@ def render_investimentos_page():
             </div>
             """, unsafe_allow_html=True)
             
-            # Criar gráfico
-            fig_projecao = px.line(
-                df_projecao,
-                x='Ano',
-                y='Valor',
-                title=f"Projeção de Crescimento para {anos_projecao} anos",
-                markers=True
-            )
+            def construir_grafico_projecao():
+                # Criar gráfico
+                fig_projecao = px.line(
+                    df_projecao,
+                    x='Ano',
+                    y='Valor',
+                    title=f"Projeção de Crescimento para {anos_projecao} anos",
+                    markers=True
+                )
             
-            fig_projecao.update_traces(
-                line=dict(width=3, color='#4CAF50'),
-                marker=dict(size=8, color='#1E88E5')
-            )
+                fig_projecao.update_traces(
+                    line=dict(width=3, color='#4CAF50'),
+                    marker=dict(size=8, color='#1E88E5')
+                )
             
-            fig_projecao.update_layout(
-                xaxis_title="Ano",
-                yaxis_title="Valor Projetado (R$)",
-                hovermode="x unified"
-            )
+                fig_projecao.update_layout(
+                    xaxis_title="Ano",
+                    yaxis_title="Valor Projetado (R$)",
+                    hovermode="x unified"
+                )
             
-            # Formatar valores no hover
-            fig_projecao.update_traces(
-                hovertemplate="Ano %{x}<br>Valor: " + 
-                            f"{formatar_moeda(0).replace('0', '%{y:,.2f}')}"
-            )
+                # Formatar valores no hover
+                fig_projecao.update_traces(
+                    hovertemplate="Ano %{x}<br>Valor: " + 
+                                f"{formatar_moeda(0).replace('0', '%{y:,.2f}')}"
+                )
+            
+                return fig_projecao
+            
+            fig_projecao = figura("investimentos.projecao", construir_grafico_projecao, parametros={
+                "valor_inicial": valor_total,
+                "aporte_mensal": aporte_mensal,
+                "rentabilidade": rentabilidade_media,
+                "anos": anos_projecao,
+            })
             
             st.plotly_chart(fig_projecao, use_container_width=True) 
\ No newline at end of file
@@ -11,22 +11,19 @@ import math
 from app.data.data_handler import (
     load_user_data,
     load_objetivos,
-    save_objetivos,
     add_objetivo,
     load_investimentos,
     atualizar_progresso_objetivo,
     vincular_investimento_objetivo,
     desvincular_investimento_objetivo,
-    calcular_progresso_objetivos
+    calcular_progresso_objetivos,
+    vinculos_objetivos,
+    contar_registros,
+    delete_by_id,
+    update_by_id
 )
-
-def formatar_moeda(valor):
-    """
-    Formata um valor numérico como moeda brasileira (R$).
-    """
-    if valor is None:
-        return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+from app.utils.formatting import formatar_moeda
+from app.ui.cache_figuras import figura
 
 def calcular_contribuicao_mensal_necessaria(valor_total, valor_atual, meses_restantes, taxa_mensal):
     """
@@ -86,10 +83,9 @@ def render_objetivos_page():
     
     # Carregar dados
     objetivos = load_objetivos()
-    investimentos = load_investimentos()
     
-    # Criar um dicionário de investimentos para acesso rápido
-    investimentos_dict = {inv.get("id", ""): inv for inv in investimentos}
+    # Investimentos vinculados a cada objetivo, já resolvidos
+    vinculos = vinculos_objetivos()
     
     # Botão em destaque para adicionar novo objetivo
     col_btn, col_empty = st.columns([1, 3])
@@ -364,12 +360,10 @@ def render_objetivos_page():
                         st.markdown(f"**Contribuição mensal necessária:** {formatar_moeda(contribuicao_mensal)}")
                     
                     # Investimentos vinculados
-                    if "investimentos_vinculados" in obj and obj["investimentos_vinculados"]:
+                    if vinculos.get(obj.get("id")):
                         st.markdown("**Investimentos vinculados:**")
-                        for inv_id in obj["investimentos_vinculados"]:
-                            if inv_id in investimentos_dict:
-                                inv = investimentos_dict[inv_id]
-                                st.markdown(f"- {inv.get('descricao', 'Investimento')} ({formatar_moeda(inv.get('valor_atual', 0))})")
+                        for inv in vinculos[obj.get("id")]:
+                            st.markdown(f"- {inv['nome']} ({formatar_moeda(inv['valor_atual'])})")
                     
                     # Opções para editar, excluir, etc.
                     col_acoes1, col_acoes2, col_acoes3 = st.columns(3)
@@ -547,10 +541,7 @@ def render_objetivos_page():
                                     # Se por algum motivo não tivermos user_id, será adicionado pelo save_objetivos
                                     pass
                                 
-                                # Atualizar na lista
-                                nova_lista_objetivos = [objetivo_atualizado if obj.get("id") == objetivo_id else obj for obj in objetivos]
-                                
-                                if save_objetivos(nova_lista_objetivos):
+                                if update_by_id("objetivos", objetivo_id, objetivo_atualizado):
                                     st.success("Objetivo atualizado com sucesso!")
                                     st.session_state.mostrar_form_edicao = False
                                     st.rerun()
@@ -609,9 +600,7 @@ def render_objetivos_page():
                     col1, col2 = st.columns(2)
                     with col1:
                         if st.button("✅ Sim, excluir", key="confirm_delete"):
-                            # Remover o objetivo da lista
-                            objetivos = [obj for obj in objetivos if obj.get("id") != objetivo_id]
-                            if save_objetivos(objetivos):
+                            if delete_by_id("objetivos", objetivo_id):
                                 st.success("Objetivo excluído com sucesso!")
                                 st.session_state.confirmar_exclusao = False
                                 st.rerun()
@@ -630,7 +619,7 @@ def render_objetivos_page():
         
         if not objetivos:
             st.info("Você precisa cadastrar objetivos financeiros primeiro.")
-        elif not investimentos:
+        elif not contar_registros("investimentos"):
             st.info("Você precisa cadastrar investimentos primeiro.")
         else:
             # Formulário para vincular investimentos a objetivos
@@ -651,109 +640,122 @@ def render_objetivos_page():
                 objetivo = next((obj for obj in objetivos if obj.get("id") == objetivo_id), None)
             
             with col2:
-                # Selecionar investimento
-                # Filtrar investimentos que já estão vinculados a este objetivo
-                investimentos_vinculados = objetivo.get("investimentos_vinculados", []) if objetivo else []
-                
-                # Criar opções apenas com investimentos não vinculados
-                investimentos_disponiveis = [inv for inv in investimentos 
-                                            if inv.get("id") not in investimentos_vinculados]
-                
-                if investimentos_disponiveis:
-                    opcoes_investimentos = {
-                        f"{inv.get('descricao', 'Investimento')} - {formatar_moeda(inv.get('valor_atual', 0))}": inv.get("id")
-                        for inv in investimentos_disponiveis
-                    }
+                # A lista completa de investimentos só é carregada ao abrir o formulário
+                if not st.session_state.get("mostrar_form_vinculo", False):
+                    if st.button("🔗 Vincular um investimento", key="abrir_form_vinculo"):
+                        st.session_state.mostrar_form_vinculo = True
+                        st.rerun()
+                else:
+                    investimentos = load_investimentos()
                     
-                    investimento_selecionado = st.selectbox(
-                        "Selecione um investimento para vincular:",
-                        options=list(opcoes_investimentos.keys()),
-                        key="vinculo_investimento"
-                    )
+                    # Selecionar investimento
+                    # Filtrar investimentos que já estão vinculados a este objetivo
+                    investimentos_vinculados = objetivo.get("investimentos_vinculados", []) if objetivo else []
+                
+                    # Criar opções apenas com investimentos não vinculados
+                    investimentos_disponiveis = [inv for inv in investimentos 
+                                                if inv.get("id") not in investimentos_vinculados]
+                
+                    if investimentos_disponiveis:
+                        opcoes_investimentos = {
+                            f"{inv.get('descricao', 'Investimento')} - {formatar_moeda(inv.get('valor_atual', 0))}": inv.get("id")
+                            for inv in investimentos_disponiveis
+                        }
                     
-                    investimento_id = opcoes_investimentos[investimento_selecionado]
+                        investimento_selecionado = st.selectbox(
+                            "Selecione um investimento para vincular:",
+                            options=list(opcoes_investimentos.keys()),
+                            key="vinculo_investimento"
+                        )
                     
-                    if st.button("🔗 Vincular Investimento", type="primary"):
-                        if vincular_investimento_objetivo(objetivo_id, investimento_id):
-                            # Recalcular progresso dos objetivos
-                            calcular_progresso_objetivos()
-                            st.success("Investimento vinculado com sucesso!")
-                            st.rerun()
-                        else:
-                            st.error("Erro ao vincular investimento.")
-                else:
-                    st.info("Não há investimentos disponíveis para vincular a este objetivo.")
+                        investimento_id = opcoes_investimentos[investimento_selecionado]
+                    
+                        if st.button("🔗 Vincular Investimento", type="primary"):
+                            if vincular_investimento_objetivo(objetivo_id, investimento_id):
+                                # Recalcular o progresso do objetivo
+                                calcular_progresso_objetivos(objetivo_ids=[objetivo_id])
+                                st.session_state.mostrar_form_vinculo = False
+                                st.success("Investimento vinculado com sucesso!")
+                                st.rerun()
+                            else:
+                                st.error("Erro ao vincular investimento.")
+                    else:
+                        st.info("Não há investimentos disponíveis para vincular a este objetivo.")
             
             # Mostrar investimentos vinculados e permitir desvincular
-            if objetivo and "investimentos_vinculados" in objetivo and objetivo["investimentos_vinculados"]:
+            if objetivo and vinculos.get(objetivo_id):
                 st.subheader("Investimentos vinculados a este objetivo")
                 
-                for inv_id in objetivo["investimentos_vinculados"]:
-                    if inv_id in investimentos_dict:
-                        inv = investimentos_dict[inv_id]
-                        
-                        col1, col2, col3 = st.columns([3, 1, 1])
-                        
-                        with col1:
-                            st.markdown(f"**{inv.get('descricao', 'Investimento')}** - {formatar_moeda(inv.get('valor_atual', 0))}")
-                        
-                        with col3:
-                            if st.button("❌ Desvincular", key=f"unlink_{inv_id}"):
-                                if desvincular_investimento_objetivo(objetivo_id, inv_id):
-                                    # Recalcular progresso dos objetivos
-                                    calcular_progresso_objetivos()
-                                    st.success("Investimento desvinculado com sucesso!")
-                                    st.rerun()
-                                else:
-                                    st.error("Erro ao desvincular investimento.")
+                for inv in vinculos[objetivo_id]:
+                    inv_id = inv["id"]
+                    
+                    col1, col2, col3 = st.columns([3, 1, 1])
+                    
+                    with col1:
+                        st.markdown(f"**{inv['nome']}** - {formatar_moeda(inv['valor_atual'])}")
+                    
+                    with col3:
+                        if st.button("❌ Desvincular", key=f"unlink_{inv_id}"):
+                            if desvincular_investimento_objetivo(objetivo_id, inv_id):
+                                # Recalcular o progresso do objetivo
+                                calcular_progresso_objetivos(objetivo_ids=[objetivo_id])
+                                st.success("Investimento desvinculado com sucesso!")
+                                st.rerun()
+                            else:
+                                st.error("Erro ao desvincular investimento.")
             
             # Mostrar visualização gráfica dos objetivos
             if objetivos:
                 st.subheader("Visão Geral dos Objetivos")
                 
-                # Preparar dados para o gráfico
-                dados_grafico = []
-                for obj in objetivos:
-                    valor_total = obj.get("valor_total", 0)
-                    valor_atual = obj.get("valor_atual", 0)
-                    percentual = (valor_atual / valor_total) * 100 if valor_total > 0 else 0
+                def construir_grafico_objetivos():
+                    # Preparar dados para o gráfico
+                    dados_grafico = []
+                    for obj in objetivos:
+                        valor_total = obj.get("valor_total", 0)
+                        valor_atual = obj.get("valor_atual", 0)
+                        percentual = (valor_atual / valor_total) * 100 if valor_total > 0 else 0
                     
-                    dados_grafico.append({
-                        "Objetivo": obj.get("nome", "Objetivo"),
-                        "Percentual": percentual,
-                        "Valor Atual": valor_atual,
-                        "Valor Total": valor_total,
-                        "Categoria": obj.get("categoria", "outros").title()
-                    })
-                
-                # Criar DataFrame
-                df = pd.DataFrame(dados_grafico)
-                
-                # Ordenar por percentual de conclusão
-                df = df.sort_values("Percentual", ascending=False)
-                
-                # Criar gráfico de barras horizontais
-                fig = px.bar(
-                    df,
-                    y="Objetivo",
-                    x="Percentual",
-                    title="Progresso dos Objetivos (%)",
-                    color="Categoria",
-                    hover_data=["Valor Atual", "Valor Total"],
-                    text="Percentual",
-                    orientation="h"
-                )
+                        dados_grafico.append({
+                            "Objetivo": obj.get("nome", "Objetivo"),
+                            "Percentual": percentual,
+                            "Valor Atual": valor_atual,
+                            "Valor Total": valor_total,
+                            "Categoria": obj.get("categoria", "outros").title()
+                        })
+                
+                    # Criar DataFrame
+                    df = pd.DataFrame(dados_grafico)
+                
+                    # Ordenar por percentual de conclusão
+                    df = df.sort_values("Percentual", ascending=False)
+                
+                    # Criar gráfico de barras horizontais
+                    fig = px.bar(
+                        df,
+                        y="Objetivo",
+                        x="Percentual",
+                        title="Progresso dos Objetivos (%)",
+                        color="Categoria",
+                        hover_data=["Valor Atual", "Valor Total"],
+                        text="Percentual",
+                        orientation="h"
+                    )
                 
-                fig.update_traces(
-                    texttemplate="%{text:.1f}%", 
-                    textposition="outside"
-                )
+                    fig.update_traces(
+                        texttemplate="%{text:.1f}%", 
+                        textposition="outside"
+                    )
                 
-                fig.update_layout(
-                    xaxis_title="Progresso (%)",
-                    yaxis_title="",
-                    xaxis=dict(range=[0, 100])
-                )
+                    fig.update_layout(
+                        xaxis_title="Progresso (%)",
+                        yaxis_title="",
+                        xaxis=dict(range=[0, 100])
+                    )
+                
+                    return fig
+                
+                fig = figura("objetivos.progresso", construir_grafico_objetivos, entidades=["objetivos"])
                 
                 st.plotly_chart(fig, use_container_width=True)
         
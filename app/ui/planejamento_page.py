@@ -4,6 +4,7 @@ from datetime import datetime
 import plotly.graph_objects as go
 from app.data.data_handler import load_data, save_data, load_user_data, load_gastos
 from app.ui.custom_style import load_custom_styles
+from app.utils.formatting import formatar_data_serie
 
 def render_planejamento_page():
     """
@@ -763,7 +764,7 @@ def render_planejamento_page():
         historico_display = planejamento.copy()
         
         if pd.api.types.is_datetime64_any_dtype(historico_display['data']):
-            historico_display['data'] = historico_display['data'].dt.strftime('%d/%m/%Y')
+            historico_display['data'] = formatar_data_serie(historico_display['data'])
         
         # Renomear colunas para exibição
         historico_display.columns = ['Data', 'Renda Mensal', 'Gastos Fixos', 'Gastos Variáveis', 'Objetivos']
@@ -7,48 +7,15 @@ import plotly.express as px
 from datetime import datetime, timedelta
 
 # Importar funções de manipulação de dados
-from data.data_handler import (
+from app.data.data_handler import (
     load_user_data,
     load_seguros,
-    save_seguros
+    add_seguro as dh_add_seguro,
+    delete_seguro,
+    update_by_id
 )
-
-def formatar_moeda(valor):
-    """
-    Formata um valor numérico como moeda brasileira (R$).
-    """
-    if valor is None:
-        return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-def calcular_dias_para_vencimento(seguro):
-    """
-    Calcula quantos dias faltam para o vencimento do seguro.
-    
-    Args:
-        seguro (dict): Objeto seguro contendo data de vencimento ou renovação
-        
-    Returns:
-        int: Número de dias até o vencimento, negativo se já venceu, None se não houver data
-    """
-    # Verificar campos de data comuns para compatibilidade
-    data_vencimento = None
-    
-    # Tentar obter a data do campo de vencimento ou renovação, caso um deles esteja definido
-    if "data_vencimento" in seguro:
-        data_vencimento = seguro["data_vencimento"]
-    elif "data_renovacao" in seguro:
-        data_vencimento = seguro["data_renovacao"]
-    
-    if not data_vencimento:
-        return -1  # Valor padrão se não houver data
-    
-    try:
-        data_venc = datetime.strptime(data_vencimento, "%Y-%m-%d")
-        hoje = datetime.now()
-        return (data_venc - hoje).days
-    except (ValueError, TypeError):
-        return -1
+from app.data.vencimentos import indice_vencimentos
+from app.utils.formatting import formatar_moeda, formatar_data
 
 def render_seguros_page():
     """
@@ -226,6 +193,9 @@ def render_seguros_page():
         </div>
         """, unsafe_allow_html=True)
     
+    # Datas de vencimento (ou renovação) convertidas e ordenadas uma vez, usadas pelas abas
+    vencimentos = indice_vencimentos("seguros", seguros)
+    
     # Criar abas para diferentes visualizações
     tab1, tab2 = st.tabs(["Todos os Seguros", "Próximos Vencimentos"])
     
@@ -234,28 +204,15 @@ def render_seguros_page():
             # Listagem de seguros em forma de cards
             st.subheader("Lista de Seguros")
             
-            # Ordenar seguros por data de vencimento ou renovação
-            def obter_data_vencimento(seguro):
-                if "data_vencimento" in seguro:
-                    return seguro["data_vencimento"]
-                elif "data_renovacao" in seguro:
-                    return seguro["data_renovacao"]
-                return "2099-12-31"  # Data distante para itens sem vencimento
-            
-            seguros_ordenados = sorted(
-                seguros,
-                key=lambda x: datetime.strptime(obter_data_vencimento(x), "%Y-%m-%d")
-            )
-            
-            for seguro in seguros_ordenados:
-                # Calcular dias para vencimento
-                dias_para_vencimento = calcular_dias_para_vencimento(seguro)
-                
+            # Seguros em ordem de vencimento ou renovação (os sem data por último)
+            for seguro, dias_para_vencimento in vencimentos.ordenados(incluir_sem_data=True):
                 # Definir classe de status com base no vencimento
                 status_class = ""
                 status_text = ""
                 
-                if dias_para_vencimento < 0:
+                if dias_para_vencimento is None:
+                    status_text = "Sem data de vencimento"
+                elif dias_para_vencimento < 0:
                     status_class = "danger"
                     status_text = f"Vencido há {abs(dias_para_vencimento)} dias"
                 elif dias_para_vencimento == 0:
@@ -269,11 +226,8 @@ def render_seguros_page():
                     status_text = f"Vence em {dias_para_vencimento} dias"
                 
                 # Formatar datas
-                data_contratacao = datetime.strptime(seguro.get("data_contratacao", "2023-01-01"), "%Y-%m-%d")
-                data_contratacao_formatada = data_contratacao.strftime("%d/%m/%Y")
-                
-                data_vencimento = datetime.strptime(seguro.get("data_vencimento", "2099-12-31"), "%Y-%m-%d")
-                data_vencimento_formatada = data_vencimento.strftime("%d/%m/%Y")
+                data_contratacao_formatada = formatar_data(seguro.get("data_contratacao", "2023-01-01"))
+                data_vencimento_formatada = formatar_data(seguro.get("data_vencimento", "2099-12-31"))
                 
                 # Criar card para cada seguro
                 st.markdown(f"""
@@ -303,17 +257,8 @@ def render_seguros_page():
         st.subheader("Próximos Vencimentos")
         
         if seguros:
-            # Calcular dias para vencimento e adicionar à lista
-            seguros_com_vencimento = []
-            for seguro in seguros:
-                dias = calcular_dias_para_vencimento(seguro)
-                if dias is not None:
-                    seguro_temp = seguro.copy()
-                    seguro_temp["dias_para_vencimento"] = dias
-                    seguros_com_vencimento.append(seguro_temp)
-            
-            # Ordenar por data de vencimento (mais próxima primeiro)
-            seguros_vencimento = sorted(seguros_com_vencimento, key=lambda x: x.get("dias_para_vencimento", 999999))
+            # Seguros com data de vencimento, já ordenados pelo índice (mais próximo primeiro)
+            seguros_vencimento = vencimentos.ordenados()
             
             # Criar tabela de próximos vencimentos
             st.markdown("""
@@ -354,12 +299,9 @@ def render_seguros_page():
                 <tbody>
             """, unsafe_allow_html=True)
             
-            for seguro in seguros_vencimento:
-                dias = seguro.get("dias_para_vencimento", 0)
-                
+            for seguro, dias in seguros_vencimento:
                 # Formatar data de vencimento
-                data_vencimento = datetime.strptime(seguro.get("data_vencimento", "2099-12-31"), "%Y-%m-%d")
-                data_formatada = data_vencimento.strftime("%d/%m/%Y")
+                data_formatada = formatar_data(seguro.get("data_vencimento", "2099-12-31"))
                 
                 # Definir status com base nos dias para vencimento
                 status_class = ""
@@ -414,27 +356,21 @@ def render_seguros_page():
                 indice = opcoes_dict[seguro_para_excluir]
                 seguro_excluir = seguros[indice]
                 
-                # Encontrar e remover o seguro
-                for i, seguro in enumerate(seguros):
-                    if all(seguro.get(k) == seguro_excluir.get(k) for k in seguro_excluir.keys()):
-                        seguros.pop(i)
-                        save_seguros(seguros)
-                        st.success(f"Seguro '{seguro_excluir.get('descricao', 'Seguro sem nome')}' excluído com sucesso!")
-                        st.rerun()
-                        break
+                if delete_seguro(seguro_excluir.get("id")):
+                    st.success(f"Seguro '{seguro_excluir.get('descricao', 'Seguro sem nome')}' excluído com sucesso!")
+                    st.rerun()
+                else:
+                    st.error("Não foi possível excluir o seguro.")
         
         with col_renovar:
             st.subheader("Renovar Seguro")
             
-            # Filtrar seguros próximos do vencimento
-            seguros_para_renovar = []
-            for seguro in seguros:
-                dias = calcular_dias_para_vencimento(seguro)
-                if dias is not None and dias <= 60:  # Mostrar apenas seguros a vencer em até 60 dias
-                    seguros_para_renovar.append(seguro)
+            # Seguros vencidos ou a vencer em até 60 dias, com os dias para o vencimento
+            renovaveis = vencimentos.vencendo_em(60, incluir_vencidos=True)
+            seguros_para_renovar = [seguro for seguro, _ in renovaveis]
             
             if seguros_para_renovar:
-                opcoes_renovacao = [f"{s.get('descricao', 'Seguro sem nome')} - Vence em {calcular_dias_para_vencimento(s)} dias" for s in seguros_para_renovar]
+                opcoes_renovacao = [f"{s.get('descricao', 'Seguro sem nome')} - Vence em {dias} dias" for s, dias in renovaveis]
                 opcoes_dict_renovacao = {opcao: i for i, opcao in enumerate(opcoes_renovacao)}
                 
                 seguro_para_renovar = st.selectbox(
@@ -447,10 +383,7 @@ def render_seguros_page():
                 indice_renovar = opcoes_dict_renovacao[seguro_para_renovar]
                 seguro_selecionado = seguros_para_renovar[indice_renovar]
                 
-                # Encontrar o índice na lista completa de seguros
-                indice_original = next((i for i, s in enumerate(seguros) if all(s.get(k) == seguro_selecionado.get(k) for k in seguro_selecionado.keys())), None)
-                
-                if indice_original is not None:
+                if seguro_selecionado.get("id") is not None:
                     # Opções de renovação
                     col_data, col_premio = st.columns(2)
                     
@@ -473,15 +406,17 @@ def render_seguros_page():
                         )
                     
                     if st.button("♻️ Renovar Seguro", type="primary"):
-                        # Atualizar o seguro com as novas informações
-                        seguros[indice_original]["data_renovacao"] = datetime.now().strftime("%Y-%m-%d")
-                        seguros[indice_original]["data_vencimento"] = nova_data_vencimento.strftime("%Y-%m-%d")
-                        seguros[indice_original]["valor_premio"] = novo_premio
-                        
-                        # Salvar as alterações
-                        save_seguros(seguros)
-                        st.success(f"Seguro '{seguro_selecionado.get('descricao', 'Seguro sem nome')}' renovado com sucesso!")
-                        st.rerun()
+                        # Atualizar o seguro com as novas informações (apenas este registro é gravado)
+                        renovado = update_by_id("seguros", seguro_selecionado["id"], {
+                            "data_renovacao": datetime.now().strftime("%Y-%m-%d"),
+                            "data_vencimento": nova_data_vencimento.strftime("%Y-%m-%d"),
+                            "valor_premio": novo_premio,
+                        })
+                        if renovado:
+                            st.success(f"Seguro '{seguro_selecionado.get('descricao', 'Seguro sem nome')}' renovado com sucesso!")
+                            st.rerun()
+                        else:
+                            st.error("Não foi possível renovar o seguro.")
             else:
                 st.info("Não há seguros próximos do vencimento para renovar.")
     
@@ -529,8 +464,6 @@ def add_seguro(seguro):
             seguro["data_renovacao"] = seguro["data_vencimento"]
             del seguro["data_vencimento"]
             
-        # Importar a função add_seguro do data_handler
-        from data.data_handler import add_seguro as dh_add_seguro
         return dh_add_seguro(seguro)
     except Exception as e:
         st.error(f"Erro ao adicionar seguro: {str(e)}")
@@ -26,15 +26,14 @@ from app.data.data_handler import (
     save_seguros
 )
 
+from app.data import compressao
+
+# Tipo MIME do arquivo exportado para cada algoritmo de compressão
+MIME_EXPORTACAO = {"zstd": "application/zstd", "gzip": "application/gzip", "nenhuma": "application/json"}
+
 # Importar função de obtenção do usuário atual
 from app.database.supabase_client import get_current_user
 
-def formatar_moeda(valor):
-    """Formata um valor para o formato de moeda brasileira."""
-    if valor is None:
-        return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
-
 def exportar_dados():
     """Exporta todos os dados do usuário para um arquivo JSON."""
     dados_export = {
@@ -180,22 +179,23 @@ def render_settings_page():
             
             if dados_exportados:
                 st.success("Dados exportados com sucesso!")
-                # Criar um download para o arquivo JSON
+                # Criar um download para o arquivo JSON (comprimido conforme BRAUNA_COMPRESSAO)
                 st.download_button(
                     label="Baixar Arquivo de Backup",
-                    data=dados_exportados,
-                    file_name=f"brauna_financas_backup_{datetime.now().strftime('%Y%m%d')}.json",
-                    mime="application/json"
+                    data=compressao.comprimir(dados_exportados),
+                    file_name=f"brauna_financas_backup_{datetime.now().strftime('%Y%m%d')}.json{compressao.extensao()}",
+                    mime=MIME_EXPORTACAO[compressao.ALGORITMO]
                 )
             else:
                 st.error("Erro ao exportar dados. Verifique os logs.")
     
     with col2:
-        uploaded_file = st.file_uploader("Importar Backup", type=["json"])
+        uploaded_file = st.file_uploader("Importar Backup", type=["json", "gz", "zst"])
         
         if uploaded_file:
             try:
-                backup_content = uploaded_file.read().decode()
+                # Backups comprimidos (.json.gz/.json.zst) e JSON simples são aceitos
+                backup_content = compressao.descomprimir(uploaded_file.read()).decode()
                 
                 if st.button("Restaurar Backup"):
                     if importar_dados(backup_content):
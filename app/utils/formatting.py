@@ -0,0 +1,120 @@
+"""
+Formatação de valores para exibição: moeda brasileira (R$ 1.234,56) e datas DD/MM/AAAA.
+
+As funções `*_serie` formatam colunas inteiras de uma vez com operações do
+pandas/NumPy, em vez de chamar a formatação de um valor por linha com
+`.apply`. As funções escalares guardam os resultados recentes em um cache
+LRU: os mesmos valores (totais, prêmios, datas de vencimento) aparecem
+várias vezes por rerun e em reruns seguidos.
+"""
+import os
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+# Valores distintos guardados pelos caches das funções escalares
+TAMANHO_CACHE = int(os.environ.get("BRAUNA_CACHE_FORMATACAO", "4096"))
+
+# Troca de separadores do formato americano (1,234.56) para o brasileiro (1.234,56)
+TROCA_SEPARADORES = str.maketrans(",.", ".,")
+
+# Posições dos separadores de milhar em um número inteiro (ex: 1234567 -> 1.234.567)
+_SEPARADOR_MILHAR = r"\B(?=(\d{3})+(?!\d))"
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _formatar_moeda(valor: float) -> str:
+    return "R$ " + f"{valor:,.2f}".translate(TROCA_SEPARADORES)
+
+
+def formatar_moeda(valor: Any) -> str:
+    """
+    Formata um valor numérico como moeda brasileira (R$).
+
+    Args:
+        valor: Número (ou None, exibido como R$ 0,00).
+
+    Returns:
+        str: Ex: "R$ 1.234,56".
+    """
+    if valor is None:
+        return "R$ 0,00"
+    return _formatar_moeda(float(valor))
+
+
+def formatar_moeda_serie(valores: Union[pd.Series, Iterable[Any]]) -> pd.Series:
+    """
+    Formata uma coluna de valores como moeda brasileira (R$) de uma vez.
+
+    Valores ausentes ou não numéricos são exibidos como R$ 0,00.
+
+    Args:
+        valores: Series ou sequência de números.
+
+    Returns:
+        pd.Series: Textos formatados, com o mesmo índice da Series recebida.
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(list(valores), dtype="object")
+    numeros = pd.to_numeric(serie, errors="coerce").fillna(0.0).to_numpy(dtype="float64")
+
+    centavos = np.rint(np.abs(numeros) * 100).astype(np.int64)
+    inteiros = pd.Series(centavos // 100, index=serie.index).astype(str)
+    inteiros = inteiros.str.replace(_SEPARADOR_MILHAR, ".", regex=True)
+    decimais = pd.Series(centavos % 100, index=serie.index).astype(str).str.zfill(2)
+    sinal = pd.Series(np.where((numeros < 0) & (centavos > 0), "-", ""), index=serie.index)
+    return "R$ " + sinal + inteiros + "," + decimais
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _formatar_data_texto(texto: str) -> str:
+    try:
+        return datetime.strptime(texto[:10], "%Y-%m-%d").strftime("%d/%m/%Y")
+    except ValueError:
+        return ""
+
+
+def formatar_data(valor: Any) -> str:
+    """
+    Formata uma data como DD/MM/AAAA.
+
+    Args:
+        valor: date/datetime ou texto ISO (AAAA-MM-DD, com ou sem horário).
+
+    Returns:
+        str: Data formatada, ou texto vazio se o valor não for uma data válida.
+    """
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime("%d/%m/%Y")
+    if not isinstance(valor, str) or not valor:
+        return ""
+    return _formatar_data_texto(valor)
+
+
+def formatar_data_serie(datas: Union[pd.Series, Iterable[Any]]) -> pd.Series:
+    """
+    Formata uma coluna de datas como DD/MM/AAAA de uma vez.
+
+    Aceita colunas de datetime ou de textos ISO (AAAA-MM-DD, com ou sem
+    horário). Datas inválidas ficam como texto vazio.
+
+    Returns:
+        pd.Series: Textos formatados, com o mesmo índice da Series recebida.
+    """
+    serie = datas if isinstance(datas, pd.Series) else pd.Series(list(datas), dtype="object")
+    if not pd.api.types.is_datetime64_any_dtype(serie):
+        serie = pd.to_datetime(serie.astype(str).str[:10], format="%Y-%m-%d", errors="coerce")
+
+    validas = serie.notna()
+    dia = serie.dt.day.fillna(0).astype(np.int64).astype(str).str.zfill(2)
+    mes = serie.dt.month.fillna(0).astype(np.int64).astype(str).str.zfill(2)
+    ano = serie.dt.year.fillna(0).astype(np.int64).astype(str).str.zfill(4)
+    return (dia + "/" + mes + "/" + ano).where(validas, "")
+
+
+def limpar_caches() -> None:
+    """Esvazia os caches das funções escalares."""
+    _formatar_moeda.cache_clear()
+    _formatar_data_texto.cache_clear()
@@ -0,0 +1,349 @@
+"""
+Instrumentação do aplicativo: logging com níveis e medição de tempo dos caminhos críticos.
+
+- `get_logger(nome)` retorna um logger do aplicativo. O nível é definido por
+  `BRAUNA_LOG_LEVEL` (padrão: WARNING), então as mensagens informativas das
+  cargas e gravações não custam escrita em stdout a cada rerun.
+- `span(operacao, entidade)` mede um trecho (carga, gravação, requisição),
+  registrando entidade, quantidade de linhas, bytes e duração.
+- `medir_tempo(operacao, entidade)` é o decorador equivalente para funções.
+- Os spans de cada rerun ficam disponíveis para o painel de depuração, separados
+  por sessão do Streamlit (várias sessões rodam ao mesmo tempo no processo), e
+  os totais acumulados podem ser exportados em JSON ou no formato do Prometheus.
+"""
+import os
+import json
+import time
+import logging
+import threading
+import functools
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Contexto do script do Streamlit (API interna, pode não existir em outras versões)
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    get_script_run_ctx = None
+
+# Nível de log do aplicativo (DEBUG, INFO, WARNING, ERROR)
+NIVEL_LOG = os.environ.get("BRAUNA_LOG_LEVEL", "WARNING").upper()
+
+# Calcular o tamanho em bytes das listas medidas (serializa os dados, tem custo)
+MEDIR_BYTES = os.environ.get("BRAUNA_MEDIR_BYTES", "0") == "1"
+
+# Arquivo JSON atualizado ao fim de cada rerun com as métricas (opcional)
+ARQUIVO_METRICAS = os.environ.get("BRAUNA_METRICS_FILE")
+
+# Limites dos buckets do histograma de duração (segundos), no estilo do Prometheus
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Máximo de spans guardados por rerun
+MAX_SPANS_RERUN = 500
+
+# Máximo de sessões com os spans do último rerun guardados
+MAX_SESSOES_RERUN = 200
+
+_configurado = False
+_config_lock = threading.Lock()
+
+
+def get_logger(nome):
+    """
+    Retorna o logger de um módulo do aplicativo (prefixo "brauna").
+
+    Args:
+        nome (str): Nome curto do módulo (ex: "data_handler").
+    """
+    global _configurado
+    with _config_lock:
+        if not _configurado:
+            raiz = logging.getLogger("brauna")
+            if not raiz.handlers:
+                handler = logging.StreamHandler()
+                handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+                raiz.addHandler(handler)
+            raiz.setLevel(getattr(logging, NIVEL_LOG, logging.WARNING))
+            raiz.propagate = False
+            _configurado = True
+    return logging.getLogger(f"brauna.{nome}")
+
+
+logger = get_logger("instrumentation")
+
+
+def sessao_atual():
+    """
+    ID da sessão do Streamlit da thread atual.
+
+    As threads de carga recebem o contexto da sessão que as iniciou; fora de
+    uma sessão (threads de segundo plano, scripts) retorna None.
+    """
+    if get_script_run_ctx is None:
+        return None
+    try:
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except TypeError:
+        ctx = get_script_run_ctx()
+    except Exception:
+        return None
+    return getattr(ctx, "session_id", None)
+
+
+def tamanho_em_bytes(dados):
+    """
+    Tamanho aproximado dos dados serializados em JSON (apenas com BRAUNA_MEDIR_BYTES=1).
+
+    Returns:
+        int ou None: Quantidade de bytes, ou None se a medição estiver desativada.
+    """
+    if not MEDIR_BYTES or dados is None:
+        return None
+    try:
+        return len(json.dumps(dados, ensure_ascii=False, default=str).encode("utf-8"))
+    except Exception:
+        return None
+
+
+class Span:
+    """
+    Trecho medido: operação, entidade, linhas, bytes e duração.
+    """
+
+    __slots__ = ("operacao", "entidade", "linhas", "bytes", "inicio", "duracao", "erro", "thread", "sessao")
+
+    def __init__(self, operacao, entidade=None):
+        self.operacao = operacao
+        self.entidade = entidade
+        self.linhas = None
+        self.bytes = None
+        self.inicio = time.time()
+        self.duracao = None
+        self.erro = None
+        self.thread = threading.current_thread().name
+        self.sessao = sessao_atual()
+
+    def registrar(self, linhas=None, dados=None, bytes=None):
+        """
+        Registra o volume do trecho.
+
+        Args:
+            linhas (int, optional): Quantidade de linhas. Se None e `dados` for lista, usa len(dados).
+            dados (list, optional): Dados processados (usados para linhas e bytes).
+            bytes (int, optional): Tamanho em bytes, quando já conhecido (ex: tamanho do arquivo).
+        """
+        if linhas is None and isinstance(dados, (list, tuple)):
+            linhas = len(dados)
+        if linhas is not None:
+            self.linhas = linhas
+        if bytes is None and dados is not None:
+            bytes = tamanho_em_bytes(dados)
+        if bytes is not None:
+            self.bytes = bytes
+
+    def como_dict(self):
+        """Representação do span para exportação."""
+        return {
+            "operacao": self.operacao,
+            "entidade": self.entidade,
+            "linhas": self.linhas,
+            "bytes": self.bytes,
+            "duracao_ms": round(self.duracao * 1000, 2) if self.duracao is not None else None,
+            "erro": self.erro,
+            "thread": self.thread,
+        }
+
+
+class RegistroMetricas:
+    """
+    Guarda os spans do rerun atual de cada sessão e os totais acumulados por
+    (operação, entidade).
+
+    Os spans de um rerun pertencem à sessão da thread que os mediu; os spans
+    de threads sem sessão (ex: envio em segundo plano) entram só nos totais.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reruns = OrderedDict()
+        self._totais = {}
+
+    def iniciar_rerun(self):
+        """Começa um novo rerun da sessão atual (os spans anteriores dela são descartados)."""
+        sessao = sessao_atual()
+        with self._lock:
+            self._reruns[sessao] = {"inicio": time.time(), "spans": []}
+            self._reruns.move_to_end(sessao)
+            while len(self._reruns) > MAX_SESSOES_RERUN:
+                self._reruns.popitem(last=False)
+
+    def adicionar(self, span):
+        """Registra um span concluído."""
+        with self._lock:
+            rerun = self._reruns.get(span.sessao)
+            if rerun is not None and len(rerun["spans"]) < MAX_SPANS_RERUN:
+                rerun["spans"].append(span)
+
+            chave = (span.operacao, span.entidade or "")
+            total = self._totais.get(chave)
+            if total is None:
+                total = self._totais[chave] = {
+                    "chamadas": 0, "erros": 0, "duracao_s": 0.0, "linhas": 0, "bytes": 0,
+                    "buckets": [0] * len(BUCKETS_DURACAO),
+                }
+            total["chamadas"] += 1
+            total["erros"] += 1 if span.erro else 0
+            total["duracao_s"] += span.duracao
+            total["linhas"] += span.linhas or 0
+            total["bytes"] += span.bytes or 0
+            for i, limite in enumerate(BUCKETS_DURACAO):
+                if span.duracao <= limite:
+                    total["buckets"][i] += 1
+
+    def spans_rerun(self):
+        """Lista (como dicionários) dos spans do rerun atual da sessão."""
+        sessao = sessao_atual()
+        with self._lock:
+            rerun = self._reruns.get(sessao)
+            return [span.como_dict() for span in rerun["spans"]] if rerun else []
+
+    def duracao_rerun(self):
+        """Tempo decorrido desde o início do rerun atual da sessão (segundos)."""
+        sessao = sessao_atual()
+        with self._lock:
+            rerun = self._reruns.get(sessao)
+            return time.time() - rerun["inicio"] if rerun else 0.0
+
+    def totais(self):
+        """Cópia dos totais acumulados por operação e entidade."""
+        with self._lock:
+            return {
+                f"{operacao}|{entidade}": {k: (list(v) if isinstance(v, list) else v) for k, v in total.items()}
+                for (operacao, entidade), total in self._totais.items()
+            }
+
+    def prometheus(self):
+        """
+        Exporta os totais no formato de texto do Prometheus.
+
+        Returns:
+            str: Métricas `brauna_operacao_*` com labels operacao e entidade.
+        """
+        with self._lock:
+            itens = sorted(self._totais.items())
+        linhas = [
+            "# HELP brauna_operacao_duracao_segundos Duração das operações medidas",
+            "# TYPE brauna_operacao_duracao_segundos histogram",
+        ]
+        for (operacao, entidade), total in itens:
+            labels = f'operacao="{operacao}",entidade="{entidade}"'
+            for limite, quantidade in zip(BUCKETS_DURACAO, total["buckets"]):
+                linhas.append(f'brauna_operacao_duracao_segundos_bucket{{{labels},le="{limite}"}} {quantidade}')
+            linhas.append(f'brauna_operacao_duracao_segundos_bucket{{{labels},le="+Inf"}} {total["chamadas"]}')
+            linhas.append(f"brauna_operacao_duracao_segundos_sum{{{labels}}} {total['duracao_s']:.6f}")
+            linhas.append(f"brauna_operacao_duracao_segundos_count{{{labels}}} {total['chamadas']}")
+        for nome, campo, descricao in [
+            ("brauna_operacao_erros_total", "erros", "Operações que terminaram com erro"),
+            ("brauna_operacao_linhas_total", "linhas", "Linhas processadas"),
+            ("brauna_operacao_bytes_total", "bytes", "Bytes processados"),
+        ]:
+            linhas.append(f"# HELP {nome} {descricao}")
+            linhas.append(f"# TYPE {nome} counter")
+            for (operacao, entidade), total in itens:
+                linhas.append(f'{nome}{{operacao="{operacao}",entidade="{entidade}"}} {total[campo]}')
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+
+@contextmanager
+def span(operacao, entidade=None):
+    """
+    Mede a duração de um trecho e o registra nas métricas.
+
+    Exemplo:
+        with span("supabase.select", "gastos") as s:
+            resposta = consulta.execute()
+            s.registrar(dados=resposta.data)
+
+    Args:
+        operacao (str): Nome da operação (ex: "data_handler.load").
+        entidade (str, optional): Coleção envolvida (ex: "gastos").
+    """
+    atual = Span(operacao, entidade)
+    inicio = time.perf_counter()
+    try:
+        yield atual
+    except BaseException as e:
+        atual.erro = type(e).__name__
+        raise
+    finally:
+        atual.duracao = time.perf_counter() - inicio
+        registro.adicionar(atual)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s %s: %.1f ms, %s linhas, %s bytes%s",
+                operacao, entidade or "", atual.duracao * 1000, atual.linhas, atual.bytes,
+                f" (erro: {atual.erro})" if atual.erro else ""
+            )
+
+
+def medir_tempo(operacao, entidade=None):
+    """
+    Decorador que mede a função com `span`.
+
+    A quantidade de linhas vem do retorno (se for lista) ou do primeiro
+    argumento (se for lista, como nas funções de gravação).
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            with span(operacao, entidade) as s:
+                resultado = funcao(*args, **kwargs)
+                if isinstance(resultado, list):
+                    s.registrar(dados=resultado)
+                elif args and isinstance(args[0], list):
+                    s.registrar(dados=args[0])
+                return resultado
+        return wrapper
+    return decorador
+
+
+def iniciar_rerun():
+    """Marca o início de um rerun da sessão atual do Streamlit (chamado no início de `main`)."""
+    registro.iniciar_rerun()
+
+
+def finalizar_rerun():
+    """
+    Marca o fim de um rerun e, se BRAUNA_METRICS_FILE estiver definido, grava as métricas.
+    """
+    if ARQUIVO_METRICAS:
+        try:
+            exportar_json(ARQUIVO_METRICAS)
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar as métricas em {ARQUIVO_METRICAS}: {e}")
+
+
+def exportar_json(caminho):
+    """
+    Grava em JSON os spans do último rerun da sessão atual e os totais acumulados.
+
+    Args:
+        caminho (str): Arquivo de destino (gravado via arquivo temporário + os.replace).
+    """
+    dados = {
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rerun": {"duracao_ms": round(registro.duracao_rerun() * 1000, 2), "spans": registro.spans_rerun()},
+        "totais": registro.totais(),
+    }
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as file:
+        json.dump(dados, file, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def exportar_prometheus():
+    """Retorna os totais no formato de texto do Prometheus."""
+    return registro.prometheus()
@@ -0,0 +1,197 @@
+"""
+Modo de profiling por rerun das páginas do Streamlit.
+
+Ativado apenas com BRAUNA_PROFILE=1 (no servidor, nunca pela URL: cada rerun
+perfilado grava arquivos em disco). A renderização da página é executada sob
+o cProfile e o tempo é atribuído às fases:
+
+- carga: leitura/gravação de dados (data_handler, Supabase, JSON, HTTP)
+- calculo: pandas, numpy e funções de cálculo do aplicativo
+- figura: construção dos gráficos do plotly
+- render: chamadas do Streamlit (st.markdown, st.dataframe, ...)
+- pagina: código das próprias páginas (app/ui)
+
+Cada rerun gera um arquivo `.prof` em BRAUNA_PROFILE_DIR (padrão: "profiles"),
+que pode ser aberto como flamegraph com snakeviz ou `python -m pstats`. Com
+BRAUNA_PROFILE=pyinstrument e o pacote pyinstrument instalado, é gravado um
+HTML com a árvore de chamadas amostrada. Apenas os BRAUNA_PROFILE_MAX_ARQUIVOS
+(padrão: 50) arquivos mais recentes são mantidos no diretório.
+"""
+import os
+import time
+import pstats
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from app.utils.instrumentation import get_logger
+
+# pyinstrument é opcional (perfil por amostragem com saída em HTML)
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+logger = get_logger("profiling")
+
+# Modo de profiling: "1"/"cprofile" (padrão do modo) ou "pyinstrument"
+MODO_PROFILE = os.environ.get("BRAUNA_PROFILE", "0").lower()
+
+# Diretório dos arquivos de perfil
+PROFILE_DIR = Path(os.environ.get("BRAUNA_PROFILE_DIR", "profiles"))
+
+# Arquivos de perfil mantidos no diretório (os mais antigos são removidos)
+MAX_ARQUIVOS = int(os.environ.get("BRAUNA_PROFILE_MAX_ARQUIVOS", "50"))
+
+# Quantidade de funções na tabela de mais custosas
+TOP_N = 15
+
+# Fases e os trechos de caminho dos módulos atribuídos a cada uma (a primeira que casar vence)
+FASES = [
+    ("figura", ("plotly",)),
+    ("render", ("streamlit",)),
+    ("carga", ("app/data", "app/database", "supabase", "postgrest", "gotrue", "httpx", "httpcore",
+               "json", "ssl", "socket", "yaml")),
+    ("calculo", ("pandas", "numpy", "app/utils", "app/models")),
+    ("pagina", ("app/ui", "app/main")),
+]
+
+
+def perfil_ativo():
+    """
+    Indica se o profiling está ativo (BRAUNA_PROFILE).
+    """
+    return MODO_PROFILE not in ("0", "", "false")
+
+
+def classificar_fase(arquivo):
+    """
+    Retorna a fase de um arquivo de código-fonte.
+
+    Args:
+        arquivo (str): Caminho do arquivo (como registrado pelo cProfile).
+    """
+    caminho = arquivo.replace("\\", "/")
+    if caminho.startswith("~") or caminho.startswith("<"):
+        # Funções embutidas: atribuídas pelo nome (ex: json.loads, socket.recv)
+        caminho = caminho.lower()
+    for fase, trechos in FASES:
+        if any(trecho in caminho for trecho in trechos):
+            return fase
+    return "outros"
+
+
+def resumir_estatisticas(estatisticas, top_n=TOP_N):
+    """
+    Agrupa o tempo próprio das funções por fase e lista as mais custosas.
+
+    Args:
+        estatisticas (pstats.Stats): Estatísticas do cProfile.
+        top_n (int): Quantidade de funções na tabela.
+
+    Returns:
+        tuple: (fases, top) onde `fases` é {fase: ms} e `top` é uma lista de
+            dicionários {"funcao", "fase", "chamadas", "proprio_ms", "acumulado_ms"}.
+    """
+    fases = {}
+    funcoes = []
+    for (arquivo, linha, nome), (_, chamadas, proprio, acumulado, _) in estatisticas.stats.items():
+        referencia = f"{nome} {arquivo}" if arquivo == "~" else arquivo
+        fase = classificar_fase(referencia)
+        fases[fase] = fases.get(fase, 0.0) + proprio * 1000
+        funcoes.append({
+            "funcao": f"{Path(arquivo).name}:{linha}({nome})" if arquivo != "~" else nome,
+            "fase": fase,
+            "chamadas": chamadas,
+            "proprio_ms": round(proprio * 1000, 2),
+            "acumulado_ms": round(acumulado * 1000, 2),
+        })
+
+    top = sorted(funcoes, key=lambda f: f["acumulado_ms"], reverse=True)[:top_n]
+    return {fase: round(ms, 2) for fase, ms in sorted(fases.items(), key=lambda x: -x[1])}, top
+
+
+def _nome_arquivo(pagina, extensao):
+    """Caminho do arquivo de perfil de uma página."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return PROFILE_DIR / f"{pagina}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.{extensao}"
+
+
+def _rotacionar(maximo=MAX_ARQUIVOS):
+    """Remove os arquivos de perfil mais antigos, mantendo os `maximo` mais recentes."""
+    arquivos = [a for a in PROFILE_DIR.glob("*") if a.suffix in (".prof", ".html") and a.is_file()]
+    if len(arquivos) <= maximo:
+        return
+    arquivos.sort(key=lambda a: a.stat().st_mtime)
+    for arquivo in arquivos[:len(arquivos) - maximo]:
+        try:
+            arquivo.unlink()
+        except OSError as e:
+            logger.warning(f"Não foi possível remover o perfil antigo {arquivo.name}: {e}")
+
+
+@contextmanager
+def perfilar(pagina, ativo=True):
+    """
+    Executa o bloco sob o profiler e preenche o resultado ao final.
+
+    Exemplo:
+        with perfilar("dashboard") as resultado:
+            render_dashboard_page()
+        resultado["fases"]  # {"render": 120.5, "carga": 80.1, ...}
+
+    Args:
+        pagina (str): Nome da página (usado no nome do arquivo).
+        ativo (bool): Se False, o bloco é executado sem profiling.
+
+    Yields:
+        dict: Preenchido ao final com "pagina", "total_ms", "fases", "top" e "arquivo".
+    """
+    resultado = {"pagina": pagina}
+    if not ativo:
+        yield resultado
+        return
+
+    usar_pyinstrument = MODO_PROFILE == "pyinstrument" and PYINSTRUMENT_AVAILABLE
+    amostrador = PyinstrumentProfiler() if usar_pyinstrument else None
+    perfil = cProfile.Profile()
+
+    try:
+        perfil.enable()
+    except ValueError as e:
+        # Outro profiler já está ativo no processo (ex: depurador)
+        logger.warning(f"Profiling indisponível neste rerun: {e}")
+        yield resultado
+        return
+
+    inicio = time.perf_counter()
+    if amostrador:
+        amostrador.start()
+    try:
+        yield resultado
+    finally:
+        perfil.disable()
+        if amostrador:
+            amostrador.stop()
+        resultado["total_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+
+        try:
+            estatisticas = pstats.Stats(perfil)
+            resultado["fases"], resultado["top"] = resumir_estatisticas(estatisticas)
+
+            arquivo = _nome_arquivo(pagina, "prof")
+            estatisticas.dump_stats(str(arquivo))
+            resultado["arquivo"] = str(arquivo)
+
+            if amostrador:
+                arquivo_html = _nome_arquivo(pagina, "html")
+                with open(arquivo_html, "w", encoding="utf-8") as file:
+                    file.write(amostrador.output_html())
+                resultado["arquivo_html"] = str(arquivo_html)
+
+            _rotacionar()
+            logger.info(f"Perfil de '{pagina}': {resultado['total_ms']:.0f} ms, fases {resultado['fases']}")
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar o perfil de '{pagina}': {e}")
@@ -0,0 +1,70 @@
+"""
+Conjuntos de dados sintéticos para os benchmarks.
+
+Reaproveita os geradores de `app.data.init_data`, parametrizados para simular
+usuários com muito histórico (1 mil a 1 milhão de gastos).
+"""
+import random
+from datetime import datetime, timedelta
+
+from app.data import init_data
+
+# Gastos variáveis por mês nos conjuntos grandes (mais os 5 fixos do gerador)
+GASTOS_POR_MES = 95
+
+
+def gerar_gastos(quantidade, semente=42):
+    """
+    Gera exatamente `quantidade` gastos, distribuídos em tantos meses quanto necessário.
+
+    Args:
+        quantidade (int): Número de gastos.
+        semente (int): Semente do gerador aleatório (resultados reprodutíveis).
+
+    Returns:
+        list: Lista de gastos no formato do aplicativo.
+    """
+    random.seed(semente)
+    por_mes = GASTOS_POR_MES + 5
+    meses = max(1, -(-quantidade // por_mes))
+    gastos = init_data.gerar_dados_gastos(meses=meses, gastos_por_mes=GASTOS_POR_MES)
+    return gastos[:quantidade]
+
+
+def gerar_investimentos(quantidade):
+    """Gera `quantidade` investimentos a partir dos exemplos do aplicativo."""
+    return init_data.gerar_dados_investimentos(quantidade)
+
+
+def gerar_objetivos(quantidade):
+    """Gera `quantidade` objetivos a partir dos exemplos do aplicativo."""
+    return init_data.gerar_dados_objetivos(quantidade)
+
+
+def objetivos_para_alocacao(objetivos, semente=42):
+    """
+    Converte objetivos do aplicativo para o formato de `calculations.allocate_resources`.
+    """
+    random.seed(semente)
+    hoje = datetime.now()
+    return [
+        {
+            "id": objetivo["id"],
+            "name": objetivo["descricao"],
+            "target_amount": objetivo["valor_total"],
+            "current_amount": objetivo["valor_acumulado"],
+            "deadline": hoje + timedelta(days=random.randint(30, 3650)),
+            "priority": random.randint(1, 3),
+            "expected_return_rate": 0.08,
+        }
+        for objetivo in objetivos
+    ]
+
+
+def objetivos_para_modelo(objetivos):
+    """
+    Converte objetivos do aplicativo para o formato de `app.models.goals.Goal`,
+    como lidos por `load_goals` (IDs inteiros e datas já em datetime).
+    """
+    return [dict(objetivo, id=i) for i, objetivo in enumerate(objetivos_para_alocacao(objetivos), start=1)]
+
@@ -0,0 +1,287 @@
+"""
+Substituto local do Supabase para os benchmarks.
+
+Implementa, em memória, a parte da API do cliente usada pelo aplicativo
+(`table().select().eq().gte().lte().or_().order().limit().execute()`, com a
+contagem de `select(..., count="exact")`, além de insert/upsert/update/delete), de forma que os caminhos de leitura e gravação
+do `supabase_client` possam ser medidos sem rede. Uma latência fixa por
+requisição pode ser simulada com `latencia`.
+
+A coluna `updated_at` segue o esquema real: o trigger BEFORE UPDATE a
+atualiza em `update()` e nos conflitos de `upsert()`; em uma inserção, o
+valor enviado pelo cliente é mantido (e o padrão da coluna vale quando ele
+não é enviado), a não ser que o trigger BEFORE INSERT de
+scripts/7_add_delta_sync.sql seja simulado com `gatilho_insercao`. As
+exclusões nas tabelas das coleções ficam em `registros_excluidos`, como
+faz o trigger AFTER DELETE do mesmo script.
+"""
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+# Tabelas com exclusões registradas em registros_excluidos (scripts/7_add_delta_sync.sql)
+TABELAS_COM_EXCLUSAO = {"gastos", "investimentos", "dividas", "objetivos", "seguros"}
+
+# Termo de filtro no formato do PostgREST: coluna.operador."valor"
+_TERMO = re.compile(r'(\w+)\.(eq|neq|gt|gte|lt|lte)\."((?:[^"\\]|\\.)*)"')
+
+_OPERADORES = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def _comparavel(valor):
+    """Converte o valor para comparação textual (como o PostgREST recebe os filtros)."""
+    return "" if valor is None else str(valor)
+
+
+def _dividir_clausulas(expressao):
+    """Divide uma expressão `or_()` nas vírgulas de primeiro nível."""
+    partes, nivel, atual = [], 0, ""
+    for caractere in expressao:
+        if caractere == "(":
+            nivel += 1
+        elif caractere == ")":
+            nivel -= 1
+        if caractere == "," and nivel == 0:
+            partes.append(atual)
+            atual = ""
+        else:
+            atual += caractere
+    if atual:
+        partes.append(atual)
+    return partes
+
+
+def _filtro_ou(expressao):
+    """Converte uma expressão `or_()` (com `and(...)` aninhados) em um predicado."""
+    clausulas = []
+    for parte in _dividir_clausulas(expressao):
+        termos = [(col, op, val) for col, op, val in _TERMO.findall(parte)]
+        clausulas.append(termos)
+
+    def predicado(registro):
+        return any(
+            all(_OPERADORES[op](_comparavel(registro.get(col)), val) for col, op, val in termos)
+            for termos in clausulas
+        )
+    return predicado
+
+
+class FakeQuery:
+    """Consulta encadeável sobre uma tabela em memória."""
+
+    def __init__(self, banco, tabela):
+        self.banco = banco
+        self.tabela = tabela
+        self.operacao = "select"
+        self.colunas = None
+        self.contagem = None
+        self.dados = None
+        self.on_conflict = None
+        self.filtros = []
+        self.ordem = []
+        self.limite = None
+
+    # Operações
+    def select(self, colunas="*", **kwargs):
+        self.operacao = "select"
+        self.colunas = None if colunas == "*" else [c.strip() for c in colunas.split(",")]
+        self.contagem = kwargs.get("count")
+        return self
+
+    def insert(self, dados, **kwargs):
+        self.operacao, self.dados = "insert", dados
+        return self
+
+    def upsert(self, dados, on_conflict="id", **kwargs):
+        self.operacao, self.dados, self.on_conflict = "upsert", dados, on_conflict or "id"
+        return self
+
+    def update(self, dados, **kwargs):
+        self.operacao, self.dados = "update", dados
+        return self
+
+    def delete(self, **kwargs):
+        self.operacao = "delete"
+        return self
+
+    # Filtros
+    def _filtrar(self, coluna, operador, valor):
+        self.filtros.append(lambda r: _OPERADORES[operador](_comparavel(r.get(coluna)), _comparavel(valor)))
+        return self
+
+    def eq(self, coluna, valor):
+        return self._filtrar(coluna, "eq", valor)
+
+    def gte(self, coluna, valor):
+        return self._filtrar(coluna, "gte", valor)
+
+    def lte(self, coluna, valor):
+        return self._filtrar(coluna, "lte", valor)
+
+    def gt(self, coluna, valor):
+        return self._filtrar(coluna, "gt", valor)
+
+    def lt(self, coluna, valor):
+        return self._filtrar(coluna, "lt", valor)
+
+    def or_(self, expressao):
+        self.filtros.append(_filtro_ou(expressao))
+        return self
+
+    def order(self, coluna, desc=False, **kwargs):
+        self.ordem.append((coluna, desc))
+        return self
+
+    def limit(self, quantidade):
+        self.limite = quantidade
+        return self
+
+    # Execução
+    def execute(self):
+        self.banco.requisicoes += 1
+        if self.banco.latencia:
+            time.sleep(self.banco.latencia)
+
+        linhas = self.banco.tabelas.setdefault(self.tabela, [])
+        selecionadas = [r for r in linhas if all(f(r) for f in self.filtros)]
+
+        if self.operacao == "select":
+            total = len(selecionadas) if self.contagem else None
+            for coluna, desc in reversed(self.ordem):
+                selecionadas.sort(key=lambda r: _comparavel(r.get(coluna)), reverse=desc)
+            if self.limite is not None:
+                selecionadas = selecionadas[:self.limite]
+            if self.colunas:
+                selecionadas = [{c: r.get(c) for c in self.colunas} for r in selecionadas]
+            else:
+                selecionadas = [dict(r) for r in selecionadas]
+            return SimpleNamespace(data=selecionadas, count=total)
+
+        agora = self.banco.agora()
+        if self.operacao == "delete":
+            removidas = {id(r) for r in selecionadas}
+            self.banco.tabelas[self.tabela] = [r for r in linhas if id(r) not in removidas]
+            if self.tabela in TABELAS_COM_EXCLUSAO:
+                self.banco.tabelas.setdefault("registros_excluidos", []).extend(
+                    {"tabela": self.tabela, "registro_id": r.get("id"),
+                     "user_id": r.get("user_id"), "deleted_at": agora}
+                    for r in selecionadas
+                )
+            return SimpleNamespace(data=selecionadas)
+
+        if self.operacao == "update":
+            for registro in selecionadas:
+                registro.update(self.dados)
+                # Trigger BEFORE UPDATE (scripts/3_create_triggers_and_policies.sql)
+                registro["updated_at"] = agora
+            return SimpleNamespace(data=selecionadas)
+
+        novos = self.dados if isinstance(self.dados, list) else [self.dados]
+        existentes = {}
+        if self.operacao == "upsert":
+            existentes = {r.get(self.on_conflict): r for r in linhas}
+        gravados = []
+        for dados in novos:
+            registro = existentes.get(dados.get(self.on_conflict)) if existentes else None
+            if registro is not None:
+                # Conflito: atualiza apenas as colunas enviadas e dispara o trigger BEFORE UPDATE
+                registro.update(dados)
+                registro["updated_at"] = agora
+            else:
+                # Inserção: sem o trigger BEFORE INSERT, o updated_at enviado pelo
+                # cliente é mantido; sem ele, vale o padrão da coluna
+                registro = dict(dados)
+                registro.setdefault("id", str(uuid.uuid4()))
+                if self.banco.gatilho_insercao or not registro.get("updated_at"):
+                    registro["updated_at"] = agora
+                linhas.append(registro)
+            gravados.append(dict(registro))
+        return SimpleNamespace(data=gravados)
+
+
+class FakeSupabaseClient:
+    """
+    Cliente Supabase em memória.
+
+    Args:
+        user_id (str): ID do usuário "autenticado".
+        latencia (float): Espera simulada por requisição (segundos).
+        gatilho_insercao (bool): Simula o trigger BEFORE INSERT de `updated_at`
+            (bancos que ainda não executaram scripts/7_add_delta_sync.sql não o têm).
+    """
+
+    def __init__(self, user_id=None, latencia=0.0, gatilho_insercao=False):
+        self.user_id = user_id or str(uuid.uuid4())
+        self.latencia = latencia
+        self.gatilho_insercao = gatilho_insercao
+        self.tabelas = {}
+        self.requisicoes = 0
+        self._relogio = 0
+        usuario = SimpleNamespace(id=self.user_id, email="benchmark@brauna.local",
+                                  user_metadata={"nome": "Benchmark"})
+        self.auth = SimpleNamespace(get_user=lambda: SimpleNamespace(user=usuario))
+
+    def agora(self):
+        """Timestamp crescente usado em `updated_at`."""
+        self._relogio += 1
+        return f"2025-01-01T00:00:00.{self._relogio:06d}+00:00"
+
+    def table(self, nome):
+        return FakeQuery(self, nome)
+
+    def carregar(self, tabela, registros):
+        """Popula uma tabela com registros do usuário (sem contar como requisição)."""
+        linhas = self.tabelas.setdefault(tabela, [])
+        for registro in registros:
+            linha = dict(registro)
+            linha["user_id"] = self.user_id
+            linha["updated_at"] = self.agora()
+            linhas.append(linha)
+
+    @property
+    def usuario(self):
+        """Usuário no formato retornado por `get_current_user`."""
+        return {"id": self.user_id, "email": "benchmark@brauna.local", "nome": "Benchmark"}
+
+
+@contextmanager
+def supabase_local(cliente, autenticado=True):
+    """
+    Faz o aplicativo usar o cliente em memória durante o bloco.
+
+    Fora do `streamlit run` a sessão não guarda valores entre acessos, então o
+    cliente e o usuário são injetados diretamente nos módulos.
+
+    Args:
+        cliente (FakeSupabaseClient): Cliente em memória.
+        autenticado (bool): Se False, simula um usuário não autenticado
+            (os caminhos de armazenamento local são usados).
+    """
+    from app.database import supabase_client
+    from app.data import data_handler
+
+    usuario = (lambda: cliente.usuario) if autenticado else (lambda: None)
+    originais = {
+        (supabase_client, "get_supabase_client"): supabase_client.get_supabase_client,
+        (supabase_client, "get_current_user"): supabase_client.get_current_user,
+        (data_handler, "get_supabase_client"): data_handler.get_supabase_client,
+        (data_handler, "get_current_user"): data_handler.get_current_user,
+    }
+    try:
+        supabase_client.get_supabase_client = lambda: cliente
+        supabase_client.get_current_user = usuario
+        data_handler.get_supabase_client = lambda: cliente
+        data_handler.get_current_user = usuario
+        yield cliente
+    finally:
+        for (modulo, nome), funcao in originais.items():
+            setattr(modulo, nome, funcao)
@@ -0,0 +1,527 @@
+"""
+Executa os benchmarks dos caminhos críticos com usuários sintéticos grandes.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --tamanhos 1000 10000 100000 1000000
+    python -m benchmarks.run_benchmarks --filtro supabase --comparar benchmarks/results/anterior.json
+
+Os resultados são gravados em JSON em `benchmarks/results/` (um arquivo por
+execução, com o commit atual no nome), para comparar execuções entre commits.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import atexit
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Garantir que o pacote `app` seja encontrado ao executar a partir da raiz
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+from benchmarks import datasets
+from benchmarks.fake_supabase import FakeSupabaseClient, supabase_local
+from app.data import compressao
+
+RESULTADOS_DIR = RAIZ / "benchmarks" / "results"
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000]
+
+# Variação acima da qual uma comparação é considerada regressão
+LIMITE_REGRESSAO = 1.2
+
+BENCHMARKS = {}
+
+
+def benchmark(nome, tamanho_maximo=None):
+    """
+    Registra um benchmark.
+
+    A função decorada recebe o tamanho do conjunto e retorna a função (sem
+    argumentos) a ser medida; a preparação dos dados fica fora da medição.
+    Também pode retornar uma tupla (função, métricas), com métricas extras
+    gravadas junto dos tempos (ex: tamanho em bytes de um backup).
+
+    Args:
+        nome (str): Nome do benchmark (prefixo indica a área: mapper, supabase...).
+        tamanho_maximo (int, optional): Maior tamanho em que o benchmark é executado.
+    """
+    def registrar(preparar):
+        BENCHMARKS[nome] = {"preparar": preparar, "tamanho_maximo": tamanho_maximo}
+        return preparar
+    return registrar
+
+
+@contextmanager
+def armazenamento_temporario():
+    """
+    Redireciona os arquivos locais do data_handler para um diretório temporário
+    e desativa o envio em segundo plano (as gravações são medidas por completo).
+    """
+    from app.data import data_handler
+
+    legados = ["USER_FILE", "GASTOS_FILE", "INVESTIMENTOS_FILE", "DIVIDAS_FILE", "SEGUROS_FILE", "OBJETIVOS_FILE"]
+    nomes = ["DATA_DIR", "USUARIOS_DIR", "OUTBOX_DIR", "WRITE_BEHIND_ATIVO"] + legados
+    originais = {nome: getattr(data_handler, nome) for nome in nomes}
+    with tempfile.TemporaryDirectory(prefix="brauna_bench_") as diretorio:
+        base = Path(diretorio)
+        data_handler.DATA_DIR = base
+        data_handler.USUARIOS_DIR = base / "usuarios"
+        data_handler.OUTBOX_DIR = base / "outbox"
+        data_handler.WRITE_BEHIND_ATIVO = False
+        # Os arquivos globais antigos não devem ser migrados para o diretório temporário
+        for nome in legados:
+            setattr(data_handler, nome, base / "legado" / originais[nome].name)
+        try:
+            yield base
+        finally:
+            for nome, valor in originais.items():
+                setattr(data_handler, nome, valor)
+
+
+def _diretorio_temporario():
+    """Diretório temporário removido ao fim da execução (dados que persistem entre repetições)."""
+    diretorio = tempfile.mkdtemp(prefix="brauna_bench_")
+    atexit.register(shutil.rmtree, diretorio, ignore_errors=True)
+    return Path(diretorio)
+
+
+def _cliente_com_gastos(n):
+    """Cria um cliente em memória com `n` gastos do usuário."""
+    cliente = FakeSupabaseClient()
+    cliente.carregar("gastos", datasets.gerar_gastos(n))
+    return cliente
+
+
+# === Benchmarks ===
+
+@benchmark("geracao.gastos")
+def bench_geracao_gastos(n):
+    return lambda: datasets.gerar_gastos(n)
+
+
+@benchmark("mapper.normalizar_gastos")
+def bench_normalizar_gastos(n):
+    from app.database.data_mapper import normalizar_gasto
+    gastos = datasets.gerar_gastos(n)
+    return lambda: [normalizar_gasto(g) for g in gastos]
+
+
+@benchmark("supabase.iter_user_data")
+def bench_iter_user_data(n):
+    from app.database import supabase_client
+    cliente = _cliente_com_gastos(n)
+
+    def executar():
+        with supabase_local(cliente):
+            return sum(1 for _ in supabase_client.iter_user_data("gastos", cliente.user_id))
+    return executar
+
+
+@benchmark("supabase.load_gastos_mes")
+def bench_load_gastos_mes(n):
+    from app.database import supabase_client
+    from app.data.data_handler import limites_do_mes
+    cliente = _cliente_com_gastos(n)
+    inicio, fim = limites_do_mes(datetime.now().strftime("%Y-%m"))
+
+    def executar():
+        with supabase_local(cliente):
+            return supabase_client.load_gastos(date_from=inicio, date_to=fim, order_by=("data", "id"))
+    return executar
+
+
+@benchmark("supabase.sync_collection_delta")
+def bench_sync_collection(n):
+    from app.database import supabase_client
+    cliente = _cliente_com_gastos(n)
+    cache = [dict(r) for r in cliente.tabelas["gastos"]]
+    marca = max(r["updated_at"] for r in cache)
+
+    # 1% dos registros alterados desde a última sincronização
+    alterados = [dict(r, valor=r["valor"] + 1) for r in cache[:max(1, n // 100)]]
+    cliente.table("gastos").upsert(alterados, on_conflict="id").execute()
+
+    def executar():
+        with supabase_local(cliente):
+            return supabase_client.sync_collection("gastos", cache=cache, watermark=marca, user_id=cliente.user_id)
+    return executar
+
+
+@benchmark("supabase.save_gastos")
+def bench_supabase_save_gastos(n):
+    from app.database import supabase_client
+    cliente = FakeSupabaseClient()
+    gastos = datasets.gerar_gastos(n)
+
+    def executar():
+        with supabase_local(cliente):
+            return supabase_client.save_gastos(gastos)
+    return executar
+
+
+@benchmark("data_handler.save_gastos_local")
+def bench_save_gastos_local(n):
+    from app.data import data_handler
+    cliente = FakeSupabaseClient()
+    gastos = datasets.gerar_gastos(n)
+
+    def executar():
+        with armazenamento_temporario(), supabase_local(cliente, autenticado=False):
+            return data_handler.save_gastos(gastos)
+    return executar
+
+
+@benchmark("data_handler.load_gastos_local")
+def bench_load_gastos_local(n):
+    from app.data import data_handler
+    from app.data import storage
+    cliente = FakeSupabaseClient()
+    gastos = datasets.gerar_gastos(n)
+
+    def executar():
+        with armazenamento_temporario(), supabase_local(cliente, autenticado=False):
+            storage.gravar_json(data_handler.arquivo_usuario("gastos"), gastos, indent=None)
+            return data_handler.load_gastos()
+    return executar
+
+
+def _cliente_com_colecoes(n, latencia):
+    """Cliente em memória com as coleções do dashboard e latência simulada por requisição."""
+    cliente = FakeSupabaseClient(latencia=latencia)
+    cliente.carregar("gastos", datasets.gerar_gastos(n))
+    cliente.carregar("investimentos", datasets.gerar_investimentos(max(1, n // 100)))
+    cliente.carregar("objetivos", datasets.gerar_objetivos(max(1, n // 1000)))
+    cliente.carregar("dividas", [])
+    cliente.carregar("seguros", [])
+    return cliente
+
+
+@benchmark("data_handler.load_dashboard_sequencial", tamanho_maximo=10_000)
+def bench_load_dashboard_sequencial(n):
+    from app.data import data_handler
+    cliente = _cliente_com_colecoes(n, latencia=0.02)
+    cargas = [data_handler.load_objetivos, data_handler.load_investimentos, data_handler.load_dividas,
+              data_handler.load_gastos, data_handler.load_seguros]
+
+    def executar():
+        with armazenamento_temporario(), supabase_local(cliente):
+            return [carregar() for carregar in cargas]
+    return executar
+
+
+@benchmark("data_handler.load_all", tamanho_maximo=10_000)
+def bench_load_all(n):
+    from app.data import data_handler
+    cliente = _cliente_com_colecoes(n, latencia=0.02)
+
+    def executar():
+        with armazenamento_temporario(), supabase_local(cliente):
+            return data_handler.load_all(["objetivos", "investimentos", "dividas", "gastos", "seguros"])
+    return executar
+
+
+def _registrar_compressao(algoritmo):
+    """Registra os benchmarks de compressão e descompressão de um algoritmo."""
+    def _dados(n):
+        return json.dumps(datasets.gerar_gastos(n), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @benchmark(f"backup.comprimir_{algoritmo}")
+    def bench_comprimir(n):
+        dados = _dados(n)
+        comprimido = compressao.comprimir(dados, algoritmo)
+        metricas = {"bytes_original": len(dados), "bytes": len(comprimido),
+                    "razao": round(len(dados) / len(comprimido), 2)}
+        return (lambda: compressao.comprimir(dados, algoritmo)), metricas
+
+    @benchmark(f"backup.descomprimir_{algoritmo}")
+    def bench_descomprimir(n):
+        caminho = _diretorio_temporario() / f"gastos.json{compressao.extensao(algoritmo)}"
+        caminho.write_bytes(compressao.comprimir(_dados(n), algoritmo))
+        # Leitura em fluxo, como na restauração dos backups
+        return lambda: compressao.ler_bytes(caminho)
+
+
+_registrar_compressao("gzip")
+if compressao.ZSTD_AVAILABLE:
+    _registrar_compressao("zstd")
+
+
+@benchmark("backup.incremental_snapshot", tamanho_maximo=100_000)
+def bench_backup_incremental(n):
+    from app.data.backups.incremental import ArmazemBackups
+    gastos = datasets.gerar_gastos(n)
+    armazem = ArmazemBackups(_diretorio_temporario() / "backups")
+    _, _, inicial = armazem.criar_snapshot({"gastos": gastos})
+
+    # Snapshot seguinte com um gasto alterado e um novo: só os blocos afetados são gravados
+    alterados = [dict(gastos[0], valor=gastos[0]["valor"] + 1)] + gastos[1:] + [dict(gastos[-1], id="bench-novo")]
+    _, _, incremental = armazem.criar_snapshot({"gastos": alterados})
+    metricas = {"bytes_inicial": inicial.get("bytes_gravados"), "bytes_incremental": incremental.get("bytes_gravados")}
+    return (lambda: armazem.criar_snapshot({"gastos": alterados})), metricas
+
+
+@benchmark("dashboard.calcular_gastos_periodo")
+def bench_calcular_gastos_periodo(n):
+    from app.ui.dashboard_page import calcular_gastos_periodo, obter_meses_anteriores
+    gastos = datasets.gerar_gastos(n)
+    meses = obter_meses_anteriores(6)
+    return lambda: [calcular_gastos_periodo(gastos, m["formato_numerico"]) for m in meses]
+
+
+@benchmark("dashboard.criar_grafico_tendencia_gastos", tamanho_maximo=100_000)
+def bench_grafico_tendencia(n):
+    from app.ui.dashboard_page import criar_grafico_tendencia_gastos, obter_meses_anteriores
+    gastos = datasets.gerar_gastos(n)
+    meses = obter_meses_anteriores(6)
+    return lambda: criar_grafico_tendencia_gastos(gastos, meses)
+
+
+@benchmark("gastos.lista_pagina")
+def bench_lista_pagina(n):
+    import pandas as pd
+    from app.ui.gastos_page import paginar, html_cards_gastos
+    df = pd.DataFrame(datasets.gerar_gastos(n)).iloc[::-1]
+    return lambda: html_cards_gastos(paginar(df, 1, 50)[0])
+
+
+def _moeda_por_linha(valor):
+    # Implementação anterior, copiada em cada página
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+@benchmark("formatacao.moeda_por_linha")
+def bench_moeda_por_linha(n):
+    import pandas as pd
+    valores = pd.Series([g["valor"] for g in datasets.gerar_gastos(n)])
+    return lambda: valores.apply(_moeda_por_linha)
+
+
+@benchmark("formatacao.moeda_vetorizada")
+def bench_moeda_vetorizada(n):
+    import pandas as pd
+    from app.utils.formatting import formatar_moeda_serie
+    valores = pd.Series([g["valor"] for g in datasets.gerar_gastos(n)])
+    return lambda: formatar_moeda_serie(valores)
+
+
+@benchmark("formatacao.data_por_linha")
+def bench_data_por_linha(n):
+    import pandas as pd
+    datas = pd.Series([g["data"] for g in datasets.gerar_gastos(n)])
+    return lambda: datas.apply(lambda d: datetime.strptime(d, "%Y-%m-%d").strftime("%d/%m/%Y"))
+
+
+@benchmark("formatacao.data_vetorizada")
+def bench_data_vetorizada(n):
+    import pandas as pd
+    from app.utils.formatting import formatar_data_serie
+    datas = pd.Series([g["data"] for g in datasets.gerar_gastos(n)])
+    return lambda: formatar_data_serie(datas)
+
+
+def _dividas_com_vencimento(n):
+    from datetime import timedelta
+    hoje = datetime.now().date()
+    return [
+        {"id": str(i), "data_vencimento": (hoje + timedelta(days=(i * 7) % 730 - 365)).isoformat()}
+        for i in range(n)
+    ]
+
+
+@benchmark("vencimentos.strptime_por_item")
+def bench_vencimentos_strptime(n):
+    dividas = _dividas_com_vencimento(n)
+
+    def executar():
+        # Implementação anterior do dashboard: converter todas as datas a cada rerun
+        hoje = datetime.now().date()
+        proximos = []
+        for divida in dividas:
+            dias = (datetime.strptime(divida["data_vencimento"], "%Y-%m-%d").date() - hoje).days
+            if 0 <= dias <= 30:
+                proximos.append((divida, dias))
+        return sorted(proximos, key=lambda par: par[1])
+    return executar
+
+
+@benchmark("vencimentos.indice_consulta")
+def bench_vencimentos_indice(n):
+    from app.data.vencimentos import IndiceVencimentos
+    indice = IndiceVencimentos(_dividas_com_vencimento(n))
+    return lambda: indice.vencendo_em(30)
+
+
+@benchmark("vencimentos.indice_construcao")
+def bench_vencimentos_construcao(n):
+    from app.data.vencimentos import IndiceVencimentos
+    dividas = _dividas_com_vencimento(n)
+    return lambda: IndiceVencimentos(dividas)
+
+
+@benchmark("modelos.goal_validado")
+def bench_goal_validado(n):
+    from app.models.goals import Goal
+    objetivos = datasets.objetivos_para_modelo(datasets.gerar_objetivos(n))
+    return lambda: [Goal(**objetivo) for objetivo in objetivos]
+
+
+@benchmark("modelos.goal_registro")
+def bench_goal_registro(n):
+    from app.models.goals import GoalRecord
+    objetivos = datasets.objetivos_para_modelo(datasets.gerar_objetivos(n))
+    return lambda: [GoalRecord(**objetivo) for objetivo in objetivos]
+
+
+@benchmark("projecoes.allocate_resources", tamanho_maximo=100_000)
+def bench_allocate_resources(n):
+    from app.utils.calculations import allocate_resources
+    objetivos = datasets.objetivos_para_alocacao(datasets.gerar_objetivos(n))
+    return lambda: allocate_resources(5000.0, objetivos)
+
+
+@benchmark("projecoes.compound_interest")
+def bench_compound_interest(n):
+    from app.utils.calculations import compound_interest
+    investimentos = datasets.gerar_investimentos(n)
+    return lambda: [
+        compound_interest(i["valor_atual"], i["rendimento_anual"], 10, 500) for i in investimentos
+    ]
+
+
+# === Execução ===
+
+def _repeticoes(n):
+    """Quantidade de repetições de acordo com o tamanho do conjunto."""
+    if n >= 1_000_000:
+        return 1
+    if n >= 100_000:
+        return 3
+    return 5
+
+
+def medir(preparar, n, repeticoes=None):
+    """
+    Mede uma função preparada para o tamanho `n`.
+
+    Returns:
+        dict: Tempos mínimo e mediano (segundos), vazão em linhas por segundo
+            e as métricas extras do benchmark.
+    """
+    funcao = preparar(n)
+    metricas = {}
+    if isinstance(funcao, tuple):
+        funcao, metricas = funcao
+    repeticoes = repeticoes or _repeticoes(n)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    minimo = min(tempos)
+    return {
+        "min_s": round(minimo, 6),
+        "mediana_s": round(statistics.median(tempos), 6),
+        "repeticoes": repeticoes,
+        "linhas_por_s": round(n / minimo) if minimo > 0 else None,
+        **metricas,
+    }
+
+
+def commit_atual():
+    """Retorna o hash curto do commit atual (ou "desconhecido")."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "desconhecido"
+
+
+def comparar(resultados, arquivo_anterior, limite=LIMITE_REGRESSAO):
+    """
+    Compara os resultados com uma execução anterior e lista as regressões.
+
+    Returns:
+        list: Descrições das regressões encontradas.
+    """
+    with open(arquivo_anterior, "r", encoding="utf-8") as file:
+        anterior = json.load(file)
+    referencia = {(r["benchmark"], r["tamanho"]): r for r in anterior.get("resultados", [])}
+
+    regressoes = []
+    for resultado in resultados:
+        base = referencia.get((resultado["benchmark"], resultado["tamanho"]))
+        if not base or not base.get("min_s"):
+            continue
+        razao = resultado["min_s"] / base["min_s"]
+        marcador = "REGRESSÃO" if razao > limite else ""
+        print(f"  {resultado['benchmark']:<42} {resultado['tamanho']:>9}  "
+              f"{base['min_s']:.4f}s -> {resultado['min_s']:.4f}s  ({razao:.2f}x) {marcador}")
+        if razao > limite:
+            regressoes.append(f"{resultado['benchmark']}[{resultado['tamanho']}]: {razao:.2f}x")
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Brauna Finanças")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO,
+                        help="Quantidades de linhas dos conjuntos (padrão: 1000 10000 100000)")
+    parser.add_argument("--filtro", default="", help="Executa apenas benchmarks cujo nome contém o texto")
+    parser.add_argument("--repeticoes", type=int, default=None, help="Repetições por medição")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    parser.add_argument("--comparar", default=None, help="Arquivo JSON de uma execução anterior")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for nome, definicao in BENCHMARKS.items():
+        if args.filtro not in nome:
+            continue
+        for n in args.tamanhos:
+            if definicao["tamanho_maximo"] and n > definicao["tamanho_maximo"]:
+                continue
+            medicao = medir(definicao["preparar"], n, args.repeticoes)
+            resultados.append({"benchmark": nome, "tamanho": n, **medicao})
+            extras = "".join(f"  {chave}={valor}" for chave, valor in medicao.items()
+                             if chave not in ("min_s", "mediana_s", "repeticoes", "linhas_por_s"))
+            print(f"{nome:<42} {n:>9}  min {medicao['min_s']:.4f}s  "
+                  f"mediana {medicao['mediana_s']:.4f}s  ({medicao['linhas_por_s'] or 0:,} linhas/s){extras}")
+
+    commit = commit_atual()
+    saida = Path(args.saida) if args.saida else (
+        RESULTADOS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json"
+    )
+    os.makedirs(saida.parent, exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as file:
+        json.dump({
+            "commit": commit,
+            "data": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "resultados": resultados,
+        }, file, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar:
+        print(f"\nComparação com {args.comparar}:")
+        regressoes = comparar(resultados, args.comparar)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressões acima de {LIMITE_REGRESSAO:.0%} do tempo anterior:")
+            for regressao in regressoes:
+                print(f"  - {regressao}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Verificações de correção dos caminhos do Supabase, com o Supabase em memória.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.verificacoes
+
+Cada verificação falha com AssertionError se o resultado divergir do
+esperado; o código de saída é 1 se alguma falhar.
+"""
+import sys
+import traceback
+from pathlib import Path
+
+# Garantir que o pacote `app` seja encontrado ao executar a partir da raiz
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+from benchmarks import datasets
+from benchmarks.fake_supabase import FakeSupabaseClient, supabase_local
+
+VERIFICACOES = {}
+
+
+def verificacao(funcao):
+    """Registra uma verificação (função sem argumentos)."""
+    VERIFICACOES[funcao.__name__] = funcao
+    return funcao
+
+
+@verificacao
+def gravacao_completa_e_sincronizacao():
+    """
+    Uma gravação completa (exclui e reinsere a coleção) seguida de uma
+    sincronização incremental mantém todos os registros gravados, com ou sem
+    o trigger BEFORE INSERT de `updated_at` no banco.
+    """
+    from app.database import supabase_client
+
+    for gatilho_insercao in (False, True):
+        cliente = FakeSupabaseClient(gatilho_insercao=gatilho_insercao)
+        cliente.carregar("gastos", datasets.gerar_gastos(300))
+
+        with supabase_local(cliente):
+            cache, marca = supabase_client.sync_collection("gastos", user_id=cliente.user_id)
+
+            # Lista editada a partir da cópia sincronizada: os registros mantêm o updated_at antigo
+            gastos = [dict(g) for g in cache[1:]]
+            gastos[0]["valor"] = gastos[0]["valor"] + 10
+            supabase_client.replace_user_collection("gastos", gastos, cliente.user_id, client=cliente)
+
+            registros, _ = supabase_client.sync_collection(
+                "gastos", cache=cache, watermark=marca, user_id=cliente.user_id
+            )
+
+        por_id = {r["id"]: r for r in registros}
+        assert set(por_id) == {g["id"] for g in gastos}, (
+            f"gatilho_insercao={gatilho_insercao}: {len(por_id)} registros sincronizados, "
+            f"{len(gastos)} gravados"
+        )
+        assert por_id[gastos[0]["id"]]["valor"] == gastos[0]["valor"]
+
+
+def main():
+    falhas = 0
+    for nome, funcao in VERIFICACOES.items():
+        try:
+            funcao()
+            print(f"ok     {nome}")
+        except Exception:
+            falhas += 1
+            print(f"FALHOU {nome}")
+            traceback.print_exc()
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
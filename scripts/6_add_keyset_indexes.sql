@@ -0,0 +1,11 @@
+-- Índices para consultas por período e paginação por chave (keyset)
+-- As leituras do aplicativo sempre filtram por user_id e ordenam por (data, id)
+-- nos gastos e por id nas demais tabelas.
+CREATE INDEX IF NOT EXISTS idx_gastos_user_data_id ON public.gastos(user_id, data, id);
+CREATE INDEX IF NOT EXISTS idx_investimentos_user_id_id ON public.investimentos(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_dividas_user_id_id ON public.dividas(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_objetivos_user_id_id ON public.objetivos(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_seguros_user_id_id ON public.seguros(user_id, id);
+
+-- Atualizar o cache do schema
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,110 @@
+-- Suporte à sincronização incremental (delta) do aplicativo
+-- O cliente busca apenas registros com updated_at >= última marca conhecida e
+-- as exclusões registradas desde então nesta tabela de "tombstones".
+
+-- Tabela de registros excluídos
+CREATE TABLE IF NOT EXISTS public.registros_excluidos (
+    id BIGSERIAL PRIMARY KEY,
+    tabela TEXT NOT NULL,
+    registro_id UUID NOT NULL,
+    user_id UUID REFERENCES auth.users NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now())
+);
+
+CREATE INDEX IF NOT EXISTS idx_registros_excluidos_user_tabela_data
+    ON public.registros_excluidos(user_id, tabela, deleted_at);
+
+ALTER TABLE public.registros_excluidos ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "registros_excluidos_policy" ON public.registros_excluidos;
+CREATE POLICY "registros_excluidos_policy" ON public.registros_excluidos
+FOR SELECT
+USING (auth.uid() = user_id);
+
+-- Função que registra cada exclusão
+CREATE OR REPLACE FUNCTION registrar_exclusao()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.registros_excluidos (tabela, registro_id, user_id)
+    VALUES (TG_TABLE_NAME, OLD.id, OLD.user_id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Só os triggers usam a função (sem RPC pelo PostgREST)
+REVOKE EXECUTE ON FUNCTION registrar_exclusao() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS registrar_exclusao_objetivos ON objetivos;
+CREATE TRIGGER registrar_exclusao_objetivos
+AFTER DELETE ON objetivos
+FOR EACH ROW
+EXECUTE FUNCTION registrar_exclusao();
+
+DROP TRIGGER IF EXISTS registrar_exclusao_investimentos ON investimentos;
+CREATE TRIGGER registrar_exclusao_investimentos
+AFTER DELETE ON investimentos
+FOR EACH ROW
+EXECUTE FUNCTION registrar_exclusao();
+
+DROP TRIGGER IF EXISTS registrar_exclusao_dividas ON dividas;
+CREATE TRIGGER registrar_exclusao_dividas
+AFTER DELETE ON dividas
+FOR EACH ROW
+EXECUTE FUNCTION registrar_exclusao();
+
+DROP TRIGGER IF EXISTS registrar_exclusao_gastos ON gastos;
+CREATE TRIGGER registrar_exclusao_gastos
+AFTER DELETE ON gastos
+FOR EACH ROW
+EXECUTE FUNCTION registrar_exclusao();
+
+DROP TRIGGER IF EXISTS registrar_exclusao_seguros ON seguros;
+CREATE TRIGGER registrar_exclusao_seguros
+AFTER DELETE ON seguros
+FOR EACH ROW
+EXECUTE FUNCTION registrar_exclusao();
+
+-- updated_at também nas inserções
+-- Os triggers de scripts/3 só atualizam updated_at em UPDATE. As gravações
+-- completas excluem e reinserem os registros, e um registro reinserido com o
+-- updated_at antigo ficaria fora da sincronização incremental enquanto a
+-- exclusão registrada acima o removeria da cópia local.
+DROP TRIGGER IF EXISTS set_objetivos_updated_at_insert ON objetivos;
+CREATE TRIGGER set_objetivos_updated_at_insert
+BEFORE INSERT ON objetivos
+FOR EACH ROW
+EXECUTE FUNCTION update_modified_column();
+
+DROP TRIGGER IF EXISTS set_investimentos_updated_at_insert ON investimentos;
+CREATE TRIGGER set_investimentos_updated_at_insert
+BEFORE INSERT ON investimentos
+FOR EACH ROW
+EXECUTE FUNCTION update_modified_column();
+
+DROP TRIGGER IF EXISTS set_dividas_updated_at_insert ON dividas;
+CREATE TRIGGER set_dividas_updated_at_insert
+BEFORE INSERT ON dividas
+FOR EACH ROW
+EXECUTE FUNCTION update_modified_column();
+
+DROP TRIGGER IF EXISTS set_gastos_updated_at_insert ON gastos;
+CREATE TRIGGER set_gastos_updated_at_insert
+BEFORE INSERT ON gastos
+FOR EACH ROW
+EXECUTE FUNCTION update_modified_column();
+
+DROP TRIGGER IF EXISTS set_seguros_updated_at_insert ON seguros;
+CREATE TRIGGER set_seguros_updated_at_insert
+BEFORE INSERT ON seguros
+FOR EACH ROW
+EXECUTE FUNCTION update_modified_column();
+
+-- Índices para as consultas por updated_at
+CREATE INDEX IF NOT EXISTS idx_gastos_user_updated_at ON public.gastos(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_investimentos_user_updated_at ON public.investimentos(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_dividas_user_updated_at ON public.dividas(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_objetivos_user_updated_at ON public.objetivos(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_seguros_user_updated_at ON public.seguros(user_id, updated_at);
+
+-- Atualizar o cache do schema
+NOTIFY pgrst, 'reload schema';
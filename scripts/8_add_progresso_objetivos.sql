@@ -0,0 +1,148 @@
+-- Progresso dos objetivos calculado no banco
+-- Os vínculos objetivo ↔ investimento passam a ficar também em uma tabela
+-- normalizada, mantida por trigger a partir da coluna investimentos_vinculados
+-- (o aplicativo continua gravando a coluna). Outros triggers mantêm
+-- objetivos.valor_atual igual à soma dos investimentos vinculados sempre que um
+-- investimento ou os vínculos de um objetivo mudam. Como updated_at muda junto,
+-- a sincronização incremental leva o progresso atualizado ao aplicativo.
+-- Objetivos sem investimentos vinculados mantêm o valor informado manualmente.
+--
+-- Depois de executar este script, defina SUPABASE_PROGRESSO_OBJETIVOS=1 no
+-- aplicativo para que ele deixe de recalcular e gravar o progresso.
+
+-- Tabela de vínculos
+-- Sem chave estrangeira para investimentos: a gravação da lista completa exclui e
+-- reinsere os investimentos com os mesmos IDs, e os vínculos devem continuar valendo.
+CREATE TABLE IF NOT EXISTS public.objetivos_investimentos (
+    objetivo_id UUID NOT NULL REFERENCES public.objetivos(id) ON DELETE CASCADE,
+    investimento_id UUID NOT NULL,
+    user_id UUID REFERENCES auth.users NOT NULL,
+    PRIMARY KEY (objetivo_id, investimento_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_objetivos_investimentos_investimento
+    ON public.objetivos_investimentos(investimento_id);
+CREATE INDEX IF NOT EXISTS idx_objetivos_investimentos_user
+    ON public.objetivos_investimentos(user_id);
+
+-- Os vínculos são gravados apenas pelos triggers
+ALTER TABLE public.objetivos_investimentos ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "objetivos_investimentos_policy" ON public.objetivos_investimentos;
+CREATE POLICY "objetivos_investimentos_policy" ON public.objetivos_investimentos
+FOR SELECT
+USING (auth.uid() = user_id);
+
+-- Soma dos investimentos vinculados a um objetivo (só grava se o valor mudou)
+CREATE OR REPLACE FUNCTION recalcular_progresso_objetivo(p_objetivo_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    WITH total AS (
+        SELECT COALESCE(SUM(i.valor_atual), 0) AS valor
+        FROM public.objetivos_investimentos oi
+        LEFT JOIN public.investimentos i
+            ON i.id = oi.investimento_id AND i.user_id = oi.user_id
+        WHERE oi.objetivo_id = p_objetivo_id
+        HAVING COUNT(*) > 0
+    )
+    UPDATE public.objetivos o
+    SET valor_atual = total.valor
+    FROM total
+    WHERE o.id = p_objetivo_id
+      AND o.valor_atual IS DISTINCT FROM total.valor;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Vínculos de um objetivo a partir da coluna investimentos_vinculados
+-- (UUID[] ou JSONB, conforme o script usado para criar a tabela)
+CREATE OR REPLACE FUNCTION sincronizar_vinculos_objetivo()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM public.objetivos_investimentos WHERE objetivo_id = NEW.id;
+
+    INSERT INTO public.objetivos_investimentos (objetivo_id, investimento_id, user_id)
+    SELECT DISTINCT NEW.id, vinculo::UUID, NEW.user_id
+    FROM jsonb_array_elements_text(COALESCE(to_jsonb(NEW.investimentos_vinculados), '[]'::jsonb)) AS vinculo
+    WHERE vinculo ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$';
+
+    PERFORM recalcular_progresso_objetivo(NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Só dispara quando os vínculos mudam: a atualização de valor_atual feita por
+-- recalcular_progresso_objetivo não o aciona de novo
+DROP TRIGGER IF EXISTS sincronizar_vinculos_objetivos ON objetivos;
+CREATE TRIGGER sincronizar_vinculos_objetivos
+AFTER INSERT OR UPDATE OF investimentos_vinculados ON objetivos
+FOR EACH ROW
+EXECUTE FUNCTION sincronizar_vinculos_objetivo();
+
+-- Progresso dos objetivos vinculados a um investimento inserido, alterado ou excluído
+CREATE OR REPLACE FUNCTION atualizar_progresso_por_investimento()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_investimento_id UUID;
+    v_objetivo_id UUID;
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.valor_atual IS NOT DISTINCT FROM OLD.valor_atual THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        v_investimento_id := OLD.id;
+    ELSE
+        v_investimento_id := NEW.id;
+    END IF;
+
+    FOR v_objetivo_id IN
+        SELECT objetivo_id FROM public.objetivos_investimentos WHERE investimento_id = v_investimento_id
+    LOOP
+        PERFORM recalcular_progresso_objetivo(v_objetivo_id);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+DROP TRIGGER IF EXISTS atualizar_progresso_objetivos ON investimentos;
+CREATE TRIGGER atualizar_progresso_objetivos
+AFTER INSERT OR UPDATE OF valor_atual OR DELETE ON investimentos
+FOR EACH ROW
+EXECUTE FUNCTION atualizar_progresso_por_investimento();
+
+-- As funções rodam com os privilégios do dono (SECURITY DEFINER) e só devem ser
+-- chamadas pelos triggers: sem EXECUTE para os papéis da API, o PostgREST não as
+-- expõe como RPC (recalcular_progresso_objetivo alcançaria o objetivo de qualquer usuário)
+REVOKE EXECUTE ON FUNCTION recalcular_progresso_objetivo(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION sincronizar_vinculos_objetivo() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION atualizar_progresso_por_investimento() FROM PUBLIC, anon, authenticated;
+
+-- Investimentos vinculados a cada objetivo, já resolvidos
+-- (security_invoker: a visão respeita as políticas de cada usuário)
+CREATE OR REPLACE VIEW public.objetivos_investimentos_detalhe
+WITH (security_invoker = true) AS
+SELECT
+    oi.objetivo_id,
+    oi.investimento_id,
+    oi.user_id,
+    i.nome,
+    i.valor_atual
+FROM public.objetivos_investimentos oi
+JOIN public.investimentos i
+    ON i.id = oi.investimento_id AND i.user_id = oi.user_id;
+
+-- Vínculos e progresso dos objetivos já existentes
+INSERT INTO public.objetivos_investimentos (objetivo_id, investimento_id, user_id)
+SELECT DISTINCT o.id, vinculo::UUID, o.user_id
+FROM public.objetivos o,
+     jsonb_array_elements_text(COALESCE(to_jsonb(o.investimentos_vinculados), '[]'::jsonb)) AS vinculo
+WHERE vinculo ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+ON CONFLICT DO NOTHING;
+
+SELECT recalcular_progresso_objetivo(objetivo_id)
+FROM (SELECT DISTINCT objetivo_id FROM public.objetivos_investimentos) AS vinculados;
+
+-- Atualizar o cache do schema
+NOTIFY pgrst, 'reload schema';